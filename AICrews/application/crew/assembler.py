@@ -16,7 +16,7 @@ import asyncio
 import os  # 添加 os 导入
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from crewai import Agent, Crew, Process, Task, LLM
 
@@ -26,8 +26,6 @@ from AICrews.llm.policy_router import LLMPolicyRouter
 from AICrews.schemas.llm_policy import LLMKeyProvisioningError
 from AICrews.database.db_manager import DBManager
 from AICrews.database.models import (
-    AgentDefinition,
-    TaskDefinition,
     CrewDefinition,
     CrewVersion,
     User,
@@ -40,7 +38,13 @@ from AICrews.database.models import (
 from AICrews.infrastructure.knowledge.knowledge_sources import KnowledgeLoader
 from AICrews.utils.citations import CitationParser
 from AICrews.utils.redaction import truncate_text
-from .preflight import CrewValidator, PreflightResult
+from .crew_graph import CrewGraph
+from .preflight import (
+    CrewValidator,
+    PreflightResult,
+    entitlement_fingerprint,
+    preflight_cache_tags,
+)
 from .versioning import CrewVersionManager
 from .task_runtime_builder import build_task_kwargs, get_provider_capabilities
 
@@ -138,6 +142,9 @@ def build_task_output_callback(
     - artifact_ref: placeholder for archive path
     - diagnostics: output_mode, schema_key, citations, etc.
 
+    The output is also checkpointed (task_checkpoints) so an interrupted run
+    with the same job_id can skip this task on resume.
+
     Args:
         job_id: The job/run ID
         task_id: The task ID
@@ -226,6 +233,16 @@ def build_task_output_callback(
             ),
         )
 
+        # 7. Checkpoint the output for resume
+        try:
+            from AICrews.application.crew.task_checkpoints import checkpoint_task_output
+
+            checkpoint_task_output(job_id, task_id, output)
+        except Exception:
+            logger.warning(
+                f"[Job {job_id}] Failed to checkpoint task {task_id}", exc_info=True
+            )
+
     return task_output_callback
 
 
@@ -260,24 +277,45 @@ class CrewAssembler:
 
         self.redis = get_redis_manager()
 
-        from AICrews.infrastructure.cache.layered_cache_manager import LayeredCacheManager
+        from AICrews.infrastructure.cache.layered_cache_manager import get_layered_cache
         from AICrews.tools.registry.tool_preregistrar import ToolPreregistrar
 
-        self._cache_manager = LayeredCacheManager(redis_manager=self.redis)
+        # 进程级共享：编译产物在 L1 (有界 LRU) 与 Redis 之间分层缓存
+        self._cache_manager = get_layered_cache()
         self._tool_preregistrar = ToolPreregistrar()
-        self._memory_cache: Dict[str, Any] = {}
 
-    def _get_cache_key(
-        self, crew_id: int, user_id: Optional[int], variables: Dict[str, Any]
-    ) -> str:
-        """生成编译产物缓存键"""
+    # 编译结构的格式版本（结构字段变化时递增，避免读取旧格式的缓存）
+    STRUCTURE_FORMAT = 1
+    STRUCTURE_CACHE_TTL = 1800
+    # 预检结果缓存时长（秒）；0 关闭。兜底未接入失效通知的配置变更（如提供方健康状态）
+    PREFLIGHT_CACHE_TTL = int(os.getenv("FAIC_PREFLIGHT_CACHE_TTL", "120"))
+
+    def _get_cache_key(self, crew_id: int, user_id: Optional[int], version: str) -> str:
+        """生成编译结构缓存键（与运行变量无关）"""
+        return f"compiled_crew:{crew_id}:{user_id or 0}:{version}"
+
+    def _crew_version(self, crew_id: int, crew_def: Optional[CrewDefinition] = None) -> str:
+        """Crew 定义的版本标识（updated_at 的哈希），单列查询
+
+        Crew 编辑会更新 updated_at，旧结构随之不可达；Agent / Task 的编辑
+        通过 user:<id> 标签失效。已加载 crew_def 时直接读取，不再查询。
+        """
         import hashlib
-        import json
 
-        var_hash = hashlib.md5(
-            json.dumps(variables, sort_keys=True).encode()
-        ).hexdigest()
-        return f"compiled_crew:{crew_id}:{user_id or 0}:{var_hash}"
+        if crew_def is not None:
+            updated_at = crew_def.updated_at
+        else:
+            session = self.db.get_session()
+            try:
+                updated_at = (
+                    session.query(CrewDefinition.updated_at)
+                    .filter(CrewDefinition.id == crew_id)
+                    .scalar()
+                )
+            finally:
+                session.close()
+        stamp = f"{self.STRUCTURE_FORMAT}:{updated_at.isoformat() if updated_at else ''}"
+        return hashlib.md5(stamp.encode()).hexdigest()[:12]
 
     def interpolate_variables(self, text: str, variables: Dict[str, Any]) -> str:
         """
@@ -350,37 +388,10 @@ class CrewAssembler:
 
         return prefix + description + suffix
 
-    async def get_compiled_crew(
-        self, crew_id: int, user_id: Optional[int], variables: Dict[str, Any]
-    ) -> Optional[Dict[str, Any]]:
-        """从缓存获取编译后的 Crew"""
-        key = self._get_cache_key(crew_id, user_id, variables)
-        try:
-            cache_mgr = getattr(self, "_cache_manager", None)
-            if cache_mgr is not None and hasattr(cache_mgr, "get_json"):
-                return await cache_mgr.get_json(key, layer="redis")
-        except Exception:
-            logger.debug("Layered cache get_json failed; falling back to redis", exc_info=True)
-        return await self.redis.get_json(key)
-
-    async def cache_compiled_crew(
-        self,
-        crew_id: int,
-        user_id: Optional[int],
-        variables: Dict[str, Any],
-        data: Dict[str, Any],
-        ttl: int = 1800,
-    ):
-        """缓存编译后的 Crew (默认 30 分钟)"""
-        key = self._get_cache_key(crew_id, user_id, variables)
-        try:
-            cache_mgr = getattr(self, "_cache_manager", None)
-            if cache_mgr is not None and hasattr(cache_mgr, "set_json"):
-                await cache_mgr.set_json(key, data, ttl=ttl, layer="redis")
-                return
-        except Exception:
-            logger.debug("Layered cache set_json failed; falling back to redis", exc_info=True)
-        await self.redis.set(key, data, ttl=ttl)
+    @staticmethod
+    def _cache_tags(crew_id: int, user_id: Optional[int]) -> List[str]:
+        """编译产物的失效标签：Crew 本身或用户的 Agent/Task/工具变更时失效"""
+        return [f"crew:{crew_id}", f"user:{user_id or 0}"]
 
     def compile(
         self,
@@ -393,246 +404,275 @@ class CrewAssembler:
 
         执行所有数据库查询、变量插值和工具/知识源解析。
         """
-        variables = variables or {}
-        session = self.db.get_session()
+        return self.materialize(self.compile_structure(crew_id, user_id), variables or {})
 
-        try:
-            crew_def = session.get(CrewDefinition, crew_id)
-            if not crew_def:
-                raise ValueError(f"Crew not found: {crew_id}")
+    def compile_structure(
+        self,
+        crew_id: int,
+        user_id: Optional[int] = None,
+        graph: Optional[CrewGraph] = None,
+    ) -> Dict[str, Any]:
+        """
+        编译第一阶段：与运行变量无关的结构
 
-            from AICrews.application.crew.variable_defaults import merge_crew_variables
-            from AICrews.application.crew.system_context import (
-                ensure_system_variables,
-                inject_system_context_to_backstory,
-            )
+        执行所有数据库查询和工具/知识源解析；goal / backstory / description /
+        expected_output 保留模板原文，由 materialize 插值。结果可按 Crew 版本缓存。
 
-            # Step 1: Merge user variables with defaults
-            merged_vars = merge_crew_variables(
-                input_schema=crew_def.input_schema,
-                default_variables=crew_def.default_variables,
-                variables=variables,
-            )
+        graph: 已加载的 Crew 实体（与预检共享）；未提供时在独立会话中批量加载
+        """
+        if graph is not None:
+            return self._compile_graph(graph)
+
+        session = self.db.get_session()
+        try:
+            graph = CrewGraph.load(session, crew_id, user_id)
+            if graph is None:
+                raise ValueError(f"Crew not found: {crew_id}")
+            return self._compile_graph(graph)
+        finally:
+            session.close()
 
-            # Step 2: Ensure system variables (date, timestamp, year) are present
-            merged_vars = ensure_system_variables(merged_vars)
+    def _compile_graph(self, graph: CrewGraph) -> Dict[str, Any]:
+        """按已加载的 CrewGraph 编译结构（不再逐条查询 Agent / Task）"""
+        crew_def = graph.crew
+        crew_id = crew_def.id
 
-            compiled_agents = []
-            compiled_tasks = []
+        compiled_agents = []
+        compiled_tasks = []
 
-            # 这里的逻辑与 assemble 类似，但返回的是可序列化的字典
-            # 为了简化，我们按顺序处理 structure
-            for entry in crew_def.structure or []:
-                entry_type = entry.get("type")
+        # 这里的逻辑与 assemble 类似，但返回的是可序列化的字典
+        # 为了简化，我们按顺序处理 structure
+        for entry in crew_def.structure or []:
+            entry_type = entry.get("type")
 
-                if entry_type == "router":
-                    # Router 处理逻辑
-                    decision_task_id = entry.get("decision_task_id")
-                    if decision_task_id:
-                        task_def = session.get(TaskDefinition, decision_task_id)
-                        if task_def:
-                            compiled_tasks.append(
+            if entry_type == "router":
+                # Router 处理逻辑
+                decision_task_id = entry.get("decision_task_id")
+                if decision_task_id:
+                    task_def = graph.task(decision_task_id)
+                    if task_def:
+                        compiled_tasks.append(
+                            {
+                                "type": "router_decision",
+                                "task_id": decision_task_id,
+                                "name": task_def.name,
+                                "description": task_def.description,
+                                "expected_output": task_def.expected_output,
+                                "async_execution": task_def.async_execution,
+                            }
+                        )
+                continue
+
+            if entry_type == "summary":
+                # Summary 处理逻辑
+                summary_task_id = entry.get("task_id")
+                reporter_agent_id = entry.get("reporter_agent_id")
+
+                # 如果有 Reporter Agent，编译它
+                if reporter_agent_id:
+                    reporter_def = graph.agent(reporter_agent_id)
+                    if reporter_def:
+                        # 检查是否已编译过
+                        existing_ids = [a["agent_id"] for a in compiled_agents]
+                        if reporter_agent_id not in existing_ids:
+                            compiled_agents.append(
                                 {
-                                    "type": "router_decision",
-                                    "task_id": decision_task_id,
-                                    "name": task_def.name,
-                                    "description": self.interpolate_variables(
-                                        task_def.description, merged_vars
-                                    ),
-                                    "expected_output": self.interpolate_variables(
-                                        task_def.expected_output, merged_vars
-                                    ),
-                                    "async_execution": task_def.async_execution,
+                                    "agent_id": reporter_agent_id,
+                                    "name": reporter_def.name,
+                                    "role": reporter_def.role,
+                                    "goal": reporter_def.goal,
+                                    "backstory": reporter_def.backstory,
+                                    "llm_config": reporter_def.llm_config,
+                                    "tool_ids": [],
+                                    "loadout_data": reporter_def.loadout_data,
+                                    "knowledge_source_ids": [],
+                                    "verbose": reporter_def.verbose,
+                                    "allow_delegation": reporter_def.allow_delegation,
+                                    "memory_policy": reporter_def.memory_policy or "run_only",
+                                    "mcp_server_ids": [],
+                                    "is_reporter": True,  # 标记为 Reporter Agent
                                 }
                             )
-                    continue
 
-                if entry_type == "summary":
-                    # Summary 处理逻辑
-                    summary_task_id = entry.get("task_id")
-                    reporter_agent_id = entry.get("reporter_agent_id")
+                if summary_task_id:
+                    task_def = graph.task(summary_task_id)
+                    if task_def:
+                        compiled_tasks.append(
+                            {
+                                "type": "summary",
+                                "task_id": summary_task_id,
+                                "agent_id": reporter_agent_id,  # 显式分配 Reporter Agent
+                                "name": task_def.name,
+                                "description": task_def.description,
+                                "expected_output": task_def.expected_output,
+                                "context_task_ids": entry.get(
+                                    "context_task_ids", []
+                                ),
+                                "async_execution": task_def.async_execution,
+                            }
+                        )
+                continue
 
-                    # 如果有 Reporter Agent，编译它
-                    if reporter_agent_id:
-                        reporter_def = session.get(AgentDefinition, reporter_agent_id)
-                        if reporter_def:
-                            # 检查是否已编译过
-                            existing_ids = [a["agent_id"] for a in compiled_agents]
-                            if reporter_agent_id not in existing_ids:
-                                compiled_agents.append(
-                                    {
-                                        "agent_id": reporter_agent_id,
-                                        "name": reporter_def.name,
-                                        "role": reporter_def.role,
-                                        "goal": self.interpolate_variables(
-                                            reporter_def.goal, merged_vars
-                                        ),
-                                        "backstory": inject_system_context_to_backstory(
-                                            self.interpolate_variables(
-                                                reporter_def.backstory, merged_vars
-                                            ),
-                                            merged_vars,
-                                            position="prepend"
-                                        ),
-                                        "llm_config": reporter_def.llm_config,
-                                        "tool_ids": [],
-                                        "loadout_data": reporter_def.loadout_data,
-                                        "knowledge_source_ids": [],
-                                        "verbose": reporter_def.verbose,
-                                        "allow_delegation": reporter_def.allow_delegation,
-                                        "memory_policy": reporter_def.memory_policy or "run_only",
-                                        "mcp_server_ids": [],
-                                        "is_reporter": True,  # 标记为 Reporter Agent
-                                    }
-                                )
+            # 普通 Agent 节点
+            agent_id = entry.get("agent_id")
+            task_ids = entry.get("tasks", [])
 
-                    if summary_task_id:
-                        task_def = session.get(TaskDefinition, summary_task_id)
-                        if task_def:
-                            compiled_tasks.append(
-                                {
-                                    "type": "summary",
-                                    "task_id": summary_task_id,
-                                    "agent_id": reporter_agent_id,  # 显式分配 Reporter Agent
-                                    "name": task_def.name,
-                                    "description": self.interpolate_variables(
-                                        task_def.description, merged_vars
-                                    ),
-                                    "expected_output": self.interpolate_variables(
-                                        task_def.expected_output, merged_vars
-                                    ),
-                                    "context_task_ids": entry.get(
-                                        "context_task_ids", []
-                                    ),
-                                    "async_execution": task_def.async_execution,
-                                }
-                            )
-                    continue
+            if not agent_id:
+                continue
 
-                # 普通 Agent 节点
-                agent_id = entry.get("agent_id")
-                task_ids = entry.get("tasks", [])
+            agent_def = graph.agent(agent_id)
+            if not agent_def:
+                continue
 
-                if not agent_id:
-                    continue
+            # 获取知识源
+            ks_ids = (
+                entry.get("knowledge_source_ids") or agent_def.knowledge_source_ids
+            )
 
-                agent_def = session.get(AgentDefinition, agent_id)
-                if not agent_def:
-                    continue
+            # 获取工具配置 (支持新旧两种格式)
+            tool_ids = []
+            loadout_data = None
 
-                # 获取知识源
-                ks_ids = (
-                    entry.get("knowledge_source_ids") or agent_def.knowledge_source_ids
-                )
+            if agent_def.loadout_data:
+                loadout = agent_def.loadout_data
+                # 新格式: skill_keys (Task 1.5)
+                if "skill_keys" in loadout:
+                    loadout_data = loadout  # Pass through for WrapperFactory
+                else:
+                    # 旧格式: 4-Tier (data_tools, quant_tools, etc.)
+                    for tier_key in [
+                        "data_tools",
+                        "quant_tools",
+                        "external_tools",
+                        "strategies",
+                    ]:
+                        tool_ids.extend(loadout.get(tier_key, []))
+            elif agent_def.tool_ids:
+                tool_ids.extend([str(t) for t in agent_def.tool_ids])
+
+            compiled_agent = {
+                "agent_id": agent_id,
+                "name": agent_def.name,
+                "role": agent_def.role,
+                "goal": agent_def.goal,
+                "backstory": agent_def.backstory,
+                "llm_config": agent_def.llm_config,
+                "tool_ids": tool_ids,
+                "loadout_data": loadout_data,  # New: pass skill_keys loadout
+                "knowledge_source_ids": ks_ids,
+                "verbose": agent_def.verbose,
+                "allow_delegation": agent_def.allow_delegation,
+                "memory_policy": agent_def.memory_policy or "run_only",
+                "mcp_server_ids": agent_def.mcp_server_ids
+                if not agent_def.loadout_data
+                else [],
+            }
+            compiled_agents.append(compiled_agent)
+
+            # Get router_condition from structure entry (if present)
+            router_condition = entry.get("router_condition")
+
+            for tid in task_ids:
+                task_def = graph.task(tid)
+                if task_def:
+                    compiled_tasks.append(
+                        {
+                            "type": "agent_task",
+                            "task_id": tid,
+                            "agent_id": agent_id,
+                            "name": task_def.name,
+                            "description": task_def.description,
+                            # Router condition wrapper is applied after interpolation (not persisted)
+                            "router_condition": router_condition,
+                            "expected_output": task_def.expected_output,
+                            "context_task_ids": task_def.context_task_ids or [],
+                            "async_execution": task_def.async_execution,
+                            # Task Output Spec fields
+                            "output_mode": getattr(task_def, "output_mode", "raw") or "raw",
+                            "output_schema_key": getattr(task_def, "output_schema_key", None),
+                            "guardrail_keys": getattr(task_def, "guardrail_keys", []) or [],
+                            "guardrail_max_retries": getattr(task_def, "guardrail_max_retries", 3) or 3,
+                            "strict_mode": getattr(task_def, "strict_mode", False) or False,
+                        }
+                    )
 
-                # 获取工具配置 (支持新旧两种格式)
-                tool_ids = []
-                loadout_data = None
+        return {
+            "crew_id": crew_id,
+            "name": crew_def.name,
+            "process": crew_def.process,
+            "memory_enabled": crew_def.memory_enabled,
+            "memory_policy": crew_def.memory_policy or "run_only",
+            "verbose": crew_def.verbose,
+            "cache_enabled": crew_def.cache_enabled,
+            "manager_llm_config": crew_def.manager_llm_config,
+            "agents": compiled_agents,
+            "tasks": compiled_tasks,
+            "input_schema": crew_def.input_schema,
+            "default_variables": crew_def.default_variables,
+            "compiled_at": datetime.now().isoformat(),
+        }
 
-                if agent_def.loadout_data:
-                    loadout = agent_def.loadout_data
-                    # 新格式: skill_keys (Task 1.5)
-                    if "skill_keys" in loadout:
-                        loadout_data = loadout  # Pass through for WrapperFactory
-                    else:
-                        # 旧格式: 4-Tier (data_tools, quant_tools, etc.)
-                        for tier_key in [
-                            "data_tools",
-                            "quant_tools",
-                            "external_tools",
-                            "strategies",
-                        ]:
-                            tool_ids.extend(loadout.get(tier_key, []))
-                elif agent_def.tool_ids:
-                    tool_ids.extend([str(t) for t in agent_def.tool_ids])
-
-                compiled_agent = {
-                    "agent_id": agent_id,
-                    "name": agent_def.name,
-                    "role": agent_def.role,
-                    "goal": self.interpolate_variables(agent_def.goal, merged_vars),
-                    "backstory": inject_system_context_to_backstory(
-                        self.interpolate_variables(agent_def.backstory, merged_vars),
-                        merged_vars,
-                        position="prepend"
-                    ),
-                    "llm_config": agent_def.llm_config,
-                    "tool_ids": tool_ids,
-                    "loadout_data": loadout_data,  # New: pass skill_keys loadout
-                    "knowledge_source_ids": ks_ids,
-                    "verbose": agent_def.verbose,
-                    "allow_delegation": agent_def.allow_delegation,
-                    "memory_policy": agent_def.memory_policy or "run_only",
-                    "mcp_server_ids": agent_def.mcp_server_ids
-                    if not agent_def.loadout_data
-                    else [],
-                }
-                compiled_agents.append(compiled_agent)
+    def materialize(self, structure: Dict[str, Any], variables: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        编译第二阶段：把运行变量插值进结构（不访问数据库）
 
-                # Get router_condition from structure entry (if present)
-                router_condition = entry.get("router_condition")
+        不修改传入的 structure（可能是缓存中的共享对象）。
+        """
+        import copy
 
-                for tid in task_ids:
-                    task_def = session.get(TaskDefinition, tid)
-                    if task_def:
-                        # Interpolate description
-                        description = self.interpolate_variables(
-                            task_def.description, merged_vars
-                        )
+        from AICrews.application.crew.variable_defaults import merge_crew_variables
+        from AICrews.application.crew.system_context import (
+            ensure_system_variables,
+            inject_system_context_to_backstory,
+        )
 
-                        # Apply router condition wrapper at runtime (not persisted)
-                        if router_condition:
-                            description = self._wrap_router_condition(
-                                description, router_condition
-                            )
+        # Step 1: Merge user variables with defaults
+        merged_vars = merge_crew_variables(
+            input_schema=structure.get("input_schema"),
+            default_variables=structure.get("default_variables"),
+            variables=variables,
+        )
 
-                        compiled_tasks.append(
-                            {
-                                "type": "agent_task",
-                                "task_id": tid,
-                                "agent_id": agent_id,
-                                "name": task_def.name,
-                                "description": description,
-                                "expected_output": self.interpolate_variables(
-                                    task_def.expected_output, merged_vars
-                                ),
-                                "context_task_ids": task_def.context_task_ids or [],
-                                "async_execution": task_def.async_execution,
-                                # Task Output Spec fields
-                                "output_mode": getattr(task_def, "output_mode", "raw") or "raw",
-                                "output_schema_key": getattr(task_def, "output_schema_key", None),
-                                "guardrail_keys": getattr(task_def, "guardrail_keys", []) or [],
-                                "guardrail_max_retries": getattr(task_def, "guardrail_max_retries", 3) or 3,
-                                "strict_mode": getattr(task_def, "strict_mode", False) or False,
-                            }
-                        )
+        # Step 2: Ensure system variables (date, timestamp, year) are present
+        merged_vars = ensure_system_variables(merged_vars)
 
-            return {
-                "crew_id": crew_id,
-                "name": crew_def.name,
-                "process": crew_def.process,
-                "memory_enabled": crew_def.memory_enabled,
-                "memory_policy": crew_def.memory_policy or "run_only",
-                "verbose": crew_def.verbose,
-                "cache_enabled": crew_def.cache_enabled,
-                "manager_llm_config": crew_def.manager_llm_config,
-                "agents": compiled_agents,
-                "tasks": compiled_tasks,
-                "variables": merged_vars,  # Include merged variables for runtime builder
-                "compiled_at": datetime.now().isoformat(),
-            }
+        compiled = copy.deepcopy(structure)
+        compiled.pop("input_schema", None)
+        compiled.pop("default_variables", None)
 
-        finally:
-            session.close()
+        for agent in compiled["agents"]:
+            agent["goal"] = self.interpolate_variables(agent["goal"], merged_vars)
+            agent["backstory"] = inject_system_context_to_backstory(
+                self.interpolate_variables(agent["backstory"], merged_vars),
+                merged_vars,
+                position="prepend",
+            )
+
+        for task in compiled["tasks"]:
+            router_condition = task.pop("router_condition", None)
+            description = self.interpolate_variables(task["description"], merged_vars)
+            # Apply router condition wrapper at runtime (not persisted)
+            if router_condition:
+                description = self._wrap_router_condition(description, router_condition)
+            task["description"] = description
+            task["expected_output"] = self.interpolate_variables(
+                task["expected_output"], merged_vars
+            )
+
+        compiled["variables"] = merged_vars  # Include merged variables for runtime builder
+        return compiled
 
     def instantiate(
         self,
         compiled_data: Dict[str, Any],
         job_id: Optional[str] = None,
         user_id: Optional[int] = None,
+        task_index: Optional[Dict[Any, Task]] = None,
     ) -> Crew:
         """
         从编译后的数据实例化 CrewAI 对象
+
+        task_index: 如提供，写入 task_id -> Task 映射（RuntimeExecutor 的 DAG 模式按任务调度）
         """
         # 🔧 清理可能导致 LLM 调用失败的环境变量
         # 只允许使用用户数据库中的配置，不依赖任何环境变量
@@ -687,6 +727,10 @@ class CrewAssembler:
         # Track all provider keys used by agents for memory gate check
         agent_provider_keys: List[str] = []
 
+        # 同一次实例化的所有 Agent 共用解析器与注册中心（复用其内部缓存）
+        loadout_resolver = None
+        tool_registry = None
+
         try:
             # 1. 实例化 Agents
             for a_data in compiled_data["agents"]:
@@ -776,8 +820,9 @@ class CrewAssembler:
                     from AICrews.services.loadout_resolver import LoadoutResolver
 
                     skill_keys = a_data["loadout_data"]["skill_keys"]
-                    resolver = LoadoutResolver(session, user_id=user_id)
-                    loadout_resolved = resolver.get_resolved_loadout(skill_keys)
+                    if loadout_resolver is None:
+                        loadout_resolver = LoadoutResolver(session, user_id=user_id)
+                    loadout_resolved = loadout_resolver.get_resolved_loadout(skill_keys)
 
                     tools = loadout_resolved["tools"]  # Builtin tools (BaseTool instances)
 
@@ -807,8 +852,9 @@ class CrewAssembler:
                 elif a_data.get("tool_ids"):
                     from AICrews.tools.registry.tool_registry import ToolRegistry
 
-                    registry = ToolRegistry(db=session)
-                    raw_tools = registry.get_tools_by_namespaced_ids(
+                    if tool_registry is None:
+                        tool_registry = ToolRegistry(db=session)
+                    raw_tools = tool_registry.get_tools_by_namespaced_ids(
                         a_data["tool_ids"], user_id=user_id
                     )
                     tools = list(raw_tools or [])
@@ -1159,6 +1205,8 @@ class CrewAssembler:
             if embedder_config:
                 crew_params["embedder"] = embedder_config
 
+            if task_index is not None:
+                task_index.update(task_map)
             return Crew(**crew_params)
         finally:
             session.close()
@@ -1170,9 +1218,12 @@ class CrewAssembler:
         variables: Optional[Dict[str, Any]] = None,
         job_id: Optional[str] = None,
         skip_preflight: bool = False,
+        task_index: Optional[Dict[Any, Task]] = None,
     ) -> Tuple[Crew, PreflightResult]:
         """
         组装 Crew (支持缓存)
+
+        task_index: 见 instantiate（断点续跑按 task_id 恢复已完成任务）
         """
         variables = variables or {}
 
@@ -1189,7 +1240,9 @@ class CrewAssembler:
         else:
             logger.info(f"Cache miss for crew {crew_id}. Compiling...")
 
-        crew = self.instantiate(compiled_data, job_id=job_id, user_id=user_id)
+        crew = self.instantiate(
+            compiled_data, job_id=job_id, user_id=user_id, task_index=task_index
+        )
         return crew, preflight
 
     def _get_executor_mode(self) -> str:
@@ -1209,47 +1262,93 @@ class CrewAssembler:
     ) -> Tuple[Dict[str, Any], str, PreflightResult]:
         variables = variables or {}
 
-        if not skip_preflight:
-            preflight = self.preflight_check(crew_id, user_id, variables)
-            if not preflight.success:
-                raise ValueError(f"Preflight check failed: {preflight.errors}")
-        else:
-            preflight = PreflightResult(success=True)
+        # 预检与编译在缓存未命中时才加载 CrewGraph，并共享同一会话中批量加载的实体
+        session = None
+        graph: Optional[CrewGraph] = None
+
+        def load_graph() -> Optional[CrewGraph]:
+            nonlocal session, graph
+            if graph is None:
+                if session is None:
+                    session = self.db.get_session()
+                graph = CrewGraph.load(session, crew_id, user_id)
+            return graph
+
+        try:
+            version = self._crew_version(crew_id)
+            if not skip_preflight:
+                preflight = self._preflight(crew_id, user_id, variables, version, load_graph)
+                if not preflight.success:
+                    raise ValueError(f"Preflight check failed: {preflight.errors}")
+            else:
+                preflight = PreflightResult(success=True)
+
+            structure, cache_source = self._get_or_compile_structure(
+                crew_id, user_id, version, load_graph
+            )
+        finally:
+            if session is not None:
+                session.close()
 
-        key = self._get_cache_key(crew_id, user_id, variables)
-        compiled_data = None
+        return self.materialize(structure, variables), cache_source, preflight
+
+    def _get_or_compile_structure(
+        self,
+        crew_id: int,
+        user_id: Optional[int],
+        version: str,
+        load_graph: Callable[[], Optional[CrewGraph]],
+    ) -> Tuple[Dict[str, Any], str]:
+        """读取或编译与变量无关的结构，返回 (structure, cache_source)"""
+        # 结构按 Crew 版本缓存，与变量（ticker / date 等）无关；变量每次插值
+        key = self._get_cache_key(crew_id, user_id, version)
+        structure = None
         cache_source = "none"
 
         cache_mgr = getattr(self, "_cache_manager", None)
         try:
-            if cache_mgr is not None and hasattr(cache_mgr, "get_json_sync"):
-                compiled_data = cache_mgr.get_json_sync(key, layer="redis")
+            if cache_mgr is not None:
+                structure = cache_mgr.get(key)
+                if structure:
+                    cache_source = "memory"
+                else:
+                    structure = cache_mgr.get_json_sync(key, layer="all")
             else:
-                compiled_data = self.redis.get_json_sync(key)
-            if compiled_data:
+                structure = self.redis.get_json_sync(key)
+            if structure and cache_source == "none":
                 cache_source = "redis"
         except Exception:
-            compiled_data = None
+            structure = None
 
-        if not compiled_data:
-            compiled_data = self._memory_cache.get(key)
-            if compiled_data:
-                cache_source = "memory"
-
-        if not compiled_data:
-            compiled_data = self.compile(crew_id, user_id, variables)
+        if not structure:
+            graph = load_graph()
+            if graph is None:
+                raise ValueError(f"Crew not found: {crew_id}")
+            structure = self.compile_structure(crew_id, user_id, graph=graph)
             cached = False
             try:
-                if cache_mgr is not None and hasattr(cache_mgr, "set_json_sync"):
-                    cached = bool(cache_mgr.set_json_sync(key, compiled_data, ttl=1800, layer="redis"))
+                if cache_mgr is not None:
+                    # 同时写入 L1 与 Redis；Redis 不可用时仅保留在 L1
+                    cached = bool(
+                        cache_mgr.set_json_sync(
+                            key,
+                            structure,
+                            ttl=self.STRUCTURE_CACHE_TTL,
+                            layer="all",
+                            tags=self._cache_tags(crew_id, user_id),
+                        )
+                    )
                 else:
-                    cached = bool(self.redis.set_sync(key, compiled_data, ttl=1800, json_encode=True))
+                    cached = bool(
+                        self.redis.set_sync(
+                            key, structure, ttl=self.STRUCTURE_CACHE_TTL, json_encode=True
+                        )
+                    )
             except Exception:
                 cached = False
-            self._memory_cache[key] = compiled_data
-            cache_source = "redis+memory" if cached else "memory-only"
+            cache_source = "redis+memory" if cached or cache_mgr is None else "memory-only"
 
-        return compiled_data, cache_source, preflight
+        return structure, cache_source
 
     def _build_execution_graph(self, crew_id: int, user_id: Optional[int]) -> Any:
         session = self.db.get_session()
@@ -1294,6 +1393,7 @@ class CrewAssembler:
 
         if mode == "runtime_executor":
             from AICrews.execution.runtime_executor import RuntimeExecutor
+            from AICrews.execution.state_persistence import get_execution_state_store
             import inspect
 
             graph = self._build_execution_graph(crew_id, user_id)
@@ -1306,6 +1406,7 @@ class CrewAssembler:
                 job_id=job_id,
                 compiled_data=compiled_data,
                 instantiate_fn=self.instantiate,
+                state_store=get_execution_state_store(),
             )
             if inspect.isawaitable(result):
                 result = asyncio.run(result)
@@ -1366,6 +1467,7 @@ class CrewAssembler:
         crew_id: int,
         user_id: Optional[int],
         variables: Optional[Dict[str, Any]] = None,
+        graph: Optional[CrewGraph] = None,
     ) -> PreflightResult:
         """
         运行前预检
@@ -1374,25 +1476,97 @@ class CrewAssembler:
             crew_id: Crew 定义 ID
             user_id: 用户 ID
             variables: 运行时变量
+            graph: 已加载的 Crew 实体（在其会话中校验，不另开会话）
 
         Returns:
             PreflightResult: 预检结果
         """
         variables = variables or {}
-        session = self.db.get_session()
+        if graph is not None:
+            version = self._crew_version(crew_id, crew_def=graph.crew)
+            return self._preflight(crew_id, user_id, variables, version, lambda: graph)
 
-        try:
-            crew_def = session.get(CrewDefinition, crew_id)
-            if not crew_def:
-                return PreflightResult(
-                    success=False, errors=[f"Crew not found: {crew_id}"]
-                )
+        session = None
+
+        def load_graph() -> Optional[CrewGraph]:
+            nonlocal session
+            session = self.db.get_session()
+            return CrewGraph.load(session, crew_id, user_id)
 
-            return self.validator.validate(
-                crew_def=crew_def, user_id=user_id, variables=variables, session=session
+        try:
+            return self._preflight(
+                crew_id, user_id, variables, self._crew_version(crew_id), load_graph
             )
         finally:
-            session.close()
+            if session is not None:
+                session.close()
+
+    def _preflight_cache_key(self, crew_id: int, user_id: Optional[int], version: str) -> str:
+        """预检缓存键：Crew 版本 + 用户 + 当前 RunContext 的权益指纹"""
+        from AICrews.application.crew.run_context import get_current_run_context
+
+        fingerprint = entitlement_fingerprint(get_current_run_context())
+        return f"preflight:{crew_id}:{user_id or 0}:{version}:{fingerprint}"
+
+    def _preflight(
+        self,
+        crew_id: int,
+        user_id: Optional[int],
+        variables: Dict[str, Any],
+        version: str,
+        load_graph: Callable[[], Optional[CrewGraph]],
+    ) -> PreflightResult:
+        """与变量无关的检查结果按 (Crew 版本, 用户, 权益指纹) 缓存；变量每次校验
+
+        只缓存通过的结果：失败的预检在用户修正配置后应立即重新检查。
+        """
+        key = self._preflight_cache_key(crew_id, user_id, version)
+        cache_mgr = getattr(self, "_cache_manager", None)
+
+        checked = None
+        if cache_mgr is not None and self.PREFLIGHT_CACHE_TTL > 0:
+            try:
+                checked = cache_mgr.get(key) or cache_mgr.get_json_sync(key, layer="all")
+            except Exception:
+                checked = None
+
+        if not checked:
+            graph = load_graph()
+            if graph is None:
+                return PreflightResult(success=False, errors=[f"Crew not found: {crew_id}"])
+
+            result, required_vars = self.validator.check_crew(
+                graph.crew,
+                user_id,
+                graph.session,
+                graph=graph,
+                session_factory=self.db.get_session,
+            )
+            checked = {
+                "result": result.to_dict(),
+                "required_variables": sorted(required_vars),
+                "input_schema": graph.crew.input_schema,
+                "default_variables": graph.crew.default_variables,
+            }
+            if result.success and cache_mgr is not None and self.PREFLIGHT_CACHE_TTL > 0:
+                try:
+                    cache_mgr.set_json_sync(
+                        key,
+                        checked,
+                        ttl=self.PREFLIGHT_CACHE_TTL,
+                        layer="all",
+                        tags=preflight_cache_tags(crew_id, user_id),
+                    )
+                except Exception as e:
+                    logger.debug(f"Failed to cache preflight result for crew {crew_id}: {e}")
+
+        return self.validator.apply_variables(
+            PreflightResult.from_dict(checked["result"]),
+            set(checked["required_variables"]),
+            input_schema=checked["input_schema"],
+            default_variables=checked["default_variables"],
+            variables=variables,
+        )
 
     def extract_required_variables(self, crew_id: int) -> List[Dict[str, Any]]:
         """提取 Crew 需要的所有变量 (委托给 Validator)"""
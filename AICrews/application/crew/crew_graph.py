@@ -0,0 +1,307 @@
+"""
+Crew Graph - Crew 引用实体的批量预取
+
+编译（CrewAssembler.compile_structure）与预检（CrewValidator）此前按 structure
+逐条 session.get Agent / Task，再按 Agent 逐个查询 MCP 服务器、模型配置、
+知识源与技能；大型 Crew 在第一次 LLM 调用前要往返数据库 50-100 次。
+
+CrewGraph 从 crew_def.structure 收集全部引用 ID，每类实体一次 IN 查询：
+- Agent / Task：构造时加载（编译与预检都需要）
+- MCP 服务器、模型配置、知识源及绑定、技能与能力提供方：首次访问时整批加载，
+  只编译不预检时不产生这些查询
+
+实体绑定在传入的 session 上（关系属性仍可懒加载），session 关闭前有效；
+同一次运行内把 graph 传给预检与编译即可共享。
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session, selectinload
+
+from AICrews.database.models import (
+    AgentDefinition,
+    AgentKnowledgeBinding,
+    CapabilityProvider,
+    CrewDefinition,
+    CrewKnowledgeBinding,
+    KnowledgeSource,
+    MCPServer,
+    ProviderCapabilityMapping,
+    SkillCatalog,
+    TaskDefinition,
+    UserKnowledgeSource,
+    UserKnowledgeSubscription,
+    UserLLMConfig,
+    UserModelConfig,
+)
+
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _int_ids(values: Any) -> List[int]:
+    """把单个 ID 或 ID 列表规整为 int 列表（忽略无法转换的值）"""
+    if isinstance(values, (int, str)):
+        values = [values]
+    if not isinstance(values, (list, tuple, set)):
+        return []
+    return [i for i in (_as_int(v) for v in values) if i is not None]
+
+
+class CrewGraph:
+    """一个 Crew 引用的全部数据库实体（按 ID 索引）"""
+
+    def __init__(self, session: Session, crew_def: CrewDefinition, user_id: Optional[int] = None):
+        self.session = session
+        self.crew = crew_def
+        self.user_id = user_id
+        self._sections: Dict[str, Any] = {}
+
+        agent_ids: Set[int] = set()
+        task_ids: Set[int] = set()
+        for entry in self.structure:
+            agent_ids.update(_int_ids(entry.get("agent_id")))
+            agent_ids.update(_int_ids(entry.get("reporter_agent_id")))
+            task_ids.update(_int_ids(entry.get("decision_task_id")))
+            task_ids.update(_int_ids(entry.get("task_id")))
+            task_ids.update(_int_ids(entry.get("tasks") or []))
+
+        self.agents: Dict[int, AgentDefinition] = self._fetch(AgentDefinition, agent_ids)
+        self.tasks: Dict[int, TaskDefinition] = self._fetch(TaskDefinition, task_ids)
+
+    @classmethod
+    def load(
+        cls, session: Session, crew_id: int, user_id: Optional[int] = None
+    ) -> Optional["CrewGraph"]:
+        """加载 Crew 及其 Agent / Task；Crew 不存在时返回 None"""
+        crew_def = session.get(CrewDefinition, crew_id)
+        if not crew_def:
+            return None
+        return cls(session, crew_def, user_id=user_id)
+
+    @property
+    def structure(self) -> List[Dict[str, Any]]:
+        return self.crew.structure or []
+
+    def agent(self, agent_id: Any) -> Optional[AgentDefinition]:
+        return self.agents.get(_as_int(agent_id))
+
+    def task(self, task_id: Any) -> Optional[TaskDefinition]:
+        return self.tasks.get(_as_int(task_id))
+
+    def entry_agents(self) -> List[AgentDefinition]:
+        """structure 中普通节点引用的 Agent（按出现顺序去重）"""
+        seen: Set[int] = set()
+        agents: List[AgentDefinition] = []
+        for entry in self.structure:
+            agent_id = _as_int(entry.get("agent_id"))
+            if agent_id is None or agent_id in seen:
+                continue
+            seen.add(agent_id)
+            agent_def = self.agents.get(agent_id)
+            if agent_def:
+                agents.append(agent_def)
+        return agents
+
+    @staticmethod
+    def effective_knowledge_ids(entry: Dict[str, Any], agent_def: AgentDefinition) -> List[int]:
+        """运行时实际加载的知识源 ID（structure 覆盖优先，其次 AgentDefinition）"""
+        return _int_ids(entry.get("knowledge_source_ids") or agent_def.knowledge_source_ids or [])
+
+    # =========================================================================
+    # 批量查询
+    # =========================================================================
+
+    def _fetch(
+        self,
+        model: Any,
+        ids: Iterable[Any],
+        column: Any = None,
+        options: Iterable[Any] = (),
+    ) -> Dict[Any, Any]:
+        column = column if column is not None else model.id
+        ids = sorted({i for i in ids if i is not None})
+        if not ids:
+            return {}
+        query = self.session.query(model).filter(column.in_(ids))
+        for option in options:
+            query = query.options(option)
+        return {getattr(row, column.key): row for row in query.all()}
+
+    def _section(self, name: str, loader: Callable[[], Any]) -> Any:
+        if name not in self._sections:
+            self._sections[name] = loader()
+        return self._sections[name]
+
+    # =========================================================================
+    # 懒加载分组（预检使用）
+    # =========================================================================
+
+    def prefetch(self) -> "CrewGraph":
+        """加载全部懒加载分组；之后读取 graph 不再访问 session（可在多个线程中只读共享）"""
+        self.mcp_servers
+        self.model_configs
+        self.knowledge_subscriptions
+        self.user_knowledge_sources
+        self.capability_providers
+        return self
+
+    @property
+    def mcp_servers(self) -> Dict[int, MCPServer]:
+        def load() -> Dict[int, MCPServer]:
+            ids: Set[int] = set()
+            for agent_def in self.agents.values():
+                ids.update(_int_ids(agent_def.mcp_server_ids or []))
+            return self._fetch(MCPServer, ids)
+
+        return self._section("mcp_servers", load)
+
+    @property
+    def model_configs(self) -> Dict[int, UserModelConfig]:
+        """Agent 绑定的 UserModelConfig，连同 llm_config.provider 一并预取"""
+        def load() -> Dict[int, UserModelConfig]:
+            ids = {
+                _as_int((agent_def.llm_config or {}).get("user_model_config_id"))
+                for agent_def in self.agents.values()
+            }
+            return self._fetch(
+                UserModelConfig,
+                ids,
+                options=(
+                    selectinload(UserModelConfig.llm_config).selectinload(UserLLMConfig.provider),
+                    selectinload(UserModelConfig.model),
+                ),
+            )
+
+        return self._section("model_configs", load)
+
+    @property
+    def agent_knowledge_bindings(self) -> Dict[str, AgentKnowledgeBinding]:
+        """agent_name -> 绑定表记录（同名多条时取第一条，与逐条 .first() 一致）"""
+        def load() -> Dict[str, AgentKnowledgeBinding]:
+            names = {a.name for a in self.entry_agents() if a.name}
+            if not names:
+                return {}
+            rows = (
+                self.session.query(AgentKnowledgeBinding)
+                .filter(
+                    AgentKnowledgeBinding.crew_name == self.crew.name,
+                    AgentKnowledgeBinding.agent_name.in_(sorted(names)),
+                )
+                .all()
+            )
+            bindings: Dict[str, AgentKnowledgeBinding] = {}
+            for row in rows:
+                bindings.setdefault(row.agent_name, row)
+            return bindings
+
+        return self._section("agent_knowledge_bindings", load)
+
+    @property
+    def crew_knowledge_binding(self) -> Optional[CrewKnowledgeBinding]:
+        def load() -> Optional[CrewKnowledgeBinding]:
+            if self.user_id is None:
+                return None
+            return (
+                self.session.query(CrewKnowledgeBinding)
+                .filter(
+                    CrewKnowledgeBinding.user_id == self.user_id,
+                    CrewKnowledgeBinding.crew_name == self.crew.name,
+                )
+                .first()
+            )
+
+        return self._section("crew_knowledge_binding", load)
+
+    def _knowledge_ids(self) -> Set[int]:
+        ids: Set[int] = set()
+        for entry in self.structure:
+            agent_def = self.agent(entry.get("agent_id"))
+            if agent_def:
+                ids.update(self.effective_knowledge_ids(entry, agent_def))
+        for binding in self.agent_knowledge_bindings.values():
+            ids.update(_int_ids(binding.source_ids or []))
+        if self.crew_knowledge_binding is not None:
+            ids.update(_int_ids(self.crew_knowledge_binding.source_ids or []))
+        return ids
+
+    @property
+    def knowledge_sources(self) -> Dict[int, KnowledgeSource]:
+        """structure、Agent 定义与绑定表引用的系统知识源"""
+        return self._section(
+            "knowledge_sources", lambda: self._fetch(KnowledgeSource, self._knowledge_ids())
+        )
+
+    @property
+    def user_knowledge_sources(self) -> Dict[int, UserKnowledgeSource]:
+        """未命中系统知识源的 ID 再按用户知识源查询（与 KnowledgeLoader 的解析顺序一致）"""
+        def load() -> Dict[int, UserKnowledgeSource]:
+            missing = self._knowledge_ids() - set(self.knowledge_sources)
+            return self._fetch(UserKnowledgeSource, missing)
+
+        return self._section("user_knowledge_sources", load)
+
+    @property
+    def knowledge_subscriptions(self) -> Set[int]:
+        """当前用户有效订阅的付费知识源 ID"""
+        def load() -> Set[int]:
+            premium = [
+                sid for sid, source in self.knowledge_sources.items()
+                if getattr(source, "tier", None) == "premium"
+            ]
+            if self.user_id is None or not premium:
+                return set()
+            rows = (
+                self.session.query(UserKnowledgeSubscription.source_id)
+                .filter(
+                    UserKnowledgeSubscription.user_id == self.user_id,
+                    UserKnowledgeSubscription.source_id.in_(premium),
+                    UserKnowledgeSubscription.is_active == True,
+                )
+                .all()
+            )
+            return {row[0] for row in rows}
+
+        return self._section("knowledge_subscriptions", load)
+
+    @property
+    def skill_keys(self) -> Set[str]:
+        keys: Set[str] = set()
+        for agent_def in self.entry_agents():
+            loadout = agent_def.loadout_data or {}
+            if "skill_keys" in loadout:
+                keys.update(loadout.get("skill_keys") or [])
+        return keys
+
+    @property
+    def skills(self) -> Dict[str, SkillCatalog]:
+        return self._section(
+            "skills", lambda: self._fetch(SkillCatalog, self.skill_keys, SkillCatalog.skill_key)
+        )
+
+    @property
+    def capability_providers(self) -> Dict[str, List[CapabilityProvider]]:
+        """capability_id -> 实现该能力的提供方（无映射的能力不出现在结果中）"""
+        def load() -> Dict[str, List[CapabilityProvider]]:
+            cap_ids = sorted({s.capability_id for s in self.skills.values() if s.capability_id})
+            if not cap_ids:
+                return {}
+            mappings = (
+                self.session.query(ProviderCapabilityMapping)
+                .filter(ProviderCapabilityMapping.capability_id.in_(cap_ids))
+                .all()
+            )
+            providers = self._fetch(CapabilityProvider, (m.provider_id for m in mappings))
+            result: Dict[str, List[CapabilityProvider]] = {}
+            for mapping in mappings:
+                provider = providers.get(mapping.provider_id)
+                bucket = result.setdefault(mapping.capability_id, [])
+                if provider is not None:
+                    bucket.append(provider)
+            return result
+
+        return self._section("capability_providers", load)
@@ -0,0 +1,229 @@
+"""
+Crew Run Job - Crew 定义运行任务
+
+Crew Builder 的运行端点通过 JobManager.submit_task("crew_run", payload) 提交，
+本进程线程池或队列 worker 均调用此处的处理函数。payload 只包含可 JSON 序列化的
+参数，RunContext 由权益决策在执行端重建。
+
+同一 job_id 再次执行（进程重启后 recover_jobs 重新提交、队列重投）时，
+已完成任务从检查点恢复，只执行剩余任务（见 task_checkpoints）。
+"""
+
+import time
+import traceback
+from typing import Any, Dict, Optional
+
+from AICrews.application.crew.assembler import get_crew_assembler
+from AICrews.application.crew.run_context import RunContext, run_context_scope
+from AICrews.application.crew.task_checkpoints import (
+    merge_restored_outputs,
+    restore_completed_tasks,
+)
+from AICrews.infrastructure.jobs.job_queue import register_job_handler
+from AICrews.observability.logging import LogContext, get_logger
+from AICrews.schemas.entitlements import PolicyDecision
+
+logger = get_logger(__name__)
+
+CREW_RUN_TASK = "crew_run"
+
+
+@register_job_handler(CREW_RUN_TASK, resumable=True)
+def run_crew_job(
+    job_id: Optional[str] = None,
+    *,
+    crew_id: int,
+    crew_name: str,
+    user_id: int,
+    variables: Dict[str, Any],
+    decision: Dict[str, Any],
+) -> str:
+    """组装并执行 Crew，返回结果文本"""
+    run_ctx = RunContext.from_decision(PolicyDecision.model_validate(decision))
+
+    from AICrews.schemas.llm_policy import LLMKeyProvisioningError
+    from AICrews.schemas.stats import AgentActivityEvent
+    from AICrews.services.tracking_service import TrackingService
+    from AICrews.utils.redaction import truncate_text
+
+    logger.info(
+        f"==================== [Job {job_id}] EXECUTION START ===================="
+    )
+
+    assembler = get_crew_assembler()
+    tracker = TrackingService()
+
+    # Set LogContext for the entire execution so EventBus listeners can access job_id
+    # This enables CrewAI tool events and litellm LLM events to be associated with this job
+    log_context = LogContext(
+        job_id=job_id,
+        user_id=str(user_id) if user_id else None,
+        ticker=variables.get("ticker"),
+    )
+    log_context.__enter__()
+
+    def _safe_activity(
+        activity_type: str,
+        message: str,
+        details: dict | None = None,
+    ) -> None:
+        try:
+            tracker.add_activity(
+                job_id,
+                AgentActivityEvent(
+                    agent_name="System",
+                    activity_type=activity_type,
+                    message=message,
+                    details=details,
+                ),
+            )
+        except Exception:
+            logger.debug(
+                "[Job %s] Failed to record activity: %s",
+                job_id,
+                activity_type,
+                exc_info=True,
+            )
+
+    _safe_activity("phase", "Execution started")
+
+    # Retry configuration for LLM key provisioning
+    MAX_PROVISIONING_RETRIES = 6
+    MAX_TOTAL_WAIT_SECONDS = 30
+
+    try:
+        # Execute within RunContext scope for entitlements + LLM routing
+        with run_context_scope(run_ctx):
+            # Retry loop for LLM key provisioning
+            crew_obj = None
+            pf = None
+            task_index: Dict[Any, Any] = {}
+            total_wait = 0
+            last_provisioning_error = None
+
+            for attempt in range(MAX_PROVISIONING_RETRIES):
+                try:
+                    _safe_activity(
+                        "phase",
+                        f"Assembling crew (attempt {attempt + 1}/{MAX_PROVISIONING_RETRIES})",
+                        {"crew_id": crew_id, "crew_name": crew_name},
+                    )
+
+                    crew_obj, pf = assembler.assemble(
+                        crew_id=crew_id,
+                        variables=variables,
+                        job_id=job_id,
+                        user_id=user_id,
+                        task_index=task_index,
+                    )
+                    break  # Success, exit retry loop
+                except LLMKeyProvisioningError as e:
+                    last_provisioning_error = e
+                    retry_after = e.retry_after or 5
+
+                    # Check if we've exceeded max wait time
+                    if total_wait + retry_after > MAX_TOTAL_WAIT_SECONDS:
+                        logger.warning(
+                            f"[Job {job_id}] LLM provisioning timeout after {total_wait}s "
+                            f"(max {MAX_TOTAL_WAIT_SECONDS}s). Giving up."
+                        )
+                        raise
+
+                    logger.info(
+                        f"[Job {job_id}] LLM key provisioning in progress, "
+                        f"waiting {retry_after}s (attempt {attempt + 1}/{MAX_PROVISIONING_RETRIES})"
+                    )
+                    _safe_activity(
+                        "phase",
+                        f"LLM key provisioning in progress; sleeping {retry_after}s",
+                        {
+                            "attempt": attempt + 1,
+                            "max_attempts": MAX_PROVISIONING_RETRIES,
+                            "retry_after_seconds": retry_after,
+                            "total_wait_seconds": total_wait,
+                        },
+                    )
+                    time.sleep(retry_after)
+                    total_wait += retry_after
+
+            # If we exhausted retries without success
+            if crew_obj is None:
+                if last_provisioning_error:
+                    raise last_provisioning_error
+                raise RuntimeError("Assembly failed: no crew object returned")
+
+            if not pf.success:
+                logger.error(f"[Job {job_id}] Assembly failed: {pf.errors}")
+                _safe_activity(
+                    "error",
+                    f"Assembly failed: {truncate_text(str(pf.errors), limit=500)}",
+                )
+                raise RuntimeError(f"Assembly failed: {pf.errors}")
+
+            logger.info(
+                f"[Job {job_id}] Crew assembled with {len(crew_obj.agents)} agents, {len(crew_obj.tasks)} tasks. Starting kickoff..."
+            )
+            _safe_activity(
+                "phase",
+                "Kickoff starting",
+                {
+                    "agents": len(getattr(crew_obj, "agents", []) or []),
+                    "tasks": len(getattr(crew_obj, "tasks", []) or []),
+                },
+            )
+            restored = restore_completed_tasks(crew_obj, task_index, job_id)
+            if restored:
+                _safe_activity(
+                    "phase",
+                    f"Resumed from checkpoints: {len(restored)} tasks restored",
+                    {"restored": len(restored), "remaining": len(crew_obj.tasks)},
+                )
+            result = crew_obj.kickoff() if crew_obj.tasks else None
+            result = merge_restored_outputs(result, restored)
+            result_str = str(result)
+            logger.info(f"[Job {job_id}] Crew kickoff completed successfully")
+            _safe_activity("phase", "Kickoff completed")
+
+        # Milestone B3 & B2 & C1: Enhanced archiving with traces, token usage, and versioning
+        try:
+            from AICrews.services.crew_run_archive_service import archive_crew_run_result
+
+            _safe_activity("phase", "Archiving started")
+
+            archive_crew_run_result(
+                job_id=job_id,
+                crew_id=crew_id,
+                crew_name=crew_name,
+                user_id=user_id,
+                variables=variables,
+                result=result,
+                result_str=result_str,
+            )
+            _safe_activity("phase", "Archiving completed")
+        except Exception as archive_err:
+            logger.error(
+                f"[Job {job_id}] Failed to archive enhanced result: {archive_err}\n{traceback.format_exc()}"
+            )
+            _safe_activity(
+                "warning",
+                f"Archiving failed: {truncate_text(str(archive_err), limit=500)}",
+            )
+
+        logger.info(
+            f"==================== [Job {job_id}] EXECUTION FINISHED ===================="
+        )
+        # Clean up LogContext before returning
+        log_context.__exit__(None, None, None)
+        return result_str
+
+    except Exception as e:
+        error_stack = traceback.format_exc()
+        logger.error(f"[Job {job_id}] CRITICAL FAILURE: {e}\n{error_stack}")
+        _safe_activity(
+            "error",
+            f"CRITICAL FAILURE: {truncate_text(str(e), limit=500)}",
+            {"stack_preview": truncate_text(error_stack, limit=2000)},
+        )
+        # Clean up LogContext before re-raising
+        log_context.__exit__(type(e), e, e.__traceback__)
+        raise
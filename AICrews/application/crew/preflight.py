@@ -1,28 +1,27 @@
 """
 Crew Validator - 负责 Crew 组装前的校验
 """
+import contextvars
+import copy
 import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from AICrews.observability.logging import get_logger
 import os
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Set, Tuple
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from sqlalchemy.orm import Session
 
 from AICrews.database.models import (
-    AgentDefinition,
-    TaskDefinition,
     CrewDefinition,
     KnowledgeSource,
-    AgentKnowledgeBinding,
-    CrewKnowledgeBinding,
     MCPServer,
     UserMCPSubscription,
-    UserKnowledgeSubscription,
-    UserKnowledgeSource,
-    UserModelConfig,
 )
 
+from .crew_graph import CrewGraph
+
 logger = get_logger(__name__)
 
 
@@ -30,6 +29,62 @@ logger = get_logger(__name__)
 CREWAI_MIN_VERSION = "1.7.1"
 CREWAI_MAX_VERSION = "1.8.0"  # exclusive
 
+# 依赖数据库会话的检查是否在线程池中并发执行
+PREFLIGHT_PARALLEL = os.getenv("FAIC_PREFLIGHT_PARALLEL", "true").lower() in ("1", "true", "yes")
+
+# 预检结果缓存的失效标签：全部 / 单个用户（工具、模型、知识源订阅等配置变更）
+PREFLIGHT_CACHE_TAG = "preflight"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("FAIC_PREFLIGHT_WORKERS", "4")),
+                    thread_name_prefix="faic-preflight",
+                )
+    return _executor
+
+
+def preflight_cache_tags(crew_id: int, user_id: Optional[int]) -> List[str]:
+    """预检缓存条目的标签：Crew / 用户定义变更（与编译产物共用）及预检专用标签"""
+    return [
+        f"crew:{crew_id}",
+        f"user:{user_id or 0}",
+        f"{PREFLIGHT_CACHE_TAG}:user:{user_id or 0}",
+        PREFLIGHT_CACHE_TAG,
+    ]
+
+
+async def invalidate_preflight_cache(user_id: Optional[int] = None) -> None:
+    """用户的工具、模型、知识源等配置变更后失效预检缓存；user_id 为 None 时全部失效"""
+    tag = PREFLIGHT_CACHE_TAG if user_id is None else f"{PREFLIGHT_CACHE_TAG}:user:{user_id}"
+    try:
+        from AICrews.infrastructure.cache.layered_cache_manager import get_layered_cache
+
+        await get_layered_cache().invalidate_tags(tag)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate preflight cache ({tag}): {e}")
+
+
+def entitlement_fingerprint(run_context: Any) -> str:
+    """影响预检结果的权益字段（LLM 路由范围、BYOK 许可、等级）的指纹"""
+    if run_context is None:
+        return "none"
+    decision = getattr(run_context, "entitlements_decision", None)
+    tier = getattr(decision, "effective_tier", None)
+    parts = [
+        str(getattr(tier, "value", tier) or ""),
+        str(getattr(run_context, "effective_scope", "") or ""),
+        "byok" if getattr(run_context, "byok_allowed", False) else "",
+    ]
+    return "-".join(parts)
+
 
 def check_crewai_version(strict: bool = False) -> Tuple[bool, Optional[str]]:
     """
@@ -88,6 +143,18 @@ class PreflightResult:
     mcp_health: Dict[str, bool] = field(default_factory=dict) # 新增 MCP 健康状态
     version_warning: Optional[str] = None  # CrewAI version check
 
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PreflightResult":
+        """从 to_dict 的结果还原（深拷贝，调用方可修改返回值而不影响缓存）"""
+        data = copy.deepcopy(data)
+        data["unauthorized_knowledge"] = [
+            UnauthorizedKnowledgeInfo(**item) for item in data.get("unauthorized_knowledge") or []
+        ]
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
 
 
 class CrewValidator:
@@ -102,6 +169,8 @@ class CrewValidator:
         user_id: Optional[int],
         variables: Dict[str, Any],
         session,
+        graph: Optional[CrewGraph] = None,
+        session_factory: Optional[Callable[[], Any]] = None,
     ) -> PreflightResult:
         """
         运行前预检 2.0
@@ -111,10 +180,40 @@ class CrewValidator:
         2. 工具依赖图与启用状态
         3. 知识源可达性与权限
         4. MCP 服务器健康度与认证
+
+        graph: 已加载的 Crew 实体（与编译共享）；未提供时在此批量加载
+        session_factory: 见 check_crew
+        """
+        result, required_vars = self.check_crew(
+            crew_def, user_id, session, graph=graph, session_factory=session_factory
+        )
+        return self.apply_variables(
+            result,
+            required_vars,
+            input_schema=crew_def.input_schema,
+            default_variables=crew_def.default_variables,
+            variables=variables,
+        )
+
+    def check_crew(
+        self,
+        crew_def: CrewDefinition,
+        user_id: Optional[int],
+        session,
+        graph: Optional[CrewGraph] = None,
+        session_factory: Optional[Callable[[], Any]] = None,
+    ) -> Tuple[PreflightResult, Set[str]]:
+        """与运行变量无关的检查，返回 (结果, 需要的变量名)；结果可按 Crew 版本缓存
+
+        session_factory: 提供时，依赖数据库会话的检查（工具启用状态、LLM 配置）
+        在线程池中各用独立会话执行，与其余基于 graph 的检查并发
         """
         result = PreflightResult(success=True)
+        required_vars: Set[str] = set()
 
         try:
+            graph = self._graph(crew_def, user_id, session, graph)
+
             # 0. CrewAI version check (non-blocking warning)
             version_ok, version_warning = check_crewai_version(strict=False)
             if not version_ok and version_warning:
@@ -122,25 +221,37 @@ class CrewValidator:
                 result.warnings.append(version_warning)
                 logger.warning(version_warning)
 
-            # 1. 变量全覆盖校验
-            required_vars = self._extract_variables(crew_def, session)
-            from .variable_defaults import merge_crew_variables
+            # 1. 变量（缺失校验见 apply_variables）
+            required_vars = self._extract_variables(crew_def, session, graph=graph)
+
+            # 2 / 6. 依赖会话的检查先提交到线程池；其余检查只读取已预取的 graph
+            tools_future = llm_future = None
+            if session_factory is not None and PREFLIGHT_PARALLEL:
+                graph.prefetch()
+                tools_future = self._submit(
+                    session_factory, self._check_agent_tools_status, crew_def, user_id, graph
+                )
+                llm_future = self._submit(
+                    session_factory, self._check_agent_llm_configs, crew_def, user_id, graph
+                )
+
+            mcp_health = self._check_mcp_health(crew_def, user_id, session, graph=graph)
+            unauthorized = self._check_knowledge_access(crew_def, user_id, session, graph=graph)
+            skill_errors, skill_warnings = self._check_skill_availability(crew_def, session, graph=graph)
+            output_spec_result = self._validate_task_output_specs(crew_def, session, graph=graph)
+
+            if tools_future is not None:
+                disabled_tools = tools_future.result()
+            else:
+                disabled_tools = self._check_agent_tools_status(crew_def, user_id, session, graph=graph)
+            if llm_future is not None:
+                llm_errors, llm_warnings, llm_hints = llm_future.result()
+            else:
+                llm_errors, llm_warnings, llm_hints = self._check_agent_llm_configs(
+                    crew_def=crew_def, user_id=user_id, session=session, graph=graph
+                )
 
-            effective_vars = merge_crew_variables(
-                input_schema=crew_def.input_schema,
-                default_variables=crew_def.default_variables,
-                variables=variables,
-            )
-            missing_no_defaults = required_vars - set(effective_vars.keys())
-            
-            if missing_no_defaults:
-                result.missing_variables = list(missing_no_defaults)
-                result.success = False
-                result.errors.append(f"Missing required variables without defaults: {', '.join(missing_no_defaults)}")
-                result.hints.append("Please provide values for all required variables in the launch panel.")
-            
             # 2. 检查工具启用状态与依赖
-            disabled_tools = self._check_agent_tools_status(crew_def, user_id, session)
             if disabled_tools:
                 result.success = False
                 for agent_name, tools in disabled_tools.items():
@@ -148,7 +259,6 @@ class CrewValidator:
                 result.hints.append("Enable required tools in the Strategy Studio or remove them from the agent configuration.")
 
             # 3. 检查 MCP 健康度
-            mcp_health = self._check_mcp_health(crew_def, user_id, session)
             result.mcp_health = mcp_health
             for server_name, is_healthy in mcp_health.items():
                 if not is_healthy:
@@ -156,7 +266,6 @@ class CrewValidator:
                     result.hints.append(f"Check the status of MCP Server '{server_name}' in the settings.")
 
             # 4. 检查知识源权限
-            unauthorized = self._check_knowledge_access(crew_def, user_id, session)
             if unauthorized:
                 result.unauthorized_knowledge = unauthorized
                 result.success = False
@@ -165,7 +274,6 @@ class CrewValidator:
                 result.hints.append("Add or subscribe to the required knowledge sources in Tools → Knowledge.")
 
             # 5. 检查 Skill 可用性（新架构：Task 1.5）
-            skill_errors, skill_warnings = self._check_skill_availability(crew_def, session)
             if skill_errors:
                 result.success = False
                 result.errors.extend(skill_errors)
@@ -174,9 +282,6 @@ class CrewValidator:
                 result.warnings.extend(skill_warnings)
 
             # 6. 检查 Agent LLM 配置（避免运行期才 401）
-            llm_errors, llm_warnings, llm_hints = self._check_agent_llm_configs(
-                crew_def=crew_def, user_id=user_id, session=session
-            )
             if llm_warnings:
                 result.warnings.extend(llm_warnings)
             if llm_hints:
@@ -186,7 +291,6 @@ class CrewValidator:
                 result.errors.extend(llm_errors)
 
             # 7. 检查 Task Output Specs（schema_key、output_mode、provider capability）
-            output_spec_result = self._validate_task_output_specs(crew_def, session)
             if output_spec_result.get("errors"):
                 result.success = False
                 result.errors.extend(output_spec_result["errors"])
@@ -200,13 +304,76 @@ class CrewValidator:
             result.errors.append(f"Preflight internal error: {str(e)}")
             logger.exception("Preflight 2.0 check error")
         
+        return result, required_vars
+
+    def apply_variables(
+        self,
+        result: PreflightResult,
+        required_vars: Set[str],
+        *,
+        input_schema: Optional[Dict[str, Any]],
+        default_variables: Optional[Dict[str, Any]],
+        variables: Dict[str, Any],
+    ) -> PreflightResult:
+        """变量全覆盖校验（就地更新并返回 result，错误排在其他检查之前）"""
+        try:
+            from .variable_defaults import merge_crew_variables
+
+            effective_vars = merge_crew_variables(
+                input_schema=input_schema,
+                default_variables=default_variables,
+                variables=variables,
+            )
+            missing_no_defaults = set(required_vars) - set(effective_vars.keys())
+
+            if missing_no_defaults:
+                result.missing_variables = list(missing_no_defaults)
+                result.success = False
+                result.errors.insert(0, f"Missing required variables without defaults: {', '.join(missing_no_defaults)}")
+                result.hints.insert(0, "Please provide values for all required variables in the launch panel.")
+        except Exception as e:
+            result.success = False
+            result.errors.append(f"Preflight internal error: {str(e)}")
+            logger.exception("Preflight 2.0 check error")
+
         return result
 
+    @staticmethod
+    def _submit(
+        session_factory: Callable[[], Any],
+        check: Callable[..., Any],
+        crew_def: CrewDefinition,
+        user_id: Optional[int],
+        graph: CrewGraph,
+    ) -> Future:
+        """在预检线程池中以独立会话运行检查（复制当前 contextvars，保留 RunContext）"""
+        def run() -> Any:
+            session = session_factory()
+            try:
+                return check(crew_def=crew_def, user_id=user_id, session=session, graph=graph)
+            finally:
+                session.close()
+
+        return _get_executor().submit(contextvars.copy_context().run, run)
+
+    @staticmethod
+    def _graph(
+        crew_def: CrewDefinition,
+        user_id: Optional[int],
+        session,
+        graph: Optional[CrewGraph],
+    ) -> CrewGraph:
+        """复用调用方已加载的 CrewGraph，否则批量加载一次"""
+        if graph is not None:
+            return graph
+        return CrewGraph(session, crew_def, user_id=user_id)
+
     def _check_agent_llm_configs(
         self,
         crew_def: CrewDefinition,
         user_id: Optional[int],
         session,
+        graph: Optional[CrewGraph] = None,
     ) -> tuple[list[str], list[str], list[str]]:
         """检查 Crew 中每个 Agent 的 LLM 绑定是否完整可用。
 
@@ -282,17 +449,8 @@ class CrewValidator:
             system_llm_ok = False
 
         # 去重：一个 Agent 可能在 structure 中出现多次
-        agent_ids: set[int] = set()
-        for entry in crew_def.structure or []:
-            agent_id = entry.get("agent_id")
-            if agent_id:
-                agent_ids.add(int(agent_id))
-
-        for agent_id in sorted(agent_ids):
-            agent_def = session.get(AgentDefinition, agent_id)
-            if not agent_def:
-                continue
-
+        graph = self._graph(crew_def, user_id, session, graph)
+        for agent_def in sorted(graph.entry_agents(), key=lambda a: a.id):
             llm_cfg = agent_def.llm_config or {}
             model_config_id = llm_cfg.get("user_model_config_id")
             llm_tier = llm_cfg.get("llm_tier")
@@ -320,7 +478,7 @@ class CrewValidator:
                     )
                 continue
 
-            user_model_config = session.get(UserModelConfig, int(model_config_id))
+            user_model_config = graph.model_configs.get(int(model_config_id))
             if not user_model_config:
                 errors.append(
                     f"Agent '{agent_def.name}' references missing UserModelConfig id={model_config_id}."
@@ -393,22 +551,26 @@ class CrewValidator:
 
         return errors, warnings, hints
 
-    def _check_mcp_health(self, crew_def: CrewDefinition, user_id: Optional[int], session) -> Dict[str, bool]:
+    def _check_mcp_health(
+        self,
+        crew_def: CrewDefinition,
+        user_id: Optional[int],
+        session,
+        graph: Optional[CrewGraph] = None,
+    ) -> Dict[str, bool]:
         """检查 Crew 涉及的 MCP 服务器健康状态"""
         health_map = {}
+        graph = self._graph(crew_def, user_id, session, graph)
         
         # 收集所有需要的 MCP Server ID
         server_ids = set()
-        for entry in crew_def.structure or []:
-            agent_id = entry.get("agent_id")
-            if not agent_id: continue
-            agent_def = session.get(AgentDefinition, agent_id)
-            if agent_def and agent_def.mcp_server_ids:
+        for agent_def in graph.entry_agents():
+            if agent_def.mcp_server_ids:
                 server_ids.update(agent_def.mcp_server_ids)
         
         # 简单检查在线状态 (此处可扩展为实际 ping MCP 端点)
         for sid in server_ids:
-            server = session.get(MCPServer, sid)
+            server = graph.mcp_servers.get(sid)
             if server:
                 # 暂时以数据库标记为准，未来可加入真实网络探测
                 health_map[server.display_name] = server.is_active
@@ -421,27 +583,20 @@ class CrewValidator:
         crew_def: CrewDefinition,
         user_id: Optional[int],
         session,
+        graph: Optional[CrewGraph] = None,
     ) -> Dict[str, List[str]]:
         """检查 Agent 绑定的工具是否已启用"""
         from AICrews.tools.registry.tool_registry import ToolRegistry
         registry = ToolRegistry(db=session)
+        graph = self._graph(crew_def, user_id, session, graph)
         
-        # 获取所有已启用的工具名称
-        enabled_tools = registry.get_user_tools(user_id=user_id)
-        enabled_tool_names = {getattr(t, "__name__", str(t)) for t in enabled_tools}
-        
-        disabled_map = {}
-        
+        # 收集每个 Agent 绑定的所有工具 ID
+        requested: List[Tuple[str, List[str]]] = []
         for entry in crew_def.structure or []:
-            agent_id = entry.get("agent_id")
-            if not agent_id:
-                continue
-            
-            agent_def = session.get(AgentDefinition, agent_id)
+            agent_def = graph.agent(entry.get("agent_id"))
             if not agent_def:
                 continue
             
-            # 收集该 Agent 绑定的所有工具 ID
             requested_tool_ids = []
             if agent_def.loadout_data:
                 for tier in ['data_tools', 'quant_tools', 'external_tools', 'strategies']:
@@ -449,22 +604,23 @@ class CrewValidator:
             elif agent_def.tool_ids:
                 requested_tool_ids.extend([str(tid) for tid in agent_def.tool_ids])
             
-            if not requested_tool_ids:
-                continue
-                
-            # 检查这些工具是否在已启用列表中
-            # 注意：requested_tool_ids 可能是命名空间格式 (data:price)
-            agent_disabled = []
-            for tid in requested_tool_ids:
-                # 简单匹配：如果 tid 包含在已启用工具的某种表示中
-                # 实际上 ToolRegistry._get_tool_key 会给工具加前缀
-                # 这里我们做个反向检查：如果这个工具 ID 无法通过 registry 加载出任何工具，说明它被禁用了
-                loaded = registry.get_tools_by_namespaced_ids([tid], user_id=user_id)
-                if not loaded:
-                    agent_disabled.append(tid)
-            
+            if requested_tool_ids:
+                requested.append((agent_def.name, requested_tool_ids))
+
+        if not requested:
+            return {}
+
+        # 注意：requested_tool_ids 可能是命名空间格式 (data:price)
+        # 反向检查：无法通过 registry 解析出工具的 ID 视为被禁用；所有 Agent 的 ID 一次解析
+        resolved = registry.resolve_tool_ids(
+            [tid for _, tool_ids in requested for tid in tool_ids], user_id=user_id
+        )
+
+        disabled_map = {}
+        for agent_name, requested_tool_ids in requested:
+            agent_disabled = [tid for tid in requested_tool_ids if resolved.get(tid) is None]
             if agent_disabled:
-                disabled_map[agent_def.name] = agent_disabled
+                disabled_map[agent_name] = agent_disabled
                 
         return disabled_map
     
@@ -472,9 +628,11 @@ class CrewValidator:
         self,
         crew_def: CrewDefinition,
         session,
+        graph: Optional[CrewGraph] = None,
     ) -> Set[str]:
         """提取配置中所有需要的变量"""
         variables = set()
+        graph = self._graph(crew_def, None, session, graph)
         
         # 从 structure 中提取 agent 和 task
         for entry in crew_def.structure or []:
@@ -483,14 +641,14 @@ class CrewValidator:
             
             # 检查 Agent
             if agent_id:
-                agent_def = session.get(AgentDefinition, agent_id)
+                agent_def = graph.agent(agent_id)
                 if agent_def:
                     variables.update(self._find_variables_in_text(agent_def.goal))
                     variables.update(self._find_variables_in_text(agent_def.backstory))
             
             # 检查 Tasks
             for task_id in task_ids:
-                task_def = session.get(TaskDefinition, task_id)
+                task_def = graph.task(task_id)
                 if task_def:
                     variables.update(self._find_variables_in_text(task_def.description))
                     variables.update(self._find_variables_in_text(task_def.expected_output))
@@ -540,8 +698,14 @@ class CrewValidator:
                 UserMCPSubscription.is_active == True,
             ).all()
             
+            server_ids = {sub.server_id for sub in subscriptions}
+            servers = {
+                server.id: server
+                for server in session.query(MCPServer).filter(MCPServer.id.in_(server_ids)).all()
+            } if server_ids else {}
+
             for sub in subscriptions:
-                server = session.get(MCPServer, sub.server_id)
+                server = servers.get(sub.server_id)
                 if server and server.requires_auth and not sub.api_key:
                     missing.append(server.display_name)
         
@@ -552,6 +716,7 @@ class CrewValidator:
         crew_def: CrewDefinition,
         user_id: Optional[int],
         session,
+        graph: Optional[CrewGraph] = None,
     ) -> List[UnauthorizedKnowledgeInfo]:
         """检查知识源访问权限。
 
@@ -562,6 +727,7 @@ class CrewValidator:
         """
         unauthorized: List[UnauthorizedKnowledgeInfo] = []
         seen_source_ids: set[int] = set()  # 避免重复报告同一个source
+        graph = self._graph(crew_def, user_id, session, graph)
 
         def _maybe_require_subscription(*, source: KnowledgeSource) -> None:
             source_id = getattr(source, "id", None)
@@ -572,15 +738,7 @@ class CrewValidator:
             if getattr(source, "tier", None) != "premium":
                 return
 
-            sub = None
-            if user_id is not None:
-                sub = session.query(UserKnowledgeSubscription).filter(
-                    UserKnowledgeSubscription.user_id == user_id,
-                    UserKnowledgeSubscription.source_id == source_id,
-                    UserKnowledgeSubscription.is_active == True,
-                ).first()
-
-            if sub:
+            if user_id is not None and source_id in graph.knowledge_subscriptions:
                 return
 
             unauthorized.append(
@@ -595,37 +753,22 @@ class CrewValidator:
 
         # 1) Validate runtime-effective IDs (structure.entry.knowledge_source_ids or AgentDefinition.knowledge_source_ids)
         for entry in crew_def.structure or []:
-            agent_id = entry.get("agent_id")
-            if not agent_id:
-                continue
-
-            agent_def = session.get(AgentDefinition, agent_id)
+            agent_def = graph.agent(entry.get("agent_id"))
             if not agent_def:
                 continue
 
-            effective_ids = entry.get("knowledge_source_ids") or agent_def.knowledge_source_ids or []
-            if isinstance(effective_ids, (int, str)):
-                effective_ids = [effective_ids]
-            if not isinstance(effective_ids, list):
-                continue
-
-            for raw_id in effective_ids:
-                try:
-                    source_id = int(raw_id)
-                except Exception:
-                    continue
-
+            for source_id in graph.effective_knowledge_ids(entry, agent_def):
                 if source_id in seen_source_ids:
                     continue
 
                 # Same resolution order as KnowledgeLoader.load_by_ids:
                 # 1) system KnowledgeSource, 2) user-owned UserKnowledgeSource.
-                source = session.get(KnowledgeSource, source_id)
+                source = graph.knowledge_sources.get(source_id)
                 if source:
                     _maybe_require_subscription(source=source)
                     continue
 
-                user_source = session.get(UserKnowledgeSource, source_id)
+                user_source = graph.user_knowledge_sources.get(source_id)
                 if user_source and user_id is not None:
                     if getattr(user_source, "user_id", None) == user_id and getattr(
                         user_source, "is_active", True
@@ -634,18 +777,11 @@ class CrewValidator:
 
         # 2) Validate binding-table knowledge sources (legacy behavior still expected by tests)
         for entry in crew_def.structure or []:
-            agent_id = entry.get("agent_id")
-            if not agent_id:
-                continue
-
-            agent_def = session.get(AgentDefinition, agent_id)
+            agent_def = graph.agent(entry.get("agent_id"))
             if not agent_def:
                 continue
 
-            binding = session.query(AgentKnowledgeBinding).filter(
-                AgentKnowledgeBinding.crew_name == crew_def.name,
-                AgentKnowledgeBinding.agent_name == agent_def.name,
-            ).first()
+            binding = graph.agent_knowledge_bindings.get(agent_def.name)
 
             for raw_id in (getattr(binding, "source_ids", None) or []):
                 try:
@@ -656,15 +792,12 @@ class CrewValidator:
                 if source_id in seen_source_ids:
                     continue
 
-                source = session.get(KnowledgeSource, source_id)
+                source = graph.knowledge_sources.get(source_id)
                 if source:
                     _maybe_require_subscription(source=source)
 
         if user_id is not None:
-            crew_binding = session.query(CrewKnowledgeBinding).filter(
-                CrewKnowledgeBinding.user_id == user_id,
-                CrewKnowledgeBinding.crew_name == crew_def.name,
-            ).first()
+            crew_binding = graph.crew_knowledge_binding
 
             for raw_id in (getattr(crew_binding, "source_ids", None) or []):
                 try:
@@ -675,7 +808,7 @@ class CrewValidator:
                 if source_id in seen_source_ids:
                     continue
 
-                source = session.get(KnowledgeSource, source_id)
+                source = graph.knowledge_sources.get(source_id)
                 if source:
                     _maybe_require_subscription(source=source)
 
@@ -684,7 +817,8 @@ class CrewValidator:
     def _check_skill_availability(
         self,
         crew_def: "CrewDefinition",
-        session: Session
+        session: Session,
+        graph: Optional[CrewGraph] = None,
     ) -> Tuple[List[str], List[str]]:
         """Check if all skills in crew agents are available.
 
@@ -697,33 +831,19 @@ class CrewValidator:
             - errors: Skills that are completely blocked (provider disabled/unhealthy)
             - warnings: Skills with degraded capabilities
         """
-        from AICrews.database.models.skill import SkillCatalog
-        from AICrews.database.models.provider import CapabilityProvider, ProviderCapabilityMapping
-        from AICrews.database.models.agent import AgentDefinition
-
         errors = []
         warnings = []
+        graph = self._graph(crew_def, None, session, graph)
 
         # Collect all skill_keys from all agents via structure
-        all_skill_keys = set()
-        for entry in crew_def.structure or []:
-            agent_id = entry.get("agent_id")
-            if not agent_id:
-                continue
-            agent_def = session.get(AgentDefinition, agent_id)
-            if agent_def and agent_def.loadout_data and "skill_keys" in agent_def.loadout_data:
-                skill_keys = agent_def.loadout_data.get("skill_keys", [])
-                all_skill_keys.update(skill_keys)
+        all_skill_keys = graph.skill_keys
 
         if not all_skill_keys:
             return errors, warnings
 
         # Fetch skill definitions from catalog
-        skills = session.query(SkillCatalog).filter(
-            SkillCatalog.skill_key.in_(all_skill_keys)
-        ).all()
-
-        skill_map = {s.skill_key: s for s in skills}
+        skill_map = graph.skills
+        skills = list(skill_map.values())
 
         # Check for missing skills
         missing_skills = all_skill_keys - set(skill_map.keys())
@@ -739,11 +859,7 @@ class CrewValidator:
                 continue
 
             # Find providers that implement this capability
-            mappings = session.query(ProviderCapabilityMapping).filter(
-                ProviderCapabilityMapping.capability_id == cap_id
-            ).all()
-
-            if not mappings:
+            if cap_id not in graph.capability_providers:
                 errors.append(f"Skill '{skill.skill_key}' requires capability '{cap_id}' but no provider implements it")
                 continue
 
@@ -751,8 +867,7 @@ class CrewValidator:
             available = False
             degraded = False
 
-            for mapping in mappings:
-                provider = session.get(CapabilityProvider, mapping.provider_id)
+            for provider in graph.capability_providers[cap_id]:
                 if provider:
                     if provider.enabled and provider.healthy:
                         available = True
@@ -771,7 +886,8 @@ class CrewValidator:
     def _validate_task_output_specs(
         self,
         crew_def: CrewDefinition,
-        session: Session
+        session: Session,
+        graph: Optional[CrewGraph] = None,
     ) -> Dict[str, List[str]]:
         """Validate TaskOutputSpec settings for all tasks in crew.
 
@@ -790,6 +906,7 @@ class CrewValidator:
         errors: List[str] = []
         warnings: List[str] = []
         hints: List[str] = []
+        graph = self._graph(crew_def, None, session, graph)
 
         VALID_OUTPUT_MODES = {
             "raw", "native_json", "native_pydantic", "soft_json", "soft_pydantic"
@@ -817,7 +934,7 @@ class CrewValidator:
                     structure_map[int(task_id)] = agent_id
 
         for task_id in sorted(task_ids):
-            task_def = session.get(TaskDefinition, task_id)
+            task_def = graph.task(task_id)
             if not task_def:
                 continue
 
@@ -847,7 +964,7 @@ class CrewValidator:
             if output_mode in ("native_json", "native_pydantic"):
                 agent_id = structure_map.get(task_id)
                 if agent_id:
-                    agent_def = session.get(AgentDefinition, agent_id)
+                    agent_def = graph.agent(agent_id)
                     if agent_def:
                         llm_cfg = agent_def.llm_config or {}
                         provider_key = llm_cfg.get("provider_key", "unknown")
@@ -22,6 +22,15 @@ class RunContext:
     byok_allowed: bool
     runtime_limits: RuntimeLimits
 
+    @classmethod
+    def from_decision(cls, decision: PolicyDecision) -> "RunContext":
+        return cls(
+            entitlements_decision=decision,
+            effective_scope=decision.effective_scope.value,
+            byok_allowed=decision.limits.byok_allowed,
+            runtime_limits=decision.limits,
+        )
+
 
 _current_run_context: contextvars.ContextVar[Optional[RunContext]] = contextvars.ContextVar(
     "faic_current_run_context", default=None
@@ -0,0 +1,162 @@
+"""
+Task Checkpoints - Crew 运行的任务级检查点与断点续跑
+
+每个任务完成时（build_task_output_callback）把 TaskOutput 写入
+ExecutionStateStore：``checkpoint:<job_id>:task:<task_id>``。同一 job_id 再次执行
+（JobManager.recover_jobs 重新提交、队列 worker 接管重投）时，
+restore_completed_tasks 在 kickoff 前：
+- 用检查点输出预填已完成任务的 task.output，并从 crew.tasks 中移除
+- 剩余任务的 context 保持不变：显式 context 引用的已恢复任务通过预填的
+  task.output 提供输出，与首次运行时得到的上下文一致
+- kickoff 结束后 merge_restored_outputs 把恢复的输出补回 tasks_output
+
+hierarchical Crew 由 Manager 动态分派任务，不做恢复（整体重跑）。
+
+环境变量:
+- FAIC_TASK_CHECKPOINTS: 是否写入与恢复任务检查点（默认 true）
+- FAIC_EXECUTION_CHECKPOINT_TTL: 检查点保留秒数（默认 86400，与任务记录一致）
+"""
+
+import os
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from AICrews.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+TASK_CHECKPOINTS_ENABLED = os.getenv("FAIC_TASK_CHECKPOINTS", "true").lower() in ("1", "true", "yes")
+
+
+def _checkpoint_store() -> Any:
+    from AICrews.execution.state_persistence import get_execution_state_store
+
+    return get_execution_state_store()
+
+
+def checkpoint_task_output(job_id: str, task_id: Any, output: Any) -> bool:
+    """写入单个任务的输出检查点（任务回调中调用，失败不影响运行）"""
+    if not TASK_CHECKPOINTS_ENABLED:
+        return False
+    pydantic_obj = getattr(output, "pydantic", None)
+    pydantic_dump = None
+    if pydantic_obj is not None:
+        try:
+            pydantic_dump = pydantic_obj.model_dump(mode="json")
+        except Exception:
+            pydantic_dump = None
+
+    store = _checkpoint_store()
+    saved = store.append_checkpoint_sync(
+        run_id=job_id,
+        checkpoint_id=store.task_checkpoint_id(task_id),
+        data={
+            "task_id": str(task_id),
+            "name": getattr(output, "name", None),
+            "description": getattr(output, "description", None),
+            "agent": getattr(output, "agent", None),
+            "raw": getattr(output, "raw", "") or "",
+            "json_dict": getattr(output, "json_dict", None),
+            "pydantic": pydantic_dump,
+        },
+    )
+    store.set_task_status_sync(run_id=job_id, task_id=str(task_id), status="success")
+    return saved
+
+
+def load_task_checkpoints(job_id: str, task_ids: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+    """task_id(str) -> 检查点数据（一次往返批量读取）"""
+    store = _checkpoint_store()
+    ids = {store.task_checkpoint_id(tid): str(tid) for tid in task_ids}
+    checkpoints = store.get_checkpoints_sync(run_id=job_id, checkpoint_ids=list(ids))
+    return {ids[cid]: cp.data for cid, cp in checkpoints.items()}
+
+
+def to_task_output(data: Dict[str, Any], task: Any) -> Any:
+    """由检查点数据重建 TaskOutput（能还原时同时还原 output_pydantic 模型）"""
+    from crewai.tasks.task_output import TaskOutput
+
+    pydantic_obj = None
+    output_pydantic = getattr(task, "output_pydantic", None)
+    if data.get("pydantic") is not None and output_pydantic is not None:
+        try:
+            pydantic_obj = output_pydantic.model_validate(data["pydantic"])
+        except Exception:
+            logger.debug("Checkpointed pydantic output no longer validates", exc_info=True)
+
+    agent = getattr(task, "agent", None)
+    return TaskOutput(
+        name=data.get("name") or getattr(task, "name", None),
+        description=data.get("description") or task.description,
+        expected_output=getattr(task, "expected_output", None),
+        raw=data.get("raw") or "",
+        json_dict=data.get("json_dict"),
+        pydantic=pydantic_obj,
+        agent=data.get("agent") or getattr(agent, "role", "") or "",
+    )
+
+
+def restore_completed_tasks(
+    crew: Any,
+    task_index: Mapping[Any, Any],
+    job_id: Optional[str],
+) -> List[Any]:
+    """
+    用检查点预填已完成的任务并从 crew.tasks 中移除
+
+    Args:
+        crew: instantiate 返回的 Crew（原地修改）
+        task_index: instantiate 写入的 task_id -> Task（按编译顺序）
+        job_id: 运行 ID（检查点的 run_id）
+
+    Returns:
+        按任务顺序恢复的 TaskOutput 列表（无检查点时为空，crew 不变）
+    """
+    if not TASK_CHECKPOINTS_ENABLED or not job_id or not task_index:
+        return []
+    if str(getattr(getattr(crew, "process", None), "value", "")) == "hierarchical":
+        return []
+
+    try:
+        checkpoints = load_task_checkpoints(job_id, task_index.keys())
+    except Exception:
+        logger.warning(f"[Job {job_id}] Failed to load task checkpoints", exc_info=True)
+        return []
+    if not checkpoints:
+        return []
+
+    restored: List[Any] = []
+    remaining: List[Any] = []
+    for task_id, task in task_index.items():
+        data = checkpoints.get(str(task_id))
+        if data is not None:
+            output = to_task_output(data, task)
+            task.output = output
+            restored.append(output)
+        else:
+            remaining.append(task)
+
+    remaining_ids = {id(task) for task in remaining}
+    crew.tasks = [task for task in crew.tasks if id(task) in remaining_ids]
+    logger.info(
+        f"[Job {job_id}] Restored {len(restored)} task outputs from checkpoints; "
+        f"{len(crew.tasks)} tasks remaining"
+    )
+    return restored
+
+
+def merge_restored_outputs(result: Any, restored: List[Any]) -> Any:
+    """把恢复的输出补回 kickoff 结果；result 为 None（无剩余任务）时由恢复输出构造"""
+    if not restored:
+        return result
+    if result is None:
+        from crewai.crews.crew_output import CrewOutput
+
+        final = restored[-1]
+        return CrewOutput(
+            raw=final.raw,
+            pydantic=final.pydantic,
+            json_dict=final.json_dict,
+            tasks_output=list(restored),
+        )
+    result.tasks_output = list(restored) + list(getattr(result, "tasks_output", None) or [])
+    return result
@@ -129,6 +129,7 @@ class SyncConfig:
     max_interval: int = 1800        # 最大同步间隔（秒）- v2.0: 从600改为1800（30分钟）
     max_errors: int = 5             # 最大连续错误次数 - v2.0: 从3改为5（更宽容）
     retry_delay: int = 10           # 重试延迟（秒）- v2.0: 从5改为10
+    scheduler_tick: int = 5         # 批量调度器轮询间隔（秒）：每个 tick 收集到期 ticker 批量同步
 
     def __post_init__(self):
         # 从环境变量覆盖
@@ -137,6 +138,7 @@ class SyncConfig:
         self.max_interval = int(os.getenv("FAIC_SYNC_MAX_INTERVAL", str(self.max_interval)))
         self.max_errors = int(os.getenv("FAIC_SYNC_MAX_ERRORS", str(self.max_errors)))
         self.retry_delay = int(os.getenv("FAIC_SYNC_RETRY_DELAY", str(self.retry_delay)))
+        self.scheduler_tick = int(os.getenv("FAIC_SYNC_SCHEDULER_TICK", str(self.scheduler_tick)))
 
 
 
@@ -268,6 +270,7 @@ class Settings:
                 "max_interval": self.sync.max_interval,
                 "max_errors": self.sync.max_errors,
                 "retry_delay": self.sync.retry_delay,
+                "scheduler_tick": self.sync.scheduler_tick,
             },
         }
     
@@ -96,7 +96,9 @@ class DBManager:
     # --- 📈 1. 股价缓存逻辑 ---
 
     @monitor
-    def get_cached_prices(self, ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
+    def get_cached_prices(
+        self, ticker: str, start_date: str, end_date: str, resolution: str = "1d"
+    ) -> pd.DataFrame:
         """
         尝试从数据库获取股价数据，返回 Pandas DataFrame (与 yfinance 格式兼容)
         """
@@ -107,7 +109,8 @@ class DBManager:
             stmt = select(StockPrice).where(
                 StockPrice.ticker == ticker,
                 StockPrice.date >= start,
-                StockPrice.date <= end
+                StockPrice.date <= end,
+                StockPrice.resolution == resolution
             ).order_by(StockPrice.date)
             results = session.scalars(stmt).all()
 
@@ -129,7 +132,9 @@ class DBManager:
             return df
 
     @monitor
-    def save_stock_data(self, ticker: str, df: pd.DataFrame, source: str = "yfinance"):
+    def save_stock_data(
+        self, ticker: str, df: pd.DataFrame, source: str = "yfinance", resolution: str = "1d"
+    ):
         """
         将 DataFrame 格式的 K 线数据存入数据库 (Upsert)
         """
@@ -148,7 +153,7 @@ class DBManager:
                 "close": float(row["Close"]),
                 "volume": float(row["Volume"]),
                 "source": source,
-                "resolution": "1d"
+                "resolution": resolution
             })
 
         if not records: return
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
 from typing import Literal
 
 
-ExecutorMode = Literal["kickoff", "agent_executor"]
+ExecutorMode = Literal["kickoff", "agent_executor", "dag"]
 
 
 @dataclass(frozen=True)
 class ExecutorSelector:
     mode: ExecutorMode = "kickoff"
 
+    @classmethod
+    def from_env(cls) -> "ExecutorSelector":
+        """FAIC_RUNTIME_EXECUTOR_MODE: kickoff | dag (default dag)."""
+        mode = os.getenv("FAIC_RUNTIME_EXECUTOR_MODE", "dag").strip().lower()
+        return cls(mode=mode if mode in ("kickoff", "agent_executor", "dag") else "dag")  # type: ignore[arg-type]
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import os
+
 from AICrews.observability.logging import get_logger
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Mapping, Optional, Set
 
+from AICrews.execution.task_dag import TaskNode, build_task_dag, join_context
 from AICrews.schemas.execution_graph import ExecutionGraph
 
 logger = get_logger(__name__)
@@ -14,8 +18,27 @@ class RuntimeExecutor:
 
     Task 10 implementation: provides an async execute() entrypoint and delegates
     execution to _execute_graph(), which can be wired to CrewAI kickoff/Flow later.
+
+    Modes (ExecutorSelector):
+    - kickoff: instantiate the crew and call crew.kickoff()
+    - dag: run the crew's tasks as a dependency graph (see task_dag.build_task_dag);
+      ready tasks run concurrently in worker threads, at most `max_parallel` at a
+      time, each receiving the outputs of its context tasks as kickoff would. Falls
+      back to kickoff for hierarchical crews or tasks that cannot be mapped.
+
+    In dag mode, tasks with an output checkpoint for this job_id (written by the task
+    callback, see task_checkpoints) are restored instead of re-executed.
+
+    `error_config` may be a single ErrorConfig (whole run in kickoff mode, default per
+    task in dag mode) or a mapping of task_id -> ErrorConfig, with an optional
+    "default" entry. Structure entries may also carry an "error_config" dict.
     """
 
+    def __init__(self, max_parallel: Optional[int] = None):
+        self.max_parallel = max(
+            1, max_parallel or int(os.getenv("FAIC_RUNTIME_MAX_PARALLEL", "4"))
+        )
+
     async def execute(
         self,
         graph: ExecutionGraph,
@@ -66,8 +89,12 @@ class RuntimeExecutor:
         from AICrews.schemas.error_handling import ErrorConfig, ErrorStrategy
         from AICrews.execution.executor_selector import ExecutorSelector
 
-        selector = executor_selector or ExecutorSelector(mode="kickoff")
-        cfg = error_config or ErrorConfig(strategy=ErrorStrategy.STOP)
+        selector = executor_selector or ExecutorSelector.from_env()
+        if isinstance(error_config, Mapping):
+            cfg = self._coerce_error_config(error_config.get("default"))
+        else:
+            cfg = error_config
+        cfg = cfg or ErrorConfig(strategy=ErrorStrategy.STOP)
 
         run_id = job_id or "run"
         if state_store is not None:
@@ -79,21 +106,47 @@ class RuntimeExecutor:
                         "crew_id": crew_id,
                         "user_id": user_id,
                         "variables": variables,
+                        "mode": selector.mode,
                     },
                 )
             except Exception:
                 logger.warning("Failed to persist execution_state start", exc_info=True)
 
         try:
-            crew = instantiate_fn(compiled_data, job_id=job_id, user_id=user_id)
+            nodes: Optional[List[TaskNode]] = None
+            if selector.mode == "dag":
+                task_index: Dict[Any, Any] = {}
+                crew = instantiate_fn(
+                    compiled_data, job_id=job_id, user_id=user_id, task_index=task_index
+                )
+                if compiled_data.get("process") != "hierarchical":
+                    nodes = build_task_dag(
+                        compiled_data.get("tasks") or [], graph.structure, task_index
+                    )
+                if not nodes:
+                    logger.info("DAG execution not applicable; falling back to kickoff")
+            else:
+                crew = instantiate_fn(compiled_data, job_id=job_id, user_id=user_id)
+
+            if nodes:
+                result = await self._run_dag(
+                    crew,
+                    nodes,
+                    run_id=run_id,
+                    restored=self._load_checkpoints(job_id, nodes),
+                    state_store=state_store,
+                    error_config=error_config,
+                    default_config=cfg,
+                )
+            else:
 
-            async def _run_selected() -> Any:
-                if selector.mode == "kickoff":
-                    return crew.kickoff()
-                raise NotImplementedError(f"Unsupported executor mode: {selector.mode}")
+                async def _run_selected() -> Any:
+                    if selector.mode in ("kickoff", "dag"):
+                        return crew.kickoff()
+                    raise NotImplementedError(f"Unsupported executor mode: {selector.mode}")
 
-            handler = ErrorHandler()
-            result = await handler.arun_with_policy(_run_selected, cfg)
+                handler = ErrorHandler()
+                result = await handler.arun_with_policy(_run_selected, cfg)
             if state_store is not None:
                 try:
                     await state_store.set_execution_state(
@@ -124,3 +177,200 @@ class RuntimeExecutor:
                 except Exception:
                     logger.warning("Failed to persist execution_state failed", exc_info=True)
             raise
+
+    # =========================================================================
+    # DAG execution
+    # =========================================================================
+
+    async def _run_dag(
+        self,
+        crew: Any,
+        nodes: List[TaskNode],
+        *,
+        run_id: str,
+        state_store: Optional[Any],
+        error_config: Optional[Any],
+        default_config: Any,
+        restored: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        from AICrews.execution.error_handler import ErrorHandler
+
+        self._prepare_agents(crew)
+        handler = ErrorHandler()
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        # CrewAI agents keep per-execution state; tasks sharing an agent run one at a time
+        agent_locks: Dict[int, asyncio.Lock] = {}
+        outputs: Dict[str, Optional[str]] = {}
+        task_outputs: Dict[str, Any] = {}
+        finished: Set[str] = set()
+        runs: Dict[str, asyncio.Task] = {}
+
+        for key, output in (restored or {}).items():
+            task_outputs[key] = output
+            outputs[key] = output.raw
+            finished.add(key)
+        for node in nodes:
+            status = "restored" if node.key in finished else "pending"
+            await self._set_task_status(state_store, run_id, node.key, status)
+
+        async def run_node(node: TaskNode) -> None:
+            if node.key in finished:
+                return
+            if node.depends_on:
+                await asyncio.gather(*(runs[key] for key in node.depends_on))
+            cfg = self._node_error_config(node, error_config, default_config)
+            lock = agent_locks.setdefault(id(node.task.agent), asyncio.Lock())
+            async with lock, semaphore:
+                await self._set_task_status(state_store, run_id, node.key, "running")
+                context = join_context([outputs.get(key) for key in node.context])
+                errors: List[BaseException] = []
+
+                async def _attempt() -> Any:
+                    errors.clear()
+                    try:
+                        # to_thread copies contextvars (RunContext / LogContext)
+                        return await asyncio.to_thread(
+                            node.task.execute_sync,
+                            agent=node.task.agent,
+                            context=context,
+                            tools=node.task.tools or node.task.agent.tools or [],
+                        )
+                    except Exception as e:
+                        errors.append(e)
+                        raise
+
+                try:
+                    result = await handler.arun_with_policy(_attempt, cfg)
+                except Exception as e:
+                    finished.add(node.key)
+                    await self._set_task_status(
+                        state_store, run_id, node.key, "failed", detail=str(e)
+                    )
+                    raise
+
+            finished.add(node.key)
+            if errors:
+                # CONTINUE / ERROR_OUTPUT: downstream tasks get the substitute output (if any)
+                outputs[node.key] = result if isinstance(result, str) else None
+                await self._set_task_status(
+                    state_store, run_id, node.key, "failed", detail=str(errors[-1])
+                )
+                return
+            task_outputs[node.key] = result
+            outputs[node.key] = getattr(result, "raw", None) or str(result)
+            await self._set_task_status(state_store, run_id, node.key, "success")
+
+        for node in nodes:
+            runs[node.key] = asyncio.create_task(run_node(node), name=f"dag-task-{node.key}")
+        try:
+            await asyncio.gather(*runs.values())
+        except BaseException:
+            # Worker threads already running cannot be interrupted; pending tasks are dropped
+            for run in runs.values():
+                run.cancel()
+            await asyncio.gather(*runs.values(), return_exceptions=True)
+            for node in nodes:
+                if node.key not in finished:
+                    await self._set_task_status(state_store, run_id, node.key, "cancelled")
+            raise
+
+        logger.info(
+            f"DAG execution finished: {len(task_outputs)}/{len(nodes)} tasks succeeded "
+            f"(max_parallel={self.max_parallel})"
+        )
+        return self._crew_output(crew, [task_outputs[n.key] for n in nodes if n.key in task_outputs])
+
+    @staticmethod
+    def _load_checkpoints(job_id: Optional[str], nodes: List[TaskNode]) -> Dict[str, Any]:
+        """node key -> TaskOutput restored from this job's task checkpoints."""
+        if not job_id:
+            return {}
+        try:
+            from AICrews.application.crew.task_checkpoints import (
+                TASK_CHECKPOINTS_ENABLED,
+                load_task_checkpoints,
+                to_task_output,
+            )
+
+            if not TASK_CHECKPOINTS_ENABLED:
+                return {}
+            checkpoints = load_task_checkpoints(job_id, [node.key for node in nodes])
+            restored = {}
+            for node in nodes:
+                data = checkpoints.get(node.key)
+                if data is not None:
+                    node.task.output = restored[node.key] = to_task_output(data, node.task)
+        except Exception:
+            logger.warning("Failed to restore task checkpoints", exc_info=True)
+            return {}
+        if restored:
+            logger.info(f"Restored {len(restored)}/{len(nodes)} tasks from checkpoints")
+        return restored
+
+    @staticmethod
+    def _prepare_agents(crew: Any) -> None:
+        """Per-agent setup normally done by crew.kickoff() (crew reference, knowledge)."""
+        for agent in getattr(crew, "agents", None) or []:
+            try:
+                agent.crew = crew
+                set_knowledge = getattr(agent, "set_knowledge", None)
+                if callable(set_knowledge):
+                    set_knowledge(crew_embedder=getattr(crew, "embedder", None))
+            except Exception:
+                logger.debug("Agent preparation skipped", exc_info=True)
+
+    @staticmethod
+    def _crew_output(crew: Any, tasks_output: List[Any]) -> Any:
+        from crewai.crews.crew_output import CrewOutput
+
+        final = tasks_output[-1] if tasks_output else None
+        kwargs: Dict[str, Any] = {
+            "raw": getattr(final, "raw", "") or "",
+            "pydantic": getattr(final, "pydantic", None),
+            "json_dict": getattr(final, "json_dict", None),
+            "tasks_output": tasks_output,
+        }
+        try:
+            kwargs["token_usage"] = crew.calculate_usage_metrics()
+        except Exception:
+            logger.debug("Failed to collect token usage", exc_info=True)
+        return CrewOutput(**kwargs)
+
+    @classmethod
+    def _node_error_config(cls, node: TaskNode, error_config: Optional[Any], default: Any) -> Any:
+        if isinstance(error_config, Mapping):
+            cfg = cls._coerce_error_config(error_config.get(node.key))
+            if cfg is not None:
+                return cfg
+        return cls._coerce_error_config(node.error_config) or default
+
+    @staticmethod
+    def _coerce_error_config(value: Optional[Any]) -> Optional[Any]:
+        if value is None:
+            return None
+        from AICrews.schemas.error_handling import ErrorConfig
+
+        if isinstance(value, ErrorConfig):
+            return value
+        try:
+            return ErrorConfig.model_validate(value)
+        except Exception:
+            logger.warning("Ignoring invalid error_config: %s", value)
+            return None
+
+    @staticmethod
+    async def _set_task_status(
+        state_store: Optional[Any],
+        run_id: str,
+        task_id: str,
+        status: str,
+        detail: Optional[str] = None,
+    ) -> None:
+        if state_store is None:
+            return
+        try:
+            await state_store.set_task_status(
+                run_id=run_id, task_id=task_id, status=status, detail=detail
+            )
+        except Exception:
+            logger.warning("Failed to persist task status", exc_info=True)
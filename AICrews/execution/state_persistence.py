@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import os
+
 from AICrews.observability.logging import get_logger
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
 
 from AICrews.schemas.execution_state import (
     ExecutionCheckpoint,
@@ -11,6 +13,9 @@ from AICrews.schemas.execution_state import (
 
 logger = get_logger(__name__)
 
+# Task output checkpoints must outlive the job record long enough to resume it
+CHECKPOINT_TTL = int(os.getenv("FAIC_EXECUTION_CHECKPOINT_TTL", "86400"))
+
 
 class ExecutionStateStore:
     """
@@ -35,6 +40,11 @@ class ExecutionStateStore:
     def _key_task_status(self, run_id: str, task_id: str) -> str:
         return f"task_status:{run_id}:{task_id}"
 
+    @staticmethod
+    def task_checkpoint_id(task_id: Any) -> str:
+        """Checkpoint id holding a completed task's output."""
+        return f"task:{task_id}"
+
     async def get_execution_state(self, *, run_id: str) -> Optional[ExecutionState]:
         try:
             raw = await self._redis.get_json(self._key_execution_state(run_id))
@@ -120,3 +130,100 @@ class ExecutionStateStore:
             )
             return False
 
+
+    # =========================================================================
+    # Sync API (crew worker threads / task callbacks, no event loop)
+    # =========================================================================
+
+    def append_checkpoint_sync(
+        self,
+        *,
+        run_id: str,
+        checkpoint_id: str,
+        data: Dict[str, Any],
+        ttl_seconds: Optional[int] = None,
+    ) -> bool:
+        ttl = CHECKPOINT_TTL if ttl_seconds is None else int(ttl_seconds)
+        cp = ExecutionCheckpoint(run_id=run_id, checkpoint_id=checkpoint_id, data=data)
+        try:
+            return bool(
+                self._redis.set_sync(
+                    self._key_checkpoint(run_id, checkpoint_id),
+                    cp.model_dump(),
+                    ttl=ttl,
+                    json_encode=True,
+                )
+            )
+        except Exception as e:
+            logger.error(
+                "Failed to append checkpoint: run_id=%s checkpoint_id=%s err=%s",
+                run_id,
+                checkpoint_id,
+                e,
+            )
+            return False
+
+    def get_checkpoints_sync(
+        self, *, run_id: str, checkpoint_ids: Iterable[str]
+    ) -> Dict[str, ExecutionCheckpoint]:
+        """Fetch several checkpoints in one round trip; missing ids are omitted."""
+        ids = list(dict.fromkeys(checkpoint_ids))
+        if not ids:
+            return {}
+        keys = {self._key_checkpoint(run_id, cid): cid for cid in ids}
+        try:
+            raw = self._redis.mget_json_sync(list(keys))
+        except Exception as e:
+            logger.error("Failed to get checkpoints: run_id=%s err=%s", run_id, e)
+            return {}
+        checkpoints: Dict[str, ExecutionCheckpoint] = {}
+        for key, value in raw.items():
+            if not value:
+                continue
+            try:
+                checkpoints[keys[key]] = ExecutionCheckpoint.model_validate(value)
+            except Exception as e:
+                logger.warning("Skipping invalid checkpoint %s: %s", key, e)
+        return checkpoints
+
+    def set_task_status_sync(
+        self,
+        *,
+        run_id: str,
+        task_id: str,
+        status: str,
+        detail: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+    ) -> bool:
+        ttl = self._ttl_seconds if ttl_seconds is None else int(ttl_seconds)
+        ts = TaskStatus(run_id=run_id, task_id=task_id, status=status, detail=detail)
+        try:
+            return bool(
+                self._redis.set_sync(
+                    self._key_task_status(run_id, task_id),
+                    ts.model_dump(),
+                    ttl=ttl,
+                    json_encode=True,
+                )
+            )
+        except Exception as e:
+            logger.error(
+                "Failed to set task status: run_id=%s task_id=%s err=%s",
+                run_id,
+                task_id,
+                e,
+            )
+            return False
+
+
+_store: Optional[ExecutionStateStore] = None
+
+
+def get_execution_state_store() -> ExecutionStateStore:
+    """Shared store bound to the global RedisManager."""
+    global _store
+    if _store is None:
+        from AICrews.infrastructure.cache.redis_manager import get_redis_manager
+
+        _store = ExecutionStateStore(get_redis_manager())
+    return _store
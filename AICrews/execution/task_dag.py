@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Set
+
+
+@dataclass
+class TaskNode:
+    """One instantiated CrewAI task, the node keys it waits for and those whose
+    outputs it receives as context (a subset of depends_on)."""
+
+    key: str
+    task: Any
+    kind: str
+    name: str
+    depends_on: List[str] = field(default_factory=list)
+    context: List[str] = field(default_factory=list)
+    error_config: Optional[Dict[str, Any]] = None
+
+
+def build_task_dag(
+    tasks: List[Dict[str, Any]],
+    structure: List[Dict[str, Any]],
+    task_index: Mapping[Any, Any],
+) -> Optional[List[TaskNode]]:
+    """
+    Derive task dependencies for parallel execution.
+
+    `tasks` is compiled_data["tasks"] (sequential order), `structure` comes from the
+    ExecutionGraph and `task_index` maps task_id -> instantiated CrewAI Task.
+
+    Dependency rules (ordering only):
+    - agent_task: its explicit context_task_ids (upstream agents in the crew graph);
+      tasks carrying a router_condition also wait for the preceding router decision
+    - router_decision: every task before it
+    - summary: its context_task_ids, or every task before it when none are set
+
+    Context matches sequential kickoff: instantiate always gives a task an explicit
+    context list built from its context_task_ids, so every node receives the outputs
+    of its preceding context_task_ids only. A task with none (including a router or
+    summary that merely waits for all earlier tasks) runs without context.
+
+    Returns nodes in topological (original list) order, or None when the tasks cannot
+    be mapped unambiguously (duplicate task ids).
+    """
+    keys = [str(t.get("task_id")) for t in tasks]
+    if len(set(keys)) != len(keys):
+        return None
+
+    routed: Set[str] = set()
+    error_configs: Dict[str, Dict[str, Any]] = {}
+    for entry in structure or []:
+        entry_task_ids = list(entry.get("tasks") or [])
+        for tid_field in ("task_id", "decision_task_id"):
+            if entry.get(tid_field) is not None:
+                entry_task_ids.append(entry[tid_field])
+        for tid in entry_task_ids:
+            if entry.get("router_condition"):
+                routed.add(str(tid))
+            if isinstance(entry.get("error_config"), dict):
+                error_configs[str(tid)] = entry["error_config"]
+
+    nodes: List[TaskNode] = []
+    seen: List[str] = []
+    last_router: Optional[str] = None
+    for t_data in tasks:
+        key = str(t_data.get("task_id"))
+        task = task_index.get(t_data.get("task_id"))
+        if task is None:
+            # instantiate skips tasks without a target agent
+            continue
+
+        kind = t_data.get("type") or "agent_task"
+        context = [str(tid) for tid in t_data.get("context_task_ids") or [] if str(tid) in seen]
+        if kind == "router_decision":
+            depends_on = list(seen)
+        elif kind == "summary":
+            depends_on = list(context) or list(seen)
+        else:
+            depends_on = list(context)
+            if key in routed and last_router is not None and last_router not in depends_on:
+                depends_on.append(last_router)
+
+        nodes.append(
+            TaskNode(
+                key=key,
+                task=task,
+                kind=kind,
+                name=t_data.get("name") or key,
+                depends_on=depends_on,
+                context=context,
+                error_config=error_configs.get(key),
+            )
+        )
+        seen.append(key)
+        if kind == "router_decision":
+            last_router = key
+
+    return nodes
+
+
+def join_context(outputs: List[Optional[str]]) -> str:
+    """Aggregate upstream outputs the way CrewAI joins task context."""
+    return "\n\n----------\n\n".join(o for o in outputs if o)
+
+
+__all__ = ["TaskNode", "build_task_dag", "join_context"]
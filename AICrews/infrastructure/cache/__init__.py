@@ -1,3 +1,11 @@
 from .redis_manager import RedisManager
+from .invalidation_bus import CacheInvalidationBus, get_invalidation_bus
+from .layered_cache_manager import LayeredCacheManager, get_layered_cache
 
-__all__ = ["RedisManager"]
+__all__ = [
+    "RedisManager",
+    "CacheInvalidationBus",
+    "get_invalidation_bus",
+    "LayeredCacheManager",
+    "get_layered_cache",
+]
@@ -0,0 +1,318 @@
+"""
+Cache Invalidation Bus - 跨 worker 缓存失效总线
+
+多个 uvicorn worker 各自持有进程内缓存（编译产物 L1、知识源实例、LLM 实例池、
+权益配置等）。任一 worker 修改数据后通过本总线广播失效消息：
+- 消息按 namespace 路由到各缓存注册的处理函数
+- 消息可指定 keys（精确失效）、tags（按标签失效，如 user:42 / crew:17）或 clear（清空）
+- 标签 -> key 的映射保存在进程内 TagIndex，各缓存写入时登记
+- 发布方先在本进程同步生效，再经 Redis pub/sub 广播；订阅循环忽略自身发出的消息
+- pub/sub 不保留离线消息：每次(重新)订阅成功后清空本进程所有已注册的缓存
+
+使用方式:
+    bus = get_invalidation_bus()
+    bus.register("knowledge_source", drop_keys)          # drop_keys(keys | None)
+    bus.tag("knowledge_source", cache_key, "knowledge:user:7")
+    await bus.publish("knowledge_source", tags=["knowledge:user:7"])
+"""
+
+import asyncio
+import json
+import os
+import socket
+import threading
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from AICrews.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 处理函数：收到需失效的 key 集合；None 表示清空该 namespace
+InvalidationHandler = Callable[[Optional[Set[str]]], None]
+
+
+@dataclass
+class InvalidationMessage:
+    """失效消息"""
+    namespace: str
+    keys: List[str] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+    clear: bool = False
+    origin: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InvalidationMessage":
+        return cls(
+            namespace=str(data["namespace"]),
+            keys=[str(k) for k in data.get("keys") or []],
+            tags=[str(t) for t in data.get("tags") or []],
+            clear=bool(data.get("clear")),
+            origin=str(data.get("origin") or ""),
+        )
+
+
+class TagIndex:
+    """进程内标签索引：namespace -> tag -> keys（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_tag: Dict[str, Dict[str, Set[str]]] = {}
+        self._by_key: Dict[str, Dict[str, Set[str]]] = {}
+
+    def add(self, namespace: str, key: str, tags: Iterable[str]) -> None:
+        tags = [t for t in tags if t]
+        if not tags:
+            return
+        with self._lock:
+            by_tag = self._by_tag.setdefault(namespace, {})
+            key_tags = self._by_key.setdefault(namespace, {}).setdefault(key, set())
+            for tag in tags:
+                by_tag.setdefault(tag, set()).add(key)
+                key_tags.add(tag)
+
+    def discard(self, namespace: str, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._discard_locked(namespace, keys)
+
+    def _discard_locked(self, namespace: str, keys: Iterable[str]) -> None:
+        by_tag = self._by_tag.get(namespace, {})
+        by_key = self._by_key.get(namespace, {})
+        for key in keys:
+            for tag in by_key.pop(key, ()):
+                members = by_tag.get(tag)
+                if members is not None:
+                    members.discard(key)
+                    if not members:
+                        del by_tag[tag]
+
+    def pop(self, namespace: str, tags: Iterable[str]) -> Set[str]:
+        """返回带有任一标签的 key，并将这些 key 移出索引"""
+        with self._lock:
+            by_tag = self._by_tag.get(namespace, {})
+            keys: Set[str] = set()
+            for tag in tags:
+                keys.update(by_tag.get(tag, ()))
+            self._discard_locked(namespace, keys)
+            return keys
+
+    def clear(self, namespace: str) -> None:
+        with self._lock:
+            self._by_tag.pop(namespace, None)
+            self._by_key.pop(namespace, None)
+
+    def size(self, namespace: str) -> int:
+        with self._lock:
+            return len(self._by_key.get(namespace, {}))
+
+
+class CacheInvalidationBus:
+    """基于 Redis pub/sub 的缓存失效总线"""
+
+    CHANNEL = "cache:invalidate"
+
+    def __init__(self, redis_manager: Any = None):
+        self._redis = redis_manager
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.tags = TagIndex()
+        self._handlers: Dict[str, List[InvalidationHandler]] = {}
+        self._handlers_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"published": 0, "received": 0, "applied_keys": 0, "errors": 0}
+
+    @property
+    def redis(self) -> Any:
+        if self._redis is None:
+            from AICrews.infrastructure.cache.redis_manager import get_redis_manager
+
+            self._redis = get_redis_manager()
+        return self._redis
+
+    # =========================================================================
+    # 注册与标签
+    # =========================================================================
+
+    def register(self, namespace: str, handler: InvalidationHandler) -> None:
+        """注册 namespace 的失效处理函数（同一 namespace 可注册多个）"""
+        with self._handlers_lock:
+            handlers = self._handlers.setdefault(namespace, [])
+            if handler not in handlers:
+                handlers.append(handler)
+
+    def unregister(self, namespace: str, handler: InvalidationHandler) -> None:
+        with self._handlers_lock:
+            handlers = self._handlers.get(namespace, [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+    def tag(self, namespace: str, key: str, *tags: str) -> None:
+        """登记缓存条目的标签"""
+        self.tags.add(namespace, key, tags)
+
+    def untag(self, namespace: str, *keys: str) -> None:
+        """缓存条目被本地淘汰时移出标签索引"""
+        self.tags.discard(namespace, keys)
+
+    # =========================================================================
+    # 发布与应用
+    # =========================================================================
+
+    def _build(
+        self, namespace: str, keys: Iterable[str], tags: Iterable[str], clear: bool
+    ) -> InvalidationMessage:
+        return InvalidationMessage(
+            namespace=namespace,
+            keys=list(keys),
+            tags=list(tags),
+            clear=clear,
+            origin=self.worker_id,
+        )
+
+    async def publish(
+        self,
+        namespace: str,
+        *,
+        keys: Iterable[str] = (),
+        tags: Iterable[str] = (),
+        clear: bool = False,
+        local: bool = True,
+    ) -> None:
+        """本进程立即失效，并广播到其他 worker
+
+        local=False 时只广播（调用方已在本进程自行完成刷新）
+        """
+        message = self._build(namespace, keys, tags, clear)
+        if local:
+            self.apply(message)
+        self._stats["published"] += 1
+        await self.redis.publish(self.CHANNEL, message.to_dict())
+
+    def publish_sync(
+        self,
+        namespace: str,
+        *,
+        keys: Iterable[str] = (),
+        tags: Iterable[str] = (),
+        clear: bool = False,
+        local: bool = True,
+    ) -> None:
+        """同步版本的 publish，用于非 asyncio 代码路径"""
+        message = self._build(namespace, keys, tags, clear)
+        if local:
+            self.apply(message)
+        self._stats["published"] += 1
+        self.redis.publish_sync(self.CHANNEL, message.to_dict())
+
+    def apply(self, message: InvalidationMessage) -> int:
+        """在本进程执行失效，返回失效的 key 数（clear 时为 -1）"""
+        with self._handlers_lock:
+            handlers = list(self._handlers.get(message.namespace, ()))
+
+        if message.clear:
+            self.tags.clear(message.namespace)
+            keys: Optional[Set[str]] = None
+        else:
+            keys = set(message.keys)
+            if message.tags:
+                keys |= self.tags.pop(message.namespace, message.tags)
+            self.tags.discard(message.namespace, message.keys)
+            if not keys:
+                return 0
+
+        for handler in handlers:
+            try:
+                handler(keys)
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"Invalidation handler failed for {message.namespace}: {e}")
+
+        applied = -1 if keys is None else len(keys)
+        if keys:
+            self._stats["applied_keys"] += len(keys)
+        return applied
+
+    # =========================================================================
+    # 订阅循环
+    # =========================================================================
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen(), name="cache_invalidation_bus")
+            logger.info(f"Cache invalidation bus started (worker={self.worker_id})")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Cache invalidation bus stopped")
+
+    async def _listen(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                async with self.redis.subscribe([self.CHANNEL]) as pubsub:
+                    backoff = 1.0
+                    # 断线期间发布的失效消息已丢失，(重新)订阅后清空所有本地缓存
+                    self._flush_local()
+                    while True:
+                        raw = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if raw is not None:
+                            self._handle_raw(raw.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation subscription lost, retrying in {backoff:.0f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def _flush_local(self) -> None:
+        """对所有已注册的 namespace 在本进程执行 clear"""
+        with self._handlers_lock:
+            namespaces = list(self._handlers)
+        for namespace in namespaces:
+            self.apply(self._build(namespace, (), (), clear=True))
+        if namespaces:
+            logger.info(f"Flushed {len(namespaces)} local cache namespaces after subscribing")
+
+    def _handle_raw(self, data: Any) -> None:
+        try:
+            message = InvalidationMessage.from_dict(json.loads(data))
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.debug(f"Ignoring malformed invalidation message: {e}")
+            return
+        if message.origin == self.worker_id:
+            return
+        self._stats["received"] += 1
+        self.apply(message)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._handlers_lock:
+            namespaces = sorted(self._handlers)
+        return {
+            **self._stats,
+            "worker_id": self.worker_id,
+            "running": self._task is not None and not self._task.done(),
+            "namespaces": namespaces,
+        }
+
+
+_invalidation_bus: Optional[CacheInvalidationBus] = None
+_invalidation_bus_lock = threading.Lock()
+
+
+def get_invalidation_bus() -> CacheInvalidationBus:
+    global _invalidation_bus
+    if _invalidation_bus is None:
+        with _invalidation_bus_lock:
+            if _invalidation_bus is None:
+                _invalidation_bus = CacheInvalidationBus()
+    return _invalidation_bus
@@ -1,69 +1,265 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import math
+import os
+import sys
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from AICrews.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Marker key for values written by this manager into Redis (envelope format)
+_ENVELOPE_MARKER = "__lc__"
+# Redis set holding the L2 keys carrying a tag
+_TAG_SET_PREFIX = "lctag:"
+
+Loader = Callable[[], Awaitable[Any]]
 
 
 @dataclass(frozen=True)
 class CacheItem:
     value: Any
     expires_at: Optional[float]
+    fresh_until: Optional[float] = None
+    negative: bool = False
+    size: int = 0
+    tags: Tuple[str, ...] = ()
+
+    def is_expired(self, now: float) -> bool:
+        return self.expires_at is not None and now > self.expires_at
+
+    def is_fresh(self, now: float) -> bool:
+        fresh_until = self.expires_at if self.fresh_until is None else self.fresh_until
+        return fresh_until is None or now <= fresh_until
 
 
 class LayeredCacheManager:
     """
-    Layered cache manager (v2 plan).
+    Two-tier read-through cache: bounded in-process LRU (L1) in front of Redis (L2).
 
-    Task 1 implementation: memory layer only.
-    Future tasks can extend this to Redis-backed layers.
+    - L1 is bounded by entry count and (estimated) bytes; least recently used
+      entries are evicted first, hard-expired entries are dropped on access.
+    - get_or_compute() is the read-through API:
+        * per-key single-flight: concurrent misses on the same event loop share
+          one loader call
+        * stale-while-revalidate: within stale_ttl after expiry the stale value
+          is served immediately and a background refresh is scheduled; loader
+          failures (exceptions or None) keep serving the stale value
+        * negative caching: a loader returning None is cached as "absent" for
+          negative_ttl so repeated misses do not hammer the backend
+    - Redis values written here are wrapped in an envelope carrying freshness,
+      so every worker agrees on when a value turns stale.
+    - Hit/miss/stale/negative counts and loader latency are reported per
+      namespace (the key prefix before the first ':').
+    - Entries may carry tags (e.g. "user:42", "crew:17"). invalidate_tags()
+      deletes tagged Redis keys and broadcasts over the invalidation bus so
+      every worker drops the matching L1 entries.
+
+    The get/set/get_json/set_json family keeps its original per-layer
+    semantics; layer="all" reads L1 then Redis and writes both.
     """
 
-    def __init__(self, redis_manager: Any = None):
+    BUS_NAMESPACE = "layered"
+
+    def __init__(
+        self,
+        redis_manager: Any = None,
+        *,
+        bus: Any = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        negative_ttl: Optional[float] = None,
+    ):
         self._redis = redis_manager
-        self._memory: Dict[str, CacheItem] = {}
+        self._bus = bus
+        if bus is not None:
+            bus.register(self.BUS_NAMESPACE, self._drop_local)
+        self.max_entries = max_entries or int(os.getenv("FAIC_L1_CACHE_MAX_ENTRIES", "5000"))
+        self.max_bytes = max_bytes or int(os.getenv("FAIC_L1_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        self.negative_ttl = (
+            float(os.getenv("FAIC_CACHE_NEGATIVE_TTL", "30")) if negative_ttl is None else negative_ttl
+        )
+        # L1 TTL for Redis values whose freshness is unknown (written outside this manager)
+        self.default_l1_ttl = float(os.getenv("FAIC_L1_CACHE_DEFAULT_TTL", "30"))
 
-    def get(self, key: str, *, layer: str = "memory") -> Any:
-        if layer != "memory":
-            raise ValueError("Only memory layer is implemented")
+        self._memory: "OrderedDict[str, CacheItem]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
 
-        item = self._memory.get(key)
-        if item is None:
-            return None
+        # (event loop id, key) -> future shared by concurrent loaders
+        self._inflight: Dict[Tuple[int, str], asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    # =========================================================================
+    # L1 (in-process LRU)
+    # =========================================================================
+
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        try:
+            return len(json.dumps(value, default=str))
+        except (TypeError, ValueError):
+            return sys.getsizeof(value)
 
-        if item.expires_at is not None and time.time() > item.expires_at:
+    def _l1_get(self, key: str, now: float) -> Optional[CacheItem]:
+        with self._lock:
+            item = self._memory.get(key)
+            if item is None:
+                return None
+            if not item.is_expired(now):
+                self._memory.move_to_end(key)
+                return item
             self._memory.pop(key, None)
-            return None
+            self._bytes -= item.size
+        self._untag(key)
+        return None
 
-        return item.value
+    def _l1_put(self, key: str, item: CacheItem) -> None:
+        if item.size > self.max_bytes:
+            # Never let a single oversized value flush the whole L1
+            self._l1_delete(key)
+            return
+        evicted = []
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._memory[key] = item
+            self._bytes += item.size
+            while self._memory and (
+                len(self._memory) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                old_key, old = self._memory.popitem(last=False)
+                self._bytes -= old.size
+                evicted.append(old_key)
+        if item.tags and self._bus is not None:
+            self._bus.tag(self.BUS_NAMESPACE, key, *item.tags)
+        if evicted:
+            self._untag(*evicted)
+            self._record_eviction(len(evicted))
+
+    def _l1_delete(self, key: str) -> None:
+        with self._lock:
+            item = self._memory.pop(key, None)
+            if item is not None:
+                self._bytes -= item.size
+        self._untag(key)
+
+    def _drop_local(self, keys: Optional[Set[str]]) -> None:
+        """Invalidation bus handler: drop L1 entries (None clears L1)."""
+        if keys is None:
+            self.clear()
+            return
+        for key in keys:
+            self._l1_delete(key)
+
+    def _untag(self, *keys: str) -> None:
+        if self._bus is not None:
+            self._bus.untag(self.BUS_NAMESPACE, *keys)
+
+    def sweep(self) -> int:
+        """Drop hard-expired L1 entries; returns the number removed."""
+        now = time.time()
+        with self._lock:
+            expired = [k for k, item in self._memory.items() if item.is_expired(now)]
+            for k in expired:
+                self._bytes -= self._memory.pop(k).size
+        self._untag(*expired)
+        return len(expired)
+
+    # =========================================================================
+    # Per-layer API
+    # =========================================================================
+
+    def get(self, key: str, *, layer: str = "memory") -> Any:
+        if layer != "memory":
+            raise ValueError("Only memory layer is supported for sync get()")
+
+        item = self._l1_get(key, time.time())
+        return None if item is None else item.value
 
     def set(self, key: str, value: Any, *, ttl: int | float | None, layer: str = "memory") -> None:
         if layer != "memory":
-            raise ValueError("Only memory layer is implemented")
+            raise ValueError("Only memory layer is supported for sync set()")
 
         expires_at = None if ttl is None else (time.time() + float(ttl))
-        self._memory[key] = CacheItem(value=value, expires_at=expires_at)
+        self._l1_put(
+            key, CacheItem(value=value, expires_at=expires_at, size=self._estimate_size(value))
+        )
+
+    def delete(self, key: str, *, layer: str = "memory") -> None:
+        if layer != "memory":
+            raise ValueError("Only memory layer is supported for sync delete()")
+        self._l1_delete(key)
 
     def clear(self, *, layer: str = "memory") -> None:
         if layer != "memory":
             raise ValueError("Only memory layer is implemented for clear()")
-        self._memory.clear()
+        with self._lock:
+            self._memory.clear()
+            self._bytes = 0
+        if self._bus is not None:
+            self._bus.tags.clear(self.BUS_NAMESPACE)
+
+    async def invalidate(self, key: str) -> None:
+        """Remove a key from both tiers on every worker."""
+        self._l1_delete(key)
+        if self._redis:
+            await self._redis.delete(key)
+        if self._bus is not None:
+            await self._bus.publish(self.BUS_NAMESPACE, keys=[key])
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """Remove every entry carrying any of the tags from both tiers on every worker.
+
+        Returns the number of Redis keys deleted.
+        """
+        tags = tuple(t for t in tags if t)
+        if not tags:
+            return 0
+        deleted = 0
+        if self._redis:
+            keys = await self._redis.pop_sets([_TAG_SET_PREFIX + t for t in tags])
+            if keys:
+                deleted = await self._redis.delete_many(keys)
+        if self._bus is not None:
+            await self._bus.publish(self.BUS_NAMESPACE, tags=tags)
+        return deleted
+
+    @staticmethod
+    def _tag_sets(item: CacheItem) -> list:
+        return [_TAG_SET_PREFIX + t for t in item.tags]
 
     async def get_json(self, key: str, *, layer: str = "redis") -> Any:
         if layer == "memory":
             return self.get(key, layer="memory")
-        if layer != "redis":
+        if layer not in ("redis", "all"):
             raise ValueError(f"Unsupported cache layer: {layer}")
+        if layer == "all":
+            item = self._l1_get(key, time.time())
+            if item is not None:
+                return item.value
         if not self._redis:
             return None
-        return await self._redis.get_json(key)
+        payload = await self._redis.get_json(key)
+        return self._unwrap_read(key, payload, populate_l1=(layer == "all"))
 
     async def set_json(
-        self, key: str, value: Any, *, ttl: int, layer: str = "redis"
+        self, key: str, value: Any, *, ttl: int, layer: str = "redis", tags: Iterable[str] = ()
     ) -> bool:
         if layer == "memory":
             self.set(key, value, ttl=ttl, layer="memory")
             return True
+        if layer == "all":
+            return await self._store(key, value, ttl=ttl, stale_ttl=0, tags=tags)
         if layer != "redis":
             raise ValueError(f"Unsupported cache layer: {layer}")
         if not self._redis:
@@ -73,26 +269,373 @@ class LayeredCacheManager:
     def get_json_sync(self, key: str, *, layer: str = "redis") -> Any:
         if layer == "memory":
             return self.get(key, layer="memory")
-        if layer != "redis":
+        if layer not in ("redis", "all"):
             raise ValueError(f"Unsupported cache layer: {layer}")
+        if layer == "all":
+            item = self._l1_get(key, time.time())
+            if item is not None:
+                return item.value
         if not self._redis:
             return None
         getter = getattr(self._redis, "get_json_sync", None)
         if callable(getter):
-            return getter(key)
+            return self._unwrap_read(key, getter(key), populate_l1=(layer == "all"))
         return None
 
     def set_json_sync(
-        self, key: str, value: Any, *, ttl: int, layer: str = "redis"
+        self, key: str, value: Any, *, ttl: int, layer: str = "redis", tags: Iterable[str] = ()
     ) -> bool:
         if layer == "memory":
             self.set(key, value, ttl=ttl, layer="memory")
             return True
-        if layer != "redis":
+        if layer not in ("redis", "all"):
             raise ValueError(f"Unsupported cache layer: {layer}")
+        tag_sets = []
+        if layer == "all":
+            item, encoded = self._build_item(value, ttl=ttl, stale_ttl=0, tags=tags)
+            self._l1_put(key, item)
+            tag_sets = self._tag_sets(item)
+            value, json_encode = encoded, False
+        else:
+            json_encode = True
         if not self._redis:
             return False
         setter = getattr(self._redis, "set_sync", None)
         if callable(setter):
-            return bool(setter(key, value, ttl=ttl, json_encode=True))
+            stored = bool(setter(key, value, ttl=ttl, json_encode=json_encode))
+            if stored and tag_sets:
+                self._redis.add_to_sets_sync(tag_sets, key, ttl=max(1, math.ceil(ttl)))
+            return stored
         return False
+
+    # =========================================================================
+    # Envelope encoding
+    # =========================================================================
+
+    def _build_item(
+        self,
+        value: Any,
+        *,
+        ttl: float,
+        stale_ttl: float,
+        negative: bool = False,
+        tags: Iterable[str] = (),
+    ) -> Tuple[CacheItem, Any]:
+        tags = tuple(t for t in tags if t)
+        now = time.time()
+        fresh_until = now + float(ttl)
+        expires_at = fresh_until + float(stale_ttl)
+        encoded, size = self._encode_envelope(
+            {
+                _ENVELOPE_MARKER: 1,
+                "v": value,
+                "fresh_until": fresh_until,
+                "expires_at": expires_at,
+                "neg": negative,
+                "tags": list(tags),
+            }
+        )
+        item = CacheItem(
+            value=value,
+            expires_at=expires_at,
+            fresh_until=fresh_until,
+            negative=negative,
+            size=size,
+            tags=tags,
+        )
+        return item, encoded
+
+    def _encode_envelope(self, envelope: Dict[str, Any]) -> Tuple[Any, int]:
+        """Serialize with the Redis codec (orjson/msgpack, compression) when available.
+
+        Returns the payload and its uncompressed length, which is what the
+        decoded value costs in L1.
+        """
+        codec = getattr(self._redis, "codec", None)
+        if codec is not None:
+            return codec.dumps_sized(envelope)
+        encoded = json.dumps(envelope, default=str)
+        return encoded, len(encoded)
+
+    def _decode(self, payload: Any) -> Optional[CacheItem]:
+        if payload is None:
+            return None
+        if isinstance(payload, dict) and payload.get(_ENVELOPE_MARKER) == 1:
+            return CacheItem(
+                value=payload.get("v"),
+                expires_at=payload.get("expires_at"),
+                fresh_until=payload.get("fresh_until"),
+                negative=bool(payload.get("neg")),
+                size=self._estimate_size(payload.get("v")),
+                tags=tuple(payload.get("tags") or ()),
+            )
+        # Plain value written by another code path: freshness unknown
+        return CacheItem(
+            value=payload,
+            expires_at=time.time() + self.default_l1_ttl,
+            size=self._estimate_size(payload),
+        )
+
+    def _unwrap_read(self, key: str, payload: Any, *, populate_l1: bool) -> Any:
+        item = self._decode(payload)
+        if item is None or item.is_expired(time.time()):
+            return None
+        if populate_l1:
+            self._l1_put(key, item)
+        return item.value
+
+    async def _store(
+        self,
+        key: str,
+        value: Any,
+        *,
+        ttl: float,
+        stale_ttl: float,
+        negative: bool = False,
+        tags: Iterable[str] = (),
+    ) -> bool:
+        item, encoded = self._build_item(
+            value, ttl=ttl, stale_ttl=stale_ttl, negative=negative, tags=tags
+        )
+        self._l1_put(key, item)
+        if not self._redis:
+            return False
+        redis_ttl = max(1, math.ceil(float(ttl) + float(stale_ttl)))
+        stored = bool(await self._redis.set(key, encoded, ttl=redis_ttl, json_encode=False))
+        if stored and item.tags:
+            await self._redis.add_to_sets(self._tag_sets(item), key, ttl=redis_ttl)
+        return stored
+
+    async def _l2_get(self, key: str) -> Optional[CacheItem]:
+        if not self._redis:
+            return None
+        try:
+            item = self._decode(await self._redis.get_json(key))
+        except Exception:
+            logger.debug("L2 cache read failed for %s", key, exc_info=True)
+            return None
+        if item is None or item.is_expired(time.time()):
+            return None
+        return item
+
+    # =========================================================================
+    # Read-through API
+    # =========================================================================
+
+    async def get_or_compute(
+        self,
+        key: str,
+        loader: Loader,
+        *,
+        ttl: float,
+        stale_ttl: float = 0,
+        negative_ttl: Optional[float] = None,
+        namespace: Optional[str] = None,
+        force_refresh: bool = False,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """Return the cached value for key, loading it on a miss.
+
+        Args:
+            key: cache key (its prefix before ':' is the metrics namespace)
+            loader: zero-argument coroutine function producing the value;
+                returning None means "absent" (negative-cached)
+            ttl: seconds the value is fresh
+            stale_ttl: extra seconds a stale value may be served while a
+                background refresh runs
+            negative_ttl: seconds to cache an absent result (defaults to
+                FAIC_CACHE_NEGATIVE_TTL; 0 disables negative caching)
+            namespace: metrics label override
+            force_refresh: skip lookups and reload (stale value still serves
+                as fallback if the loader fails)
+            tags: invalidation tags for the stored value (see invalidate_tags)
+        """
+        tags = tuple(tags)
+        ns = namespace or self._namespace(key)
+        now = time.time()
+
+        item = self._l1_get(key, now)
+        tier = "l1_hit"
+        if item is None:
+            item = await self._l2_get(key)
+            tier = "l2_hit"
+            if item is not None:
+                self._l1_put(key, item)
+
+        stale = item if item is not None and not item.negative else None
+
+        if item is not None and not force_refresh:
+            if item.is_fresh(now):
+                self._record(ns, "negative" if item.negative else tier)
+                return item.value
+            if stale is not None:
+                self._record(ns, "stale")
+                self._refresh_in_background(key, loader, ttl, stale_ttl, negative_ttl, ns, stale, tags)
+                return stale.value
+
+        self._record(ns, "miss")
+        return await self._load(key, loader, ttl, stale_ttl, negative_ttl, ns, stale, tags)
+
+    async def _load(
+        self,
+        key: str,
+        loader: Loader,
+        ttl: float,
+        stale_ttl: float,
+        negative_ttl: Optional[float],
+        ns: str,
+        stale: Optional[CacheItem],
+        tags: Tuple[str, ...] = (),
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        pending = self._inflight.get(flight_key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = loop.create_future()
+        self._inflight[flight_key] = future
+        try:
+            value = await self._call_loader(
+                key, loader, ttl, stale_ttl, negative_ttl, ns, stale, tags
+            )
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so unattended failures are not logged twice
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(flight_key, None)
+
+    async def _call_loader(
+        self,
+        key: str,
+        loader: Loader,
+        ttl: float,
+        stale_ttl: float,
+        negative_ttl: Optional[float],
+        ns: str,
+        stale: Optional[CacheItem],
+        tags: Tuple[str, ...] = (),
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            value = await loader()
+        except Exception as e:
+            self._observe_load(ns, "error", time.perf_counter() - start)
+            if stale is not None:
+                logger.warning(f"Cache loader failed for {key}, serving stale value: {e}")
+                return stale.value
+            raise
+
+        if value is None:
+            self._observe_load(ns, "empty", time.perf_counter() - start)
+            if stale is not None:
+                return stale.value
+            negative_ttl = self.negative_ttl if negative_ttl is None else negative_ttl
+            if negative_ttl > 0:
+                await self._store(key, None, ttl=negative_ttl, stale_ttl=0, negative=True, tags=tags)
+            return None
+
+        self._observe_load(ns, "ok", time.perf_counter() - start)
+        await self._store(key, value, ttl=ttl, stale_ttl=stale_ttl, tags=tags)
+        return value
+
+    def _refresh_in_background(
+        self,
+        key: str,
+        loader: Loader,
+        ttl: float,
+        stale_ttl: float,
+        negative_ttl: Optional[float],
+        ns: str,
+        stale: CacheItem,
+        tags: Tuple[str, ...] = (),
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        if (id(loop), key) in self._inflight:
+            return
+        task = loop.create_task(
+            self._load(key, loader, ttl, stale_ttl, negative_ttl, ns, stale, tags)
+        )
+        self._background.add(task)
+        task.add_done_callback(self._on_refresh_done)
+
+    def _on_refresh_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background cache refresh failed: {task.exception()}")
+
+    # =========================================================================
+    # Metrics
+    # =========================================================================
+
+    @staticmethod
+    def _namespace(key: str) -> str:
+        return key.split(":", 1)[0] or "default"
+
+    def _record(self, ns: str, result: str) -> None:
+        counters = self._stats.setdefault(ns, {})
+        counters[result] = counters.get(result, 0) + 1
+        try:
+            from AICrews.infrastructure.metrics import get_cache_metrics
+
+            get_cache_metrics().record_result(ns, result)
+        except Exception as e:
+            logger.debug(f"Layered cache metrics unavailable: {e}")
+
+    @staticmethod
+    def _observe_load(ns: str, status: str, duration: float) -> None:
+        try:
+            from AICrews.infrastructure.metrics import get_cache_metrics
+
+            get_cache_metrics().observe_load(ns, status, duration)
+        except Exception as e:
+            logger.debug(f"Layered cache metrics unavailable: {e}")
+
+    @staticmethod
+    def _record_eviction(count: int) -> None:
+        try:
+            from AICrews.infrastructure.metrics import get_cache_metrics
+
+            get_cache_metrics().record_eviction("layered_l1", count)
+        except Exception as e:
+            logger.debug(f"Layered cache metrics unavailable: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = len(self._memory), self._bytes
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "inflight": len(self._inflight),
+            "tagged": self._bus.tags.size(self.BUS_NAMESPACE) if self._bus is not None else 0,
+            "namespaces": {ns: dict(counters) for ns, counters in self._stats.items()},
+        }
+
+
+_layered_cache: Optional[LayeredCacheManager] = None
+_layered_cache_lock = threading.Lock()
+
+
+def get_layered_cache() -> LayeredCacheManager:
+    """Process-wide LayeredCacheManager backed by the shared RedisManager."""
+    global _layered_cache
+    if _layered_cache is None:
+        with _layered_cache_lock:
+            if _layered_cache is None:
+                from AICrews.infrastructure.cache.invalidation_bus import get_invalidation_bus
+                from AICrews.infrastructure.cache.redis_manager import get_redis_manager
+
+                _layered_cache = LayeredCacheManager(
+                    redis_manager=get_redis_manager(), bus=get_invalidation_bus()
+                )
+    return _layered_cache
@@ -0,0 +1,250 @@
+"""
+Redis Codec - Redis 值的序列化与压缩
+
+RedisManager 的 JSON 读写（set / get_json / mset_json / mget_json 及同步版本）
+统一经过这里编码与解码：
+- 序列化：json（标准库，默认）、orjson、msgpack
+- 压缩：超过阈值（FAIC_REDIS_COMPRESS_MIN_BYTES）的负载用 zstd 或 lz4 压缩，
+  压缩后没有变小时保留原文
+- 格式前缀：非纯 JSON 的负载以一个前缀字节开头，
+  ``0x80 | (serializer << 4) | compression``（0x80-0xBF）；
+  JSON 文本不会以该范围的字节开头，因此无前缀的旧值仍按 JSON 读取
+
+未压缩的 json / orjson 负载不加前缀，旧版本进程也能读取；msgpack 与压缩负载
+只有升级后的进程能读取（旧进程视为缓存未命中），所有进程升级后再开启。
+
+环境变量:
+- FAIC_REDIS_CODEC: json | orjson | msgpack（默认 json；依赖未安装时回退 json）
+- FAIC_REDIS_COMPRESSION: none | zstd | lz4（默认 none；依赖未安装时不压缩）
+- FAIC_REDIS_COMPRESS_MIN_BYTES: 压缩阈值（默认 4096）
+"""
+
+import json
+import os
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from AICrews.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - optional dependency
+    lz4_frame = None
+
+
+SERIALIZERS = {"json": 0, "orjson": 1, "msgpack": 2}
+COMPRESSIONS = {"none": 0, "zstd": 1, "lz4": 2}
+
+_HEADER_FLAG = 0x80
+_HEADER_MASK = 0xC0
+
+
+def _header(serializer: str, compression: str) -> bytes:
+    return bytes([_HEADER_FLAG | (SERIALIZERS[serializer] << 4) | COMPRESSIONS[compression]])
+
+
+def _parse_header(byte: int) -> Tuple[str, str]:
+    serializer = next((k for k, v in SERIALIZERS.items() if v == (byte >> 4) & 0x3), None)
+    compression = next((k for k, v in COMPRESSIONS.items() if v == byte & 0xF), None)
+    if serializer is None or compression is None:
+        raise ValueError(f"Unknown Redis payload format byte: {byte:#x}")
+    return serializer, compression
+
+
+def _msgpack_default(value: Any) -> Any:
+    # 与 json.dumps(default=str) 的行为保持一致
+    return str(value)
+
+
+class RedisCodec:
+    """Redis 负载编码器（线程安全，无状态）"""
+
+    def __init__(
+        self,
+        serializer: str = "json",
+        compression: str = "none",
+        compress_min_bytes: int = 4096,
+    ):
+        serializer = (serializer or "json").lower()
+        compression = (compression or "none").lower()
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Unsupported Redis codec: {serializer}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported Redis compression: {compression}")
+
+        if serializer == "orjson" and orjson is None:
+            logger.warning("FAIC_REDIS_CODEC=orjson but orjson is not installed; using json")
+            serializer = "json"
+        if serializer == "msgpack" and msgpack is None:
+            logger.warning("FAIC_REDIS_CODEC=msgpack but msgpack is not installed; using json")
+            serializer = "json"
+        if compression == "zstd" and zstandard is None:
+            logger.warning("FAIC_REDIS_COMPRESSION=zstd but zstandard is not installed; disabled")
+            compression = "none"
+        if compression == "lz4" and lz4_frame is None:
+            logger.warning("FAIC_REDIS_COMPRESSION=lz4 but lz4 is not installed; disabled")
+            compression = "none"
+
+        self.serializer = serializer
+        self.compression = compression
+        self.compress_min_bytes = max(0, int(compress_min_bytes))
+
+    @classmethod
+    def from_env(cls) -> "RedisCodec":
+        return cls(
+            serializer=os.getenv("FAIC_REDIS_CODEC", "json"),
+            compression=os.getenv("FAIC_REDIS_COMPRESSION", "none"),
+            compress_min_bytes=int(os.getenv("FAIC_REDIS_COMPRESS_MIN_BYTES", "4096")),
+        )
+
+    # =========================================================================
+    # 编码
+    # =========================================================================
+
+    def dumps(self, value: Any) -> bytes:
+        return self.dumps_sized(value)[0]
+
+    def dumps_sized(self, value: Any) -> Tuple[bytes, int]:
+        """编码并返回 (负载, 压缩前的序列化长度)；后者用于估算解码后的内存占用"""
+        data = _SERIALIZE[self.serializer](value)
+        if self.compression != "none" and len(data) >= self.compress_min_bytes:
+            compressed = _COMPRESS[self.compression](data)
+            if len(compressed) < len(data):
+                return _header(self.serializer, self.compression) + compressed, len(data)
+        if self.serializer == "msgpack":
+            return _header(self.serializer, "none") + data, len(data)
+        return data, len(data)
+
+    # =========================================================================
+    # 解码
+    # =========================================================================
+
+    @staticmethod
+    def loads(payload: Union[str, bytes, bytearray, None]) -> Any:
+        """解码任意格式的负载（带前缀或旧的纯 JSON）
+
+        Raises:
+            ValueError: 负载无法解码（格式未知、依赖缺失或数据损坏）
+        """
+        if payload is None:
+            return None
+        if isinstance(payload, str):
+            return json.loads(payload)
+        if not payload:
+            raise ValueError("Empty Redis payload")
+        if payload[0] & _HEADER_MASK != _HEADER_FLAG:
+            return _plain_json_loads(payload)
+
+        serializer, compression = _parse_header(payload[0])
+        data = bytes(payload[1:])
+        try:
+            if compression != "none":
+                data = _DECOMPRESS[compression](data)
+            return _DESERIALIZE[serializer](data)
+        except ValueError:
+            raise
+        except Exception as e:
+            # 依赖缺失（AttributeError）或压缩数据损坏
+            raise ValueError(f"Cannot decode {serializer}/{compression} payload: {e}") from e
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "serializer": self.serializer,
+            "compression": self.compression,
+            "compress_min_bytes": self.compress_min_bytes,
+        }
+
+
+# =========================================================================
+# 格式实现
+# =========================================================================
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=str).encode("utf-8")
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(
+        value,
+        default=str,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+def _plain_json_loads(data: Union[bytes, bytearray]) -> Any:
+    """无前缀 JSON：优先 orjson；标准库写入的 NaN/Infinity 被 orjson 拒绝时回退标准库"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    try:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    except (msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as e:
+        raise ValueError(f"Invalid msgpack payload: {e}") from e
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+_SERIALIZE: Dict[str, Callable[[Any], bytes]] = {
+    "json": _json_dumps,
+    "orjson": _orjson_dumps,
+    "msgpack": _msgpack_dumps,
+}
+
+_DESERIALIZE: Dict[str, Callable[[bytes], Any]] = {
+    "json": json.loads,
+    "orjson": lambda data: orjson.loads(data),
+    "msgpack": _msgpack_loads,
+}
+
+_COMPRESS: Dict[str, Callable[[bytes], bytes]] = {
+    "zstd": _zstd_compress,
+    "lz4": lambda data: lz4_frame.compress(data),
+}
+
+_DECOMPRESS: Dict[str, Callable[[bytes], bytes]] = {
+    "zstd": _zstd_decompress,
+    "lz4": lambda data: lz4_frame.decompress(data),
+}
+
+
+_codec: Optional[RedisCodec] = None
+
+
+def get_redis_codec() -> RedisCodec:
+    """获取按环境变量配置的编码器单例"""
+    global _codec
+    if _codec is None:
+        _codec = RedisCodec.from_env()
+    return _codec
@@ -3,21 +3,84 @@ Redis 缓存管理器
 
 提供统一的 Redis 连接和缓存操作接口，支持：
 - 键值存储（带 TTL）
+- 批量操作（mset_json / mget_json / pipeline，单次往返）
 - 发布/订阅（用于实时推送）
 - 连接池管理
+
+JSON 值的编码由 RedisCodec 负责（json / orjson / msgpack，可选 zstd / lz4 压缩，
+见 redis_codec）。读取 JSON 值使用不解码响应的二进制客户端，
+因此带格式前缀的负载与旧的纯 JSON 值都能读取。
+
+批量操作与 INCR+EXPIRE 脚本记录往返延迟、每次往返的命令数与负载字节数
+（redis_round_trip_duration_seconds / redis_commands_per_round_trip / redis_payload_bytes）。
 """
 
 import json
+import time
 from AICrews.observability.logging import get_logger
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Dict, Iterator, List, Mapping, AsyncIterator
 from datetime import datetime
 import redis.asyncio as redis
 import redis as sync_redis
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
+
+from AICrews.infrastructure.cache.redis_codec import RedisCodec, get_redis_codec
 
 logger = get_logger(__name__)
 
 
+# INCRBY 并在 key 没有过期时间时设置 TTL（单次往返、原子）。
+# 只在无 TTL 时设置：计数窗口不会被后续递增续期，也不会因 EXPIRE 丢失而永久存在。
+INCR_EXPIRE_LUA = """
+local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+local ttl = tonumber(ARGV[2])
+if ttl > 0 and redis.call('TTL', KEYS[1]) < 0 then
+    redis.call('EXPIRE', KEYS[1], ttl)
+end
+return value
+"""
+
+
+def _payload_size(values: Any) -> int:
+    return sum(len(v) for v in values if isinstance(v, (str, bytes)))
+
+
+def _observe_round_trip(
+    op: str,
+    status: str,
+    start: float,
+    commands: int = 1,
+    bytes_out: int = 0,
+    bytes_in: int = 0,
+) -> None:
+    try:
+        from AICrews.infrastructure.metrics import get_redis_metrics
+
+        get_redis_metrics().observe_round_trip(
+            op, status, time.perf_counter() - start, commands, bytes_out, bytes_in
+        )
+    except Exception:
+        pass
+
+
+class RedisBatch:
+    """pipeline() / pipeline_sync() 产出的批次：排队命令，退出上下文时一次发送
+
+    命令方法直接转发到底层 redis-py pipeline；执行结果在退出上下文后通过
+    results 读取（顺序与排队顺序一致）。
+    """
+
+    def __init__(self, pipe: Any):
+        self._pipe = pipe
+        self.results: List[Any] = []
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pipe, name)
+
+    def __len__(self) -> int:
+        return len(self._pipe.command_stack)
+
+
 class RedisManager:
     """Redis 连接和缓存管理器"""
     
@@ -25,17 +88,32 @@ class RedisManager:
     _pool: Optional[redis.ConnectionPool] = None
     _client: Optional[redis.Redis] = None
     _sync_client: Optional[sync_redis.Redis] = None
+    # 不解码响应的客户端，用于读取可能带二进制格式前缀的 JSON 值
+    _raw_pool: Optional[redis.ConnectionPool] = None
+    _raw_client: Optional[redis.Redis] = None
+    _raw_sync_client: Optional[sync_redis.Redis] = None
+    _codec: Optional[RedisCodec] = None
     
     # Key 前缀设计
     PRICE_PREFIX = "price:"           # 单个资产价格
     PORTFOLIO_PREFIX = "portfolio:"   # 用户组合
     COCKPIT_PREFIX = "cockpit:"       # Cockpit 数据
     SUBSCRIPTION_PREFIX = "sub:"      # 订阅状态
+    INDICATOR_PREFIX = "ind:"         # 增量指标状态
     
     # TTL 配置（秒）
     PRICE_TTL = 400                   # 价格数据 400秒（需 >= 同步间隔 300s + 缓冲）
     PORTFOLIO_TTL = 60                # 组合数据 60秒
     COCKPIT_TTL = 60                  # Cockpit 数据 60秒
+    INDICATOR_TTL = 7 * 24 * 3600     # 增量指标状态 7 天（长于节假日停牌）
+
+    # SCAN 每批键数（keys_sync / delete_pattern）
+    SCAN_COUNT = 500
+    # 单条 MGET 的最大键数（更多的键拆成多条 MGET，仍在同一个 pipeline 中发送）
+    MGET_CHUNK = 500
+
+    _incr_script: Any = None
+    _incr_script_sync: Any = None
     
     def __new__(cls) -> 'RedisManager':
         if cls._instance is None:
@@ -82,10 +160,34 @@ class RedisManager:
                 password=password,
                 decode_responses=True
             )
+
+            # 二进制客户端（连接按需建立）
+            self._raw_pool = redis.ConnectionPool(
+                host=host,
+                port=port,
+                db=db,
+                password=password,
+                max_connections=max_connections,
+                decode_responses=False
+            )
+            self._raw_client = redis.Redis(connection_pool=self._raw_pool)
+            self._raw_sync_client = sync_redis.Redis(
+                host=host,
+                port=port,
+                db=db,
+                password=password,
+                decode_responses=False
+            )
+
+            # Lua 脚本（EVALSHA，脚本缓存丢失时自动回退 EVAL）
+            self._incr_script = self._client.register_script(INCR_EXPIRE_LUA)
+            self._incr_script_sync = self._sync_client.register_script(INCR_EXPIRE_LUA)
             
             # 测试连接
             await self._client.ping()
-            logger.info(f"Redis connected successfully: {host}:{port}")
+            logger.info(
+                f"Redis connected successfully: {host}:{port} (codec={self.codec.describe()})"
+            )
             
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
@@ -118,18 +220,51 @@ class RedisManager:
                 else:
                     raise
 
-        # Close sync client (no async issues)
-        if self._sync_client:
+        if self._raw_client:
             try:
-                self._sync_client.close()
-            except Exception as e:
-                logger.debug(f"Redis sync client close error (ignored): {e}")
+                await self._raw_client.close()
+                await self._raw_pool.disconnect()
+            except RuntimeError as e:
+                logger.debug(f"Redis raw client close skipped: {e}")
+
+        # Close sync client (no async issues)
+        for client in (self._sync_client, self._raw_sync_client):
+            if client:
+                try:
+                    client.close()
+                except Exception as e:
+                    logger.debug(f"Redis sync client close error (ignored): {e}")
 
         self._client = None
         self._sync_client = None
         self._pool = None
+        self._raw_client = None
+        self._raw_sync_client = None
+        self._raw_pool = None
+        self._incr_script = None
+        self._incr_script_sync = None
         logger.info("Redis connection closed")
     
+    # ==================== 编码 ====================
+
+    @property
+    def codec(self) -> RedisCodec:
+        if self._codec is None:
+            self._codec = get_redis_codec()
+        return self._codec
+
+    def encode_json(self, value: Any) -> bytes:
+        """按配置的编码器序列化（供自行组装 pipeline 的调用方使用）"""
+        return self.codec.dumps(value)
+
+    def decode_json(self, payload: Any) -> Any:
+        """解码任意格式的负载
+
+        Raises:
+            ValueError: 负载无法解码
+        """
+        return self.codec.loads(payload)
+
     # ==================== 基础操作 ====================
     
     def set_sync(self, key: str, value: Any, ttl: int = 60, json_encode: bool = True) -> bool:
@@ -138,7 +273,7 @@ class RedisManager:
             return False
         try:
             if json_encode:
-                value = json.dumps(value, default=str)
+                value = self.codec.dumps(value)
             self._sync_client.set(key, value, ex=ttl)
             return True
         except Exception as e:
@@ -149,44 +284,53 @@ class RedisManager:
         """同步版本的 incr，用于 rate limiting / 线程环境。
 
         - 返回当前计数；失败时返回 0
-        - 仅在第一次递增时设置 TTL（避免每次续期）
+        - 仅在 key 尚无 TTL 时设置（避免每次续期），INCR 与 EXPIRE 由 Lua 脚本原子完成
         """
         if not self._sync_client:
             return 0
+        start = time.perf_counter()
         try:
-            value = int(self._sync_client.incr(key, int(amount)))
-            if ttl and value == int(amount):
-                try:
-                    self._sync_client.expire(key, int(ttl))
-                except Exception:
-                    logger.debug("Redis expire failed for key=%s", key, exc_info=True)
+            value = int(self._incr_script_sync(keys=[key], args=[int(amount), int(ttl or 0)]))
+            _observe_round_trip("incr", "ok", start)
             return value
         except Exception as e:
+            _observe_round_trip("incr", "error", start)
             logger.error(f"Redis incr_sync error: {e}")
             return 0
 
     def get_json_sync(self, key: str) -> Optional[Dict[str, Any]]:
         """同步版本的 get_json"""
-        if not self._sync_client:
+        client = self._raw_sync_client or self._sync_client
+        if not client:
             return None
         try:
-            value = self._sync_client.get(key)
+            value = client.get(key)
             if value:
-                return json.loads(value)
+                return self.codec.loads(value)
         except Exception as e:
             logger.error(f"Redis get_json_sync error: {e}")
         return None
 
     def keys_sync(self, pattern: str) -> List[str]:
-        """同步版本的 keys，用于非 asyncio 线程"""
+        """同步版本的 keys，用于非 asyncio 线程（SCAN 迭代，不阻塞 Redis）"""
         if not self._sync_client:
             return []
         try:
-            return self._sync_client.keys(pattern)
+            return list(self._sync_client.scan_iter(match=pattern, count=self.SCAN_COUNT))
         except Exception as e:
             logger.error(f"Redis keys_sync error: {e}")
             return []
 
+    async def scan_keys(self, pattern: str) -> List[str]:
+        """SCAN 迭代匹配的键（替代阻塞式 KEYS）"""
+        if not self._client:
+            return []
+        try:
+            return [key async for key in self._client.scan_iter(match=pattern, count=self.SCAN_COUNT)]
+        except Exception as e:
+            logger.error(f"Redis scan_keys error: {e}")
+            return []
+
     async def get(self, key: str) -> Optional[str]:
         """获取值"""
         if not self._client:
@@ -198,12 +342,19 @@ class RedisManager:
             return None
     
     async def get_json(self, key: str) -> Optional[Dict[str, Any]]:
-        """获取 JSON 格式的值"""
-        value = await self.get(key)
+        """获取 JSON 格式的值（任意编码格式）"""
+        client = self._raw_client or self._client
+        if not client:
+            return None
+        try:
+            value = await client.get(key)
+        except Exception as e:
+            logger.error(f"Redis get error: {e}")
+            return None
         if value:
             try:
-                return json.loads(value)
-            except json.JSONDecodeError as e:
+                return self.codec.loads(value)
+            except ValueError as e:
                 logger.error(f"JSON decode error for key {key}: {e}")
         return None
     
@@ -222,7 +373,7 @@ class RedisManager:
             return False
         try:
             if json_encode:
-                value = json.dumps(value, default=str)
+                value = self.codec.dumps(value)
             await self._client.set(key, value, ex=ttl)
             return True
         except RuntimeError as e:
@@ -236,6 +387,26 @@ class RedisManager:
             logger.error(f"Redis set error: {e}")
             return False
 
+    async def claim_keys(self, keys: List[str], ttl: int = 60) -> List[str]:
+        """批量 SET NX（单次 pipeline），返回本次成功占用的 key
+
+        用于跨 worker 去重：同一 key 在 TTL 内只会被一个调用方占用。
+        Redis 不可用时返回全部 key（由调用方的进程内状态兜底去重）。
+        """
+        if not keys:
+            return []
+        if not self._client:
+            return list(keys)
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for key in keys:
+                pipe.set(key, "1", ex=ttl, nx=True)
+            results = await pipe.execute()
+            return [key for key, ok in zip(keys, results) if ok]
+        except Exception as e:
+            logger.error(f"Redis claim keys error: {e}")
+            return list(keys)
+
     async def incr(self, key: str, amount: int = 1, ttl: int = 60) -> int:
         """INCR key with TTL (best-effort), returns new value; returns 0 if Redis unavailable.
 
@@ -243,10 +414,10 @@ class RedisManager:
         """
         if not self._client:
             return 0
+        start = time.perf_counter()
         try:
-            val = await self._client.incr(key, amount)
-            if val == amount:
-                await self._client.expire(key, ttl)
+            val = await self._incr_script(keys=[key], args=[int(amount), int(ttl or 0)])
+            _observe_round_trip("incr", "ok", start)
             return int(val)
         except RuntimeError as e:
             # Handle "Event loop is closed" error during shutdown
@@ -271,18 +442,259 @@ class RedisManager:
             return False
     
     async def delete_pattern(self, pattern: str) -> int:
-        """批量删除匹配模式的键"""
+        """批量删除匹配模式的键（SCAN 分批删除，不阻塞 Redis）"""
         if not self._client:
             return 0
+        deleted = 0
+        batch: List[str] = []
         try:
-            keys = await self._client.keys(pattern)
-            if keys:
-                return await self._client.delete(*keys)
-            return 0
+            async for key in self._client.scan_iter(match=pattern, count=self.SCAN_COUNT):
+                batch.append(key)
+                if len(batch) >= self.SCAN_COUNT:
+                    deleted += await self._client.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += await self._client.delete(*batch)
+            return deleted
         except Exception as e:
             logger.error(f"Redis delete_pattern error: {e}")
-            return 0
+            return deleted
     
+    async def delete_many(self, keys: List[str]) -> int:
+        """批量删除键（单条 DEL）"""
+        if not self._client or not keys:
+            return 0
+        try:
+            return await self._client.delete(*keys)
+        except Exception as e:
+            logger.error(f"Redis delete_many error: {e}")
+            return 0
+
+    # ==================== 批量操作 ====================
+
+    def _queue_mset(
+        self,
+        pipe: Any,
+        items: Mapping[str, Any],
+        ttl: int,
+        ttls: Optional[Mapping[str, int]],
+    ) -> int:
+        size = 0
+        for key, value in items.items():
+            payload = self.codec.dumps(value)
+            size += len(payload)
+            key_ttl = ttls.get(key, ttl) if ttls else ttl
+            pipe.set(key, payload, ex=int(key_ttl) if key_ttl else None)
+        return size
+
+    def _queue_mget(self, pipe: Any, keys: List[str]) -> None:
+        for i in range(0, len(keys), self.MGET_CHUNK):
+            pipe.mget(keys[i:i + self.MGET_CHUNK])
+
+    def _decode_mget(self, keys: List[str], chunks: List[Any]) -> Dict[str, Optional[Any]]:
+        values = [value for chunk in chunks for value in (chunk or [])]
+        result: Dict[str, Optional[Any]] = {}
+        for key, value in zip(keys, values):
+            if value is None:
+                result[key] = None
+                continue
+            try:
+                result[key] = self.codec.loads(value)
+            except (TypeError, ValueError):
+                logger.error(f"JSON decode error for key {key}")
+                result[key] = None
+        return result
+
+    async def mset_json(
+        self,
+        items: Mapping[str, Any],
+        ttl: int = 60,
+        ttls: Optional[Mapping[str, int]] = None,
+    ) -> int:
+        """批量写入 JSON 值（单次 pipeline 往返）
+
+        Args:
+            items: key -> 可 JSON 序列化的值
+            ttl: 默认 TTL（秒），0 表示不过期
+            ttls: 按 key 覆盖的 TTL
+
+        Returns:
+            写入的 key 数量（失败时为 0）
+        """
+        if not self._client or not items:
+            return 0
+        start = time.perf_counter()
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            size = self._queue_mset(pipe, items, ttl, ttls)
+            await pipe.execute()
+            _observe_round_trip("mset_json", "ok", start, len(items), bytes_out=size)
+            return len(items)
+        except Exception as e:
+            _observe_round_trip("mset_json", "error", start, len(items))
+            logger.error(f"Redis mset_json error: {e}")
+            return 0
+
+    def mset_json_sync(
+        self,
+        items: Mapping[str, Any],
+        ttl: int = 60,
+        ttls: Optional[Mapping[str, int]] = None,
+    ) -> int:
+        """同步版本的 mset_json"""
+        if not self._sync_client or not items:
+            return 0
+        start = time.perf_counter()
+        try:
+            pipe = self._sync_client.pipeline(transaction=False)
+            size = self._queue_mset(pipe, items, ttl, ttls)
+            pipe.execute()
+            _observe_round_trip("mset_json", "ok", start, len(items), bytes_out=size)
+            return len(items)
+        except Exception as e:
+            _observe_round_trip("mset_json", "error", start, len(items))
+            logger.error(f"Redis mset_json_sync error: {e}")
+            return 0
+
+    async def mget_json(self, keys: List[str]) -> Dict[str, Optional[Any]]:
+        """批量读取 JSON 值（单次往返），缺失或无法解析的 key 为 None"""
+        keys = list(keys)
+        client = self._raw_client or self._client
+        if not client or not keys:
+            return {key: None for key in keys}
+        start = time.perf_counter()
+        try:
+            pipe = client.pipeline(transaction=False)
+            self._queue_mget(pipe, keys)
+            chunks = await pipe.execute()
+            _observe_round_trip(
+                "mget_json", "ok", start, len(chunks),
+                bytes_in=sum(_payload_size(chunk or ()) for chunk in chunks),
+            )
+            return self._decode_mget(keys, chunks)
+        except Exception as e:
+            _observe_round_trip("mget_json", "error", start)
+            logger.error(f"Redis mget_json error: {e}")
+            return {key: None for key in keys}
+
+    def mget_json_sync(self, keys: List[str]) -> Dict[str, Optional[Any]]:
+        """同步版本的 mget_json"""
+        keys = list(keys)
+        client = self._raw_sync_client or self._sync_client
+        if not client or not keys:
+            return {key: None for key in keys}
+        start = time.perf_counter()
+        try:
+            pipe = client.pipeline(transaction=False)
+            self._queue_mget(pipe, keys)
+            chunks = pipe.execute()
+            _observe_round_trip(
+                "mget_json", "ok", start, len(chunks),
+                bytes_in=sum(_payload_size(chunk or ()) for chunk in chunks),
+            )
+            return self._decode_mget(keys, chunks)
+        except Exception as e:
+            _observe_round_trip("mget_json", "error", start)
+            logger.error(f"Redis mget_json_sync error: {e}")
+            return {key: None for key in keys}
+
+    @asynccontextmanager
+    async def pipeline(
+        self, transaction: bool = False, op: str = "pipeline"
+    ) -> AsyncIterator[RedisBatch]:
+        """批量发送任意命令（退出上下文时单次往返执行）
+
+        用法:
+            async with redis_manager.pipeline(op="chart_warmup") as batch:
+                batch.get("a")
+                batch.incr("b")
+            a, b = batch.results
+
+        上下文内抛出异常时不发送任何命令；执行失败时异常向上抛出。
+        op 作为指标标签，应为低基数的调用点名称。
+
+        Raises:
+            RuntimeError: Redis 未初始化
+        """
+        if not self._client:
+            raise RuntimeError("Redis is not initialized")
+        batch = RedisBatch(self._client.pipeline(transaction=transaction))
+        yield batch
+        commands = len(batch)
+        if not commands:
+            return
+        start = time.perf_counter()
+        try:
+            batch.results = await batch._pipe.execute()
+        except Exception:
+            _observe_round_trip(op, "error", start, commands)
+            raise
+        _observe_round_trip(op, "ok", start, commands, bytes_in=_payload_size(batch.results))
+
+    @contextmanager
+    def pipeline_sync(self, transaction: bool = False, op: str = "pipeline") -> Iterator[RedisBatch]:
+        """同步版本的 pipeline，用于非 asyncio 线程"""
+        if not self._sync_client:
+            raise RuntimeError("Redis is not initialized")
+        batch = RedisBatch(self._sync_client.pipeline(transaction=transaction))
+        yield batch
+        commands = len(batch)
+        if not commands:
+            return
+        start = time.perf_counter()
+        try:
+            batch.results = batch._pipe.execute()
+        except Exception:
+            _observe_round_trip(op, "error", start, commands)
+            raise
+        _observe_round_trip(op, "ok", start, commands, bytes_in=_payload_size(batch.results))
+
+    # ==================== 标签集合（缓存按标签失效） ====================
+
+    async def add_to_sets(self, set_keys: List[str], member: str, ttl: int) -> None:
+        """把 member 加入多个集合并续期（单次 pipeline）"""
+        if not self._client or not set_keys:
+            return
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for set_key in set_keys:
+                pipe.sadd(set_key, member)
+                pipe.expire(set_key, ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Redis add_to_sets error: {e}")
+
+    def add_to_sets_sync(self, set_keys: List[str], member: str, ttl: int) -> None:
+        """同步版本的 add_to_sets"""
+        if not self._sync_client or not set_keys:
+            return
+        try:
+            pipe = self._sync_client.pipeline(transaction=False)
+            for set_key in set_keys:
+                pipe.sadd(set_key, member)
+                pipe.expire(set_key, ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Redis add_to_sets_sync error: {e}")
+
+    async def pop_sets(self, set_keys: List[str]) -> List[str]:
+        """读取并删除多个集合，返回成员并集"""
+        if not self._client or not set_keys:
+            return []
+        try:
+            pipe = self._client.pipeline(transaction=True)
+            for set_key in set_keys:
+                pipe.smembers(set_key)
+            pipe.delete(*set_keys)
+            results = await pipe.execute()
+            members = set()
+            for result in results[:-1]:
+                members.update(result or ())
+            return sorted(members)
+        except Exception as e:
+            logger.error(f"Redis pop_sets error: {e}")
+            return []
+
     async def exists(self, key: str) -> bool:
         """检查键是否存在"""
         if not self._client:
@@ -317,25 +729,52 @@ class RedisManager:
             ttl=ttl
         )
     
+    async def set_prices_batch(
+        self, prices: Dict[str, Dict[str, Any]], ttl: int = None
+    ) -> int:
+        """批量设置资产价格（单次 pipeline 往返）
+
+        Returns:
+            写入的 key 数量
+        """
+        if not self._client or not prices:
+            return 0
+
+        if ttl is None:
+            ttl = self.PRICE_TTL
+
+        cached_at = datetime.now().isoformat()
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for ticker, data in prices.items():
+                data["cached_at"] = cached_at
+                pipe.set(self._price_key(ticker), self.codec.dumps(data), ex=ttl)
+            await pipe.execute()
+            return len(prices)
+        except Exception as e:
+            logger.error(f"Redis batch set prices error: {e}")
+            return 0
+
     async def delete_price(self, ticker: str) -> bool:
         """删除价格缓存"""
         return await self.delete(self._price_key(ticker))
     
     async def get_multiple_prices(self, tickers: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
         """批量获取多个资产价格"""
-        if not self._client:
+        client = self._raw_client or self._client
+        if not client:
             return {t: None for t in tickers}
         
         try:
             keys = [self._price_key(t) for t in tickers]
-            values = await self._client.mget(keys)
+            values = await client.mget(keys)
             
             result = {}
             for ticker, value in zip(tickers, values):
                 if value:
                     try:
-                        result[ticker] = json.loads(value)
-                    except json.JSONDecodeError:
+                        result[ticker] = self.codec.loads(value)
+                    except ValueError:
                         result[ticker] = None
                 else:
                     result[ticker] = None
@@ -346,6 +785,54 @@ class RedisManager:
             logger.error(f"Redis mget error: {e}")
             return {t: None for t in tickers}
     
+    # ==================== 增量指标状态 ====================
+
+    def _indicator_key(self, ticker: str) -> str:
+        """生成增量指标状态键"""
+        return f"{self.INDICATOR_PREFIX}{ticker}"
+
+    async def get_indicator_states(
+        self, tickers: List[str]
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """批量读取增量指标状态（单次 MGET）"""
+        client = self._raw_client or self._client
+        if not client or not tickers:
+            return {t: None for t in tickers}
+
+        try:
+            values = await client.mget([self._indicator_key(t) for t in tickers])
+        except Exception as e:
+            logger.error(f"Redis mget indicator states error: {e}")
+            return {t: None for t in tickers}
+
+        result = {}
+        for ticker, value in zip(tickers, values):
+            try:
+                result[ticker] = self.codec.loads(value) if value else None
+            except ValueError:
+                result[ticker] = None
+        return result
+
+    async def set_indicator_states(
+        self, states: Dict[str, Dict[str, Any]], ttl: int = None
+    ) -> int:
+        """批量写入增量指标状态（单次 pipeline 往返）"""
+        if not self._client or not states:
+            return 0
+
+        if ttl is None:
+            ttl = self.INDICATOR_TTL
+
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for ticker, state in states.items():
+                pipe.set(self._indicator_key(ticker), self.codec.dumps(state), ex=ttl)
+            await pipe.execute()
+            return len(states)
+        except Exception as e:
+            logger.error(f"Redis batch set indicator states error: {e}")
+            return 0
+
     # ==================== 组合缓存操作 ====================
     
     def _portfolio_key(self, user_id: int) -> str:
@@ -419,6 +906,16 @@ class RedisManager:
             logger.error(f"Redis publish error: {e}")
             return 0
     
+    def publish_sync(self, channel: str, message: Dict[str, Any]) -> int:
+        """同步版本的 publish，用于非 asyncio 线程"""
+        if not self._sync_client:
+            return 0
+        try:
+            return self._sync_client.publish(channel, json.dumps(message, default=str))
+        except Exception as e:
+            logger.error(f"Redis publish_sync error: {e}")
+            return 0
+
     def publish_channel(self, ticker: str) -> str:
         """生成价格更新频道名"""
         return f"{self.PRICE_PREFIX}{ticker}"
@@ -503,6 +1000,7 @@ class RedisManager:
             info = await self._client.info("memory")
             return {
                 "status": "connected",
+                "codec": self.codec.describe(),
                 "used_memory": info.get("used_memory_human", "N/A"),
                 "connected_clients": await self._client.info("clients"),
                 "uptime_seconds": await self._client.info("uptime_in_seconds"),
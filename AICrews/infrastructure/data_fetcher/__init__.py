@@ -12,6 +12,7 @@ from .yfinance_fetcher import (
     get_yfinance_cooldown_remaining,
 )
 from .akshare_fetcher import AkShareFetcher, get_akshare_fetcher
+from .ohlcv_store import OHLCVStore, get_ohlcv_store
 
 __all__ = [
     "SDKFetcherBase",
@@ -25,4 +26,6 @@ __all__ = [
     "get_yfinance_cooldown_remaining",
     "AkShareFetcher",
     "get_akshare_fetcher",
+    "OHLCVStore",
+    "get_ohlcv_store",
 ]
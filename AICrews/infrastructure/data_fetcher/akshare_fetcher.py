@@ -2,10 +2,17 @@
 AkShare Fetcher - A股、港股数据获取
 
 直接使用 akshare 库，不经过 MCP HTTP API
+
+实时行情通过进程级快照缓存 (SpotSnapshotCache) 获取：
+每个刷新周期只下载一次全市场行情表，按代码建立索引后供所有价格查询、
+报价和资产搜索共享，查询为 O(1) 字典查找而非逐行扫描。
 """
 
 import asyncio
-from typing import Any, Dict, List, Optional
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from AICrews.observability.logging import get_logger
 from .sdk_fetcher import SDKFetcherBase
@@ -13,6 +20,164 @@ from .sdk_fetcher import SDKFetcherBase
 logger = get_logger(__name__)
 
 
+SPOT_MARKET_CN = "CN"
+SPOT_MARKET_HK = "HK"
+
+# 快照刷新周期（秒），可通过环境变量覆盖
+_DEFAULT_SPOT_TTL_SECONDS = float(os.getenv("FAIC_AKSHARE_SPOT_TTL_SECONDS", "30"))
+# 上游失败后的重试间隔，避免每个调用方都去重试全表下载
+_SPOT_FAILURE_RETRY_SECONDS = 10.0
+
+
+def normalize_hk_code(code: str) -> str:
+    """将港股代码规范为 5 位数字 (0700.HK / 700 -> 00700)"""
+    return str(code).strip().upper().replace(".HK", "").zfill(5)
+
+
+class SpotSnapshotCache:
+    """A股/港股 实时行情快照缓存（进程级共享）
+
+    - 每个市场每个刷新周期只调用一次上游全表接口
+    - 快照按代码索引为 dict，单票查询 O(1)
+    - 刷新使用线程锁做 single-flight，并发的过期读取只触发一次下载
+    - 上游失败时继续返回上一份快照（若有）
+    """
+
+    def __init__(self, ttl_seconds: float = _DEFAULT_SPOT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        # market -> (fetched_at, {code: row})
+        self._snapshots: Dict[str, Tuple[float, Dict[str, Dict[str, Any]]]] = {}
+        self._refresh_locks: Dict[str, threading.Lock] = {
+            SPOT_MARKET_CN: threading.Lock(),
+            SPOT_MARKET_HK: threading.Lock(),
+        }
+        self._upstream_calls = 0
+
+    def _is_fresh(self, market: str) -> bool:
+        entry = self._snapshots.get(market)
+        return entry is not None and (time.monotonic() - entry[0]) < self.ttl_seconds
+
+    def _current(self, market: str) -> Dict[str, Dict[str, Any]]:
+        entry = self._snapshots.get(market)
+        return entry[1] if entry else {}
+
+    async def get_snapshot(self, market: str) -> Dict[str, Dict[str, Any]]:
+        """获取市场快照 {code: row}，过期时刷新
+
+        仅在真正需要访问上游时占用 akshare 限流配额。
+        """
+        if self._is_fresh(market):
+            return self._current(market)
+
+        from AICrews.infrastructure.limits.provider_limiter import get_provider_limiter
+
+        limiter = get_provider_limiter()
+        await limiter.acquire("akshare")
+        try:
+            return await asyncio.to_thread(self.get_snapshot_sync, market)
+        finally:
+            limiter.release("akshare")
+
+    def get_snapshot_sync(self, market: str) -> Dict[str, Dict[str, Any]]:
+        """同步版本（供线程内调用），过期时阻塞刷新"""
+        if self._is_fresh(market):
+            return self._current(market)
+
+        with self._refresh_locks[market]:
+            # double-check: 等锁期间其他线程可能已经刷新
+            if self._is_fresh(market):
+                return self._current(market)
+
+            previous = self._current(market)
+            try:
+                rows = self._load(market)
+            except Exception as e:
+                logger.warning(f"AkShare {market} spot snapshot refresh failed: {e}")
+                # 记录失败时间，使下一次重试推迟 _SPOT_FAILURE_RETRY_SECONDS
+                retry_at = time.monotonic() - self.ttl_seconds + _SPOT_FAILURE_RETRY_SECONDS
+                self._snapshots[market] = (retry_at, previous)
+                return previous
+
+            self._snapshots[market] = (time.monotonic(), rows)
+            return rows
+
+    async def lookup(self, market: str, code: str) -> Optional[Dict[str, Any]]:
+        """按代码查询单行行情"""
+        if market == SPOT_MARKET_HK:
+            code = normalize_hk_code(code)
+        return (await self.get_snapshot(market)).get(code)
+
+    async def lookup_many(
+        self, market: str, codes: Iterable[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """批量按代码查询，只读取一次快照"""
+        snapshot = await self.get_snapshot(market)
+        found: Dict[str, Dict[str, Any]] = {}
+        for code in codes:
+            key = normalize_hk_code(code) if market == SPOT_MARKET_HK else str(code)
+            row = snapshot.get(key)
+            if row is not None:
+                found[code] = row
+        return found
+
+    def invalidate(self, market: Optional[str] = None) -> None:
+        """丢弃快照，下一次读取强制刷新"""
+        if market is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(market, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "upstream_calls": self._upstream_calls,
+            "markets": {
+                market: {"rows": len(rows), "age_seconds": round(now - fetched_at, 1)}
+                for market, (fetched_at, rows) in self._snapshots.items()
+            },
+        }
+
+    def _load(self, market: str) -> Dict[str, Dict[str, Any]]:
+        import akshare as ak
+
+        self._upstream_calls += 1
+        if market == SPOT_MARKET_CN:
+            df = ak.stock_zh_a_spot_em()
+        elif market == SPOT_MARKET_HK:
+            df = ak.stock_hk_spot()
+        else:
+            raise ValueError(f"Unsupported spot market: {market}")
+
+        if df is None or df.empty:
+            return {}
+
+        index: Dict[str, Dict[str, Any]] = {}
+        for row in df.to_dict("records"):
+            if market == SPOT_MARKET_HK:
+                raw_code = row.get("symbol") or row.get("代码") or ""
+                if not raw_code:
+                    continue
+                index[normalize_hk_code(raw_code)] = row
+            else:
+                raw_code = row.get("代码")
+                if raw_code is None:
+                    continue
+                index[str(raw_code)] = row
+        return index
+
+
+_spot_snapshot_cache: Optional[SpotSnapshotCache] = None
+
+
+def get_spot_snapshot_cache() -> SpotSnapshotCache:
+    """获取进程级行情快照缓存单例"""
+    global _spot_snapshot_cache
+    if _spot_snapshot_cache is None:
+        _spot_snapshot_cache = SpotSnapshotCache()
+    return _spot_snapshot_cache
+
+
 class AkShareFetcher(SDKFetcherBase):
     """AkShare 数据获取器
 
@@ -25,13 +190,13 @@ class AkShareFetcher(SDKFetcherBase):
 
         self.ak = ak
         self._limiter = get_provider_limiter()
+        self._spot_cache = get_spot_snapshot_cache()
 
     async def fetch_price(self, ticker: str) -> Optional[Dict[str, Any]]:
         """获取 A股/港股实时价格
 
-        使用 ProviderRateLimiter 控制请求速率。
+        从共享行情快照读取；仅在快照过期需要访问上游时占用限流配额。
         """
-        await self._limiter.acquire("akshare")
         try:
             ticker_upper = ticker.upper()
 
@@ -44,37 +209,25 @@ class AkShareFetcher(SDKFetcherBase):
         except Exception as e:
             logger.error(f"AkShare fetch_price error for {ticker}: {e}")
             return None
-        finally:
-            self._limiter.release("akshare")
+
+    async def fetch_prices_batch(
+        self, tickers: List[str]
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """批量获取 A股/港股价格，每个市场最多读取一次快照"""
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        for ticker in tickers:
+            results[ticker] = await self.fetch_price(ticker)
+        return results
 
     async def _fetch_hk_price(self, ticker: str) -> Optional[Dict[str, Any]]:
         """获取港股价格"""
-        import akshare as ak
-
-        code = ticker.replace(".HK", "").zfill(5)
-
-        def fetch():
-            try:
-                df = ak.stock_hk_spot()
-                if df is not None and not df.empty:
-                    for _, row in df.iterrows():
-                        row_code = str(row.get("symbol", "") or row.get("代码", ""))
-                        if code in row_code or row_code.endswith(code):
-                            return {
-                                "price": row.get("lasttrade") or row.get("最新价"),
-                                "prev_close": row.get("prevclose") or row.get("昨收"),
-                                "name": row.get("name") or row.get("名称", ticker),
-                            }
-            except Exception as e:
-                logger.warning(f"AkShare HK spot failed: {e}")
-            return None
-
-        result = await asyncio.to_thread(fetch)
-        if not result:
+        row = await self._spot_cache.lookup(SPOT_MARKET_HK, ticker)
+        if not row:
             return None
 
-        price = result.get("price")
-        prev_close = result.get("prev_close")
+        price = row.get("lasttrade") or row.get("最新价")
+        prev_close = row.get("prevclose") or row.get("昨收")
+        name = row.get("name") or row.get("名称", ticker)
 
         if price and prev_close:
             try:
@@ -87,7 +240,7 @@ class AkShareFetcher(SDKFetcherBase):
                     "price": price,
                     "change": change,
                     "change_percent": change_pct,
-                    "name": result.get("name"),
+                    "name": name,
                     "currency": "HKD",
                 }
             except (ValueError, TypeError):
@@ -97,22 +250,9 @@ class AkShareFetcher(SDKFetcherBase):
 
     async def _fetch_cn_price(self, ticker: str) -> Optional[Dict[str, Any]]:
         """获取 A股价格"""
-        import akshare as ak
-
         code = ticker.replace(".SS", "").replace(".SZ", "")
 
-        def fetch():
-            try:
-                df = ak.stock_zh_a_spot_em()
-                if df is not None and not df.empty:
-                    for _, row in df.iterrows():
-                        if str(row.get("代码", "")) == code:
-                            return row.to_dict()
-            except Exception as e:
-                logger.warning(f"AkShare CN spot failed: {e}")
-            return None
-
-        row_data = await asyncio.to_thread(fetch)
+        row_data = await self._spot_cache.lookup(SPOT_MARKET_CN, code)
         if not row_data:
             return None
 
@@ -0,0 +1,424 @@
+"""
+OHLCV Store - 历史 K 线读穿缓存 (read-through)
+
+为 MarketDataClient.get_historical_data 提供历史数据：
+1. 内存层：按 (ticker, interval) 缓存已拼装好的 DataFrame（有界 LRU + TTL）
+2. 数据库层：日线从 market_prices (StockPrice) 表读取
+3. Provider 层：只拉取数据库缺失的日期区间（头部缺口 / 中间缺口 / 新增 K 线），
+   拉取结果中已收盘的 K 线回写数据库；provider 确认没有数据的区间（上市前、
+   长假）按 ticker 记录，之后不再重复拉取
+
+所有阻塞操作（yfinance / 同步 DB 会话）都在工作线程中执行，不阻塞事件循环。
+同一 key 的并发加载通过线程锁合并为一次（single-flight），对多个事件循环同样有效。
+
+返回的 DataFrame 列为: date, open, high, low, close, volume
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from AICrews.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+OHLCV_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+
+# yfinance period -> 自然日跨度
+_PERIOD_DAYS = {
+    "1d": 3,
+    "5d": 7,
+    "1mo": 31,
+    "3mo": 92,
+    "6mo": 183,
+    "1y": 366,
+    "2y": 731,
+    "5y": 1827,
+    "10y": 3653,
+}
+
+# 数据库首条记录晚于请求起点、或相邻两条记录间隔超过该值时才视为缺口（覆盖周末/节假日）
+_HEAD_GAP_TOLERANCE = timedelta(days=5)
+
+# market_prices.ticker 列长度
+_DB_TICKER_MAX_LEN = 10
+
+# 只有日线落库；其余周期仅走内存缓存
+_DB_RESOLUTION = "1d"
+
+_MemoryKey = Tuple[str, str]
+
+
+class OHLCVStore:
+    """历史 K 线读穿缓存（进程级共享）"""
+
+    def __init__(
+        self,
+        memory_ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.memory_ttl_seconds = memory_ttl_seconds or float(
+            os.getenv("FAIC_OHLCV_MEMORY_TTL_SECONDS", "300")
+        )
+        self.max_entries = max_entries or int(
+            os.getenv("FAIC_OHLCV_MEMORY_MAX_ENTRIES", "256")
+        )
+        # key -> (fetched_at, covered_from, df)；covered_from=None 表示覆盖全部历史
+        self._memory: "OrderedDict[_MemoryKey, Tuple[float, Optional[pd.Timestamp], pd.DataFrame]]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._key_locks: Dict[_MemoryKey, threading.Lock] = {}
+        # ticker -> 最早一根 K 线（provider 确认此前没有数据，如上市日）
+        self._history_starts: Dict[str, pd.Timestamp] = {}
+        # ticker -> provider 确认无数据的中间缺口（以缺口前一根 K 线日期标识）
+        self._empty_gaps: Dict[str, Set[pd.Timestamp]] = {}
+        self._db_available = True
+        self._stats = {"memory_hits": 0, "db_loads": 0, "provider_calls": 0}
+
+    # =========================================================================
+    # 公共接口
+    # =========================================================================
+
+    async def get_history(
+        self, ticker: str, period: str = "3mo", interval: str = "1d"
+    ) -> Optional[pd.DataFrame]:
+        """获取历史 K 线（内存 → 数据库 → 仅补缺口的 provider 拉取）"""
+        cached = self._serve_from_memory(ticker, period, interval)
+        if cached is not None:
+            return cached
+        return await asyncio.to_thread(self.get_history_sync, ticker, period, interval)
+
+    def get_history_sync(
+        self, ticker: str, period: str = "3mo", interval: str = "1d"
+    ) -> Optional[pd.DataFrame]:
+        """同步版本（在工作线程中调用）"""
+        key = self._key(ticker, interval)
+        with self._key_lock(key):
+            # double-check: 等锁期间其他线程可能已经加载
+            cached = self._serve_from_memory(ticker, period, interval)
+            if cached is not None:
+                return cached
+
+            start = self._period_start(period)
+            if interval == _DB_RESOLUTION and start is not None:
+                df = self._load_daily(key[0], start)
+            else:
+                df = self._fetch_provider(key[0], period=period, interval=interval)
+
+            if df is None or df.empty:
+                return None
+
+            # 未知周期无法判断覆盖范围，不进入内存缓存
+            if start is not None or period == "max":
+                self._remember(key, start, df)
+            return self._slice(df, start, key)
+
+    def invalidate(self, ticker: Optional[str] = None) -> None:
+        """丢弃内存缓存（ticker=None 时清空全部）"""
+        with self._memory_lock:
+            if ticker is None:
+                self._memory.clear()
+                return
+            for key in [k for k in self._memory if k[0] == ticker.upper()]:
+                self._memory.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._memory_lock:
+            entries = len(self._memory)
+        return {
+            **self._stats,
+            "memory_entries": entries,
+            "max_entries": self.max_entries,
+            "memory_ttl_seconds": self.memory_ttl_seconds,
+            "db_available": self._db_available,
+        }
+
+    # =========================================================================
+    # 内存层
+    # =========================================================================
+
+    @staticmethod
+    def _key(ticker: str, interval: str) -> _MemoryKey:
+        return (ticker.strip().upper(), interval)
+
+    def _key_lock(self, key: _MemoryKey) -> threading.Lock:
+        with self._memory_lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _serve_from_memory(
+        self, ticker: str, period: str, interval: str
+    ) -> Optional[pd.DataFrame]:
+        key = self._key(ticker, interval)
+        start = self._period_start(period)
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            fetched_at, covered_from, df = entry
+            if time.monotonic() - fetched_at >= self.memory_ttl_seconds:
+                return None
+            if covered_from is not None and (start is None or start < covered_from):
+                return None
+            self._memory.move_to_end(key)
+            self._stats["memory_hits"] += 1
+        return self._slice(df, start, key)
+
+    def _remember(
+        self, key: _MemoryKey, covered_from: Optional[pd.Timestamp], df: pd.DataFrame
+    ) -> None:
+        with self._memory_lock:
+            self._memory[key] = (time.monotonic(), covered_from, df)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                evicted, _ = self._memory.popitem(last=False)
+                self._key_locks.pop(evicted, None)
+
+    @staticmethod
+    def _slice(
+        df: pd.DataFrame, start: Optional[pd.Timestamp], key: _MemoryKey
+    ) -> pd.DataFrame:
+        """返回副本，调用方可以随意修改
+
+        副本在 attrs 中携带 ticker/resolution，供 QuantEngine 指标缓存构造键。
+        """
+        if start is not None:
+            df = df[df["date"] >= start]
+        df = df.reset_index(drop=True).copy()
+        df.attrs["ticker"], df.attrs["resolution"] = key
+        return df
+
+    @staticmethod
+    def _period_start(period: str) -> Optional[pd.Timestamp]:
+        """period -> 起始日期；max/未知周期返回 None"""
+        today = pd.Timestamp.now().normalize()
+        if period == "ytd":
+            return today.replace(month=1, day=1)
+        days = _PERIOD_DAYS.get(period)
+        if days is None:
+            return None
+        return today - timedelta(days=days)
+
+    # =========================================================================
+    # 日线：数据库 + 缺口补齐
+    # =========================================================================
+
+    def _load_daily(self, ticker: str, start: pd.Timestamp) -> Optional[pd.DataFrame]:
+        today = pd.Timestamp.now().normalize()
+        tomorrow = today + timedelta(days=1)
+
+        stored = self._load_from_db(ticker, start, today)
+        fetched = []
+        # 已知最早 K 线之前没有数据，不再作为头部缺口拉取
+        head = max(start, self._history_starts.get(ticker, start))
+
+        if stored.empty:
+            df = self._fetch_provider(ticker, start=start, end=tomorrow)
+            if df is not None and not df.empty:
+                self._note_history_start(ticker, start, df["date"].iloc[0])
+            fetched.append(df)
+        else:
+            first, last = stored["date"].iloc[0], stored["date"].iloc[-1]
+            if first - head > _HEAD_GAP_TOLERANCE:
+                df = self._fetch_provider(ticker, start=head, end=first)
+                if df is not None:
+                    # 空结果：first 之前没有数据；否则以拉到的第一根 K 线为准
+                    self._note_history_start(
+                        ticker, head, first if df.empty else df["date"].iloc[0]
+                    )
+                fetched.append(df)
+            fetched.append(self._fetch_middle_gaps(ticker, stored))
+            if last < today:
+                # 增量追加：只拉取最后一根已存 K 线之后的数据
+                fetched.append(
+                    self._fetch_provider(ticker, start=last + timedelta(days=1), end=tomorrow)
+                )
+
+        new_rows = [f for f in fetched if f is not None and not f.empty]
+        if not new_rows:
+            return stored if not stored.empty else None
+
+        merged = (
+            pd.concat([stored, *new_rows], ignore_index=True)
+            .drop_duplicates(subset="date", keep="last")
+            .sort_values("date")
+            .reset_index(drop=True)
+        )
+
+        # 只持久化已收盘的 K 线，当日未收盘数据仅保留在内存中
+        completed = pd.concat(new_rows, ignore_index=True)
+        completed = completed[completed["date"] < today]
+        if not completed.empty:
+            self._save_to_db(ticker, completed)
+
+        return merged
+
+    def _note_history_start(
+        self, ticker: str, requested: pd.Timestamp, earliest: pd.Timestamp
+    ) -> None:
+        """provider 在 [requested, earliest) 内没有数据时记录最早 K 线"""
+        if earliest - requested > _HEAD_GAP_TOLERANCE:
+            with self._memory_lock:
+                self._history_starts[ticker] = earliest
+
+    def _fetch_middle_gaps(self, ticker: str, stored: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """用一次 provider 调用补齐已存区间内超过容忍度的缺口"""
+        dates = stored["date"].reset_index(drop=True)
+        known_empty = self._empty_gaps.get(ticker, set())
+        gaps: List[Tuple[pd.Timestamp, pd.Timestamp]] = [
+            (before, after)
+            for before, after in zip(dates.iloc[:-1], dates.iloc[1:])
+            if after - before > _HEAD_GAP_TOLERANCE and before not in known_empty
+        ]
+        if not gaps:
+            return None
+
+        df = self._fetch_provider(
+            ticker, start=gaps[0][0] + timedelta(days=1), end=gaps[-1][1]
+        )
+        if df is None:
+            return None
+
+        # 没有拉到任何 K 线的缺口（长假/停牌）记为已确认，之后不再重复拉取
+        empty = {
+            before
+            for before, after in gaps
+            if not ((df["date"] > before) & (df["date"] < after)).any()
+        }
+        if empty:
+            with self._memory_lock:
+                self._empty_gaps.setdefault(ticker, set()).update(empty)
+        return df
+
+    def _load_from_db(
+        self, ticker: str, start: pd.Timestamp, end: pd.Timestamp
+    ) -> pd.DataFrame:
+        empty = pd.DataFrame(columns=OHLCV_COLUMNS)
+        if not self._db_available or len(ticker) > _DB_TICKER_MAX_LEN:
+            return empty
+
+        try:
+            from AICrews.database.db_manager import DBManager
+
+            df = DBManager().get_cached_prices(
+                ticker,
+                start.strftime("%Y-%m-%d"),
+                end.strftime("%Y-%m-%d"),
+                resolution=_DB_RESOLUTION,
+            )
+        except Exception as e:
+            self._handle_db_error(e, f"load {ticker}")
+            return empty
+
+        if df is None or df.empty:
+            return empty
+
+        self._stats["db_loads"] += 1
+        df = df.reset_index()
+        df.columns = [str(c).lower() for c in df.columns]
+        return self._normalize(df)
+
+    def _save_to_db(self, ticker: str, df: pd.DataFrame) -> None:
+        if not self._db_available or len(ticker) > _DB_TICKER_MAX_LEN:
+            return
+
+        frame = df.rename(columns={c: c.capitalize() for c in OHLCV_COLUMNS}).set_index("Date")
+        try:
+            from AICrews.database.db_manager import DBManager
+
+            DBManager().save_stock_data(ticker, frame, resolution=_DB_RESOLUTION)
+        except Exception as e:
+            self._handle_db_error(e, f"save {ticker}")
+
+    def _handle_db_error(self, error: Exception, action: str) -> None:
+        from AICrews.utils.exceptions import ConfigException
+
+        if isinstance(error, ConfigException):
+            # DATABASE_URL 未配置：本进程内不再尝试数据库层
+            self._db_available = False
+            logger.info(f"OHLCV store running without database: {error}")
+        else:
+            logger.warning(f"OHLCV store failed to {action}: {error}")
+
+    # =========================================================================
+    # Provider 层
+    # =========================================================================
+
+    def _fetch_provider(
+        self,
+        ticker: str,
+        period: Optional[str] = None,
+        interval: str = "1d",
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+    ) -> Optional[pd.DataFrame]:
+        """阻塞调用 yfinance（必须在工作线程中执行）
+
+        Returns:
+            K 线 DataFrame；区间内没有数据时为空 DataFrame，限流或出错时为 None
+        """
+        from AICrews.infrastructure.data_fetcher.yfinance_fetcher import (
+            is_yfinance_rate_limited,
+        )
+
+        if is_yfinance_rate_limited():
+            logger.debug(f"YFinance rate limited, skip history fetch for {ticker}")
+            return None
+
+        try:
+            import yfinance as yf
+
+            self._stats["provider_calls"] += 1
+            if start is not None:
+                df = yf.Ticker(ticker).history(
+                    start=start.strftime("%Y-%m-%d"),
+                    end=end.strftime("%Y-%m-%d") if end is not None else None,
+                    interval=interval,
+                )
+            else:
+                df = yf.Ticker(ticker).history(period=period or "3mo", interval=interval)
+        except ImportError:
+            logger.warning("yfinance not installed")
+            return None
+        except Exception as e:
+            logger.warning(f"yfinance history fetch error for {ticker}: {e}")
+            return None
+
+        if df is None or len(df) == 0:
+            # 请求成功但区间内没有数据（区别于限流/出错时返回的 None）
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+        df = df.reset_index()
+        df.columns = [str(c).lower() for c in df.columns]
+        if "datetime" in df.columns and "date" not in df.columns:
+            df = df.rename(columns={"datetime": "date"})
+        return self._normalize(df, daily=interval == _DB_RESOLUTION)
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame, daily: bool = True) -> pd.DataFrame:
+        """统一列与时间格式：tz-naive 日期，日线归一到零点"""
+        df = df[[c for c in OHLCV_COLUMNS if c in df.columns]].copy()
+        dates = pd.to_datetime(df["date"])
+        if getattr(dates.dt, "tz", None) is not None:
+            dates = dates.dt.tz_localize(None)
+        df["date"] = dates.dt.normalize() if daily else dates
+        return df.sort_values("date").reset_index(drop=True)
+
+
+_ohlcv_store: Optional[OHLCVStore] = None
+
+
+def get_ohlcv_store() -> OHLCVStore:
+    """获取 OHLCV Store 单例"""
+    global _ohlcv_store
+    if _ohlcv_store is None:
+        _ohlcv_store = OHLCVStore()
+    return _ohlcv_store
@@ -419,6 +419,7 @@ class YFinanceFetcher(SDKFetcherBase):
                             "volume": int(last_row.get("Volume", 0) or 0),
                             "high": float(last_row.get("High", 0) or 0),
                             "low": float(last_row.get("Low", 0) or 0),
+                            "trade_date": _bar_date(df.index[-1]),
                         }
                     else:
                         results[ticker] = None
@@ -452,6 +453,7 @@ class YFinanceFetcher(SDKFetcherBase):
                                     "volume": int(last_row.get("Volume", 0) or 0),
                                     "high": float(last_row.get("High", 0) or 0),
                                     "low": float(last_row.get("Low", 0) or 0),
+                                    "trade_date": _bar_date(ticker_df.index[-1]),
                                 }
                             else:
                                 results[ticker] = None
@@ -475,6 +477,15 @@ class YFinanceFetcher(SDKFetcherBase):
             self._limiter.release("yfinance")
 
 
+
+def _bar_date(label: Any) -> Optional[str]:
+    """yf.download 日线索引（交易所当地日期）-> ISO 日期"""
+    try:
+        return label.date().isoformat()
+    except (AttributeError, ValueError):
+        return None
+
+
 _yfinance_fetcher: Optional[YFinanceFetcher] = None
 
 
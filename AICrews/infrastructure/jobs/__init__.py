@@ -1,5 +1,16 @@
 """Job management module for async task handling."""
 
-from .job_manager import JobManager, JobStatus, get_job_manager
+from .job_manager import JobManager, JobPage, JobStatus, get_job_manager
+from .job_queue import RedisJobQueue, register_job_handler
+from .scheduler import FairJobScheduler, JobAdmissionError
 
-__all__ = ["JobManager", "JobStatus", "get_job_manager"]
+__all__ = [
+    "JobManager",
+    "JobPage",
+    "JobStatus",
+    "get_job_manager",
+    "RedisJobQueue",
+    "register_job_handler",
+    "FairJobScheduler",
+    "JobAdmissionError",
+]
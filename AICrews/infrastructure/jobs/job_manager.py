@@ -9,9 +9,19 @@ Memory Management:
 - Time-based retention (configurable via FAIC_JOB_RETENTION_HOURS)
 - Result dropping: large results nulled from memory after Redis persistence
 - Per-job chat message limits to prevent unbounded chat history growth
+
+Recovery:
+- 本进程线程池执行的 submit_task 任务持久化 task / payload / tier；
+  进程重启后 recover_jobs 重新提交注册为 resumable 的任务（同一 job_id，
+  处理函数从检查点跳过已完成部分），最多 FAIC_JOB_MAX_RESUMES 次，其余标记失败
+- 本地执行（含排队中）的任务持有租约 job:lease:<job_id>，由心跳线程每
+  FAIC_JOB_LEASE_TTL/3 秒续期；多 worker 部署下只恢复租约已过期的任务，
+  仍在其他存活进程上运行的任务不会被重复提交或标记失败
 """
 
 import os
+import socket
+import time
 import uuid
 import asyncio
 import traceback
@@ -20,11 +30,19 @@ from concurrent.futures import ThreadPoolExecutor, Future
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from threading import Lock
+from threading import Event, Lock, Thread
 from typing import Any, Callable, Dict, List, Optional
 
 from typing import TYPE_CHECKING
 
+from AICrews.infrastructure.jobs.job_queue import (
+    QueuedJob,
+    RedisJobQueue,
+    get_job_handler,
+    is_resumable_handler,
+    priority_for_tier,
+)
+from AICrews.infrastructure.jobs.scheduler import FairJobScheduler, JobAdmissionError
 from AICrews.observability.logging import get_logger
 
 if TYPE_CHECKING:
@@ -33,6 +51,25 @@ if TYPE_CHECKING:
 
 logger = get_logger(__name__)
 
+# 续期/释放只作用于本进程持有的租约（值为持有者标识）
+LEASE_REFRESH_LUA = """
+local refreshed = 0
+for i, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        redis.call('EXPIRE', key, ARGV[2])
+        refreshed = refreshed + 1
+    end
+end
+return refreshed
+"""
+
+LEASE_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
 
 class JobStatus(str, Enum):
     """任务状态"""
@@ -65,6 +102,12 @@ class JobResult:
     
     # 聊天历史（用于后续 Copilot 功能）
     chat_history: List[Dict[str, str]] = field(default_factory=list)
+
+    # 中断恢复：按名称提交的任务及其参数（见 recover_jobs）
+    task: Optional[str] = None
+    payload: Optional[Dict[str, Any]] = None
+    tier: Optional[str] = None
+    resume_count: int = 0
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -82,6 +125,10 @@ class JobResult:
             "crew_name": self.crew_name,
             "user_id": self.user_id,
             "chat_history": self.chat_history,
+            "task": self.task,
+            "payload": self.payload,
+            "tier": self.tier,
+            "resume_count": self.resume_count,
         }
 
 
@@ -92,80 +139,319 @@ class JobStore:
     def list(self, user_id: Optional[int] = None, limit: int = 50) -> List[JobResult]: raise NotImplementedError()
     def delete(self, job_id: str): raise NotImplementedError()
 
+
+@dataclass
+class JobPage:
+    """分页查询结果；next_cursor 为 None 表示没有更多"""
+    jobs: List[JobResult]
+    next_cursor: Optional[str] = None
+
+
 class RedisJobStore(JobStore):
-    """基于 Redis 的任务存储"""
+    """基于 Redis 的任务存储
+
+    Key 设计:
+    - job:<job_id>            任务 JSON（TTL 24h）
+    - jobs:index              全局索引 ZSET（score = created_at 时间戳）
+    - jobs:user:<user_id>     用户索引 ZSET（匿名任务记为 user 0）
+    - job:lease:<job_id>      执行租约（值为持有进程标识，TTL FAIC_JOB_LEASE_TTL）
+
+    列表查询按索引倒序分页（游标为上一页最后一条的 score，开区间），
+    一次 MGET 取回整页任务；任务 TTL 过期后 MGET 返回空，顺带从索引移除。
+    """
+
+    JOB_TTL = 86400  # 24h
+    # 索引中超过该时长的条目在保存时批量裁剪（任务本身早已过期）
+    INDEX_RETENTION = 2 * JOB_TTL
+    INDEX_KEY = "jobs:index"
+    USER_INDEX_PREFIX = "jobs:user:"
+    # 按状态过滤时单次查询最多翻阅的索引批次数
+    MAX_SCAN_ROUNDS = 10
+    LEASE_PREFIX = "job:lease:"
+    LEASE_TTL = int(os.getenv("FAIC_JOB_LEASE_TTL", "60"))
+
     def __init__(self):
         from AICrews.infrastructure.cache.redis_manager import get_redis_manager
         self.redis = get_redis_manager()
         self.prefix = "job:"
+        self._lease_refresh_script = None
+        self._lease_release_script = None
 
     def _get_key(self, job_id: str) -> str:
         return f"{self.prefix}{job_id}"
 
+    def _index_key(self, user_id: Optional[int]) -> str:
+        if user_id is None:
+            return self.INDEX_KEY
+        return f"{self.USER_INDEX_PREFIX}{user_id}"
+
+    @staticmethod
+    def _score(job: JobResult) -> float:
+        return (job.created_at or datetime.now()).timestamp()
+
+    @staticmethod
+    def _decode(data: Optional[Dict[str, Any]]) -> Optional[JobResult]:
+        """从 dict 恢复 JobResult，注意 datetime 转换"""
+        if not data:
+            return None
+        if data.get('created_at'): data['created_at'] = datetime.fromisoformat(data['created_at'])
+        if data.get('started_at'): data['started_at'] = datetime.fromisoformat(data['started_at'])
+        if data.get('completed_at'): data['completed_at'] = datetime.fromisoformat(data['completed_at'])
+        data['status'] = JobStatus(data['status'])
+        return JobResult(**data)
+
+    def _decode_raw(self, raw: Optional[bytes]) -> Optional[JobResult]:
+        if not raw:
+            return None
+        try:
+            return self._decode(self.redis.decode_json(raw))
+        except Exception as e:
+            logger.warning(f"Skipping undecodable job payload: {e}")
+            return None
+
+    def _queue_save(self, pipe: Any, job: JobResult) -> None:
+        payload = self.redis.encode_json(job.to_dict())
+        score = self._score(job)
+        user_index = self._index_key(job.user_id or 0)
+        cutoff = time.time() - self.INDEX_RETENTION
+        pipe.set(self._get_key(job.job_id), payload, ex=self.JOB_TTL)
+        pipe.zadd(self.INDEX_KEY, {job.job_id: score})
+        pipe.zadd(user_index, {job.job_id: score})
+        pipe.expire(user_index, self.INDEX_RETENTION)
+        pipe.zremrangebyscore(self.INDEX_KEY, "-inf", cutoff)
+        pipe.zremrangebyscore(user_index, "-inf", cutoff)
+
+    def _range_args(self, cursor: Optional[str], count: int) -> Dict[str, Any]:
+        return {
+            "max": f"({cursor}" if cursor else "+inf",
+            "min": "-inf",
+            "start": 0,
+            "num": count,
+            "withscores": True,
+        }
+
+    def _collect(
+        self,
+        entries: List[Any],
+        raws: List[Optional[bytes]],
+        status: Optional[JobStatus],
+        jobs: List[JobResult],
+        expired: List[str],
+        limit: int,
+    ) -> Optional[str]:
+        """把一批索引条目与 MGET 结果合并进 jobs，返回最后消费条目的 score"""
+        last_score = None
+        for (job_id, score), raw in zip(entries, raws):
+            last_score = repr(score)
+            job = self._decode_raw(raw)
+            if job is None:
+                expired.append(job_id)
+            elif status is None or job.status == status:
+                jobs.append(job)
+                if len(jobs) >= limit:
+                    break
+        return last_score
+
+    # =========================================================================
+    # 异步接口
+    # =========================================================================
+
     async def save(self, job: JobResult):
-        await self.redis.set(self._get_key(job.job_id), job.to_dict(), ttl=86400) # 24h
+        client = self.redis._client
+        if not client:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            self._queue_save(pipe, job)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to save job {job.job_id}: {e}")
+
+    async def get(self, job_id: str) -> Optional[JobResult]:
+        return self._decode(await self.redis.get_json(self._get_key(job_id)))
+
+    async def list_page(
+        self,
+        user_id: Optional[int] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[JobStatus] = None,
+    ) -> JobPage:
+        """按创建时间倒序分页列出任务"""
+        client = self.redis._client
+        if not client:
+            return JobPage(jobs=[])
+        # 任务负载可能是二进制编码（见 redis_codec），用不解码响应的客户端读取
+        raw_client = self.redis._raw_client or client
+        index = self._index_key(user_id)
+        jobs: List[JobResult] = []
+        expired: List[str] = []
+        exhausted = False
+        try:
+            for _ in range(self.MAX_SCAN_ROUNDS):
+                entries = await client.zrevrangebyscore(index, **self._range_args(cursor, limit))
+                if not entries:
+                    exhausted = True
+                    break
+                raws = await raw_client.mget([self._get_key(job_id) for job_id, _ in entries])
+                cursor = self._collect(entries, raws, status, jobs, expired, limit)
+                if len(jobs) >= limit:
+                    break
+                if len(entries) < limit:
+                    exhausted = True
+                    break
+            if expired:
+                await client.zrem(index, *expired)
+        except Exception as e:
+            logger.error(f"Failed to list jobs from index {index}: {e}")
+            exhausted = True
+        return JobPage(jobs=jobs, next_cursor=None if exhausted else cursor)
+
+    async def list(self, user_id: Optional[int] = None, limit: int = 50) -> List[JobResult]:
+        """列出持久化的任务"""
+        return (await self.list_page(user_id=user_id, limit=limit)).jobs
+
+    async def list_active(self) -> List[JobResult]:
+        """列出仍处于 PENDING / RUNNING 状态的任务（启动恢复用）"""
+        active: List[JobResult] = []
+        cursor = None
+        while True:
+            page = await self.list_page(limit=500, cursor=cursor)
+            active.extend(
+                job for job in page.jobs
+                if job.status in (JobStatus.PENDING, JobStatus.RUNNING)
+            )
+            if not page.next_cursor:
+                return active
+            cursor = page.next_cursor
+
+    async def lease_alive(self, job_id: str) -> bool:
+        """任务租约是否仍被某个进程持有（读取失败时按存活处理，避免重复执行）"""
+        client = self.redis._client
+        if not client:
+            return False
+        try:
+            return bool(await client.exists(self._lease_key(job_id)))
+        except Exception as e:
+            logger.warning(f"Failed to check lease for job {job_id}: {e}")
+            return True
+
+    async def delete(self, job_id: str):
+        client = self.redis._client
+        if not client:
+            return
+        job = await self.get(job_id)
+        pipe = client.pipeline(transaction=False)
+        pipe.delete(self._get_key(job_id))
+        pipe.zrem(self.INDEX_KEY, job_id)
+        if job is not None:
+            pipe.zrem(self._index_key(job.user_id or 0), job_id)
+        await pipe.execute()
+
+    # =========================================================================
+    # 同步接口（非 asyncio 线程 - 避免 'Future attached to a different loop' 错误）
+    # =========================================================================
 
     def save_sync(self, job: JobResult):
         """同步保存，用于非 asyncio 线程"""
-        self.redis.set_sync(self._get_key(job.job_id), job.to_dict(), ttl=86400)
+        client = self.redis._sync_client
+        if not client:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            self._queue_save(pipe, job)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to save job {job.job_id}: {e}")
 
     def get_sync(self, job_id: str) -> Optional[JobResult]:
-        """同步获取，用于非 asyncio 线程 - 避免 'Future attached to a different loop' 错误"""
-        data = self.redis.get_json_sync(self._get_key(job_id))
-        if data:
-            # 从 dict 恢复，注意 datetime 转换
-            if data.get('created_at'): data['created_at'] = datetime.fromisoformat(data['created_at'])
-            if data.get('started_at'): data['started_at'] = datetime.fromisoformat(data['started_at'])
-            if data.get('completed_at'): data['completed_at'] = datetime.fromisoformat(data['completed_at'])
-            data['status'] = JobStatus(data['status'])
-            return JobResult(**data)
-        return None
+        """同步获取，用于非 asyncio 线程"""
+        return self._decode(self.redis.get_json_sync(self._get_key(job_id)))
 
-    async def get(self, job_id: str) -> Optional[JobResult]:
-        data = await self.redis.get_json(self._get_key(job_id))
-        if data:
-            # 简单的从 dict 恢复，注意 datetime 转换
-            if data.get('created_at'): data['created_at'] = datetime.fromisoformat(data['created_at'])
-            if data.get('started_at'): data['started_at'] = datetime.fromisoformat(data['started_at'])
-            if data.get('completed_at'): data['completed_at'] = datetime.fromisoformat(data['completed_at'])
-            data['status'] = JobStatus(data['status'])
-            return JobResult(**data)
-        return None
+    # =========================================================================
+    # 执行租约（同步接口，心跳线程与提交路径共用）
+    # =========================================================================
 
-    async def list(self, user_id: Optional[int] = None, limit: int = 50) -> List[JobResult]:
-        """列出持久化的任务"""
-        # 注意：这里在 Redis 中扫描所有任务键
-        # 实际生产中应维护一个 sorted set 保存 job_id 索引
-        keys = await self.redis._client.keys(f"{self.prefix}*")
-        jobs = []
-        for key in keys:
-            job_id = key.split(":")[-1]
-            job = await self.get(job_id)
-            if job:
-                if user_id is None or job.user_id == user_id:
-                    jobs.append(job)
+    def _lease_key(self, job_id: str) -> str:
+        return f"{self.LEASE_PREFIX}{job_id}"
 
-        # 按时间排序
-        jobs.sort(key=lambda x: x.created_at, reverse=True)
-        return jobs[:limit]
+    def acquire_lease_sync(self, job_id: str, owner: str, *, exclusive: bool = False) -> bool:
+        """写入租约；exclusive=True 时仅在无人持有时成功（恢复任务时抢占）"""
+        client = self.redis._sync_client
+        if not client:
+            return True
+        try:
+            return bool(
+                client.set(self._lease_key(job_id), owner, nx=exclusive, ex=self.LEASE_TTL)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to acquire lease for job {job_id}: {e}")
+            return not exclusive
+
+    def refresh_leases_sync(self, job_ids: List[str], owner: str) -> int:
+        """续期本进程持有的租约，返回成功续期的数量"""
+        client = self.redis._sync_client
+        if not client or not job_ids:
+            return 0
+        if self._lease_refresh_script is None:
+            self._lease_refresh_script = client.register_script(LEASE_REFRESH_LUA)
+        return int(
+            self._lease_refresh_script(
+                keys=[self._lease_key(jid) for jid in job_ids],
+                args=[owner, self.LEASE_TTL],
+            )
+        )
 
-    def list_sync(self, user_id: Optional[int] = None, limit: int = 50) -> List[JobResult]:
-        """同步版本的 list，用于非 asyncio 线程 - 避免 'Future attached to a different loop' 错误"""
-        keys = self.redis.keys_sync(f"{self.prefix}*")
-        jobs = []
-        for key in keys:
-            job_id = key.split(":")[-1]
-            job = self.get_sync(job_id)
-            if job:
-                if user_id is None or job.user_id == user_id:
-                    jobs.append(job)
+    def release_lease_sync(self, job_id: str, owner: str) -> None:
+        client = self.redis._sync_client
+        if not client:
+            return
+        try:
+            if self._lease_release_script is None:
+                self._lease_release_script = client.register_script(LEASE_RELEASE_LUA)
+            self._lease_release_script(keys=[self._lease_key(job_id)], args=[owner])
+        except Exception as e:
+            logger.warning(f"Failed to release lease for job {job_id}: {e}")
 
-        # 按时间排序
-        jobs.sort(key=lambda x: x.created_at, reverse=True)
-        return jobs[:limit]
+    def list_page_sync(
+        self,
+        user_id: Optional[int] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[JobStatus] = None,
+    ) -> JobPage:
+        """同步版本的 list_page"""
+        client = self.redis._sync_client
+        if not client:
+            return JobPage(jobs=[])
+        raw_client = self.redis._raw_sync_client or client
+        index = self._index_key(user_id)
+        jobs: List[JobResult] = []
+        expired: List[str] = []
+        exhausted = False
+        try:
+            for _ in range(self.MAX_SCAN_ROUNDS):
+                entries = client.zrevrangebyscore(index, **self._range_args(cursor, limit))
+                if not entries:
+                    exhausted = True
+                    break
+                raws = raw_client.mget([self._get_key(job_id) for job_id, _ in entries])
+                cursor = self._collect(entries, raws, status, jobs, expired, limit)
+                if len(jobs) >= limit:
+                    break
+                if len(entries) < limit:
+                    exhausted = True
+                    break
+            if expired:
+                client.zrem(index, *expired)
+        except Exception as e:
+            logger.error(f"Failed to list jobs from index {index}: {e}")
+            exhausted = True
+        return JobPage(jobs=jobs, next_cursor=None if exhausted else cursor)
 
-    async def delete(self, job_id: str):
-        await self.redis.delete(self._get_key(job_id))
+    def list_sync(self, user_id: Optional[int] = None, limit: int = 50) -> List[JobResult]:
+        """同步版本的 list"""
+        return self.list_page_sync(user_id=user_id, limit=limit).jobs
 
 class JobManager:
     """
@@ -191,12 +477,22 @@ class JobManager:
             return
 
         self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        # 线程池之前的公平调度与准入控制：仅在有空闲线程时才提交到线程池
+        self._scheduler = FairJobScheduler(max_running=max_workers)
 
         # Memory management configuration
         self._max_jobs_in_memory = int(os.getenv("FAIC_JOB_MAX_IN_MEMORY", "200"))
         self._retention_hours = int(os.getenv("FAIC_JOB_RETENTION_HOURS", "24"))
         self._drop_result_from_memory = os.getenv("FAIC_JOB_DROP_RESULT_FROM_MEMORY", "true").lower() == "true"
         self._max_chat_messages_per_job = int(os.getenv("FAIC_JOB_MAX_CHAT_MESSAGES", "1000"))
+        self._max_resumes = int(os.getenv("FAIC_JOB_MAX_RESUMES", "2"))
+
+        # 本进程持有租约的任务（提交到本地调度器时获取，执行结束时释放）
+        self._lease_owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._leases: set = set()
+        self._lease_lock = Lock()
+        self._lease_stop = Event()
+        self._lease_thread: Optional[Thread] = None
 
         # OrderedDict for LRU tracking (insertion order = access order via move_to_end)
         self._jobs: OrderedDict[str, JobResult] = OrderedDict()
@@ -204,8 +500,16 @@ class JobManager:
         self._initialized = True
         self.store = RedisJobStore()
 
+        # Execution mode: "thread" runs jobs on this process's pool; "queue"
+        # enqueues registered tasks to Redis streams for standalone workers.
+        self._execution_mode = os.getenv("FAIC_JOB_EXECUTION_MODE", "thread").lower()
+        self._queue: Optional[RedisJobQueue] = (
+            RedisJobQueue() if self._execution_mode == "queue" else None
+        )
+
         logger.info(
             f"JobManager initialized: workers={max_workers}, "
+            f"mode={self._execution_mode}, "
             f"max_in_memory={self._max_jobs_in_memory}, "
             f"retention_hours={self._retention_hours}, "
             f"drop_results={self._drop_result_from_memory}"
@@ -347,146 +651,339 @@ class JobManager:
         ticker: Optional[str] = None,
         crew_name: Optional[str] = None,
         user_id: Optional[int] = None,
+        tier: Optional[str] = None,
         **kwargs,
     ) -> str:
         """
         提交任务到线程池
 
+        闭包无法跨进程传递，因此 queue 模式下 submit 仍在本进程执行；
+        需要分布式执行的任务请使用 submit_task。
+
+        任务经 FairJobScheduler 按用户/权益等级公平排队（tier 缺省按 free 计）。
         Enforces memory limit via LRU eviction before adding new job.
+
+        Raises:
+            JobAdmissionError: 队列已满或超出该用户配额（未创建任务记录）
         """
-        # Enforce memory limit before adding new job
-        self._enforce_memory_limit()
+        self._scheduler.admit(user_id=user_id, tier=tier)
+        job_result = self._create_job(ticker=ticker, crew_name=crew_name, user_id=user_id)
+        self._submit_local(job_result.job_id, func, args, kwargs, user_id=user_id, tier=tier)
+        return job_result.job_id
 
-        job_id = str(uuid.uuid4())
+    def submit_task(
+        self,
+        task: str,
+        payload: Dict[str, Any],
+        *,
+        ticker: Optional[str] = None,
+        crew_name: Optional[str] = None,
+        user_id: Optional[int] = None,
+        tier: Optional[str] = None,
+    ) -> str:
+        """
+        按名称提交已注册的任务（见 job_queue.register_job_handler）
+
+        queue 模式下入队由独立 worker 执行（按权益等级确定优先级），
+        否则与 submit 相同在本进程线程池执行。payload 必须可 JSON 序列化。
 
-        # 创建任务记录
+        Raises:
+            JobAdmissionError: 队列已满或超出该用户配额（未创建任务记录）
+        """
+        if self._queue is None:
+            self._scheduler.admit(user_id=user_id, tier=tier)
+            job_result = self._create_job(
+                ticker=ticker, crew_name=crew_name, user_id=user_id,
+                task=task, payload=payload, tier=tier,
+            )
+            self._submit_local(
+                job_result.job_id, get_job_handler(task), (), dict(payload),
+                user_id=user_id, tier=tier,
+            )
+            return job_result.job_id
+
+        self._admit_queued(tier)
+        job_result = self._create_job(
+            ticker=ticker, crew_name=crew_name, user_id=user_id, track_in_memory=False
+        )
+        priority = priority_for_tier(tier)
+        try:
+            self._queue.enqueue(job_result.job_id, task, payload, priority=priority, tier=tier)
+        except Exception as e:
+            # 队列不可用时退化为本进程执行，保证任务不丢失
+            logger.warning(f"[Job {job_result.job_id}] Enqueue failed, running locally: {e}")
+            job_result.task, job_result.payload, job_result.tier = task, dict(payload), tier
+            self._enforce_memory_limit()
+            self._jobs[job_result.job_id] = job_result
+            self._submit_local(
+                job_result.job_id, get_job_handler(task), (), dict(payload),
+                user_id=user_id, tier=tier, admitted=False,
+            )
+            return job_result.job_id
+
+        logger.info(f"[Job {job_result.job_id}] Enqueued task={task} priority={priority}")
+        return job_result.job_id
+
+    def _admit_queued(self, tier: Optional[str]) -> None:
+        """queue 模式的准入：stream 积压（排队 + 执行中）超过全局上限时快速拒绝
+
+        每用户配额由各 API 进程的本地调度器负责，跨进程无法精确统计，
+        queue 模式只做全局背压；等级间的先后由优先级 stream 保证。
+        """
+        try:
+            backlog = self._queue.backlog()
+        except Exception as e:
+            logger.debug(f"Job queue backlog unavailable, skipping admission check: {e}")
+            return
+        if backlog >= self._scheduler.max_queue_length:
+            self._scheduler.record_rejection(str(getattr(tier, "value", tier) or "free"), "queue_full")
+            raise JobAdmissionError(
+                "Job queue is full, please retry later", reason="queue_full", retry_after=10
+            )
+
+    def _create_job(
+        self,
+        *,
+        ticker: Optional[str],
+        crew_name: Optional[str],
+        user_id: Optional[int],
+        track_in_memory: bool = True,
+        task: Optional[str] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        tier: Optional[str] = None,
+    ) -> JobResult:
+        """创建并持久化 PENDING 任务记录"""
         job_result = JobResult(
-            job_id=job_id,
+            job_id=str(uuid.uuid4()),
             status=JobStatus.PENDING,
             ticker=ticker,
             crew_name=crew_name,
             user_id=user_id,
+            task=task,
+            payload=dict(payload) if payload is not None else None,
+            tier=str(getattr(tier, "value", tier)) if tier is not None else None,
         )
-        self._jobs[job_id] = job_result
-
-        # 初始持久化
-        self._persist_job(job_result)
-        
-        # 包装函数
-        def wrapped_func(jid: str):
-            job: Optional[JobResult] = None
-            tracker = None
-            try:
-                job = self._jobs[jid]
-                job.status = JobStatus.RUNNING
-                job.started_at = datetime.now()
-                job.progress_message = "AI 智能体正在分析中..."
-                self.store.save_sync(job)
+        if track_in_memory:
+            # Enforce memory limit before adding new job
+            self._enforce_memory_limit()
+            self._jobs[job_result.job_id] = job_result
+            # 初始持久化
+            self._persist_job(job_result)
+        else:
+            # 入队前必须已落盘，worker 领取时从 store 读取任务记录
+            self.store.save_sync(job_result)
+        return job_result
 
-                logger.info(
-                    f"[Job {jid}] 🚀 开始执行 - ticker={job.ticker}, crew={job.crew_name}"
-                )
+    def _submit_local(
+        self,
+        job_id: str,
+        func: Callable[..., Any],
+        args: tuple,
+        kwargs: Dict[str, Any],
+        *,
+        user_id: Optional[int] = None,
+        tier: Optional[str] = None,
+        admitted: bool = True,
+    ) -> None:
+        """经公平调度器排队，轮到时提交到线程池
+
+        admitted=False（入队失败的回退路径）时准入被拒也照常执行，避免已创建的任务丢失。
+        排队与执行期间持有任务租约。
+        """
+        self._hold_lease(job_id)
 
-                from AICrews.services.tracking_service import TrackingService
-                tracker = TrackingService()
+        def _start() -> None:
+            future = self._executor.submit(self._run_job, job_id, func, args, kwargs)
+            self._futures[job_id] = future
+
+            def _on_done(done: Future) -> None:
+                self._scheduler.release(job_id)
+                self._release_lease(job_id)
                 try:
-                    tracker.init_job(jid, ticker or "Unknown", crew_name or "Unknown")
+                    done.result()
                 except Exception:
-                    logger.warning(
-                        f"[Job {jid}] Tracking init failed; continuing without tracking",
+                    logger.error(
+                        f"[Job {job_id}] Unhandled exception in worker future",
                         exc_info=True,
                     )
 
-                import inspect
-                sig = inspect.signature(func)
-                if 'job_id' in sig.parameters:
-                    kwargs['job_id'] = jid
-
-                # Establish LogContext for this worker thread so CrewAI EventBus
-                # listeners and other observability helpers can reliably resolve
-                # job_id/run_id/user_id/ticker during execution.
-                from AICrews.observability.logging import LogContext
-
-                with LogContext(
-                    job_id=jid,
-                    run_id=jid,
-                    user_id=job.user_id,
-                    ticker=job.ticker,
-                ):
-                    result = func(*args, **kwargs)
-                job.status = JobStatus.COMPLETED
-                job.result = result
-                job.progress = 100
-                job.progress_message = "分析完成"
-                job.completed_at = datetime.now()
-                
-                # 持久化完成状态
-                self.store.save_sync(job)
-
-                # Drop large result from memory after persistence (Tier 3 memory management)
-                if self._drop_result_from_memory and job.result is not None:
-                    job.result = None
-                    logger.debug(f"[Job {jid}] Dropped result from memory after completion (can be recovered from Redis)")
-
-                # Emit webhook event (best-effort, after persistence)
-                self._emit_job_notification(job)
+            future.add_done_callback(_on_done)
 
-                try:
-                    tracker.complete_job(jid, status="completed")
-                except Exception:
+        try:
+            self._scheduler.submit(job_id, _start, user_id=user_id, tier=tier)
+        except JobAdmissionError as e:
+            if admitted:
+                # 预检通过后被并发提交挤占：任务记录已创建，标记失败后再拒绝
+                self._release_lease(job_id)
+                self.mark_failed(job_id, str(e))
+                raise
+            _start()
+
+    # =========================================================================
+    # 执行租约
+    # =========================================================================
+
+    def _hold_lease(self, job_id: str) -> None:
+        """记录本进程持有的租约并确保心跳线程在运行"""
+        self.store.acquire_lease_sync(job_id, self._lease_owner)
+        with self._lease_lock:
+            self._leases.add(job_id)
+            if self._lease_thread is None:
+                self._lease_thread = Thread(
+                    target=self._lease_heartbeat, name="job-lease-heartbeat", daemon=True
+                )
+                self._lease_thread.start()
+
+    def _release_lease(self, job_id: str) -> None:
+        with self._lease_lock:
+            if job_id not in self._leases:
+                return
+            self._leases.discard(job_id)
+        self.store.release_lease_sync(job_id, self._lease_owner)
+
+    def _lease_heartbeat(self) -> None:
+        """每 1/3 TTL 批量续期本进程持有的租约（单次 Lua 调用）"""
+        interval = max(1, self.store.LEASE_TTL // 3)
+        while not self._lease_stop.wait(interval):
+            with self._lease_lock:
+                job_ids = list(self._leases)
+            if not job_ids:
+                continue
+            try:
+                refreshed = self.store.refresh_leases_sync(job_ids, self._lease_owner)
+                if refreshed < len(job_ids):
                     logger.warning(
-                        f"[Job {jid}] Tracking complete failed",
-                        exc_info=True,
+                        f"Lost {len(job_ids) - refreshed}/{len(job_ids)} job leases "
+                        f"(expired before renewal)"
                     )
-
-                return result
             except Exception as e:
-                logger.error(f"[Job {jid}] Worker crashed during execution:\n{traceback.format_exc()}")
-                logger.error(
-                    f"[Job {jid}] Worker crashed during execution: {e}",
+                logger.warning(f"Failed to refresh job leases: {e}")
+
+    def run_queued(self, queued: QueuedJob) -> Any:
+        """在当前线程执行从队列领取的任务（worker 进程调用）"""
+        job = self.store.get_sync(queued.job_id) or JobResult(
+            job_id=queued.job_id, status=JobStatus.PENDING
+        )
+        self._enforce_memory_limit()
+        self._jobs[queued.job_id] = job
+        return self._run_job(
+            queued.job_id, get_job_handler(queued.task), (), dict(queued.payload)
+        )
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        """将任务标记为失败并持久化（用于无法执行的队列任务）"""
+        job = self._jobs.get(job_id) or self.store.get_sync(job_id)
+        if job is None:
+            return
+        job.status = JobStatus.FAILED
+        job.error = error
+        job.progress_message = f"分析失败: {error}"
+        job.completed_at = datetime.now()
+        self.store.save_sync(job)
+        self._emit_job_notification(job)
+
+    def _run_job(
+        self, jid: str, func: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]
+    ) -> Any:
+        """执行任务并维护状态、追踪与通知（本地线程池与队列 worker 共用）"""
+        job: Optional[JobResult] = None
+        tracker = None
+        try:
+            job = self._jobs[jid]
+            job.status = JobStatus.RUNNING
+            job.started_at = datetime.now()
+            job.progress_message = "AI 智能体正在分析中..."
+            self.store.save_sync(job)
+
+            logger.info(
+                f"[Job {jid}] 🚀 开始执行 - ticker={job.ticker}, crew={job.crew_name}"
+            )
+
+            from AICrews.services.tracking_service import TrackingService
+            tracker = TrackingService()
+            try:
+                tracker.init_job(jid, job.ticker or "Unknown", job.crew_name or "Unknown")
+            except Exception:
+                logger.warning(
+                    f"[Job {jid}] Tracking init failed; continuing without tracking",
                     exc_info=True,
                 )
 
-                if job is not None:
-                    job.status = JobStatus.FAILED
-                    job.error = str(e)
-                    job.progress_message = f"分析失败: {str(e)}"
-                    job.completed_at = datetime.now()
-                
-                # 持久化失败状态
-                if job is not None:
-                    try:
-                        self.store.save_sync(job)
-                    except Exception:
-                        logger.error(f"[Job {jid}] Failed to persist job state:\n{traceback.format_exc()}")
-
-                    # Emit webhook event (best-effort, after persistence)
-                    self._emit_job_notification(job)
-
-                if tracker is not None:
-                    try:
-                        tracker.complete_job(jid, status="failed", error=str(e))
-                    except Exception:
-                        logger.warning(
-                            f"[Job {jid}] Tracking complete (failed) failed",
-                            exc_info=True,
-                        )
-                raise
-        
-        future = self._executor.submit(wrapped_func, job_id)
-        self._futures[job_id] = future
+            import inspect
+            sig = inspect.signature(func)
+            if 'job_id' in sig.parameters:
+                kwargs['job_id'] = jid
+
+            # Establish LogContext for this worker thread so CrewAI EventBus
+            # listeners and other observability helpers can reliably resolve
+            # job_id/run_id/user_id/ticker during execution.
+            from AICrews.observability.logging import LogContext
+
+            with LogContext(
+                job_id=jid,
+                run_id=jid,
+                user_id=job.user_id,
+                ticker=job.ticker,
+            ):
+                result = func(*args, **kwargs)
+            job.status = JobStatus.COMPLETED
+            job.result = result
+            job.progress = 100
+            job.progress_message = "分析完成"
+            job.completed_at = datetime.now()
+            
+            # 持久化完成状态
+            self.store.save_sync(job)
+
+            # Drop large result from memory after persistence (Tier 3 memory management)
+            if self._drop_result_from_memory and job.result is not None:
+                job.result = None
+                logger.debug(f"[Job {jid}] Dropped result from memory after completion (can be recovered from Redis)")
+
+            # Emit webhook event (best-effort, after persistence)
+            self._emit_job_notification(job)
 
-        def _log_unhandled_future_error(done: Future) -> None:
             try:
-                done.result()
+                tracker.complete_job(jid, status="completed")
             except Exception:
-                logger.error(
-                    f"[Job {job_id}] Unhandled exception in worker future",
+                logger.warning(
+                    f"[Job {jid}] Tracking complete failed",
                     exc_info=True,
                 )
 
-        future.add_done_callback(_log_unhandled_future_error)
-        return job_id
+            return result
+        except Exception as e:
+            logger.error(f"[Job {jid}] Worker crashed during execution:\n{traceback.format_exc()}")
+            logger.error(
+                f"[Job {jid}] Worker crashed during execution: {e}",
+                exc_info=True,
+            )
+
+            if job is not None:
+                job.status = JobStatus.FAILED
+                job.error = str(e)
+                job.progress_message = f"分析失败: {str(e)}"
+                job.completed_at = datetime.now()
+            
+            # 持久化失败状态
+            if job is not None:
+                try:
+                    self.store.save_sync(job)
+                except Exception:
+                    logger.error(f"[Job {jid}] Failed to persist job state:\n{traceback.format_exc()}")
+
+                # Emit webhook event (best-effort, after persistence)
+                self._emit_job_notification(job)
+
+            if tracker is not None:
+                try:
+                    tracker.complete_job(jid, status="failed", error=str(e))
+                except Exception:
+                    logger.warning(
+                        f"[Job {jid}] Tracking complete (failed) failed",
+                        exc_info=True,
+                    )
+            raise
 
     def get_status(self, job_id: str, user_id: Optional[int] = None) -> Optional[JobResult]:
         """
@@ -510,9 +1007,11 @@ class JobManager:
                         logger.debug(f"[Job {job_id}] Expired, not restoring to memory")
                         return None  # Don't restore expired jobs
 
-                    # Restore to memory (respecting memory limit)
-                    self._enforce_memory_limit()
-                    self._jobs[job_id] = job
+                    # Restore to memory (respecting memory limit). In queue mode
+                    # the job runs in another process, so always re-read the store.
+                    if self._queue is None:
+                        self._enforce_memory_limit()
+                        self._jobs[job_id] = job
             except Exception as e:
                 logger.warning(f"Failed to fetch job {job_id} from store: {e}")
 
@@ -528,6 +1027,16 @@ class JobManager:
         attempts to recover from Redis.
         """
         job = self._jobs.get(job_id)
+        if job is None and self._queue is not None:
+            # 队列模式下任务在 worker 进程执行，结果只在 store 中
+            try:
+                persisted_job = self.store.get_sync(job_id)
+            except Exception as e:
+                logger.warning(f"[Job {job_id}] Failed to load result from Redis: {e}")
+                return None
+            if persisted_job and persisted_job.status == JobStatus.COMPLETED:
+                return persisted_job.result
+            return None
         if job and job.status == JobStatus.COMPLETED:
             # If result is in memory, return it
             if job.result is not None:
@@ -549,6 +1058,15 @@ class JobManager:
     
     def cancel(self, job_id: str) -> bool:
         """取消任务"""
+        if self._scheduler.cancel(job_id):
+            self._release_lease(job_id)
+            job = self._jobs.get(job_id)
+            if job:
+                job.status = JobStatus.CANCELLED
+                job.completed_at = datetime.now()
+                self._persist_job(job)
+            logger.info(f"Job {job_id} cancelled before start")
+            return True
         future = self._futures.get(job_id)
         if future and not future.done():
             cancelled = future.cancel()
@@ -559,7 +1077,25 @@ class JobManager:
                     job.completed_at = datetime.now()
                 logger.info(f"Job {job_id} cancelled")
             return cancelled
+        if self._queue is not None:
+            return self._cancel_queued(job_id)
         return False
+
+    def _cancel_queued(self, job_id: str) -> bool:
+        """取消仍在队列中等待的任务（已被 worker 开始执行的任务无法取消）"""
+        try:
+            job = self.store.get_sync(job_id)
+            if job is None or job.status != JobStatus.PENDING:
+                return False
+            self._queue.request_cancel(job_id)
+            job.status = JobStatus.CANCELLED
+            job.completed_at = datetime.now()
+            self.store.save_sync(job)
+        except Exception as e:
+            logger.warning(f"Failed to cancel queued job {job_id}: {e}")
+            return False
+        logger.info(f"Queued job {job_id} cancelled")
+        return True
     
     def list_jobs(
         self,
@@ -570,32 +1106,60 @@ class JobManager:
         """
         列出任务 (合并内存与持久化存储)
         """
-        # 1. 先获取内存中的任务
-        memory_jobs = list(self._jobs.values())
-        if user_id is not None:
-            memory_jobs = [j for j in memory_jobs if j.user_id == user_id]
-        if status:
-            memory_jobs = [j for j in memory_jobs if j.status == status]
-            
-        # 2. 如果内存任务不够，从 store 获取 - 使用同步方法避免事件循环冲突
-        if len(memory_jobs) < limit:
-            try:
-                persisted_jobs = self.store.list_sync(user_id=user_id, limit=limit)
-
-                # 合并并去重
-                seen_ids = {j.job_id for j in memory_jobs}
-                for pj in persisted_jobs:
-                    if pj.job_id not in seen_ids:
-                        if not status or pj.status == status:
-                            memory_jobs.append(pj)
-            except Exception as e:
-                logger.warning(f"Failed to list jobs from store: {e}")
-        
-        # 3. 按创建时间倒序排序
-        memory_jobs.sort(key=lambda x: x.created_at, reverse=True)
-        
-        return memory_jobs[:limit]
-    
+        return self.list_jobs_page(status=status, limit=limit, user_id=user_id).jobs
+
+    def list_jobs_page(
+        self,
+        status: Optional[JobStatus] = None,
+        limit: int = 50,
+        user_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> JobPage:
+        """
+        分页列出任务
+
+        持久化索引是分页的依据；内存中的任务状态更新更及时，覆盖同 ID 的持久化
+        版本，尚未落盘的新任务只并入第一页。
+        """
+        def matches(job: JobResult) -> bool:
+            if user_id is not None and job.user_id != user_id:
+                return False
+            return status is None or job.status == status
+
+        # 1. 从索引取一页 - 使用同步方法避免事件循环冲突
+        try:
+            page = self.store.list_page_sync(
+                user_id=user_id, limit=limit, cursor=cursor, status=status
+            )
+        except Exception as e:
+            logger.warning(f"Failed to list jobs from store: {e}")
+            page = JobPage(jobs=[])
+
+        # 2. 内存中的任务覆盖持久化版本
+        jobs = {job.job_id: self._jobs.get(job.job_id, job) for job in page.jobs}
+        jobs = {job_id: job for job_id, job in jobs.items() if matches(job)}
+
+        # 3. 第一页并入尚未出现在索引页中的内存任务（仅限本页时间范围内，避免跨页重复）
+        if cursor is None:
+            boundary = (
+                min(job.created_at for job in page.jobs)
+                if page.jobs and page.next_cursor else None
+            )
+            for job in list(self._jobs.values()):
+                if job.job_id in jobs or not matches(job):
+                    continue
+                if boundary is None or job.created_at > boundary:
+                    jobs[job.job_id] = job
+
+        # 4. 按创建时间倒序排序
+        ordered = sorted(jobs.values(), key=lambda x: x.created_at, reverse=True)
+        if len(ordered) > limit:
+            ordered = ordered[:limit]
+            next_cursor = repr(ordered[-1].created_at.timestamp())
+        else:
+            next_cursor = page.next_cursor
+        return JobPage(jobs=ordered, next_cursor=next_cursor)
+
     def add_chat_message(
         self,
         job_id: str,
@@ -671,33 +1235,88 @@ class JobManager:
     async def recover_jobs(self):
         """恢复持久化存储中的异常任务 (如重启导致的僵死任务)"""
         logger.info("Starting job recovery process...")
-        # 扫描所有任务
-        if hasattr(self.store, 'redis') and hasattr(self.store, 'prefix'):
-            keys = await self.store.redis._client.keys(f"{self.store.prefix}*")
+        if self._queue is not None:
+            # 队列模式下任务由 worker 执行，中断的任务由 worker 通过可见性超时接管
+            logger.info("Job recovery skipped: queue mode, stale jobs are reclaimed by workers")
+            return
+        # 通过任务索引查找未结束的任务
+        if hasattr(self.store, 'list_active'):
             recovered_count = 0
-            for key in keys:
-                job_id = key.split(":")[-1]
-                job = await self.store.get(job_id)
-                if job and job.status in [JobStatus.RUNNING, JobStatus.PENDING]:
-                    # 如果任务处于运行中或等待中但没有对应的线程在跑，说明是重启导致的僵死任务
-                    if job_id not in self._futures:
-                        logger.info(f"Marking zombie job {job_id} as FAILED due to system restart")
-                        job.status = JobStatus.FAILED
-                        job.error = "Job interrupted by system restart"
-                        job.completed_at = datetime.now()
-                        await self.store.save(job)
-                        recovered_count += 1
+            resumed_count = 0
+            jobs = await self.store.list_active()
+            while jobs:
+                # 租约仍被持有的任务属于存活进程（或刚退出进程的租约尚未过期），过期后再检查
+                leased: List[str] = []
+                for job in jobs:
+                    job_id = job.job_id
+                    if job.status not in [JobStatus.RUNNING, JobStatus.PENDING]:
+                        continue
+                    # 如果任务处于运行中或等待中但没有对应的线程在跑，且租约已过期，说明是僵死任务
+                    if job_id in self._futures or job_id in self._leases:
+                        continue
+                    if await self.store.lease_alive(job_id):
+                        leased.append(job_id)
+                        continue
+                    if await self._resume_job(job):
+                        resumed_count += 1
+                        continue
+                    logger.info(f"Marking zombie job {job_id} as FAILED due to system restart")
+                    job.status = JobStatus.FAILED
+                    job.error = "Job interrupted by system restart"
+                    job.completed_at = datetime.now()
+                    await self.store.save(job)
+                    recovered_count += 1
+
+                if not leased:
+                    break
+                logger.info(f"{len(leased)} active jobs hold a live lease; rechecking after expiry")
+                await asyncio.sleep(self.store.LEASE_TTL)
+                jobs = [job for job in [await self.store.get(jid) for jid in leased] if job]
             
+            if resumed_count > 0:
+                logger.info(f"Resubmitted {resumed_count} interrupted jobs for resume")
             if recovered_count > 0:
                 logger.info(f"Successfully recovered {recovered_count} zombie jobs")
-            else:
+            elif resumed_count == 0:
                 logger.info("No zombie jobs found to recover")
         else:
-            logger.warning("Job recovery skipped: store does not support key scanning")
+            logger.warning("Job recovery skipped: store does not support listing active jobs")
+
+    async def _resume_job(self, job: JobResult) -> bool:
+        """重新提交可恢复的中断任务（同一 job_id）；不可恢复时返回 False"""
+        if not is_resumable_handler(job.task) or job.payload is None:
+            return False
+        if job.resume_count >= self._max_resumes:
+            logger.info(
+                f"[Job {job.job_id}] Not resuming: already resumed {job.resume_count} times"
+            )
+            return False
+        if not self.store.acquire_lease_sync(job.job_id, self._lease_owner, exclusive=True):
+            # 另一个进程已抢到租约并接手（视为已处理，不标记失败）
+            return True
+
+        job.status = JobStatus.PENDING
+        job.error = None
+        job.resume_count += 1
+        job.progress_message = "任务因系统重启中断，正在从检查点恢复..."
+        await self.store.save(job)
+
+        self._enforce_memory_limit()
+        self._jobs[job.job_id] = job
+        self._submit_local(
+            job.job_id, get_job_handler(job.task), (), dict(job.payload),
+            user_id=job.user_id, tier=job.tier, admitted=False,
+        )
+        logger.info(
+            f"[Job {job.job_id}] Resubmitted interrupted {job.task} job "
+            f"(resume {job.resume_count}/{self._max_resumes})"
+        )
+        return True
 
     def shutdown(self, wait: bool = True) -> None:
         """关闭线程池"""
         self._executor.shutdown(wait=wait)
+        self._lease_stop.set()
         logger.info("JobManager shutdown")
 
 
@@ -0,0 +1,327 @@
+"""
+Job Queue - 基于 Redis Streams 的分布式任务队列
+
+JobManager 的可选执行模式（FAIC_JOB_EXECUTION_MODE=queue）：API 进程只负责入队，
+独立的 worker 进程（python -m AICrews.infrastructure.jobs.worker）消费并执行。
+
+设计:
+- 每个优先级一个 stream（jobs:queue:high / normal / low），共享消费组 crew-workers
+- 领取时按优先级依次非阻塞读取，全部为空时在所有 stream 上阻塞等待
+- 可见性超时：执行中的 worker 定期 XCLAIM 续约；worker 崩溃后条目空闲超时，
+  由其他 worker 通过 XAUTOCLAIM 接管重新执行
+- 投递次数超过上限的条目标记为失败并确认（避免毒消息无限重试）
+- 执行成功或失败后 XACK + XDEL（stream 长度即排队 + 执行中的任务数）
+- 取消：写入 job:cancel:<job_id> 标记，worker 领取时跳过
+
+任务通过名称注册处理函数（进程间只传递 JSON 参数，不传递闭包）:
+
+    @register_job_handler("crew_run")
+    def run_crew_job(job_id: str, *, crew_id: int, ...) -> str:
+        ...
+"""
+
+import json
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from AICrews.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# =============================================================================
+# 处理函数注册
+# =============================================================================
+
+JobHandler = Callable[..., Any]
+
+_job_handlers: Dict[str, JobHandler] = {}
+# 中断后可用原 job_id 与 payload 重新执行的处理函数（自行跳过已完成的部分）
+_resumable_handlers: Set[str] = set()
+
+
+def register_job_handler(name: str, *, resumable: bool = False) -> Callable[[JobHandler], JobHandler]:
+    """注册可排队执行的任务处理函数（签名: handler(job_id, **payload)）
+
+    resumable=True 表示进程重启后 JobManager.recover_jobs 可以重新提交该任务，
+    而不是标记为失败。
+    """
+    def decorator(func: JobHandler) -> JobHandler:
+        _job_handlers[name] = func
+        if resumable:
+            _resumable_handlers.add(name)
+        else:
+            _resumable_handlers.discard(name)
+        return func
+    return decorator
+
+
+def is_resumable_handler(name: Optional[str]) -> bool:
+    return name in _resumable_handlers and name in _job_handlers
+
+
+def get_job_handler(name: str) -> JobHandler:
+    handler = _job_handlers.get(name)
+    if handler is None:
+        raise KeyError(f"No job handler registered for task '{name}'")
+    return handler
+
+
+# =============================================================================
+# 优先级
+# =============================================================================
+
+PRIORITIES: Tuple[str, ...] = ("high", "normal", "low")
+DEFAULT_PRIORITY = "normal"
+
+
+def _parse_tier_priorities(raw: str) -> Dict[str, str]:
+    mapping: Dict[str, str] = {}
+    for item in raw.split(","):
+        tier, _, priority = item.partition(":")
+        tier, priority = tier.strip().lower(), priority.strip().lower()
+        if tier and priority in PRIORITIES:
+            mapping[tier] = priority
+    return mapping
+
+
+TIER_PRIORITIES = _parse_tier_priorities(
+    os.getenv("FAIC_JOB_QUEUE_TIER_PRIORITIES", "pro:high,starter:normal,free:low")
+)
+
+
+def priority_for_tier(tier: Optional[str]) -> str:
+    """权益等级 -> 队列优先级"""
+    if not tier:
+        return DEFAULT_PRIORITY
+    return TIER_PRIORITIES.get(str(getattr(tier, "value", tier)).lower(), DEFAULT_PRIORITY)
+
+
+# =============================================================================
+# 队列
+# =============================================================================
+
+@dataclass
+class QueuedJob:
+    """从队列领取的任务"""
+    job_id: str
+    task: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    priority: str = DEFAULT_PRIORITY
+    stream: str = ""
+    entry_id: str = ""
+    deliveries: int = 1
+    tier: str = ""
+    enqueued_at: float = 0.0
+
+
+class RedisJobQueue:
+    """Redis Streams 任务队列（同步接口，供 API 线程与 worker 线程使用）"""
+
+    STREAM_PREFIX = "jobs:queue:"
+    GROUP = "crew-workers"
+    CANCEL_PREFIX = "job:cancel:"
+
+    def __init__(
+        self,
+        redis_manager: Any = None,
+        visibility_timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        if redis_manager is None:
+            from AICrews.infrastructure.cache.redis_manager import get_redis_manager
+
+            redis_manager = get_redis_manager()
+        self.redis = redis_manager
+        self.visibility_timeout = visibility_timeout if visibility_timeout is not None else float(
+            os.getenv("FAIC_JOB_QUEUE_VISIBILITY_SECONDS", "300")
+        )
+        self.max_attempts = max_attempts if max_attempts is not None else int(
+            os.getenv("FAIC_JOB_QUEUE_MAX_ATTEMPTS", "3")
+        )
+        self._groups_ready = False
+
+    @property
+    def client(self) -> Any:
+        client = self.redis._sync_client
+        if client is None:
+            raise RuntimeError("Redis is not initialized; job queue unavailable")
+        return client
+
+    def stream_key(self, priority: str) -> str:
+        return f"{self.STREAM_PREFIX}{priority}"
+
+    @property
+    def streams(self) -> List[str]:
+        return [self.stream_key(p) for p in PRIORITIES]
+
+    def ensure_groups(self) -> None:
+        """创建消费组（幂等）"""
+        if self._groups_ready:
+            return
+        for stream in self.streams:
+            try:
+                self.client.xgroup_create(stream, self.GROUP, id="0", mkstream=True)
+            except Exception as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+        self._groups_ready = True
+
+    # =========================================================================
+    # 生产者
+    # =========================================================================
+
+    def enqueue(
+        self,
+        job_id: str,
+        task: str,
+        payload: Dict[str, Any],
+        priority: str = DEFAULT_PRIORITY,
+        tier: Optional[str] = None,
+    ) -> str:
+        """入队，返回 stream entry id（tier 仅用于 worker 侧的排队时长指标）"""
+        if priority not in PRIORITIES:
+            priority = DEFAULT_PRIORITY
+        self.ensure_groups()
+        return self.client.xadd(
+            self.stream_key(priority),
+            {
+                "job_id": job_id,
+                "task": task,
+                "payload": json.dumps(payload, default=str),
+                "enqueued_at": f"{time.time():.3f}",
+                "tier": str(getattr(tier, "value", tier) or ""),
+            },
+        )
+
+    def backlog(self) -> int:
+        """所有优先级 stream 的条目总数（排队 + 执行中，已确认的条目会被 XDEL）"""
+        pipe = self.client.pipeline(transaction=False)
+        for stream in self.streams:
+            pipe.xlen(stream)
+        return sum(int(n or 0) for n in pipe.execute())
+
+    def request_cancel(self, job_id: str) -> None:
+        ttl = int(max(self.visibility_timeout * self.max_attempts, 3600))
+        self.client.set(f"{self.CANCEL_PREFIX}{job_id}", "1", ex=ttl)
+
+    def is_cancelled(self, job_id: str) -> bool:
+        return bool(self.client.exists(f"{self.CANCEL_PREFIX}{job_id}"))
+
+    # =========================================================================
+    # 消费者
+    # =========================================================================
+
+    def claim(self, consumer: str, block_ms: int = 2000) -> List[QueuedJob]:
+        """按优先级领取任务；无任务时最多阻塞 block_ms 毫秒
+
+        通常返回一个任务。阻塞读取同时监听所有 stream，若多个 stream 同时到达
+        会各返回一条（按优先级排序），调用方需持有并续约全部返回的任务。
+        """
+        self.ensure_groups()
+        for stream in self.streams:
+            jobs = self._read(consumer, {stream: ">"}, block_ms=None)
+            if jobs:
+                return jobs
+        jobs = self._read(consumer, {s: ">" for s in self.streams}, block_ms=block_ms)
+        return sorted(jobs, key=lambda job: PRIORITIES.index(job.priority))
+
+    def _read(
+        self, consumer: str, streams: Dict[str, str], block_ms: Optional[int]
+    ) -> List[QueuedJob]:
+        response = self.client.xreadgroup(
+            self.GROUP, consumer, streams, count=1, block=block_ms
+        )
+        return [
+            self._to_job(stream, entry_id, fields, deliveries=1)
+            for stream, entries in response or []
+            for entry_id, fields in entries
+        ]
+
+    def reclaim_stale(self, consumer: str, count: int = 10) -> List[QueuedJob]:
+        """接管超过可见性超时未续约的条目（原 worker 已崩溃或失联）"""
+        self.ensure_groups()
+        min_idle_ms = int(self.visibility_timeout * 1000)
+        reclaimed: List[QueuedJob] = []
+        for stream in self.streams:
+            result = self.client.xautoclaim(
+                stream, self.GROUP, consumer, min_idle_ms, start_id="0-0", count=count
+            )
+            entries = result[1] if result and len(result) > 1 else []
+            for entry_id, fields in entries:
+                if not fields:
+                    # 条目已被 XDEL（例如任务已被确认），仅清理 PEL
+                    self.client.xack(stream, self.GROUP, entry_id)
+                    continue
+                reclaimed.append(
+                    self._to_job(stream, entry_id, fields, deliveries=self._deliveries(stream, entry_id))
+                )
+        return reclaimed
+
+    def _deliveries(self, stream: str, entry_id: str) -> int:
+        try:
+            pending = self.client.xpending_range(
+                stream, self.GROUP, min=entry_id, max=entry_id, count=1
+            )
+            if pending:
+                return int(pending[0].get("times_delivered", 1))
+        except Exception as e:
+            logger.debug(f"XPENDING failed for {stream} {entry_id}: {e}")
+        return 1
+
+    def touch(self, job: QueuedJob, consumer: str) -> None:
+        """续约：重置条目空闲时间，防止执行中的长任务被其他 worker 接管"""
+        self.client.xclaim(
+            job.stream, self.GROUP, consumer, 0, [job.entry_id], justid=True
+        )
+
+    def ack(self, job: QueuedJob) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.xack(job.stream, self.GROUP, job.entry_id)
+        pipe.xdel(job.stream, job.entry_id)
+        pipe.delete(f"{self.CANCEL_PREFIX}{job.job_id}")
+        pipe.execute()
+
+    def _to_job(
+        self, stream: str, entry_id: str, fields: Dict[str, str], deliveries: int
+    ) -> QueuedJob:
+        try:
+            payload = json.loads(fields.get("payload") or "{}")
+        except ValueError:
+            payload = {}
+        try:
+            enqueued_at = float(fields.get("enqueued_at") or 0.0)
+        except ValueError:
+            enqueued_at = 0.0
+        return QueuedJob(
+            job_id=fields.get("job_id", ""),
+            task=fields.get("task", ""),
+            payload=payload,
+            priority=stream[len(self.STREAM_PREFIX):],
+            stream=stream,
+            entry_id=entry_id,
+            deliveries=deliveries,
+            tier=fields.get("tier", ""),
+            enqueued_at=enqueued_at,
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {}
+        for priority in PRIORITIES:
+            stream = self.stream_key(priority)
+            try:
+                pending = self.client.xpending(stream, self.GROUP)
+                stats[priority] = {
+                    "length": self.client.xlen(stream),
+                    "pending": (pending or {}).get("pending", 0),
+                }
+            except Exception:
+                stats[priority] = {"length": 0, "pending": 0}
+        return stats
+
+
+def default_consumer_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
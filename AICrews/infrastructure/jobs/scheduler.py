@@ -0,0 +1,362 @@
+"""
+Job Scheduler - 线程模式下的多租户公平调度与准入控制
+
+JobManager 的线程池此前按 FIFO 执行：单个用户批量提交即可占满所有 worker，
+付费用户的任务只能排在后面。调度器位于线程池之前：
+- 准入：全局排队长度上限（FAIC_JOB_MAX_QUEUE_LENGTH）与每用户排队上限，
+  超限立即抛出 JobAdmissionError（HTTP 层映射为 429），不创建任务记录
+- 并发：每用户同时执行的任务数上限，占满时该用户的任务继续排队，不占用执行槽
+- 公平：按用户分队列，以权益等级的 queue_weight 做加权差额轮询（DRR），
+  高等级用户每轮获得更多执行机会，低等级用户不会饿死
+- 指标：排队等待时长（job_queue_wait_seconds{tier}）、拒绝次数与排队深度
+
+每用户上限与权重来自 config/entitlements.yaml 的 tiers.<tier>.limits，
+经 EntitlementPolicyEngine 读取；权益配置重载时（失效总线 entitlements namespace）
+清空本地缓存。
+
+仅在工作槽空闲时才把任务交给线程池，因此线程池内部不会再积压任务。
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from AICrews.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_TIER = "free"
+
+
+class JobAdmissionError(Exception):
+    """任务未通过准入控制（队列已满或超出用户配额）"""
+
+    def __init__(self, message: str, *, reason: str, retry_after: int = 5):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class TenantLimits:
+    """单个用户的调度配额"""
+    max_concurrent_runs: int = 1
+    max_queued_runs: int = 2
+    queue_weight: int = 1
+
+
+@dataclass
+class _PendingJob:
+    job_id: str
+    start: Callable[[], None]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _TenantQueue:
+    tier: str
+    limits: TenantLimits
+    pending: Deque[_PendingJob] = field(default_factory=deque)
+    running: int = 0
+    deficit: int = 0
+
+
+def _tier_name(tier: Any) -> str:
+    return str(getattr(tier, "value", tier) or DEFAULT_TIER).lower()
+
+
+class EntitlementsLimitsResolver:
+    """按权益等级读取调度配额（带进程内缓存）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache: Dict[str, TenantLimits] = {}
+        self._engine: Any = None
+        self._register_invalidation()
+
+    def __call__(self, tier: str) -> TenantLimits:
+        limits = self._cache.get(tier)
+        if limits is not None:
+            return limits
+        with self._lock:
+            limits = self._cache.get(tier)
+            if limits is None:
+                limits = self._load(tier)
+                self._cache[tier] = limits
+        return limits
+
+    def _load(self, tier: str) -> TenantLimits:
+        try:
+            if self._engine is None:
+                from AICrews.services.entitlements.policy_engine import EntitlementPolicyEngine
+
+                self._engine = EntitlementPolicyEngine()
+            tier_limits = self._engine.tier_limits(tier)
+            return TenantLimits(
+                max_concurrent_runs=tier_limits.max_concurrent_runs,
+                max_queued_runs=tier_limits.max_queued_runs,
+                queue_weight=tier_limits.queue_weight,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to load scheduling limits for tier {tier}, using defaults: {e}")
+            return TenantLimits()
+
+    def clear(self, _keys=None) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _register_invalidation(self) -> None:
+        try:
+            from AICrews.infrastructure.cache.invalidation_bus import get_invalidation_bus
+            from AICrews.services.entitlements.config_loader import ENTITLEMENTS_CACHE_NAMESPACE
+
+            get_invalidation_bus().register(ENTITLEMENTS_CACHE_NAMESPACE, self.clear)
+        except Exception as e:
+            logger.debug(f"Scheduling limits will not follow entitlements reloads: {e}")
+
+
+class FairJobScheduler:
+    """按用户加权公平地把任务分派到有限的执行槽"""
+
+    def __init__(
+        self,
+        max_running: int,
+        max_queue_length: Optional[int] = None,
+        limits_resolver: Optional[Callable[[str], TenantLimits]] = None,
+    ):
+        self.max_running = max_running
+        self.max_queue_length = max_queue_length if max_queue_length is not None else int(
+            os.getenv("FAIC_JOB_MAX_QUEUE_LENGTH", "100")
+        )
+        self._resolve_limits = limits_resolver or EntitlementsLimitsResolver()
+
+        self._lock = threading.Lock()
+        self._tenants: Dict[str, _TenantQueue] = {}
+        # 有待执行任务的用户，按轮询顺序排列
+        self._active: Deque[str] = deque()
+        # job_id -> 租户 key（排队中与执行中的任务）
+        self._owners: Dict[str, str] = {}
+        self._queued = 0
+        self._running = 0
+        self._stats = {"admitted": 0, "rejected": 0, "dispatched": 0, "cancelled": 0}
+
+    @staticmethod
+    def tenant_key(user_id: Optional[int]) -> str:
+        return f"user:{user_id}" if user_id is not None else "anonymous"
+
+    # =========================================================================
+    # 准入
+    # =========================================================================
+
+    def submit(
+        self,
+        job_id: str,
+        start: Callable[[], None],
+        *,
+        user_id: Optional[int],
+        tier: Optional[str],
+    ) -> None:
+        """登记任务并在有空闲槽时立即启动
+
+        start 在调度器锁之外调用，负责把任务交给线程池；任务结束后调用方必须调用
+        release(job_id) 归还执行槽。
+
+        Raises:
+            JobAdmissionError: 全局队列已满或超出该用户的排队配额
+        """
+        self.admit(user_id=user_id, tier=tier, job_id=job_id, start=start)
+        self._drain()
+
+    def admit(
+        self,
+        *,
+        user_id: Optional[int],
+        tier: Optional[str],
+        job_id: Optional[str] = None,
+        start: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """检查准入；提供 job_id 与 start 时同时登记任务（不启动）"""
+        tier_name = _tier_name(tier)
+        limits = self._resolve_limits(tier_name)
+        key = self.tenant_key(user_id)
+
+        with self._lock:
+            tenant = self._tenants.get(key)
+            queued = len(tenant.pending) if tenant else 0
+            running = tenant.running if tenant else 0
+            # 能立即执行的任务不计入排队配额
+            will_wait = running >= limits.max_concurrent_runs or self._running >= self.max_running
+
+            reason = None
+            if will_wait and self._queued >= self.max_queue_length:
+                reason = "queue_full"
+            elif will_wait and queued >= limits.max_queued_runs:
+                reason = "user_limit"
+            if reason is not None:
+                self._stats["rejected"] += 1
+            elif job_id is not None and start is not None:
+                if tenant is None:
+                    tenant = _TenantQueue(tier=tier_name, limits=limits)
+                    self._tenants[key] = tenant
+                # 等级变化（升级/降级）从下一个任务开始生效
+                tenant.tier, tenant.limits = tier_name, limits
+                if not tenant.pending:
+                    self._active.append(key)
+                tenant.pending.append(_PendingJob(job_id=job_id, start=start))
+                self._owners[job_id] = key
+                self._queued += 1
+                self._stats["admitted"] += 1
+
+        if reason is not None:
+            self.record_rejection(tier_name, reason)
+            if reason == "queue_full":
+                raise JobAdmissionError(
+                    "Job queue is full, please retry later", reason=reason, retry_after=10
+                )
+            raise JobAdmissionError(
+                f"Too many pending jobs for this account (limit {limits.max_queued_runs} "
+                f"queued, {limits.max_concurrent_runs} running)",
+                reason=reason,
+            )
+
+    # =========================================================================
+    # 分派
+    # =========================================================================
+
+    def release(self, job_id: str) -> None:
+        """任务结束（成功、失败或取消）后归还执行槽并分派后续任务"""
+        with self._lock:
+            key = self._owners.pop(job_id, None)
+            tenant = self._tenants.get(key) if key else None
+            if tenant is None:
+                return
+            tenant.running = max(0, tenant.running - 1)
+            self._running = max(0, self._running - 1)
+            if not tenant.running and not tenant.pending:
+                del self._tenants[key]
+        self._drain()
+
+    def cancel(self, job_id: str) -> bool:
+        """移除仍在排队的任务；已开始执行的任务返回 False"""
+        with self._lock:
+            key = self._owners.get(job_id)
+            tenant = self._tenants.get(key) if key else None
+            if tenant is None:
+                return False
+            for item in tenant.pending:
+                if item.job_id == job_id:
+                    tenant.pending.remove(item)
+                    break
+            else:
+                return False
+            del self._owners[job_id]
+            self._queued -= 1
+            self._stats["cancelled"] += 1
+            if not tenant.pending:
+                self._active.remove(key)
+                tenant.deficit = 0
+                if not tenant.running:
+                    del self._tenants[key]
+        self._update_depth()
+        return True
+
+    def _drain(self) -> None:
+        started: List[tuple] = []
+        with self._lock:
+            while self._running < self.max_running:
+                picked = self._next_locked()
+                if picked is None:
+                    break
+                started.append(picked)
+
+        for tier, item in started:
+            wait = time.monotonic() - item.enqueued_at
+            self._observe_wait(tier, wait)
+            try:
+                item.start()
+            except Exception as e:
+                logger.error(f"[Job {item.job_id}] Failed to start scheduled job: {e}", exc_info=True)
+                self.release(item.job_id)
+        self._update_depth()
+
+    def _next_locked(self):
+        """加权差额轮询：每轮每个用户最多启动 queue_weight 个任务"""
+        for _ in range(len(self._active)):
+            key = self._active[0]
+            tenant = self._tenants[key]
+            if tenant.running >= tenant.limits.max_concurrent_runs:
+                # 已达并发上限的用户让出本轮，不累积额度
+                tenant.deficit = 0
+                self._active.rotate(-1)
+                continue
+
+            if tenant.deficit <= 0:
+                tenant.deficit = tenant.limits.queue_weight
+            tenant.deficit -= 1
+            item = tenant.pending.popleft()
+            tenant.running += 1
+            self._running += 1
+            self._queued -= 1
+            self._stats["dispatched"] += 1
+
+            if not tenant.pending:
+                self._active.popleft()
+                tenant.deficit = 0
+            elif tenant.deficit <= 0:
+                self._active.rotate(-1)
+            return tenant.tier, item
+        return None
+
+    # =========================================================================
+    # 指标
+    # =========================================================================
+
+    @staticmethod
+    def record_rejection(tier: str, reason: str) -> None:
+        logger.info(f"Job admission rejected: tier={tier}, reason={reason}")
+        try:
+            from AICrews.infrastructure.metrics import get_job_scheduler_metrics
+
+            get_job_scheduler_metrics().record_rejection(tier, reason)
+        except Exception:
+            pass
+
+    @staticmethod
+    def _observe_wait(tier: str, wait_seconds: float) -> None:
+        try:
+            from AICrews.infrastructure.metrics import get_job_scheduler_metrics
+
+            get_job_scheduler_metrics().observe_wait(tier, wait_seconds)
+        except Exception:
+            pass
+
+    def _queue_depth(self) -> Dict[str, int]:
+        with self._lock:
+            depth: Dict[str, int] = {}
+            for tenant in self._tenants.values():
+                depth[tenant.tier] = depth.get(tenant.tier, 0) + len(tenant.pending)
+            return depth
+
+    def _update_depth(self) -> None:
+        try:
+            from AICrews.infrastructure.metrics import get_job_scheduler_metrics
+
+            depth = {tier: 0 for tier in ("free", "starter", "pro")}
+            depth.update(self._queue_depth())
+            get_job_scheduler_metrics().update_queue_depth(depth)
+        except Exception:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                **self._stats,
+                "queued": self._queued,
+                "running": self._running,
+                "tenants": len(self._tenants),
+            }
+        stats["queued_by_tier"] = self._queue_depth()
+        return stats
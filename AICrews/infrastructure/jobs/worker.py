@@ -0,0 +1,242 @@
+"""
+Job Worker - 队列模式下的独立任务执行进程
+
+从 Redis Streams 队列领取任务并在本进程线程池中执行，与 HTTP 层分开水平扩展。
+API 进程需设置 FAIC_JOB_EXECUTION_MODE=queue 才会把任务入队。
+
+运行:
+    python -m AICrews.infrastructure.jobs.worker --concurrency 4
+
+环境变量:
+- FAIC_JOB_WORKER_CONCURRENCY: 并发执行的任务数（默认 3）
+- FAIC_JOB_HANDLER_MODULES: 启动时导入以注册任务处理函数的模块（逗号分隔）
+- FAIC_JOB_QUEUE_VISIBILITY_SECONDS / FAIC_JOB_QUEUE_MAX_ATTEMPTS: 见 job_queue
+"""
+
+import argparse
+import importlib
+import os
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Optional
+
+from AICrews.infrastructure.jobs.job_manager import JobManager, get_job_manager
+from AICrews.infrastructure.jobs.job_queue import (
+    QueuedJob,
+    RedisJobQueue,
+    default_consumer_name,
+    get_job_handler,
+)
+from AICrews.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_HANDLER_MODULES = (
+    "AICrews.application.crew.crew_run_job,"
+    "AICrews.services.analysis_service"
+)
+
+
+class JobWorker:
+    """队列消费者：领取、续约、执行并确认任务"""
+
+    # 两次接管过期条目之间的间隔（秒）
+    RECLAIM_INTERVAL = 30.0
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        queue: Optional[RedisJobQueue] = None,
+        job_manager: Optional[JobManager] = None,
+        consumer: Optional[str] = None,
+        block_ms: int = 2000,
+    ):
+        self.concurrency = concurrency or int(os.getenv("FAIC_JOB_WORKER_CONCURRENCY", "3"))
+        self.queue = queue or RedisJobQueue()
+        self.job_manager = job_manager or get_job_manager()
+        self.consumer = consumer or default_consumer_name()
+        self.block_ms = block_ms
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="faic-job-worker"
+        )
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._stop = threading.Event()
+        self._held_lock = threading.Lock()
+        # 已领取（执行中或待执行）的条目，心跳线程为其续约
+        self._held: Dict[str, QueuedJob] = {}
+        self._backlog: Deque[QueuedJob] = deque()
+        self._stats = {"completed": 0, "failed": 0, "skipped": 0, "reclaimed": 0}
+
+    # =========================================================================
+    # 主循环
+    # =========================================================================
+
+    def run(self) -> None:
+        self.queue.ensure_groups()
+        heartbeat = threading.Thread(target=self._heartbeat, name="faic-job-heartbeat", daemon=True)
+        heartbeat.start()
+        logger.info(
+            f"Job worker started: consumer={self.consumer}, concurrency={self.concurrency}"
+        )
+
+        last_reclaim = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - last_reclaim > self.RECLAIM_INTERVAL:
+                    last_reclaim = time.monotonic()
+                    reclaimed = self.queue.reclaim_stale(self.consumer)
+                    if reclaimed:
+                        self._stats["reclaimed"] += len(reclaimed)
+                        logger.info(f"Reclaimed {len(reclaimed)} stale queue entries")
+                        self._hold(reclaimed)
+
+                if not self._slots.acquire(timeout=1.0):
+                    continue
+                job = self._backlog.popleft() if self._backlog else None
+                if job is None:
+                    claimed = self.queue.claim(self.consumer, block_ms=self.block_ms)
+                    self._hold(claimed)
+                    job = self._backlog.popleft() if self._backlog else None
+                if job is None:
+                    self._slots.release()
+                    continue
+                self._dispatch(job)
+            except Exception as e:
+                logger.error(f"Job worker loop error: {e}", exc_info=True)
+                time.sleep(1.0)
+
+        logger.info("Job worker stopping; waiting for running jobs to finish")
+        self._executor.shutdown(wait=True)
+        logger.info(f"Job worker stopped: {self._stats}")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _hold(self, jobs) -> None:
+        with self._held_lock:
+            for job in jobs:
+                self._held[job.entry_id] = job
+                self._backlog.append(job)
+
+    def _release(self, job: QueuedJob) -> None:
+        with self._held_lock:
+            self._held.pop(job.entry_id, None)
+
+    # =========================================================================
+    # 执行
+    # =========================================================================
+
+    def _dispatch(self, job: QueuedJob) -> None:
+        """在持有一个执行槽的前提下处理领取到的条目"""
+        skip_reason = None
+        if self.queue.is_cancelled(job.job_id):
+            skip_reason = "cancelled"
+        elif job.deliveries > self.queue.max_attempts:
+            skip_reason = "max_attempts"
+            self.job_manager.mark_failed(
+                job.job_id, f"Job abandoned after {job.deliveries - 1} interrupted attempts"
+            )
+        else:
+            try:
+                get_job_handler(job.task)
+            except KeyError as e:
+                skip_reason = "unknown_task"
+                self.job_manager.mark_failed(job.job_id, str(e))
+
+        if skip_reason is not None:
+            logger.info(f"[Job {job.job_id}] Skipped queue entry ({skip_reason})")
+            self._stats["skipped"] += 1
+            self._finish(job)
+            return
+
+        self._observe_wait(job)
+        self._executor.submit(self._execute, job)
+
+    @staticmethod
+    def _observe_wait(job: QueuedJob) -> None:
+        # 仅统计首次投递：接管重试的等待时间包含前一个 worker 的执行时长
+        if not job.enqueued_at or job.deliveries > 1:
+            return
+        try:
+            from AICrews.infrastructure.metrics import get_job_scheduler_metrics
+
+            get_job_scheduler_metrics().observe_wait(
+                job.tier or "unknown", max(0.0, time.time() - job.enqueued_at)
+            )
+        except Exception:
+            pass
+
+    def _execute(self, job: QueuedJob) -> None:
+        try:
+            self.job_manager.run_queued(job)
+            self._stats["completed"] += 1
+        except Exception:
+            # 失败状态已由 JobManager 持久化；执行失败不重试，只有进程中断才会重新投递
+            self._stats["failed"] += 1
+        finally:
+            self._finish(job)
+
+    def _finish(self, job: QueuedJob) -> None:
+        try:
+            self.queue.ack(job)
+        except Exception as e:
+            logger.warning(f"[Job {job.job_id}] Failed to ack queue entry: {e}")
+        self._release(job)
+        self._slots.release()
+
+    def _heartbeat(self) -> None:
+        # 停止后仍需为收尾中的任务续约，因此不随 _stop 退出（守护线程随进程结束）
+        interval = max(1.0, self.queue.visibility_timeout / 3)
+        while True:
+            time.sleep(interval)
+            with self._held_lock:
+                held = list(self._held.values())
+            for job in held:
+                try:
+                    self.queue.touch(job, self.consumer)
+                except Exception as e:
+                    logger.debug(f"[Job {job.job_id}] Heartbeat failed: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._held_lock:
+            held = len(self._held)
+        return {**self._stats, "held": held}
+
+
+def _import_handler_modules() -> None:
+    modules = os.getenv("FAIC_JOB_HANDLER_MODULES", DEFAULT_HANDLER_MODULES)
+    for module in filter(None, (m.strip() for m in modules.split(","))):
+        importlib.import_module(module)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the crew job queue worker")
+    parser.add_argument("--concurrency", type=int, default=None, help="Concurrent jobs")
+    args = parser.parse_args()
+
+    from AICrews.observability.logging import configure_logging
+    from AICrews.infrastructure.cache.redis_manager import get_redis_manager
+    from AICrews.tools.async_runner import run_sync
+
+    configure_logging()
+    # 异步 Redis 客户端绑定到共享事件循环，工具调用的协程同样运行在该循环上
+    run_sync(get_redis_manager().init(), name="init_redis")
+    _import_handler_modules()
+
+    worker = JobWorker(concurrency=args.concurrency)
+
+    def _handle_signal(signum, _frame) -> None:
+        logger.info(f"Received signal {signum}; draining")
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, _handle_signal)
+    signal.signal(signal.SIGINT, _handle_signal)
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
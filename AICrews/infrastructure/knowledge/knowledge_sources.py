@@ -29,6 +29,7 @@ from pydantic import Field
 
 from AICrews.database.db_manager import DBManager
 from AICrews.database.vector_utils import VectorUtil
+from AICrews.infrastructure.cache.invalidation_bus import get_invalidation_bus
 from AICrews.observability.logging import get_logger
 
 logger = get_logger(__name__)
@@ -295,9 +296,37 @@ def clear_knowledge_cache():
     """清除知识源缓存（用于测试或重新加载）"""
     global _knowledge_source_cache
     _knowledge_source_cache.clear()
+    get_invalidation_bus().tags.clear(KNOWLEDGE_CACHE_NAMESPACE)
     logger.info("Knowledge source cache cleared")
 
 
+# 跨 worker 失效：知识源更新/删除时按 knowledge:<type>:<id> 标签失效
+KNOWLEDGE_CACHE_NAMESPACE = "knowledge_source"
+
+
+def _knowledge_source_tag(source_type: str, source_id: int) -> str:
+    return f"knowledge:{source_type}:{source_id}"
+
+
+def _drop_knowledge_sources(keys: Optional[Set[str]]) -> None:
+    if keys is None:
+        _knowledge_source_cache.clear()
+        return
+    for key in keys:
+        _knowledge_source_cache.pop(key, None)
+
+
+def invalidate_knowledge_source(source_type: str, source_id: int) -> None:
+    """失效所有 worker 中该知识源的缓存实例"""
+    get_invalidation_bus().publish_sync(
+        KNOWLEDGE_CACHE_NAMESPACE,
+        tags=[_knowledge_source_tag(source_type, source_id)],
+    )
+
+
+get_invalidation_bus().register(KNOWLEDGE_CACHE_NAMESPACE, _drop_knowledge_sources)
+
+
 class KnowledgeLoader:
     """
     知识加载器 - 根据配置加载 CrewAI Knowledge Sources
@@ -430,6 +459,11 @@ class KnowledgeLoader:
         try:
             ks = FileKnowledgeSourceFactory.create_from_config(source)
             _knowledge_source_cache[cache_key] = ks
+            get_invalidation_bus().tag(
+                KNOWLEDGE_CACHE_NAMESPACE,
+                cache_key,
+                _knowledge_source_tag(source_type, source.id),
+            )
             logger.info(f"Created knowledge source: {source.display_name}")
             return ks
         except Exception as e:
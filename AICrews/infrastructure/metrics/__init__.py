@@ -6,6 +6,14 @@ from .prometheus_metrics import (
     set_shared_registry,
     MemoryManagementMetrics,
     get_memory_metrics,
+    CacheMetrics,
+    get_cache_metrics,
+    ToolCallMetrics,
+    get_tool_call_metrics,
+    JobSchedulerMetrics,
+    get_job_scheduler_metrics,
+    RedisMetrics,
+    get_redis_metrics,
 )
 from .llm_routing_metrics import (
     LLMRoutingMetrics,
@@ -18,6 +26,14 @@ __all__ = [
     "set_shared_registry",
     "MemoryManagementMetrics",
     "get_memory_metrics",
+    "CacheMetrics",
+    "get_cache_metrics",
+    "ToolCallMetrics",
+    "get_tool_call_metrics",
+    "JobSchedulerMetrics",
+    "get_job_scheduler_metrics",
+    "RedisMetrics",
+    "get_redis_metrics",
     "LLMRoutingMetrics",
     "get_llm_routing_metrics",
 ]
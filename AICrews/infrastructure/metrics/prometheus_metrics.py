@@ -295,3 +295,255 @@ def get_memory_metrics(registry: CollectorRegistry = None) -> MemoryManagementMe
         _memory_metrics_instance = MemoryManagementMetrics(registry=registry)
     return _memory_metrics_instance
 
+
+
+class CacheMetrics:
+    """进程内缓存命中率指标
+
+    Labels are cache names only (e.g. 'quant_indicators'), never keys.
+    """
+
+    def __init__(self, registry: CollectorRegistry = None):
+        """
+        初始化缓存指标
+
+        Args:
+            registry: Prometheus registry，如果为 None 则使用默认 registry
+        """
+        self.registry = registry
+
+        self.cache_requests_total = Counter(
+            'cache_requests_total',
+            'Cache lookups by result',
+            # result: hit, miss; layered caches also report l1_hit, l2_hit, stale, negative
+            ['cache_name', 'result'],
+            registry=self.registry
+        )
+        self.cache_evictions_total = Counter(
+            'cache_evictions_total',
+            'Entries evicted from bounded caches',
+            ['cache_name'],
+            registry=self.registry
+        )
+        self.cache_load_duration_seconds = Histogram(
+            'cache_load_duration_seconds',
+            'Latency of loader calls on cache misses',
+            ['cache_name', 'status'],  # status: ok, empty, error
+            buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+            registry=self.registry
+        )
+
+    def record_hit(self, cache_name: str) -> None:
+        self.cache_requests_total.labels(cache_name=cache_name, result="hit").inc()
+
+    def record_miss(self, cache_name: str) -> None:
+        self.cache_requests_total.labels(cache_name=cache_name, result="miss").inc()
+
+    def record_result(self, cache_name: str, result: str) -> None:
+        self.cache_requests_total.labels(cache_name=cache_name, result=result).inc()
+
+    def observe_load(self, cache_name: str, status: str, duration_seconds: float) -> None:
+        self.cache_load_duration_seconds.labels(cache_name=cache_name, status=status).observe(
+            duration_seconds
+        )
+
+    def record_eviction(self, cache_name: str, count: int = 1) -> None:
+        self.cache_evictions_total.labels(cache_name=cache_name).inc(count)
+
+
+# 全局 CacheMetrics 单例
+_cache_metrics_instance = None
+
+
+def get_cache_metrics(registry: CollectorRegistry = None) -> CacheMetrics:
+    """获取全局 CacheMetrics 实例"""
+    global _cache_metrics_instance
+    # 如果已设置共享 registry，使用它
+    if _shared_registry is not None:
+        registry = _shared_registry
+
+    if _cache_metrics_instance is None:
+        _cache_metrics_instance = CacheMetrics(registry=registry)
+    return _cache_metrics_instance
+
+
+class ToolCallMetrics:
+    """同步工具包装器调用延迟指标
+
+    Labels are tool function names and status only (ok, error, timeout).
+    """
+
+    def __init__(self, registry: CollectorRegistry = None):
+        """
+        初始化工具调用指标
+
+        Args:
+            registry: Prometheus registry，如果为 None 则使用默认 registry
+        """
+        self.registry = registry
+
+        self.tool_call_duration_seconds = Histogram(
+            'tool_call_duration_seconds',
+            'Latency of sync tool calls bridged onto the shared event loop',
+            ['tool_name', 'status'],
+            buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+            registry=self.registry
+        )
+        self.tool_calls_in_flight = Gauge(
+            'tool_calls_in_flight',
+            'Tool coroutines currently running on the shared event loop',
+            registry=self.registry
+        )
+
+    def observe_call(self, tool_name: str, status: str, duration_seconds: float) -> None:
+        self.tool_call_duration_seconds.labels(tool_name=tool_name, status=status).observe(
+            duration_seconds
+        )
+
+
+# 全局 ToolCallMetrics 单例
+_tool_call_metrics_instance = None
+
+
+def get_tool_call_metrics(registry: CollectorRegistry = None) -> ToolCallMetrics:
+    """获取全局 ToolCallMetrics 实例"""
+    global _tool_call_metrics_instance
+    # 如果已设置共享 registry，使用它
+    if _shared_registry is not None:
+        registry = _shared_registry
+
+    if _tool_call_metrics_instance is None:
+        _tool_call_metrics_instance = ToolCallMetrics(registry=registry)
+    return _tool_call_metrics_instance
+
+
+class JobSchedulerMetrics:
+    """任务调度与准入指标
+
+    Labels are tier names and rejection reasons only, never user or job ids.
+    """
+
+    def __init__(self, registry: CollectorRegistry = None):
+        """
+        初始化任务调度指标
+
+        Args:
+            registry: Prometheus registry，如果为 None 则使用默认 registry
+        """
+        self.registry = registry
+
+        self.job_queue_wait_seconds = Histogram(
+            'job_queue_wait_seconds',
+            'Time from job admission until a worker slot starts it',
+            ['tier'],
+            buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+            registry=self.registry
+        )
+        self.job_admission_rejections_total = Counter(
+            'job_admission_rejections_total',
+            'Job submissions rejected by admission control',
+            ['tier', 'reason'],  # reason: queue_full, user_limit
+            registry=self.registry
+        )
+        self.job_queue_depth = Gauge(
+            'job_queue_depth',
+            'Admitted jobs waiting for a worker slot',
+            ['tier'],
+            registry=self.registry
+        )
+
+    def observe_wait(self, tier: str, wait_seconds: float) -> None:
+        self.job_queue_wait_seconds.labels(tier=tier).observe(wait_seconds)
+
+    def record_rejection(self, tier: str, reason: str) -> None:
+        self.job_admission_rejections_total.labels(tier=tier, reason=reason).inc()
+
+    def update_queue_depth(self, depth_by_tier: Dict[str, int]) -> None:
+        for tier, depth in depth_by_tier.items():
+            self.job_queue_depth.labels(tier=tier).set(depth)
+
+
+# 全局 JobSchedulerMetrics 单例
+_job_scheduler_metrics_instance = None
+
+
+def get_job_scheduler_metrics(registry: CollectorRegistry = None) -> JobSchedulerMetrics:
+    """获取全局 JobSchedulerMetrics 实例"""
+    global _job_scheduler_metrics_instance
+    # 如果已设置共享 registry，使用它
+    if _shared_registry is not None:
+        registry = _shared_registry
+
+    if _job_scheduler_metrics_instance is None:
+        _job_scheduler_metrics_instance = JobSchedulerMetrics(registry=registry)
+    return _job_scheduler_metrics_instance
+
+
+class RedisMetrics:
+    """Redis 往返次数与负载大小指标
+
+    Labels are operation names only (e.g. 'mget_json', 'pipeline'), never keys.
+    """
+
+    def __init__(self, registry: CollectorRegistry = None):
+        """
+        初始化 Redis 指标
+
+        Args:
+            registry: Prometheus registry，如果为 None 则使用默认 registry
+        """
+        self.registry = registry
+
+        self.redis_round_trip_duration_seconds = Histogram(
+            'redis_round_trip_duration_seconds',
+            'Latency of one Redis round trip (single command, script or pipeline)',
+            ['op', 'status'],  # status: ok, error
+            buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+            registry=self.registry
+        )
+        self.redis_commands_per_round_trip = Histogram(
+            'redis_commands_per_round_trip',
+            'Commands sent in one round trip',
+            ['op'],
+            buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+            registry=self.registry
+        )
+        self.redis_payload_bytes = Histogram(
+            'redis_payload_bytes',
+            'Value bytes written to or read from Redis per round trip',
+            ['op', 'direction'],  # direction: out, in
+            buckets=(64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+            registry=self.registry
+        )
+
+    def observe_round_trip(
+        self,
+        op: str,
+        status: str,
+        duration_seconds: float,
+        commands: int = 1,
+        bytes_out: int = 0,
+        bytes_in: int = 0,
+    ) -> None:
+        self.redis_round_trip_duration_seconds.labels(op=op, status=status).observe(duration_seconds)
+        self.redis_commands_per_round_trip.labels(op=op).observe(commands)
+        if bytes_out:
+            self.redis_payload_bytes.labels(op=op, direction="out").observe(bytes_out)
+        if bytes_in:
+            self.redis_payload_bytes.labels(op=op, direction="in").observe(bytes_in)
+
+
+# 全局 RedisMetrics 单例
+_redis_metrics_instance = None
+
+
+def get_redis_metrics(registry: CollectorRegistry = None) -> RedisMetrics:
+    """获取全局 RedisMetrics 实例"""
+    global _redis_metrics_instance
+    # 如果已设置共享 registry，使用它
+    if _shared_registry is not None:
+        registry = _shared_registry
+
+    if _redis_metrics_instance is None:
+        _redis_metrics_instance = RedisMetrics(registry=registry)
+    return _redis_metrics_instance
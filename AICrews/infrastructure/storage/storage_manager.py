@@ -20,6 +20,7 @@ from AICrews.schemas import (
     TaskConfig,
 )
 from AICrews.schemas.stats import TaskExecutionStats
+from AICrews.infrastructure.storage.task_stats_log import TaskStatsLog, apply_task_stats_updates
 from AICrews.observability.logging import get_logger
 
 logger = get_logger(__name__)
@@ -56,7 +57,9 @@ class StorageManager:
         # 各类配置文件 (全局共享，用于向后兼容)
         self.llm_configs_file = self.storage_dir / "llm_configs.json"
         self.crew_configs_file = self.storage_dir / "crew_configs.json"
+        # 旧版整体覆盖写的统计文件，首次启动时迁移到追加写日志
         self.task_stats_file = self.storage_dir / "task_stats.json"
+        self.task_stats_log_file = self.storage_dir / "task_stats.log"
         
         # 用户数据目录
         self.users_dir = self.storage_dir / "users"
@@ -65,7 +68,7 @@ class StorageManager:
         # 内存缓存 (全局配置)
         self._llm_configs: Dict[str, LLMProviderConfig] = {}
         self._crew_configs: Dict[str, CrewConfig] = {}
-        self._task_stats: Dict[str, TaskExecutionStats] = {}
+        self._task_stats: Optional[TaskStatsLog] = None
         
         # 用户级别缓存: user_id -> {config_type -> configs}
         self._user_llm_configs: Dict[int, Dict[str, LLMProviderConfig]] = {}
@@ -242,24 +245,10 @@ class StorageManager:
     # ============================================
     
     def _load_task_stats(self) -> None:
-        """加载任务统计"""
-        if self.task_stats_file.exists():
-            try:
-                with open(self.task_stats_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for item in data[-100:]:  # 只保留最近100条
-                        stats = TaskExecutionStats(**item)
-                        self._task_stats[stats.job_id] = stats
-            except Exception as e:
-                logger.warning(f"Failed to load task stats: {e}")
-    
-    def _save_task_stats(self) -> None:
-        """保存任务统计"""
-        data = [stats.model_dump() for stats in list(self._task_stats.values())[-100:]]
-        for item in data:
-            self._serialize_datetime_recursive(item)
-        with open(self.task_stats_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        """加载任务统计索引（追加写日志，见 task_stats_log）"""
+        self._task_stats = TaskStatsLog(
+            self.task_stats_log_file, legacy_file=self.task_stats_file
+        )
     
     def _serialize_datetime_recursive(self, obj: Any) -> None:
         """递归序列化 datetime"""
@@ -278,8 +267,7 @@ class StorageManager:
     
     def create_task_stats(self, stats: TaskExecutionStats) -> TaskExecutionStats:
         """创建任务统计"""
-        self._task_stats[stats.job_id] = stats
-        self._save_task_stats()
+        self._task_stats.append(stats)
         return stats
     
     def get_task_stats(self, job_id: str) -> Optional[TaskExecutionStats]:
@@ -287,24 +275,18 @@ class StorageManager:
         return self._task_stats.get(job_id)
     
     def update_task_stats(self, job_id: str, updates: Dict[str, Any]) -> Optional[TaskExecutionStats]:
-        """更新任务统计"""
+        """更新任务统计（追加一条新版本记录）"""
         stats = self._task_stats.get(job_id)
         if not stats:
             return None
         
-        for key, value in updates.items():
-            if hasattr(stats, key):
-                setattr(stats, key, value)
-        
-        self._task_stats[job_id] = stats
-        self._save_task_stats()
+        stats = apply_task_stats_updates(stats, updates)
+        self._task_stats.append(stats)
         return stats
     
     def list_task_stats(self, limit: int = 50) -> List[TaskExecutionStats]:
-        """列出任务统计"""
-        stats = list(self._task_stats.values())
-        stats.sort(key=lambda x: x.started_at or datetime.min, reverse=True)
-        return stats[:limit]
+        """列出任务统计（按开始时间倒序）"""
+        return self._task_stats.list(limit=limit)
 
 
     # ============================================
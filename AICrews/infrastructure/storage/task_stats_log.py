@@ -0,0 +1,304 @@
+"""
+Task Stats Log - 追加写的任务统计持久化
+
+此前每次创建/更新任务统计都把最近 100 条记录以 indent=2 重新序列化并整体覆盖
+task_stats.json：每个事件 O(历史) 的磁盘 I/O，写到一半崩溃会损坏文件，
+多进程同时写会互相覆盖。
+
+这里改为追加写日志（task_stats.log）：
+- 每次写入只追加一行：``<job_id>\\t<started_at>\\t<TaskExecutionStats JSON>``，
+  同一任务的后写记录覆盖先写记录
+- 内存索引 job_id -> (偏移, 长度, started_at)；读取单条记录时 seek 定位，
+  list_task_stats 只解析需要返回的记录；建索引时只拆分行首字段，不解析 JSON
+- 多进程：追加前加文件锁（fcntl.flock，平台不支持时仅进程内加锁）；
+  读取前检查文件大小，增量索引其他进程追加的行；检测到文件被压缩替换后重建索引
+- 压缩：失效行（被覆盖或超出保留条数）多于有效行时，把保留的记录写入临时文件，
+  fsync 后 os.replace 原子替换
+- 崩溃安全：末尾不完整的行在建索引时忽略，下一次追加前截掉
+
+环境变量:
+- FAIC_TASK_STATS_MAX_RECORDS: 保留的任务数（默认 1000）
+- FAIC_TASK_STATS_COMPACT_MIN_LINES: 触发压缩的最少行数（默认 200）
+"""
+
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from threading import RLock
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from AICrews.schemas.stats import TaskExecutionStats
+from AICrews.observability.logging import get_logger
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = get_logger(__name__)
+
+
+class _IndexEntry(NamedTuple):
+    offset: int
+    length: int
+    started_at: str
+
+
+class TaskStatsLog:
+    """任务统计的追加写日志 + 内存索引"""
+
+    # 已解析记录的缓存条数（TrackingService 只在内存未命中时读取存储）
+    PARSED_CACHE_SIZE = 128
+
+    def __init__(
+        self,
+        path: Path,
+        max_records: Optional[int] = None,
+        compact_min_lines: Optional[int] = None,
+        legacy_file: Optional[Path] = None,
+    ):
+        self.path = Path(path)
+        self.max_records = max_records or int(os.getenv("FAIC_TASK_STATS_MAX_RECORDS", "1000"))
+        self.compact_min_lines = compact_min_lines or int(
+            os.getenv("FAIC_TASK_STATS_COMPACT_MIN_LINES", "200")
+        )
+        self._lock = RLock()
+        # job_id -> 最新记录位置，按最后写入顺序排列
+        self._index: "OrderedDict[str, _IndexEntry]" = OrderedDict()
+        self._parsed: "OrderedDict[str, tuple]" = OrderedDict()
+        self._indexed_size = 0
+        self._inode: Optional[int] = None
+        self._lines = 0
+
+        with self._lock:
+            if legacy_file is not None and not self.path.exists() and Path(legacy_file).exists():
+                self._migrate_legacy(Path(legacy_file))
+            self._refresh()
+
+    # =========================================================================
+    # 索引
+    # =========================================================================
+
+    def _refresh(self) -> None:
+        """同步索引与磁盘文件（增量读取新追加的行，文件被替换时重建）"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset_index()
+            return
+        if st.st_ino != self._inode or st.st_size < self._indexed_size:
+            self._reset_index()
+            self._inode = st.st_ino
+        if st.st_size > self._indexed_size:
+            self._index_from(self._indexed_size)
+
+    def _reset_index(self) -> None:
+        self._index.clear()
+        self._parsed.clear()
+        self._indexed_size = 0
+        self._inode = None
+        self._lines = 0
+
+    def _index_from(self, start: int) -> None:
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # 末尾不完整的行（写入中或崩溃残留），等待补全或由下一次追加跳过
+                    break
+                self._index_line(raw, offset)
+                offset += len(raw)
+        self._indexed_size = offset
+
+    def _index_line(self, raw: bytes, offset: int) -> None:
+        self._lines += 1
+        parts = raw.split(b"\t", 2)
+        if len(parts) != 3:
+            return
+        job_id = parts[0].decode("utf-8", "replace")
+        started_at = parts[1].decode("utf-8", "replace")
+        header = len(parts[0]) + len(parts[1]) + 2
+        self._index.pop(job_id, None)
+        self._index[job_id] = _IndexEntry(offset + header, len(raw) - header - 1, started_at)
+
+    # =========================================================================
+    # 读
+    # =========================================================================
+
+    def get(self, job_id: str) -> Optional[TaskExecutionStats]:
+        with self._lock:
+            self._refresh()
+            entry = self._index.get(job_id)
+            if entry is None:
+                return None
+            cached = self._parsed.get(job_id)
+            if cached is not None and cached[0] == entry.offset:
+                self._parsed.move_to_end(job_id)
+                return cached[1].model_copy(deep=True)
+            with open(self.path, "rb") as f:
+                stats = self._read_entry(f, job_id, entry)
+            return stats.model_copy(deep=True) if stats else None
+
+    def list(self, limit: int = 50) -> List[TaskExecutionStats]:
+        """按 started_at 倒序返回最近的记录（只解析返回的记录）"""
+        with self._lock:
+            self._refresh()
+            ordered = sorted(
+                self._index.items(), key=lambda item: item[1].started_at, reverse=True
+            )[: max(0, limit)]
+            if not ordered:
+                return []
+            results: List[TaskExecutionStats] = []
+            with open(self.path, "rb") as f:
+                for job_id, entry in ordered:
+                    stats = self._read_entry(f, job_id, entry)
+                    if stats is not None:
+                        results.append(stats.model_copy(deep=True))
+            return results
+
+    def _read_entry(self, f: Any, job_id: str, entry: _IndexEntry) -> Optional[TaskExecutionStats]:
+        cached = self._parsed.get(job_id)
+        if cached is not None and cached[0] == entry.offset:
+            return cached[1]
+        f.seek(entry.offset)
+        try:
+            stats = TaskExecutionStats.model_validate_json(f.read(entry.length))
+        except Exception as e:
+            logger.warning(f"Skipping unreadable task stats record for {job_id}: {e}")
+            return None
+        self._parsed[job_id] = (entry.offset, stats)
+        self._parsed.move_to_end(job_id)
+        while len(self._parsed) > self.PARSED_CACHE_SIZE:
+            self._parsed.popitem(last=False)
+        return stats
+
+    # =========================================================================
+    # 写
+    # =========================================================================
+
+    def append(self, stats: TaskExecutionStats) -> None:
+        line = self._encode(stats)
+        with self._lock:
+            with self._open_locked() as f:
+                try:
+                    end = f.seek(0, os.SEEK_END)
+                    if end:
+                        complete = self._complete_size(end)
+                        if complete != end:
+                            # 上一次写入被中断（进程崩溃），截掉残缺的行
+                            logger.warning(
+                                f"Truncating {end - complete} bytes of torn task stats record"
+                            )
+                            f.truncate(complete)
+                    f.write(line)
+                    f.flush()
+                finally:
+                    self._flock(f, exclusive=False)
+            self._refresh()
+            if self._should_compact():
+                self.compact()
+
+    def _complete_size(self, size: int, chunk: int = 65536) -> int:
+        """文件中最后一个完整行的结束位置"""
+        with open(self.path, "rb") as f:
+            end = size
+            while end > 0:
+                start = max(0, end - chunk)
+                f.seek(start)
+                pos = f.read(end - start).rfind(b"\n")
+                if pos >= 0:
+                    return start + pos + 1
+                end = start
+        return 0
+
+    @staticmethod
+    def _encode(stats: TaskExecutionStats) -> bytes:
+        started_at = stats.started_at.isoformat() if stats.started_at else ""
+        body = stats.model_dump_json()
+        return f"{stats.job_id}\t{started_at}\t{body}\n".encode("utf-8")
+
+    def _should_compact(self) -> bool:
+        live = min(len(self._index), self.max_records)
+        return self._lines >= self.compact_min_lines and self._lines - live > live
+
+    def compact(self) -> None:
+        """只保留每个任务的最新记录（最多 max_records 个），原子替换日志文件"""
+        with self._lock:
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with self._open_locked() as lock_file:
+                try:
+                    # 持锁后重新同步，包含其他进程刚追加的行
+                    self._refresh()
+                    keep = list(self._index.items())[-self.max_records:]
+                    with open(self.path, "rb") as src, open(tmp_path, "wb") as dst:
+                        for job_id, entry in keep:
+                            src.seek(entry.offset)
+                            body = src.read(entry.length)
+                            dst.write(
+                                f"{job_id}\t{entry.started_at}\t".encode("utf-8") + body + b"\n"
+                            )
+                        dst.flush()
+                        os.fsync(dst.fileno())
+                    before = self._lines
+                    os.replace(tmp_path, self.path)
+                finally:
+                    self._flock(lock_file, exclusive=False)
+            self._reset_index()
+            self._refresh()
+            logger.info(
+                f"Compacted task stats log: {before} -> {self._lines} lines ({self.path.name})"
+            )
+
+    def _open_locked(self) -> Any:
+        """以追加模式打开并加排他锁；等锁期间文件被其他进程压缩替换时重新打开"""
+        while True:
+            f = open(self.path, "ab")
+            self._flock(f, exclusive=True)
+            try:
+                if fcntl is None or os.fstat(f.fileno()).st_ino == os.stat(self.path).st_ino:
+                    return f
+            except FileNotFoundError:
+                pass
+            self._flock(f, exclusive=False)
+            f.close()
+
+    @staticmethod
+    def _flock(f: Any, exclusive: bool) -> None:
+        if fcntl is None:
+            return
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_UN)
+
+    # =========================================================================
+    # 迁移
+    # =========================================================================
+
+    def _migrate_legacy(self, legacy_file: Path) -> None:
+        """导入旧的 task_stats.json，并改名避免重复导入"""
+        try:
+            with open(legacy_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            with open(self.path, "wb") as f:
+                for item in data[-self.max_records:]:
+                    f.write(self._encode(TaskExecutionStats(**item)))
+            os.replace(legacy_file, legacy_file.with_name(legacy_file.name + ".migrated"))
+            logger.info(f"Migrated {len(data)} task stats records from {legacy_file.name}")
+        except Exception as e:
+            logger.warning(f"Failed to migrate legacy task stats: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+
+def apply_task_stats_updates(
+    stats: TaskExecutionStats, updates: Dict[str, Any]
+) -> TaskExecutionStats:
+    """把更新字段合并到统计记录并重新校验（嵌套事件统一还原为模型）"""
+    data = stats.model_dump()
+    for key, value in updates.items():
+        if key in data:
+            data[key] = value
+    return TaskExecutionStats.model_validate(data)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 import threading
 from collections import OrderedDict
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, Optional, Set
 
 
 class LLMInstancePool:
@@ -11,6 +11,10 @@ class LLMInstancePool:
     Simple in-process pool for reusing LLM instances.
 
     Keyed by a stable hash of a config dict.
+
+    When ``namespace`` is given, the pool registers with the cache invalidation
+    bus so entries tagged via ``acquire_with_key(..., tags=...)`` are dropped on
+    every worker when the underlying config changes.
     """
 
     def __init__(
@@ -18,11 +22,19 @@ class LLMInstancePool:
         *,
         create_fn: Callable[[Dict[str, Any]], Any],
         maxsize: int = 128,
+        namespace: Optional[str] = None,
     ) -> None:
         self._create_fn = create_fn
         self._maxsize = int(maxsize)
         self._lock = threading.Lock()
         self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._namespace = namespace
+        self._bus = None
+        if namespace:
+            from AICrews.infrastructure.cache.invalidation_bus import get_invalidation_bus
+
+            self._bus = get_invalidation_bus()
+            self._bus.register(namespace, self.discard)
 
     def _make_key(self, config: Dict[str, Any]) -> str:
         payload = json.dumps(config, sort_keys=True, default=str, ensure_ascii=True)
@@ -37,15 +49,16 @@ class LLMInstancePool:
                 return cached
 
         instance = self._create_fn(config)
-
-        with self._lock:
-            self._cache[key] = instance
-            self._cache.move_to_end(key)
-            if self._maxsize > 0 and len(self._cache) > self._maxsize:
-                self._cache.popitem(last=False)
+        self._put(key, instance)
         return instance
 
-    def acquire_with_key(self, key_config: Dict[str, Any], *, create: Callable[[], Any]) -> Any:
+    def acquire_with_key(
+        self,
+        key_config: Dict[str, Any],
+        *,
+        create: Callable[[], Any],
+        tags: Iterable[str] = (),
+    ) -> Any:
         key = self._make_key(key_config)
         with self._lock:
             cached = self._cache.get(key)
@@ -54,13 +67,31 @@ class LLMInstancePool:
                 return cached
 
         instance = create()
+        self._put(key, instance, tags)
+        return instance
 
+    def _put(self, key: str, instance: Any, tags: Iterable[str] = ()) -> None:
+        evicted = None
         with self._lock:
             self._cache[key] = instance
             self._cache.move_to_end(key)
             if self._maxsize > 0 and len(self._cache) > self._maxsize:
-                self._cache.popitem(last=False)
-        return instance
+                evicted, _ = self._cache.popitem(last=False)
+        if self._bus is not None:
+            tags = tuple(tags)
+            if tags:
+                self._bus.tag(self._namespace, key, *tags)
+            if evicted is not None:
+                self._bus.untag(self._namespace, evicted)
+
+    def discard(self, keys: Optional[Set[str]]) -> None:
+        """Drop the given pool keys (``None`` clears the pool)."""
+        if keys is None:
+            self.clear()
+            return
+        with self._lock:
+            for key in keys:
+                self._cache.pop(key, None)
 
     def release(self, config: Dict[str, Any], instance: Any) -> None:
         # Currently a no-op; present for future ref-counting/health checks.
@@ -69,3 +100,5 @@ class LLMInstancePool:
     def clear(self) -> None:
         with self._lock:
             self._cache.clear()
+        if self._bus is not None:
+            self._bus.tags.clear(self._namespace)
@@ -2,7 +2,7 @@ import hashlib
 from AICrews.observability.logging import get_logger
 import os
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from urllib.parse import urlparse
 
 from AICrews.database.models import UserModelConfig
@@ -33,6 +33,23 @@ class ResolvedLLMConfig:
     api_key_fingerprint: str
 
 
+# Invalidation bus namespace for pooled LLM instances. Credential/endpoint
+# changes publish llm_config:<id> / user_model_config:<id> tags so every worker
+# drops instances built from the old config.
+LLM_POOL_NAMESPACE = "llm_pool"
+
+
+def llm_pool_tags(
+    *, llm_config_id: Optional[int] = None, user_model_config_id: Optional[int] = None
+) -> List[str]:
+    tags = []
+    if llm_config_id is not None:
+        tags.append(f"llm_config:{llm_config_id}")
+    if user_model_config_id is not None:
+        tags.append(f"user_model_config:{user_model_config_id}")
+    return tags
+
+
 class LLMRuntime:
     """Runtime resolver + factory wrapper.
 
@@ -46,7 +63,9 @@ class LLMRuntime:
         # Enable LLM pooling by default to avoid redundant instance creation
         self._pool_enabled = os.getenv("FAIC_LLM_POOL_ENABLED", "true").lower() == "true"
         maxsize = int(os.getenv("FAIC_LLM_POOL_MAXSIZE", "128"))
-        self._pool = LLMInstancePool(create_fn=lambda _cfg: None, maxsize=maxsize)
+        self._pool = LLMInstancePool(
+            create_fn=lambda _cfg: None, maxsize=maxsize, namespace=LLM_POOL_NAMESPACE
+        )
 
     def resolve(self, user_model_config: UserModelConfig) -> ResolvedLLMConfig:
         provider = user_model_config.llm_config.provider
@@ -105,6 +124,10 @@ class LLMRuntime:
                 create=lambda: self._factory.create_from_user_model_config(
                     user_model_config, **kwargs
                 ),
+                tags=llm_pool_tags(
+                    llm_config_id=user_model_config.llm_config_id,
+                    user_model_config_id=resolved.user_model_config_id,
+                ),
             )
         else:
             llm = self._factory.create_from_user_model_config(user_model_config, **kwargs)
@@ -321,12 +321,27 @@ class SystemLLMConfigStore:
 # Singleton instance
 _store: Optional[SystemLLMConfigStore] = None
 
+# Cache invalidation bus namespace: a hot reload on one worker is broadcast so
+# every worker re-reads its environment.
+SYSTEM_LLM_CONFIG_NAMESPACE = "system_llm_config"
+
+
+def _on_remote_reload(_keys) -> None:
+    if _store is not None:
+        _store.reload()
+
 
 def get_system_llm_config_store() -> SystemLLMConfigStore:
     """Get the singleton SystemLLMConfigStore instance."""
     global _store
     if _store is None:
         _store = SystemLLMConfigStore()
+        try:
+            from AICrews.infrastructure.cache.invalidation_bus import get_invalidation_bus
+
+            get_invalidation_bus().register(SYSTEM_LLM_CONFIG_NAMESPACE, _on_remote_reload)
+        except Exception as e:
+            logger.debug(f"Cache invalidation bus unavailable: {e}")
     return _store
 
 
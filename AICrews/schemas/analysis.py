@@ -84,6 +84,7 @@ class JobListResponse(BaseSchema):
     """任务列表响应"""
     jobs: List[JobStatusResponse]
     total: int
+    next_cursor: Optional[str] = Field(None, description="下一页游标，为空表示没有更多")
 
 class ChatMessage(BaseSchema):
     """聊天消息"""
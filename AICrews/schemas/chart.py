@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -7,7 +7,11 @@ class ChartDataRequest(BaseModel):
     resolution: str = Field(default="1d", description="时间分辨率: 1m, 5m, 15m, 1h, 1d")
     start_date: Optional[str] = None
     end_date: Optional[str] = None
-    limit: Optional[int] = Field(default=100, description="返回数据点数量")
+    limit: Optional[int] = Field(default=100, description="返回数据点数量（取区间内最近的 N 根）")
+    layout: Literal["rows", "columnar"] = Field(
+        default="rows",
+        description="响应格式: rows（data 为逐根对象）或 columnar（timestamps 为 epoch 秒，OHLCV 为数组）",
+    )
 
 class OHLCVData(BaseModel):
     """OHLCV数据点"""
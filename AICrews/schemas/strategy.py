@@ -8,7 +8,7 @@ class StrategyCreate(BaseModel):
     description: Optional[str] = Field(None, max_length=500, description="策略描述")
     formula: str = Field(..., min_length=1, description="策略公式")
     category: str = Field("custom", description="策略类别: trend, momentum, volatility, custom")
-    variables: Optional[Dict[str, Any]] = Field(None, description="公式变量定义")
+    variables: Optional[Dict[str, Any]] = Field(None, description="公式变量定义；alert 字段订阅实时告警，如 {\"alert\": {\"enabled\": true, \"tickers\": [\"AAPL\"]}}")
     is_public: bool = Field(False, description="是否公开分享")
 
 class StrategyUpdate(BaseModel):
@@ -66,3 +66,39 @@ class BatchEvaluationResponse(BaseModel):
     formula: str
     results: List[Dict[str, Any]]
     summary: Dict[str, int]
+
+class StrategyBacktestRequest(BaseModel):
+    """策略回测请求"""
+    ticker: str = Field(..., description="股票代码")
+    strategy_id: Optional[int] = Field(None, description="策略 ID")
+    formula: Optional[str] = Field(None, description="直接使用公式（不保存）")
+    period: str = Field("2y", description="回测区间: 6mo, 1y, 2y, 5y, max")
+    horizons: List[int] = Field(default_factory=lambda: [1, 5, 10, 20], description="前瞻持有期（K 线数）")
+
+class BacktestHorizonStats(BaseModel):
+    """单个持有期的回测统计"""
+    horizon: int
+    samples: int
+    hit_rate: Optional[float]
+    avg_return: Optional[float]
+    median_return: Optional[float]
+    max_adverse_excursion: Optional[float]
+    baseline_avg_return: Optional[float]
+
+class BacktestResult(BaseModel):
+    """回测结果"""
+    ticker: str
+    formula: str
+    period: str
+    bars: int = 0
+    start: Optional[str] = None
+    end: Optional[str] = None
+    signal_count: int = 0
+    entry_count: int = 0
+    signal_dates: List[str] = Field(default_factory=list)
+    horizons: List[BacktestHorizonStats] = Field(default_factory=list)
+    exposure: float = 0.0
+    total_return: float = 0.0
+    max_drawdown: float = 0.0
+    evaluated_at: str
+    error: Optional[str] = None
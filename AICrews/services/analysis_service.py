@@ -15,6 +15,7 @@ from AICrews.database.vector_utils import VectorUtil
 from AICrews.schemas.analysis import StructuredResult, CitationInfo, CrewInfo
 from AICrews.utils.citations import CitationParser, CitationEnricher
 from AICrews.infrastructure.jobs import JobManager, get_job_manager, JobStatus
+from AICrews.infrastructure.jobs.job_queue import register_job_handler
 
 
 class AnalysisService:
@@ -75,6 +76,18 @@ class AnalysisService:
         """列出任务"""
         return self.job_manager.list_jobs(status=status, limit=limit, user_id=user_id)
 
+    def list_jobs_page(
+        self,
+        status: Optional[JobStatus] = None,
+        limit: int = 50,
+        user_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Any:
+        """分页列出任务"""
+        return self.job_manager.list_jobs_page(
+            status=status, limit=limit, user_id=user_id, cursor=cursor
+        )
+
     def cancel_job(self, job_id: str) -> bool:
         """取消任务"""
         return self.job_manager.cancel(job_id)
@@ -476,3 +489,46 @@ class AnalysisService:
                 "report_counts": report_counts,
                 "reports": grouped,
             }
+
+
+# ============================================
+# 可排队执行的分析任务
+# ============================================
+
+ANALYSIS_TASK = "analysis"
+
+
+@register_job_handler(ANALYSIS_TASK)
+def run_analysis_job(
+    job_id: Optional[str] = None,
+    *,
+    ticker: str,
+    date: str,
+    crew_name: str,
+    analysts: Optional[List[str]] = None,
+    debate_rounds: int = 1,
+    user_id: Optional[int] = None,
+    decision: Optional[Dict[str, Any]] = None,
+) -> str:
+    """执行分析任务（本进程线程池或队列 worker 调用），返回结果文本"""
+    from contextlib import nullcontext
+
+    from AICrews.application.crew.run_context import RunContext, run_context_scope
+    from AICrews.schemas.entitlements import PolicyDecision
+
+    scope = nullcontext()
+    if decision is not None:
+        scope = run_context_scope(
+            RunContext.from_decision(PolicyDecision.model_validate(decision))
+        )
+    with scope:
+        result_dict = AnalysisService().run_analysis(
+            ticker=ticker,
+            date=date,
+            crew_name=crew_name,
+            analysts=analysts,
+            debate_rounds=debate_rounds,
+            user_id=user_id,
+            run_id=job_id,
+        )
+    return str(result_dict.get("result", ""))
@@ -3,13 +3,19 @@ Chart Data Service - 图表数据服务
 
 提供图表数据的获取、缓存和标准化逻辑。
 采用混合模式：
-1. 优先检查 Redis 缓存
-2. 缓存未命中则调用 SDK Fetcher 获取实时数据
-3. 数据标准化后存入缓存并返回
+1. 优先检查分层缓存（进程内 L1 -> Redis L2）
+2. 缓存未命中则调用 SDK Fetcher 获取实时数据（并发未命中合并为一次请求）
+3. 数据标准化后存入缓存并返回；过期数据在刷新期间/失败时继续提供
+
+K 线按列缓存（ChartSeries）：epoch 秒时间戳与 OHLCV 数组，而不是逐根 K 线的字典。
+每个 ticker + 分辨率缓存一条默认窗口的序列，落在窗口内的 start_date / end_date /
+limit 请求都从同一条序列切片返回；超出窗口的请求单独缓存。
 """
 
-from typing import List, Dict, Optional, Any
-from datetime import datetime, timedelta, time
+import calendar
+from bisect import bisect_left
+from typing import List, Dict, Optional, Any, Tuple, Union
+from datetime import datetime, timedelta, time, timezone
 import pytz
 
 from AICrews.observability.logging import get_logger
@@ -24,106 +30,335 @@ from AICrews.schemas.chart import (
     ChartDataResponse,
     SparklineResponse,
 )
+from AICrews.infrastructure.cache.layered_cache_manager import get_layered_cache
 from AICrews.infrastructure.cache.redis_manager import get_redis_manager
 
 logger = get_logger(__name__)
 
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _wall_epoch(value: Union[str, datetime]) -> int:
+    """本地挂钟时间对应的 epoch 秒（按 UTC 计算），用于与 K 线的本地日期比较"""
+    dt = datetime.fromisoformat(value) if isinstance(value, str) else value
+    return calendar.timegm(dt.timetuple())
+
+
+class ChartSeries:
+    """列式 K 线序列
+
+    t 为 UTC epoch 秒；tz 为 UTC 偏移秒数（整条序列相同时为单个值，naive 时间为 None，
+    跨夏令时等偏移不一致时为逐根列表）。缓存、切片都只操作列表，
+    仅在生成响应时渲染时间戳。
+    """
+
+    __slots__ = ("t", "tz", "open", "high", "low", "close", "volume", "start", "end", "last_updated")
+
+    FORMAT_VERSION = 1
+
+    def __init__(
+        self,
+        t: List[int],
+        tz: Union[int, None, List[Optional[int]]],
+        open: List[float],
+        high: List[float],
+        low: List[float],
+        close: List[float],
+        volume: List[Optional[int]],
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        last_updated: Optional[str] = None,
+    ):
+        self.t = t
+        self.tz = tz
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        # 序列覆盖的挂钟时间范围 [start, end)，None 表示未知
+        self.start = start
+        self.end = end
+        self.last_updated = last_updated or datetime.now().isoformat()
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    # =========================================================================
+    # 缓存格式
+    # =========================================================================
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> Optional["ChartSeries"]:
+        if not isinstance(payload, dict) or payload.get("fmt") != cls.FORMAT_VERSION:
+            return None
+        return cls(
+            t=payload["t"],
+            tz=payload.get("tz"),
+            open=payload["o"],
+            high=payload["h"],
+            low=payload["l"],
+            close=payload["c"],
+            volume=payload["v"],
+            start=payload.get("start"),
+            end=payload.get("end"),
+            last_updated=payload.get("last_updated"),
+        )
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "fmt": self.FORMAT_VERSION,
+            "t": self.t,
+            "tz": self.tz,
+            "o": self.open,
+            "h": self.high,
+            "l": self.low,
+            "c": self.close,
+            "v": self.volume,
+            "start": self.start,
+            "end": self.end,
+            "last_updated": self.last_updated,
+        }
+
+    # =========================================================================
+    # 切片
+    # =========================================================================
+
+    def _offset(self, i: int) -> Optional[int]:
+        return self.tz[i] if isinstance(self.tz, list) else self.tz
+
+    def _wall(self, i: int) -> int:
+        return self.t[i] + (self._offset(i) or 0)
+
+    def slice(
+        self, start: Optional[int] = None, end: Optional[int] = None, limit: Optional[int] = None
+    ) -> "ChartSeries":
+        """按挂钟时间 [start, end) 过滤，再取最后 limit 根"""
+        n = len(self.t)
+        lo = bisect_left(range(n), start, key=self._wall) if start is not None else 0
+        hi = bisect_left(range(n), end, key=self._wall) if end is not None else n
+        if limit and limit > 0:
+            lo = max(lo, hi - limit)
+        if lo <= 0 and hi >= n:
+            return self
+        return ChartSeries(
+            t=self.t[lo:hi],
+            tz=self.tz[lo:hi] if isinstance(self.tz, list) else self.tz,
+            open=self.open[lo:hi],
+            high=self.high[lo:hi],
+            low=self.low[lo:hi],
+            close=self.close[lo:hi],
+            volume=self.volume[lo:hi],
+            start=self.start,
+            end=self.end,
+            last_updated=self.last_updated,
+        )
+
+    # =========================================================================
+    # 响应
+    # =========================================================================
+
+    def timestamps(self) -> List[datetime]:
+        zones: Dict[int, timezone] = {}
+        result = []
+        for i, ts in enumerate(self.t):
+            offset = self._offset(i)
+            if offset is None:
+                result.append(_EPOCH + timedelta(seconds=ts))
+                continue
+            zone = zones.get(offset)
+            if zone is None:
+                zone = zones[offset] = timezone(timedelta(seconds=offset))
+            result.append(datetime.fromtimestamp(ts, zone))
+        return result
+
+    def iso_timestamps(self) -> List[str]:
+        # 与 Pydantic 序列化 datetime 的格式一致（UTC 偏移为 0 时使用 Z）
+        return [
+            dt.isoformat().replace("+00:00", "Z") for dt in self.timestamps()
+        ]
+
+    def to_response_dict(
+        self, ticker: str, resolution: str, cached: bool, columnar: bool = False
+    ) -> Dict[str, Any]:
+        """构造与 ChartDataResponse 等价的 JSON 结构（不逐根构造 Pydantic 模型）"""
+        body: Dict[str, Any] = {
+            "ticker": ticker,
+            "resolution": resolution,
+            "data_source": "mcp",
+            "cached": cached,
+            "last_updated": self.last_updated,
+        }
+        if columnar:
+            body.update(
+                timestamps=self.t,
+                open=self.open,
+                high=self.high,
+                low=self.low,
+                close=self.close,
+                volume=self.volume,
+            )
+            return body
+        body["data"] = [
+            {"timestamp": ts, "open": o, "high": h, "low": lo, "close": c, "volume": v}
+            for ts, o, h, lo, c, v in zip(
+                self.iso_timestamps(), self.open, self.high, self.low, self.close, self.volume
+            )
+        ]
+        return body
+
+    def to_response(self, ticker: str, resolution: str, cached: bool) -> ChartDataResponse:
+        return ChartDataResponse(
+            ticker=ticker,
+            resolution=resolution,
+            data=[
+                OHLCVData.model_construct(
+                    timestamp=ts, open=o, high=h, low=lo, close=c, volume=v
+                )
+                for ts, o, h, lo, c, v in zip(
+                    self.timestamps(), self.open, self.high, self.low, self.close, self.volume
+                )
+            ],
+            cached=cached,
+            last_updated=datetime.fromisoformat(self.last_updated),
+        )
+
 
 class ChartDataService:
-    """图表数据服务 - 透传模式 + Redis缓存"""
+    """图表数据服务 - 透传模式 + 分层缓存（进程内 LRU + Redis）"""
+
+    # 过期后仍可作为旧数据返回的时长（相对 TTL 的倍数）
+    STALE_TTL_FACTOR = 4
+    # 无数据 / 限流结果的负缓存时长（秒）
+    NEGATIVE_TTL = 30
+    SPARKLINE_TTL = 600
+    SPARKLINE_STALE_TTL = 1800
+    # 未指定 start_date 时默认获取的天数（同时是共享序列的缓存窗口）
+    DEFAULT_WINDOW_DAYS = {"1m": 7, "5m": 30, "15m": 60, "1h": 90, "1d": 365}
 
     def __init__(self):
         self.redis_manager = get_redis_manager()
+        self.cache = get_layered_cache()
         self.yf_fetcher = get_yfinance_fetcher()
 
     async def get_chart_data(self, request: ChartDataRequest) -> ChartDataResponse:
         """获取图表数据（透传+缓存模式）
 
+        返回完整的 ChartDataResponse；高频接口应使用 get_chart_series，
+        直接把列式序列序列化为响应，跳过逐根 K 线的模型构造。
+        """
+        result = await self.get_chart_series(request)
+        if result is None:
+            return None
+        series, cached = result
+        return series.to_response(request.ticker, request.resolution, cached)
+
+    async def get_chart_series(
+        self, request: ChartDataRequest
+    ) -> Optional[Tuple[ChartSeries, bool]]:
+        """获取按请求切片后的列式序列
+
         逻辑：
-        1. 生成缓存键
-        2. 检查Redis缓存
-        3. 缓存未命中 -> 调用MCP -> 存缓存 -> 返回
-        4. 缓存命中 -> 直接返回
-        
+        1. 请求范围落在默认窗口内 -> 读取该 ticker + 分辨率的共享序列；否则按范围单独缓存
+        2. 经 LayeredCacheManager 读取（进程内 L1 -> Redis L2）
+        3. 缓存未命中 -> 调用 SDK（并发请求合并为一次）-> 存缓存
+        4. 缓存过期但在 stale 窗口内 -> 直接返回旧数据并在后台刷新
+        5. 按 start_date / end_date / limit 切片
+
         v2.1 优化：在 YFinance 限流时，如果有缓存则直接返回缓存数据，
         避免发起注定失败的请求。
+
+        Returns:
+            (序列, 是否来自缓存)；无数据时返回 None
         """
-        cache_key = self._generate_cache_key(request)
-
-        # 1. 尝试从Redis获取缓存
-        cached_data = await self.redis_manager.get_json(cache_key)
-        if cached_data:
-            logger.debug(f"Cache hit for {cache_key}")
-            return ChartDataResponse(
-                ticker=request.ticker,
-                resolution=request.resolution,
-                data=[OHLCVData(**item) for item in cached_data["data"]],
-                cached=True,
-                last_updated=datetime.fromisoformat(cached_data["last_updated"]),
+        try:
+            start = _wall_epoch(request.start_date) if request.start_date else None
+            end = _wall_epoch(request.end_date) if request.end_date else None
+        except ValueError:
+            # 无法解析的日期原样交给 SDK，不做切片
+            start = end = None
+            window = None
+        else:
+            window = self._default_window(request.resolution)
+
+        if window is not None and (start is None or start >= _wall_epoch(window[0])) and (
+            end is None or end <= _wall_epoch(window[1])
+        ):
+            cache_key = self._generate_cache_key(request, shared=True)
+            fetch_request = request.model_copy(
+                update={"start_date": window[0], "end_date": window[1]}
             )
+        else:
+            cache_key = self._generate_cache_key(request)
+            fetch_request = request
 
-        # 2. 检查 YFinance 是否处于限流状态
-        if is_yfinance_rate_limited():
-            cooldown_remaining = get_yfinance_cooldown_remaining()
-            logger.warning(
-                f"YFinance rate limited for chart request {request.ticker}, "
-                f"cooldown remaining: {cooldown_remaining:.1f}s, no cache available"
-            )
-            # 没有缓存且被限流，返回 None 让 API 层处理
+        series, cached = await self._load_series(cache_key, fetch_request)
+        if series is None:
             return None
+        series = series.slice(start, end, request.limit)
+        return (series, cached) if len(series) else None
 
-        # 3. 缓存未命中，从 SDK Fetcher 获取数据
-        logger.debug(f"Cache miss for {cache_key}, fetching from SDK")
-        raw_data = await self._fetch_from_sdk(request)
-
-        if not raw_data:
-            # 如果没有数据，尝试返回空列表而不是报错，或者根据业务需求抛出异常
-            # 这里保持原逻辑抛出异常
-            # raise HTTPException(status_code=404, detail=f"No data found for {request.ticker}")
-            # Service层不应该直接抛出HTTP异常，返回None让API层处理
-            return None
+    async def _load_series(
+        self, cache_key: str, request: ChartDataRequest
+    ) -> Tuple[Optional[ChartSeries], bool]:
+        ttl = self._get_cache_ttl(request.resolution)
+        loaded = False
 
-        # 3. 转换数据格式
-        chart_data = self._normalize_chart_data(raw_data)
-
-        # 4. 存储到Redis缓存
-        cache_data = {
-            "data": [
-                {
-                    "timestamp": item.timestamp.isoformat(),
-                    "open": item.open,
-                    "high": item.high,
-                    "low": item.low,
-                    "close": item.close,
-                    "volume": item.volume,
-                }
-                for item in chart_data
-            ],
-            "last_updated": datetime.now().isoformat(),
-        }
+        async def _load() -> Optional[Dict[str, Any]]:
+            nonlocal loaded
+            # 检查 YFinance 是否处于限流状态（有旧数据时由缓存层继续返回旧数据）
+            if is_yfinance_rate_limited():
+                cooldown_remaining = get_yfinance_cooldown_remaining()
+                logger.warning(
+                    f"YFinance rate limited for chart request {request.ticker}, "
+                    f"cooldown remaining: {cooldown_remaining:.1f}s"
+                )
+                return None
 
-        # 根据分辨率设置不同的缓存时间
-        ttl = self._get_cache_ttl(request.resolution)
-        await self.redis_manager.set(cache_key, cache_data, ttl=ttl)
+            logger.debug(f"Cache miss for {cache_key}, fetching from SDK")
+            raw_data = await self._fetch_from_sdk(request)
+            if not raw_data:
+                # Service层不应该直接抛出HTTP异常，返回None让API层处理
+                return None
 
-        return ChartDataResponse(
-            ticker=request.ticker,
-            resolution=request.resolution,
-            data=chart_data,
-            cached=False,
-            last_updated=datetime.now(),
+            series = self._build_series(raw_data)
+            if not series:
+                return None
+            if request.start_date and request.end_date:
+                try:
+                    series.start = _wall_epoch(request.start_date)
+                    series.end = _wall_epoch(request.end_date)
+                except ValueError:
+                    pass
+            loaded = True
+            return series.to_payload()
+
+        cached_data = await self.cache.get_or_compute(
+            cache_key,
+            _load,
+            ttl=ttl,
+            stale_ttl=ttl * self.STALE_TTL_FACTOR,
+            negative_ttl=min(ttl, self.NEGATIVE_TTL),
         )
+        if not cached_data:
+            return None, False
+        return ChartSeries.from_payload(cached_data), not loaded
 
-    def _generate_cache_key(self, request: ChartDataRequest) -> str:
-        """生成缓存键"""
-        key_parts = [
-            "chart",
-            request.ticker.upper(),
-            request.resolution,
-            request.start_date or "default",
-            request.end_date or "default",
-            str(request.limit),
-        ]
+    def _default_window(self, resolution: str) -> Tuple[str, str]:
+        """默认获取窗口 (start_date, end_date)，与 SDK 获取时的默认值一致"""
+        now = datetime.now()
+        days = self.DEFAULT_WINDOW_DAYS.get(resolution, 365)
+        return (now - timedelta(days=days)).strftime("%Y-%m-%d"), now.strftime("%Y-%m-%d")
+
+    def _generate_cache_key(self, request: ChartDataRequest, shared: bool = False) -> str:
+        """生成缓存键
+
+        共享序列只按 ticker + 分辨率区分；超出默认窗口的请求按日期范围区分。
+        limit 不参与缓存键（从序列切片）。
+        """
+        key_parts = ["chart", request.ticker.upper(), request.resolution]
+        if not shared:
+            key_parts += [request.start_date or "default", request.end_date or "default"]
         return ":".join(key_parts)
 
     def _get_cache_ttl(self, resolution: str, ticker: str = None) -> int:
@@ -418,33 +653,52 @@ class ChartDataService:
             logger.error(f"Error fetching macro data for {ticker}: {e}")
             return None
 
-    def _normalize_chart_data(self, raw_data: List[Dict[str, Any]]) -> List[OHLCVData]:
-        """标准化图表数据格式"""
-        normalized_data = []
-
+    def _build_series(self, raw_data: List[Dict[str, Any]]) -> ChartSeries:
+        """标准化为列式序列（按时间排序）"""
+        rows = []
         for row in raw_data:
             try:
                 timestamp = self._parse_timestamp(row)
-
-                ohlcv = OHLCVData(
-                    timestamp=timestamp,
-                    open=float(row.get("Open") or row.get("open", 0)),
-                    high=float(row.get("High") or row.get("high", 0)),
-                    low=float(row.get("Low") or row.get("low", 0)),
-                    close=float(row.get("Close") or row.get("close", 0)),
-                    volume=int(row.get("Volume") or row.get("volume", 0)),
+                offset = timestamp.utcoffset()
+                if offset is None:
+                    epoch = _wall_epoch(timestamp)
+                else:
+                    epoch = int(timestamp.timestamp())
+                    offset = int(offset.total_seconds())
+                volume = row.get("Volume") or row.get("volume", 0)
+                rows.append(
+                    (
+                        epoch,
+                        offset,
+                        float(row.get("Open") or row.get("open", 0)),
+                        float(row.get("High") or row.get("high", 0)),
+                        float(row.get("Low") or row.get("low", 0)),
+                        float(row.get("Close") or row.get("close", 0)),
+                        int(volume) if volume is not None else None,
+                    )
                 )
-                normalized_data.append(ohlcv)
             except Exception as e:
                 logger.warning(f"Error normalizing data row: {e}, row: {row}")
                 continue
 
-        return normalized_data
+        rows.sort(key=lambda r: r[0])
+        offsets = [r[1] for r in rows]
+        uniform = all(o == offsets[0] for o in offsets)
+        return ChartSeries(
+            t=[r[0] for r in rows],
+            tz=(offsets[0] if offsets else None) if uniform else offsets,
+            open=[r[2] for r in rows],
+            high=[r[3] for r in rows],
+            low=[r[4] for r in rows],
+            close=[r[5] for r in rows],
+            volume=[r[6] for r in rows],
+        )
 
     def _parse_timestamp(self, row: Dict[str, Any]) -> datetime:
         """解析时间戳，处理多种格式"""
         ts_val = (
-            row.get("Date")
+            row.get("timestamp")
+            or row.get("Date")
             or row.get("date")
             or row.get("Datetime")
             or row.get("datetime")
@@ -489,156 +743,96 @@ class ChartDataService:
 
         逻辑：
         1. 生成缓存键
-        2. 检查Redis缓存（除非 force_refresh=True）
+        2. 经 LayeredCacheManager 读取（除非 force_refresh=True）
         3. 缓存未命中 -> 调用 SDK Fetcher 获取数据 -> 提取简略信息 -> 存缓存 -> 返回
         4. 缓存命中 -> 直接返回
         
         v2.1 优化：
-        - 在 YFinance 限流时，如果有缓存则返回缓存数据（即使过期）
-        - 增加缓存 TTL 到 10 分钟，减少限流期间的缓存失效
+        - 在 YFinance 限流或 SDK 获取失败时，如果有缓存则返回缓存数据（即使过期）
+        - 缓存 TTL 10 分钟，过期后 30 分钟内仍可作为旧数据返回
         """
         cache_key = f"sparkline:{ticker.upper()}:{period}"
+        loaded = False
 
-        # 1. 尝试从Redis获取缓存
-        cached_data = await self.redis_manager.get_json(cache_key)
-        
-        # 如果有缓存且不强制刷新，直接返回
-        if cached_data and not force_refresh:
-            logger.debug(f"Sparkline cache hit for {cache_key}")
-            return SparklineResponse(
-                ticker=ticker.upper(),
-                period=period,
-                current_price=cached_data["current_price"],
-                change_percent=cached_data["change_percent"],
-                sparkline_data=cached_data["sparkline_data"],
-                last_updated=datetime.fromisoformat(cached_data["last_updated"]),
-                data=cached_data.get("data", cached_data["sparkline_data"]),
-                timestamps=cached_data.get("timestamps", []),
-                high=cached_data.get("high", 0),
-                low=cached_data.get("low", 0),
-                cached=True,
-                last_close_date=cached_data.get("last_close_date"),
-            )
-
-        # 2. 检查 YFinance 是否处于限流状态
-        if is_yfinance_rate_limited():
-            cooldown_remaining = get_yfinance_cooldown_remaining()
-            # 如果有缓存（即使过期），在限流时返回缓存数据
-            if cached_data:
+        async def _load() -> Optional[Dict[str, Any]]:
+            nonlocal loaded
+            if is_yfinance_rate_limited():
+                cooldown_remaining = get_yfinance_cooldown_remaining()
                 logger.warning(
-                    f"YFinance rate limited for sparkline {ticker}, "
-                    f"returning stale cache (cooldown remaining: {cooldown_remaining:.1f}s)"
-                )
-                return SparklineResponse(
-                    ticker=ticker.upper(),
-                    period=period,
-                    current_price=cached_data["current_price"],
-                    change_percent=cached_data["change_percent"],
-                    sparkline_data=cached_data["sparkline_data"],
-                    last_updated=datetime.fromisoformat(cached_data["last_updated"]),
-                    data=cached_data.get("data", cached_data["sparkline_data"]),
-                    timestamps=cached_data.get("timestamps", []),
-                    high=cached_data.get("high", 0),
-                    low=cached_data.get("low", 0),
-                    cached=True,
-                    last_close_date=cached_data.get("last_close_date"),
-                )
-            else:
-                logger.warning(
-                    f"YFinance rate limited for sparkline {ticker}, "
-                    f"no cache available (cooldown remaining: {cooldown_remaining:.1f}s)"
+                    f"YFinance rate limited for sparkline {ticker} "
+                    f"(cooldown remaining: {cooldown_remaining:.1f}s)"
                 )
                 return None
 
-        # 3. 缓存未命中，从 SDK Fetcher 获取数据
-        logger.debug(f"Sparkline cache miss for {cache_key}, fetching from SDK")
-
-        # 将 period 转换为日期范围
-        period_map = {"5d": 5, "1m": 30, "3m": 90, "1y": 365, "5y": 1825}
-        days = period_map.get(period, 5)
+            logger.debug(f"Sparkline cache miss for {cache_key}, fetching from SDK")
 
-        request = ChartDataRequest(
-            ticker=ticker,
-            resolution="1d",
-            start_date=(datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d"),
-            end_date=datetime.now().strftime("%Y-%m-%d"),
-            limit=100,
-        )
+            # 将 period 转换为日期范围
+            period_map = {"5d": 5, "1m": 30, "3m": 90, "1y": 365, "5y": 1825}
+            days = period_map.get(period, 5)
 
-        raw_data = await self._fetch_from_sdk(request)
-
-        if not raw_data or len(raw_data) == 0:
-            # 如果获取失败但有缓存，返回缓存数据
-            if cached_data:
-                logger.warning(f"SDK fetch failed for sparkline {ticker}, returning stale cache")
-                return SparklineResponse(
-                    ticker=ticker.upper(),
-                    period=period,
-                    current_price=cached_data["current_price"],
-                    change_percent=cached_data["change_percent"],
-                    sparkline_data=cached_data["sparkline_data"],
-                    last_updated=datetime.fromisoformat(cached_data["last_updated"]),
-                    data=cached_data.get("data", cached_data["sparkline_data"]),
-                    timestamps=cached_data.get("timestamps", []),
-                    high=cached_data.get("high", 0),
-                    low=cached_data.get("low", 0),
-                    cached=True,
-                    last_close_date=cached_data.get("last_close_date"),
-                )
-            return None
+            request = ChartDataRequest(
+                ticker=ticker,
+                resolution="1d",
+                start_date=(datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d"),
+                end_date=datetime.now().strftime("%Y-%m-%d"),
+                limit=100,
+            )
 
-        # 4. 提取简略信息
-        chart_data = self._normalize_chart_data(raw_data)
+            raw_data = await self._fetch_from_sdk(request)
+            if not raw_data:
+                logger.warning(f"SDK fetch returned no sparkline data for {ticker}")
+                return None
 
-        if len(chart_data) == 0:
-            return None
+            series = self._build_series(raw_data)
+            if len(series) == 0:
+                return None
 
-        # 计算变化百分比
-        first_close = chart_data[0].close
-        last_close = chart_data[-1].close
-        change_percent = (
-            ((last_close - first_close) / first_close * 100) if first_close > 0 else 0
-        )
+            # 计算变化百分比
+            first_close = series.close[0]
+            last_close = series.close[-1]
+            change_percent = (
+                ((last_close - first_close) / first_close * 100) if first_close > 0 else 0
+            )
 
-        # 提取简化的价格数据点（只保留收盘价）
-        sparkline_data = [item.close for item in chart_data]
-
-        # 计算高低点
-        high_price = max(item.high for item in chart_data) if chart_data else 0
-        low_price = min(item.low for item in chart_data) if chart_data else 0
-
-        # 提取时间戳标签
-        timestamps = [item.timestamp.strftime("%Y-%m-%d") for item in chart_data]
-
-        # 获取最后收盘价的日期
-        last_close_date = chart_data[-1].timestamp.strftime("%Y-%m-%d") if chart_data else None
-
-        # 5. 存储到Redis缓存（缓存10分钟，增加以应对限流）
-        cache_data = {
-            "current_price": last_close,
-            "change_percent": change_percent,
-            "sparkline_data": sparkline_data,
-            "last_updated": datetime.now().isoformat(),
-            "data": sparkline_data,
-            "timestamps": timestamps,
-            "high": high_price,
-            "low": low_price,
-            "last_close_date": last_close_date,
-        }
+            # 提取简化的价格数据点（只保留收盘价）
+            sparkline_data = list(series.close)
+            dates = [ts.strftime("%Y-%m-%d") for ts in series.timestamps()]
+
+            loaded = True
+            return {
+                "current_price": last_close,
+                "change_percent": change_percent,
+                "sparkline_data": sparkline_data,
+                "last_updated": datetime.now().isoformat(),
+                "data": sparkline_data,
+                "timestamps": dates,
+                "high": max(series.high),
+                "low": min(series.low),
+                "last_close_date": dates[-1],
+            }
 
-        await self.redis_manager.set(cache_key, cache_data, ttl=600)
+        cached_data = await self.cache.get_or_compute(
+            cache_key,
+            _load,
+            ttl=self.SPARKLINE_TTL,
+            stale_ttl=self.SPARKLINE_STALE_TTL,
+            negative_ttl=self.NEGATIVE_TTL,
+            force_refresh=force_refresh,
+        )
+        if not cached_data:
+            return None
 
         return SparklineResponse(
             ticker=ticker.upper(),
             period=period,
-            current_price=last_close,
-            change_percent=change_percent,
-            sparkline_data=sparkline_data,
-            last_updated=datetime.now(),
-            data=sparkline_data,
-            timestamps=timestamps,
-            high=high_price,
-            low=low_price,
-            cached=False,
-            last_close_date=last_close_date,
+            current_price=cached_data["current_price"],
+            change_percent=cached_data["change_percent"],
+            sparkline_data=cached_data["sparkline_data"],
+            last_updated=datetime.fromisoformat(cached_data["last_updated"]),
+            data=cached_data.get("data", cached_data["sparkline_data"]),
+            timestamps=cached_data.get("timestamps", []),
+            high=cached_data.get("high", 0),
+            low=cached_data.get("low", 0),
+            cached=not loaded,
+            last_close_date=cached_data.get("last_close_date"),
         )
@@ -15,6 +15,11 @@ class TierLimits(BaseModel):
     max_iterations: int = Field(..., ge=1)
     timeout_seconds: int = Field(..., gt=0)
     max_parallel_tools: int = Field(..., ge=0)
+    # Job scheduling (thread-mode JobManager): per-user run caps and the
+    # weighted-fair-queuing share relative to other tiers.
+    max_concurrent_runs: int = Field(1, ge=1)
+    max_queued_runs: int = Field(2, ge=0)
+    queue_weight: int = Field(1, ge=1)
 
     class Config:
         extra = "forbid"
@@ -105,6 +110,16 @@ class EntitlementsConfigLoader:
         except ValidationError as exc:  # pragma: no cover - covered by tests using ValueError below
             raise ValueError(f"Invalid entitlements config: {exc}") from exc
 
+    def reload(self) -> EntitlementsConfig:
+        """Drop the cached config on this worker and all others, then re-read the file."""
+        try:
+            from AICrews.infrastructure.cache.invalidation_bus import get_invalidation_bus
+
+            get_invalidation_bus().publish_sync(ENTITLEMENTS_CACHE_NAMESPACE, clear=True)
+        except Exception:  # pragma: no cover - bus is optional for standalone use
+            clear_entitlements_cache()
+        return self.get()
+
     def fingerprint(self) -> str:
         """
         Returns a stable fingerprint (sha256) of the current entitlements config file.
@@ -113,3 +128,24 @@ class EntitlementsConfigLoader:
         if self._fingerprint is None:
             self.get()
         return self._fingerprint or ""
+
+
+# Cache invalidation bus namespace: after editing entitlements.yaml, publishing
+# a clear on this namespace makes every worker re-read the file.
+ENTITLEMENTS_CACHE_NAMESPACE = "entitlements"
+
+
+def clear_entitlements_cache(_keys=None) -> None:
+    EntitlementsConfigLoader.get.cache_clear()
+
+
+def _register_invalidation() -> None:
+    try:
+        from AICrews.infrastructure.cache.invalidation_bus import get_invalidation_bus
+
+        get_invalidation_bus().register(ENTITLEMENTS_CACHE_NAMESPACE, clear_entitlements_cache)
+    except Exception:  # pragma: no cover - bus is optional for standalone use
+        pass
+
+
+_register_invalidation()
@@ -17,7 +17,7 @@ from AICrews.schemas.entitlements import (
     RuntimeLimits,
     TierType,
 )
-from AICrews.services.entitlements.config_loader import EntitlementsConfigLoader
+from AICrews.services.entitlements.config_loader import EntitlementsConfigLoader, TierLimits
 from AICrews.services.entitlements.effective_tier import resolve_effective_tier
 
 
@@ -124,6 +124,12 @@ class EntitlementPolicyEngine:
             byok_used=None,
         )
 
+    def tier_limits(self, tier: Optional[str]) -> TierLimits:
+        """Configured limits for a tier name (unknown / missing tiers fall back to free)."""
+        cfg = self._loader.get()
+        tier_norm = str(getattr(tier, "value", tier) or "free").lower()
+        return cfg.tiers.get(tier_norm, cfg.tiers["free"]).limits
+
     def snapshot(
         self,
         db: Session,
@@ -13,6 +13,7 @@ from AICrews.database.models import (
     UserKnowledgeSource, CrewKnowledgeBinding, AgentKnowledgeBinding,
     TradingLesson, KnowledgeSourceVersion, KnowledgeUsageLog
 )
+from AICrews.infrastructure.knowledge.knowledge_sources import invalidate_knowledge_source
 from AICrews.schemas.knowledge import (
     KnowledgeSourceResponse,
     CreateUserKnowledgeRequest,
@@ -399,6 +400,7 @@ class KnowledgeService:
         
         self.db.delete(source)
         self.db.commit()
+        invalidate_knowledge_source("user", source_id)
         
         return {"message": "Knowledge source deleted successfully"}
 
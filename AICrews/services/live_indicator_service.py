@@ -0,0 +1,212 @@
+"""
+Live Indicator Service - 实时行情驱动的增量指标
+
+UnifiedSyncService 每批次发布行情后调用 on_quotes()：
+- 已有状态的标的：O(1) 增量更新（见 AICrews.tools.streaming_indicators）
+- 首次出现的标的：优先从 Redis 恢复状态，否则用 OHLCVStore 的日线历史回放初始化
+- 更新后的状态批量写回 Redis（单次 pipeline），供其他 worker 和重启后恢复
+- 除默认指标外，可通过 set_requirements() 为标的追加指标规格（如策略告警引擎
+  需要的 sma:60），缺少规格的标的会在后台重新回放历史
+
+K 线日期按交易所时区确定（行情自带 trade_date 时优先使用）；休市时段到达的行情
+（盘前盘后、周末、收盘后的重复报价）不推进当前 K 线。
+
+读路径 get_indicators()/get_indicators_batch() 只读内存/Redis，不触发外部 I/O。
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, time as dt_time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import pytz
+
+from AICrews.infrastructure.cache.redis_manager import get_redis_manager
+from AICrews.infrastructure.data_fetcher import MarketType, detect_market
+from AICrews.observability.logging import get_logger
+from AICrews.tools.streaming_indicators import DEFAULT_SPECS, IndicatorSet
+
+logger = get_logger(__name__)
+
+# 各市场的交易所时区与常规交易时段（日线 K 线只包含常规时段）
+_EXCHANGE_SESSIONS = {
+    MarketType.US: ("America/New_York", ((dt_time(9, 30), dt_time(16, 0)),)),
+    MarketType.HK: ("Asia/Hong_Kong", ((dt_time(9, 30), dt_time(12, 0)), (dt_time(13, 0), dt_time(16, 0)))),
+    MarketType.CN: ("Asia/Shanghai", ((dt_time(9, 30), dt_time(11, 30)), (dt_time(13, 0), dt_time(15, 0)))),
+}
+
+
+def quote_bar_date(
+    ticker: str, quote: Dict[str, Any], now: Optional[datetime] = None
+) -> Optional[str]:
+    """行情所属的日线 K 线日期（交易所时区）；休市时返回 None
+
+    加密货币 7x24 交易，按 UTC 日期切分；其余市场只在常规交易时段内接受行情。
+    行情源提供 trade_date 时以其为准，早于当前 K 线的日期由 IndicatorSet 忽略。
+    """
+    now = now or datetime.now(pytz.utc)
+    market = detect_market(ticker)
+    if market == MarketType.CRYPTO:
+        return quote.get("trade_date") or now.astimezone(pytz.utc).date().isoformat()
+
+    tz_name, sessions = _EXCHANGE_SESSIONS.get(market, _EXCHANGE_SESSIONS[MarketType.US])
+    local = now.astimezone(pytz.timezone(tz_name))
+    if local.weekday() >= 5:
+        return None
+    if not any(start <= local.time() <= end for start, end in sessions):
+        return None
+    return quote.get("trade_date") or local.date().isoformat()
+
+
+class LiveIndicatorService:
+    """按标的维护增量指标状态"""
+
+    # 初始化所需的历史区间（需覆盖最长预热窗口 MACD 26+9）
+    SEED_PERIOD = "1y"
+    # 初始化失败后的重试间隔（秒），避免每批次都重新拉取历史
+    SEED_RETRY_SECONDS = 600
+
+    def __init__(self):
+        self.redis = get_redis_manager()
+        self._states: Dict[str, IndicatorSet] = {}
+        self._requirements: Dict[str, Set[str]] = {}
+        self._seeding: set = set()
+        self._seed_failed_at: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+        self._seed_semaphore = asyncio.Semaphore(
+            int(os.getenv("FAIC_LIVE_INDICATOR_SEED_CONCURRENCY", "8"))
+        )
+
+    def set_requirements(self, requirements: Dict[str, Iterable[str]]) -> None:
+        """设置各标的额外需要的指标规格（整体替换）"""
+        self._requirements = {ticker: set(specs) for ticker, specs in requirements.items()}
+
+    def _specs_for(self, ticker: str) -> List[str]:
+        return list(DEFAULT_SPECS) + sorted(self._requirements.get(ticker, ()))
+
+    async def on_quotes(self, quotes: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """应用一批行情，返回各标的最新指标快照（仅包含已初始化的标的）"""
+        if not quotes:
+            return {}
+
+        async with self._lock:
+            missing = [t for t in quotes if t not in self._states and t not in self._seeding]
+            if missing:
+                restored = await self.redis.get_indicator_states(missing)
+                for ticker, payload in restored.items():
+                    if not payload:
+                        continue
+                    try:
+                        self._states[ticker] = IndicatorSet.from_dict(payload)
+                    except Exception as e:
+                        logger.warning(f"Discarding invalid indicator state for {ticker}: {e}")
+
+            # 新标的以及缺少所需规格的标的需要回放历史；后者在重新初始化前继续使用旧状态
+            now = time.monotonic()
+            to_seed = [
+                t for t in quotes
+                if t not in self._seeding
+                and now - self._seed_failed_at.get(t, -self.SEED_RETRY_SECONDS) >= self.SEED_RETRY_SECONDS
+                and (t not in self._states or not self._states[t].has_specs(self._specs_for(t)))
+            ]
+            self._seeding.update(to_seed)
+
+            snapshots = {}
+            changed = {}
+            for ticker, quote in quotes.items():
+                indicator_set = self._states.get(ticker)
+                price = quote.get("price")
+                if indicator_set is None or price is None:
+                    continue
+                bar_ts = quote_bar_date(ticker, quote)
+                if bar_ts is None:
+                    continue
+                indicator_set.update_quote(
+                    price=float(price),
+                    bar_ts=bar_ts,
+                    volume=quote.get("volume"),
+                    high=quote.get("high"),
+                    low=quote.get("low"),
+                )
+                snapshots[ticker] = indicator_set.snapshot()
+                changed[ticker] = indicator_set.to_dict()
+
+        if changed:
+            await self.redis.set_indicator_states(changed)
+
+        for ticker in to_seed:
+            asyncio.create_task(self._seed(ticker, quotes[ticker]))
+
+        return snapshots
+
+    def get_indicators(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """读取内存中的最新指标快照"""
+        indicator_set = self._states.get(ticker)
+        return indicator_set.snapshot() if indicator_set else None
+
+    async def get_indicators_batch(self, tickers: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """批量读取指标快照（内存未命中时从 Redis 读取，不做初始化）"""
+        result = {t: self.get_indicators(t) for t in tickers}
+        missing = [t for t, snapshot in result.items() if snapshot is None]
+        if missing:
+            for ticker, payload in (await self.redis.get_indicator_states(missing)).items():
+                if payload:
+                    try:
+                        result[ticker] = IndicatorSet.from_dict(payload).snapshot()
+                    except Exception:
+                        result[ticker] = None
+        return result
+
+    def forget(self, ticker: str) -> None:
+        """标的取消订阅后释放内存状态（Redis 中的状态保留至 TTL 过期）"""
+        self._states.pop(ticker, None)
+
+    async def _seed(self, ticker: str, quote: Dict[str, Any]) -> None:
+        """用日线历史回放初始化指标状态"""
+        try:
+            async with self._seed_semaphore:
+                from AICrews.infrastructure.data_fetcher.ohlcv_store import get_ohlcv_store
+
+                df = await get_ohlcv_store().get_history(ticker, period=self.SEED_PERIOD)
+                if df is None or df.empty:
+                    logger.debug(f"No history to seed live indicators for {ticker}")
+                    self._seed_failed_at[ticker] = time.monotonic()
+                    return
+                indicator_set = await asyncio.to_thread(
+                    IndicatorSet.from_history, df, self._specs_for(ticker)
+                )
+
+            async with self._lock:
+                # 回放期间到达的行情以本次初始化时的行情代替，下一批次行情会继续更新
+                bar_ts = quote_bar_date(ticker, quote)
+                if quote.get("price") is not None and bar_ts is not None:
+                    indicator_set.update_quote(
+                        price=float(quote["price"]),
+                        bar_ts=bar_ts,
+                        volume=quote.get("volume"),
+                        high=quote.get("high"),
+                        low=quote.get("low"),
+                    )
+                self._states[ticker] = indicator_set
+                state = indicator_set.to_dict()
+            self._seed_failed_at.pop(ticker, None)
+            await self.redis.set_indicator_states({ticker: state})
+        except Exception as e:
+            logger.warning(f"Failed to seed live indicators for {ticker}: {e}")
+            self._seed_failed_at[ticker] = time.monotonic()
+        finally:
+            self._seeding.discard(ticker)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"tickers": len(self._states), "seeding": len(self._seeding)}
+
+
+_live_indicator_service: Optional[LiveIndicatorService] = None
+
+
+def get_live_indicator_service() -> LiveIndicatorService:
+    global _live_indicator_service
+    if _live_indicator_service is None:
+        _live_indicator_service = LiveIndicatorService()
+    return _live_indicator_service
@@ -1208,40 +1208,44 @@ class MarketService(BaseService[Asset]):
             if market_hint in ("HK", "SS", "SZ", "CN"):
                 # A-shares and HK stocks
                 try:
-                    def search_a_shares():
-                        try:
-                            # Get A-share stock list
-                            df = ak.stock_zh_a_spot_em()
-                            if df is not None and not df.empty:
-                                matches = []
-                                for _, row in df.iterrows():
-                                    code = str(row.get("代码", ""))
-                                    name = str(row.get("名称", ""))
-                                    if query in code or query in name.upper():
-                                        # Determine exchange
-                                        if code.startswith(("600", "601", "603", "605", "688")):
-                                            suffix = ".SS"
-                                            exchange = "SSE"
-                                        else:
-                                            suffix = ".SZ"
-                                            exchange = "SZSE"
-                                        matches.append({
-                                            "ticker": f"{code}{suffix}",
-                                            "name": name,
-                                            "exchange": exchange,
-                                            "asset_type": "CN",
-                                            "currency": "CNY",
-                                        })
-                                        if len(matches) >= limit:
-                                            break
-                                return matches
-                        except Exception as e:
-                            logger.debug(f"akshare A-share search failed for query '{query}': {e}")
-                        return []
+                    from AICrews.infrastructure.data_fetcher.akshare_fetcher import (
+                        SPOT_MARKET_CN,
+                        get_spot_snapshot_cache,
+                    )
 
-                    matches = await asyncio.wait_for(
-                        asyncio.to_thread(search_a_shares), timeout=5.0
+                    def to_match(code: str, name: str) -> Dict[str, Any]:
+                        # Determine exchange
+                        if code.startswith(("600", "601", "603", "605", "688")):
+                            suffix = ".SS"
+                            exchange = "SSE"
+                        else:
+                            suffix = ".SZ"
+                            exchange = "SZSE"
+                        return {
+                            "ticker": f"{code}{suffix}",
+                            "name": name,
+                            "exchange": exchange,
+                            "asset_type": "CN",
+                            "currency": "CNY",
+                        }
+
+                    # Shared spot snapshot: one upstream download per refresh interval
+                    snapshot = await asyncio.wait_for(
+                        get_spot_snapshot_cache().get_snapshot(SPOT_MARKET_CN),
+                        timeout=5.0,
                     )
+                    matches = []
+                    code_query = query.split(".")[0]
+                    exact = snapshot.get(code_query)
+                    if exact is not None:
+                        matches.append(to_match(code_query, str(exact.get("名称", ""))))
+                    else:
+                        for code, row in snapshot.items():
+                            name = str(row.get("名称", ""))
+                            if query in code or query in name.upper():
+                                matches.append(to_match(code, name))
+                                if len(matches) >= limit:
+                                    break
                     for m in matches:
                         results.append(AssetSearchResult(**m))
                 except asyncio.TimeoutError:
@@ -255,28 +255,18 @@ class QuickAnalysisService:
             return {"price": "N/A", "change": "N/A", "change_percent": 0}
 
     async def _get_price_from_akshare(self, ticker: str) -> Dict[str, Any]:
-        """使用 akshare 获取 A股/港股价格数据"""
+        """使用 akshare 获取 A股/港股价格数据（读取进程级共享行情快照）"""
         try:
-            import akshare as ak
-
-            if ticker.endswith(".HK"):
-                code = ticker.replace(".HK", "").zfill(5)
+            from AICrews.infrastructure.data_fetcher.akshare_fetcher import (
+                SPOT_MARKET_CN,
+                SPOT_MARKET_HK,
+                get_spot_snapshot_cache,
+            )
 
-                def fetch_hk_data():
-                    try:
-                        df = ak.stock_hk_spot()
-                        if df is not None and not df.empty:
-                            for _, row in df.iterrows():
-                                row_code = str(
-                                    row.get("symbol", "") or row.get("代码", "")
-                                )
-                                if code in row_code or row_code.endswith(code):
-                                    return row.to_dict()
-                    except Exception as e:
-                        logger.warning(f"akshare stock_hk_spot failed: {e}")
-                    return None
+            spot_cache = get_spot_snapshot_cache()
 
-                row_data = await asyncio.to_thread(fetch_hk_data)
+            if ticker.endswith(".HK"):
+                row_data = await spot_cache.lookup(SPOT_MARKET_HK, ticker)
                 if row_data:
                     price = row_data.get("lasttrade") or row_data.get("最新价")
                     prev_close = row_data.get("prevclose") or row_data.get("昨收")
@@ -308,19 +298,7 @@ class QuickAnalysisService:
 
             elif ticker.endswith(".SS") or ticker.endswith(".SZ"):
                 code = ticker.replace(".SS", "").replace(".SZ", "")
-
-                def fetch_a_stock_data():
-                    try:
-                        df = ak.stock_zh_a_spot_em()
-                        if df is not None and not df.empty:
-                            for _, row in df.iterrows():
-                                if str(row.get("代码", "")) == code:
-                                    return row.to_dict()
-                    except Exception as e:
-                        logger.warning(f"akshare stock_zh_a_spot_em failed: {e}")
-                    return None
-
-                row_data = await asyncio.to_thread(fetch_a_stock_data)
+                row_data = await spot_cache.lookup(SPOT_MARKET_CN, code)
                 if row_data:
 
                     def safe_float(value, default=0):
@@ -161,6 +161,67 @@ class RealtimeWebSocketManager:
         
         return sent_count
     
+    async def broadcast_price_updates(self, quotes: Dict[str, Dict[str, Any]]) -> int:
+        """批量广播一批价格更新
+
+        每个 ticker 的消息只序列化一次；每个连接只遍历一次，
+        发送失败的连接断开后不再重试本批次剩余消息。
+        消息格式与 broadcast_price_update 保持一致（每个 ticker 一帧）。
+        """
+        if not quotes:
+            return 0
+
+        all_connections = self._price_connections.get("_all", set())
+        outbox: Dict[WebSocket, list] = {}
+        for ticker, data in quotes.items():
+            connections = self._price_connections.get(ticker, set()) | all_connections
+            if not connections:
+                continue
+            message = json.dumps({
+                "type": "price_update",
+                "ticker": ticker,
+                "data": data
+            })
+            for connection in connections:
+                outbox.setdefault(connection, []).append(message)
+
+        sent_count = 0
+        for connection, messages in outbox.items():
+            try:
+                for message in messages:
+                    await connection.send_text(message)
+                    sent_count += 1
+            except Exception as e:
+                logger.error(f"Failed to send batched price update: {e}")
+                self.disconnect_price(connection)
+
+        return sent_count
+    
+    def bind_user(self, websocket: WebSocket, user_id: int) -> None:
+        """将已认证的连接绑定到用户，用于 send_to_user 定向推送"""
+        info = self._connection_info.get(websocket)
+        if info is None:
+            return
+        info["user_id"] = user_id
+        self._user_connections.setdefault(user_id, set()).add(websocket)
+
+    async def send_to_user(self, user_id: int, message: Dict[str, Any]) -> int:
+        """推送消息到用户的所有连接"""
+        connections = self._user_connections.get(user_id)
+        if not connections:
+            return 0
+
+        payload = json.dumps(message, default=str)
+        sent_count = 0
+        for connection in list(connections):
+            try:
+                await connection.send_text(payload)
+                sent_count += 1
+            except Exception as e:
+                logger.error(f"Failed to send user message: {e}")
+                self.disconnect_price(connection)
+        return sent_count
+    
     async def send_to_connection(self, websocket: WebSocket, message: Dict[str, Any]) -> bool:
         """发送消息到单个连接"""
         try:
@@ -0,0 +1,169 @@
+"""
+Run Event Dispatcher - 运行事件到 WebSocket 的批量分发
+
+TrackingService 的事件大多来自 crew 工作线程（工具调用、LLM 回调、Agent 活动），
+这些线程没有运行中的事件循环。此前每个事件都 asyncio.run() 一次广播协程，
+即每个事件创建并销毁一个事件循环，且在非主循环上操作 WebSocket 连接。
+
+这里在应用主事件循环上运行唯一的分发任务：
+- 工作线程通过 loop.call_soon_threadsafe 把事件交给主循环，不再创建事件循环
+- 分发任务被唤醒后等待一个很短的合并窗口（FAIC_RUN_EVENT_FLUSH_MS），
+  将同一 run 的事件按到达顺序合并为批次（最多 FAIC_RUN_EVENT_MAX_BATCH 条）一次发送
+- 待发送事件总数超过 FAIC_RUN_EVENT_MAX_PENDING 时丢弃新事件（事件仍保存在
+  TrackingService 的 ring buffer 中，客户端可通过任务状态接口补齐）
+- 未绑定事件循环（如独立 worker 进程，没有 WebSocket 客户端）时直接丢弃广播
+
+使用方式:
+    dispatcher = RunEventDispatcher()
+    dispatcher.set_sink(ws_manager)      # 提供 broadcast_batch(run_id, events)
+    await dispatcher.start()             # 在应用事件循环中调用
+    dispatcher.submit(run_id, payload)   # 任意线程
+"""
+
+import asyncio
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from AICrews.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class RunEventDispatcher:
+    """把任意线程产生的运行事件批量分发到 WebSocket 管理器"""
+
+    def __init__(
+        self,
+        flush_interval: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ):
+        self.flush_interval = flush_interval if flush_interval is not None else (
+            float(os.getenv("FAIC_RUN_EVENT_FLUSH_MS", "50")) / 1000
+        )
+        self.max_batch = max_batch or int(os.getenv("FAIC_RUN_EVENT_MAX_BATCH", "100"))
+        self.max_pending = max_pending or int(os.getenv("FAIC_RUN_EVENT_MAX_PENDING", "10000"))
+
+        self._sink: Any = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        # 以下状态只在事件循环线程中访问，无需加锁
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._pending_count = 0
+        self._stats = {"submitted": 0, "sent": 0, "batches": 0, "dropped": 0, "errors": 0}
+
+    def set_sink(self, sink: Any) -> None:
+        """设置接收方（backend.app.ws.run_log_manager.manager）"""
+        self._sink = sink
+
+    # =========================================================================
+    # 生命周期
+    # =========================================================================
+
+    async def start(self) -> None:
+        """绑定当前运行的事件循环并启动分发任务"""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="run_event_dispatcher")
+        logger.info(
+            f"Run event dispatcher started: flush={self.flush_interval * 1000:.0f}ms, "
+            f"max_batch={self.max_batch}"
+        )
+
+    async def stop(self) -> None:
+        """停止分发任务，并发送剩余事件"""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self._flush()
+        self._loop = None
+        self._loop_thread = None
+        logger.info(f"Run event dispatcher stopped: {self._stats}")
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    # =========================================================================
+    # 提交
+    # =========================================================================
+
+    def submit(self, run_id: str, payload: Dict[str, Any]) -> None:
+        """提交一个事件（线程安全，不阻塞调用方）"""
+        loop = self._loop
+        if loop is None or self._sink is None or loop.is_closed():
+            self._stats["dropped"] += 1
+            return
+        self._stats["submitted"] += 1
+        if threading.get_ident() == self._loop_thread:
+            self._enqueue(run_id, payload)
+            return
+        try:
+            loop.call_soon_threadsafe(self._enqueue, run_id, payload)
+        except RuntimeError:
+            # 事件循环已关闭（进程退出中）
+            self._stats["dropped"] += 1
+
+    def _enqueue(self, run_id: str, payload: Dict[str, Any]) -> None:
+        if self._pending_count >= self.max_pending:
+            self._stats["dropped"] += 1
+            if self._stats["dropped"] % 1000 == 1:
+                logger.warning(
+                    f"Run event dispatcher backlog full ({self.max_pending}); dropping events"
+                )
+            return
+        self._pending.setdefault(run_id, []).append(payload)
+        self._pending_count += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # =========================================================================
+    # 分发
+    # =========================================================================
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            # 合并窗口：让同一时刻涌入的事件进入同一批次
+            if self.flush_interval > 0:
+                await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        self._pending_count = 0
+        for run_id, events in pending.items():
+            for start in range(0, len(events), self.max_batch):
+                await self._send(run_id, events[start:start + self.max_batch])
+
+    async def _send(self, run_id: str, events: List[Dict[str, Any]]) -> None:
+        sink = self._sink
+        if sink is None:
+            return
+        try:
+            if hasattr(sink, "broadcast_batch"):
+                await sink.broadcast_batch(run_id, events)
+            else:
+                for event in events:
+                    await sink.broadcast_to_run(run_id, event)
+            self._stats["sent"] += len(events)
+            self._stats["batches"] += 1
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"Failed to broadcast run events for {run_id}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "pending": self._pending_count, "running": self.running}
@@ -0,0 +1,278 @@
+"""
+Strategy Alert Engine - 服务端策略告警
+
+在 UnifiedSyncService 每批次行情发布后，对订阅了告警的用户策略重新求值：
+- 索引：活跃策略按其关注的标的建立 ticker -> 公式 -> 策略 的倒排索引，
+  每批次只评估发生变化的标的所关联的策略；同一标的上相同公式只求值一次
+- 求值：公式预编译（ExpressionEngine.compile 进程级缓存），指标来自
+  LiveIndicatorService 的增量状态（O(1) 更新），不重新加载历史
+- 去重：同一 (策略, 标的) 只在信号由假变真时触发，且每根 K 线最多一次
+  （Redis SET NX 跨 worker / 重启去重）
+- 推送：NotificationService 系统 webhook + 用户 WebSocket 连接
+
+策略通过 variables 中的 alert 配置订阅告警：
+    {"alert": {"enabled": true, "tickers": ["AAPL", "0700.HK"]}}
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from AICrews.database.db_manager import get_db_session
+from AICrews.database.models import UserStrategy
+from AICrews.infrastructure.cache.redis_manager import get_redis_manager
+from AICrews.observability.logging import get_logger
+from AICrews.services.live_indicator_service import get_live_indicator_service
+from AICrews.services.realtime_ws_manager import get_realtime_ws_manager
+from AICrews.tools.expression_tools import (
+    CompiledFormula,
+    ExpressionEngine,
+    ExpressionParseError,
+)
+
+logger = get_logger(__name__)
+
+
+# 单个策略最多关注的标的数
+MAX_ALERT_TICKERS_PER_STRATEGY = 200
+
+
+@dataclass(frozen=True)
+class AlertWatch:
+    """一条 (策略, 标的) 告警订阅"""
+    strategy_id: int
+    user_id: int
+    name: str
+    formula: str
+    compiled: CompiledFormula
+    specs: Tuple[str, ...]
+
+
+def alert_tickers(variables: Optional[Dict[str, Any]]) -> List[str]:
+    """从策略 variables 中解析告警关注的标的（未启用时返回空列表）"""
+    alert = (variables or {}).get("alert") if isinstance(variables, dict) else None
+    if not isinstance(alert, dict) or not alert.get("enabled"):
+        return []
+    tickers = alert.get("tickers") or []
+    if not isinstance(tickers, list):
+        return []
+    normalized = dict.fromkeys(
+        str(t).strip().upper() for t in tickers if isinstance(t, str) and t.strip()
+    )
+    return list(normalized)[:MAX_ALERT_TICKERS_PER_STRATEGY]
+
+
+class StrategyAlertEngine:
+    """策略告警引擎"""
+
+    FIRED_PREFIX = "alert:fired:"
+    # 去重键保留时长（覆盖周末/节假日的同一根 K 线）
+    FIRED_TTL = 4 * 24 * 3600
+
+    def __init__(self):
+        self.engine = ExpressionEngine()
+        self.redis = get_redis_manager()
+        self.ws_manager = get_realtime_ws_manager()
+        self.refresh_seconds = int(os.getenv("FAIC_STRATEGY_ALERT_REFRESH_SECONDS", "60"))
+
+        # ticker -> 规范化公式 -> 订阅列表
+        self._index: Dict[str, Dict[str, List[AlertWatch]]] = {}
+        self._last_results: Dict[Tuple[int, str], bool] = {}
+        self._refreshed_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._stats = {"evaluations": 0, "alerts": 0, "errors": 0}
+
+    # =========================================================================
+    # 索引
+    # =========================================================================
+
+    @property
+    def watched_tickers(self) -> Set[str]:
+        return set(self._index)
+
+    def invalidate(self) -> None:
+        """策略变更后调用，下一次 refresh_index 立即重建索引"""
+        self._refreshed_at = 0.0
+
+    async def refresh_index(self, force: bool = False) -> bool:
+        """从数据库重建倒排索引（按 refresh_seconds 节流）
+
+        Returns:
+            是否执行了重建
+        """
+        if not force and time.monotonic() - self._refreshed_at < self.refresh_seconds:
+            return False
+
+        async with self._refresh_lock:
+            if not force and time.monotonic() - self._refreshed_at < self.refresh_seconds:
+                return False
+            try:
+                async with get_db_session() as session:
+                    result = await session.execute(
+                        select(
+                            UserStrategy.id,
+                            UserStrategy.user_id,
+                            UserStrategy.name,
+                            UserStrategy.formula,
+                            UserStrategy.variables,
+                        ).where(UserStrategy.is_active == True)
+                    )
+                    rows = result.all()
+            except Exception as e:
+                logger.error(f"Failed to load strategies for alert index: {e}")
+                return False
+
+            self._index = self._build_index(rows)
+            self._refreshed_at = time.monotonic()
+
+            # 清理已不再订阅的去重状态
+            active = {
+                (watch.strategy_id, ticker)
+                for ticker, groups in self._index.items()
+                for watches in groups.values()
+                for watch in watches
+            }
+            self._last_results = {k: v for k, v in self._last_results.items() if k in active}
+
+            get_live_indicator_service().set_requirements(self.requirements())
+            logger.info(
+                f"Strategy alert index rebuilt: {len(active)} pairs across {len(self._index)} tickers"
+            )
+            return True
+
+    def _build_index(self, rows: Iterable[Any]) -> Dict[str, Dict[str, List[AlertWatch]]]:
+        index: Dict[str, Dict[str, List[AlertWatch]]] = {}
+        for strategy_id, user_id, name, formula, variables in rows:
+            tickers = alert_tickers(variables)
+            if not tickers:
+                continue
+            try:
+                compiled = self.engine.compile(formula)
+            except ExpressionParseError as e:
+                logger.warning(f"Skipping alerts for strategy {strategy_id}: {e}")
+                continue
+            watch = AlertWatch(
+                strategy_id, user_id, name, formula, compiled,
+                self.engine.streaming_specs(compiled),
+            )
+            for ticker in tickers:
+                index.setdefault(ticker, {}).setdefault(compiled.formula, []).append(watch)
+        return index
+
+    def requirements(self) -> Dict[str, Set[str]]:
+        """各标的需要的增量指标规格"""
+        requirements: Dict[str, Set[str]] = {}
+        for ticker, groups in self._index.items():
+            specs = requirements.setdefault(ticker, set())
+            for watches in groups.values():
+                specs.update(watches[0].specs)
+        return requirements
+
+    # =========================================================================
+    # 求值与推送
+    # =========================================================================
+
+    async def on_snapshots(self, snapshots: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """对发生变化的标的重新求值，返回本批次触发的告警"""
+        candidates = []
+        for ticker, snapshot in snapshots.items():
+            groups = self._index.get(ticker)
+            if not groups:
+                continue
+            for watches in groups.values():
+                compiled = watches[0].compiled
+                # 快照尚未包含所需指标（重新初始化中）时跳过
+                if any(spec not in snapshot for spec in watches[0].specs):
+                    continue
+                try:
+                    result, context = self.engine.evaluate_live(compiled, snapshot)
+                except Exception as e:
+                    self._stats["errors"] += 1
+                    logger.debug(f"Alert evaluation failed for {ticker} / {compiled.formula}: {e}")
+                    continue
+                self._stats["evaluations"] += 1
+
+                for watch in watches:
+                    key = (watch.strategy_id, ticker)
+                    previous = self._last_results.get(key, False)
+                    self._last_results[key] = result
+                    if result and not previous:
+                        candidates.append((watch, ticker, snapshot, context))
+
+        if not candidates:
+            return []
+
+        # 跨 worker / 重启去重：每根 K 线每个 (策略, 标的) 最多触发一次
+        keys = [
+            f"{self.FIRED_PREFIX}{watch.strategy_id}:{ticker}:{snapshot.get('bar_ts')}"
+            for watch, ticker, snapshot, _ in candidates
+        ]
+        claimed = set(await self.redis.claim_keys(keys, ttl=self.FIRED_TTL))
+
+        alerts = []
+        triggered_at = datetime.now().isoformat()
+        for key, (watch, ticker, snapshot, context) in zip(keys, candidates):
+            if key not in claimed:
+                continue
+            alerts.append({
+                "strategy_id": watch.strategy_id,
+                "strategy_name": watch.name,
+                "user_id": watch.user_id,
+                "ticker": ticker,
+                "formula": watch.formula,
+                "signal": "BUY",
+                "price": snapshot.get("close"),
+                "bar_ts": snapshot.get("bar_ts"),
+                "context": {
+                    k: round(float(v), 4) if isinstance(v, (int, float)) else v
+                    for k, v in context.items()
+                },
+                "triggered_at": triggered_at,
+            })
+
+        if alerts:
+            self._stats["alerts"] += len(alerts)
+            await self._emit(alerts)
+        return alerts
+
+    async def _emit(self, alerts: List[Dict[str, Any]]) -> None:
+        for alert in alerts:
+            try:
+                await self.ws_manager.send_to_user(
+                    alert["user_id"], {"type": "strategy_alert", "data": alert}
+                )
+            except Exception as e:
+                logger.warning(f"Failed to push strategy alert over WebSocket: {e}")
+
+        # 系统 webhook 为同步 HTTP 调用，放到工作线程
+        await asyncio.to_thread(self._emit_webhooks, alerts)
+
+    @staticmethod
+    def _emit_webhooks(alerts: List[Dict[str, Any]]) -> None:
+        from AICrews.services.notification_service import NotificationService
+
+        service = NotificationService()
+        for alert in alerts:
+            service.emit_event("strategy.alert_triggered", alert, user_id=alert["user_id"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "tickers": len(self._index),
+            "pairs": len(self._last_results),
+        }
+
+
+_strategy_alert_engine: Optional[StrategyAlertEngine] = None
+
+
+def get_strategy_alert_engine() -> StrategyAlertEngine:
+    global _strategy_alert_engine
+    if _strategy_alert_engine is None:
+        _strategy_alert_engine = StrategyAlertEngine()
+    return _strategy_alert_engine
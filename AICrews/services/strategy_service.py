@@ -1,3 +1,5 @@
+import asyncio
+
 from AICrews.observability.logging import get_logger
 from datetime import datetime
 from typing import List, Optional, Dict, Any
@@ -8,12 +10,20 @@ from sqlalchemy import desc
 from AICrews.database.models import User, UserStrategy
 from AICrews.schemas.strategy import (
     StrategyCreate, StrategyUpdate, StrategyResponse,
-    EvaluationResult, BatchEvaluationResponse
+    EvaluationResult, BatchEvaluationResponse, BacktestResult
 )
-from AICrews.tools.expression_tools import ExpressionEngine
+from AICrews.tools.expression_tools import ExpressionEngine, ExpressionParseError
+from AICrews.services.strategy_alert_service import get_strategy_alert_engine
 
 logger = get_logger(__name__)
 
+# 批量评估的标的数量上限（批量模式下指标按面板向量化计算）
+MAX_BATCH_TICKERS = 500
+
+# 回测前瞻持有期上限（K 线数）与数量上限
+MAX_BACKTEST_HORIZON = 250
+MAX_BACKTEST_HORIZONS = 10
+
 class StrategyService:
     """策略管理服务"""
     
@@ -73,6 +83,7 @@ class StrategyService:
         self.db.add(new_strategy)
         self.db.commit()
         self.db.refresh(new_strategy)
+        get_strategy_alert_engine().invalidate()
         
         logger.info(f"Strategy created: {new_strategy.id} by user {user_id}")
         return self._strategy_to_response(new_strategy)
@@ -116,6 +127,7 @@ class StrategyService:
         
         self.db.commit()
         self.db.refresh(strategy)
+        get_strategy_alert_engine().invalidate()
         return self._strategy_to_response(strategy)
 
     async def delete_strategy(self, user_id: int, strategy_id: int) -> bool:
@@ -130,11 +142,17 @@ class StrategyService:
         
         self.db.delete(strategy)
         self.db.commit()
+        get_strategy_alert_engine().invalidate()
         return True
 
     async def validate_formula(self, formula: str) -> Dict[str, Any]:
-        """验证策略公式语法和安全性"""
+        """验证策略公式语法和安全性（编译结果进入公式缓存，后续评估直接复用）"""
         is_valid, error = self.engine.validate_formula(formula)
+        if is_valid:
+            try:
+                self.engine.compile(formula)
+            except ExpressionParseError as e:
+                is_valid, error = False, str(e)
         return {
             "is_valid": is_valid,
             "formula": formula,
@@ -205,23 +223,21 @@ class StrategyService:
         if strategy.user_id != user_id and not strategy.is_public:
             raise PermissionError("Access denied")
         
+        # 去重并限制数量；公式只编译一次，指标在多标的面板上一次计算
+        unique_tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+        tickers = unique_tickers[:MAX_BATCH_TICKERS]
+        
+        evaluations = await self.engine.evaluate_for_tickers(tickers, strategy.formula)
+        
         results = []
-        for ticker in tickers[:20]:  # 限制最多20个
-            try:
-                result = await self.engine.evaluate_for_ticker(ticker, strategy.formula)
-                results.append({
-                    "ticker": ticker,
-                    "result": result.get("result"),
-                    "signal": "BUY" if result.get("result") else "NO SIGNAL",
-                    "error": result.get("error")
-                })
-            except Exception as e:
-                results.append({
-                    "ticker": ticker,
-                    "result": None,
-                    "signal": "ERROR",
-                    "error": str(e)
-                })
+        for ticker in tickers:
+            result = evaluations.get(ticker) or {}
+            results.append({
+                "ticker": ticker,
+                "result": result.get("result"),
+                "signal": "BUY" if result.get("result") else "NO SIGNAL",
+                "error": result.get("error")
+            })
         
         # 更新使用统计
         strategy.usage_count += len(tickers)
@@ -240,6 +256,61 @@ class StrategyService:
             }
         )
 
+    async def backtest_strategy(
+        self,
+        user_id: int,
+        ticker: str,
+        strategy_id: Optional[int] = None,
+        formula: Optional[str] = None,
+        period: str = "2y",
+        horizons: Optional[List[int]] = None,
+    ) -> BacktestResult:
+        """历史回测策略
+        
+        在完整历史上逐 K 线向量化求值公式（与实时评估使用同一 QuantEngine 指标），
+        返回信号日期、各持有期胜率/前瞻收益以及回撤统计。
+        """
+        if strategy_id:
+            strategy = self.db.query(UserStrategy).filter(UserStrategy.id == strategy_id).first()
+            if not strategy:
+                raise ValueError("Strategy not found")
+            if strategy.user_id != user_id and not strategy.is_public:
+                raise PermissionError("Access denied")
+            formula = strategy.formula
+        
+        if not formula:
+            raise ValueError("Formula or strategy_id required")
+        
+        horizons = sorted({h for h in (horizons or [1, 5, 10, 20]) if 0 < h <= MAX_BACKTEST_HORIZON})
+        if not horizons or len(horizons) > MAX_BACKTEST_HORIZONS:
+            raise ValueError(
+                f"Provide 1-{MAX_BACKTEST_HORIZONS} horizons between 1 and {MAX_BACKTEST_HORIZON} bars"
+            )
+        
+        ticker = ticker.strip().upper()
+        try:
+            from AICrews.infrastructure.data_fetcher.ohlcv_store import get_ohlcv_store
+            
+            # 直接读 OHLCVStore：MarketDataClient 在无数据时会回退到模拟数据，回测不能基于模拟数据
+            df = await get_ohlcv_store().get_history(ticker, period=period)
+            if df is None or df.empty:
+                raise ValueError("No historical data")
+            if len(df) < 50:
+                raise ValueError("Insufficient historical data")
+            
+            # 指标计算与统计为 CPU 密集型，放到工作线程
+            stats = await asyncio.to_thread(self.engine.backtest, formula, df, tuple(horizons))
+            return BacktestResult(ticker=ticker, period=period, **stats)
+        except Exception as e:
+            logger.error(f"Strategy backtest error: {e}")
+            return BacktestResult(
+                ticker=ticker,
+                formula=formula,
+                period=period,
+                evaluated_at=datetime.now().isoformat(),
+                error=str(e)
+            )
+
     async def get_popular_strategies(self, category: Optional[str] = None, limit: int = 10) -> List[StrategyResponse]:
         """获取热门公开策略"""
         query = self.db.query(UserStrategy).filter(
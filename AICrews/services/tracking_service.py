@@ -1,8 +1,8 @@
-from collections import OrderedDict
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union
-import asyncio
+from typing import Any, Deque, Dict, List, Optional, Union
 import os
+import threading
 
 from AICrews.schemas.stats import (
     TaskExecutionStats,
@@ -24,6 +24,7 @@ from AICrews.observability.crew_run_logger import (
     get_crew_run_logger,
 )
 from AICrews.observability.logging import get_logger
+from AICrews.services.run_event_dispatcher import RunEventDispatcher
 
 logger = get_logger(__name__)
 
@@ -353,6 +354,9 @@ class TrackingService:
     - Time-based retention (configurable via FAIC_TRACKING_RETENTION_HOURS)
     - Per-run event limits (configurable via FAIC_TRACKING_MAX_EVENTS_PER_RUN)
     - Per-run tool/LLM/activity event caps to prevent unbounded list growth
+
+    Run events are kept in a lock-protected ring buffer per run (deque with
+    maxlen) and broadcast through a RunEventDispatcher bound to the app loop.
     """
 
     _instance = None
@@ -384,10 +388,12 @@ class TrackingService:
 
         # OrderedDict for LRU tracking (insertion order = access order via move_to_end)
         self._stats: OrderedDict[str, TaskExecutionStats] = OrderedDict()
-        # run_id -> list of RunEvent objects
-        self._events: OrderedDict[str, List[RunEvent]] = OrderedDict()
+        # run_id -> ring buffer of RunEvent objects (written from crew worker threads)
+        self._events: OrderedDict[str, Deque[RunEvent]] = OrderedDict()
+        self._events_lock = threading.Lock()
         self.storage = None
         self.ws_manager = None
+        self.event_dispatcher = RunEventDispatcher()
         self._initialized = True
 
         logger.info(
@@ -405,6 +411,7 @@ class TrackingService:
         """
         self.storage = storage
         self.ws_manager = ws_manager
+        self.event_dispatcher.set_sink(ws_manager)
 
     def _is_run_expired(self, stats: TaskExecutionStats) -> bool:
         """Check if run is expired based on retention policy."""
@@ -429,7 +436,8 @@ class TrackingService:
             if stats.status in ["completed", "failed"]:
                 # Evict this run
                 del self._stats[run_id]
-                self._events.pop(run_id, None)
+                with self._events_lock:
+                    self._events.pop(run_id, None)
                 logger.debug(
                     f"[TrackingService] LRU eviction: run_id={run_id}, status={stats.status}, "
                     f"new_size={len(self._stats)}"
@@ -529,26 +537,11 @@ class TrackingService:
                 logger.warning(f"Failed to get task stats from storage: {e}")
         return None
 
-    async def _broadcast(self, run_id: str, payload: Dict[str, Any]) -> None:
-        """广播事件到 WebSocket (run_log_manager ring-buffer)。"""
+    def _schedule_broadcast(self, run_id: str, payload: Dict[str, Any]) -> None:
+        """交给主事件循环上的分发器批量广播（任意线程可调用，不阻塞）。"""
         if not self.ws_manager:
             return
-        try:
-            await self.ws_manager.broadcast_to_run(run_id, payload)
-        except Exception as e:
-            logger.error(f"Failed to broadcast run event: {e}")
-
-    def _schedule_broadcast(self, run_id: str, payload: Dict[str, Any]) -> None:
-        """在同步/线程上下文中安全调度广播协程。"""
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(self._broadcast(run_id, payload))
-        except RuntimeError:
-            # 线程中通常没有 running loop
-            try:
-                asyncio.run(self._broadcast(run_id, payload))
-            except Exception as e:
-                logger.error(f"Failed to run broadcast coroutine: {e}")
+        self.event_dispatcher.submit(run_id, payload)
 
     def _get_run_logger(self, job_id: str) -> Optional[CrewRunLogger]:
         """获取指定 job 的 CrewRunLogger（如果存在）"""
@@ -560,23 +553,21 @@ class TrackingService:
         Enforces per-run event limit (configurable via FAIC_TRACKING_MAX_EVENTS_PER_RUN).
         """
         run_id = event.run_id
-        if run_id not in self._events:
-            self._events[run_id] = []
-        self._events[run_id].append(event)
-
-        # Limit memory: FIFO eviction when exceeding max events per run
-        if len(self._events[run_id]) > self._max_events_per_run:
-            evicted = self._events[run_id].pop(0)
-            logger.debug(
-                f"[TrackingService] Run {run_id} event buffer full ({self._max_events_per_run}), evicted oldest event"
-            )
+        with self._events_lock:
+            buffer = self._events.get(run_id)
+            if buffer is None:
+                # Limit memory: the ring buffer drops the oldest event once full
+                buffer = deque(maxlen=self._max_events_per_run)
+                self._events[run_id] = buffer
+            buffer.append(event)
 
         # 广播（兼容线程池执行）
         self._schedule_broadcast(run_id, event.model_dump(mode="json"))
 
     def get_run_events(self, run_id: str) -> List[RunEvent]:
-        """获取任务的所有运行事件"""
-        return self._events.get(run_id, [])
+        """获取任务的所有运行事件（快照，按时间顺序）"""
+        with self._events_lock:
+            return list(self._events.get(run_id, ()))
         
     def add_tool_event(self, job_id: str, event: ToolUsageEvent) -> None:
         """添加工具使用事件
@@ -8,21 +8,26 @@
 
 核心逻辑：
 1. 触发 (Trigger)：用户关注资产
-2. 任务注册 (Registration)：检查是否已在活跃监控，启动同步
-3. 数据拉取 (Fetch & Cache)：调用 MCP API，更新 Redis + DB
-4. 共享 (Sharing)：多用户共享同一份 Redis 缓存
-5. 推送 (Push)：WebSocket 实时推送更新
-6. 注销 (Deregistration)：无用户关注时停止同步
+2. 任务注册 (Registration)：检查是否已在活跃监控，登记到调度器
+3. 批量调度 (Scheduling)：单个调度循环每个 tick 收集到期的 ticker，按市场分桶
+4. 数据拉取 (Fetch & Cache)：yfinance 批量下载 / akshare 行情快照，
+   Redis pipeline 批量写入，RealtimeQuote 单条语句批量 upsert
+5. 共享 (Sharing)：多用户共享同一份 Redis 缓存
+6. 推送 (Push)：每批次一次 WebSocket 广播
+7. 注销 (Deregistration)：无用户关注时停止同步
 """
 
 import asyncio
-from typing import Dict, Optional, Any
+import time
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from dataclasses import dataclass, field
 from concurrent.futures import ThreadPoolExecutor
 
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from AICrews.database.models import (
     Asset,
@@ -33,6 +38,8 @@ from AICrews.database.models import (
 from AICrews.database.db_manager import get_db_session
 from AICrews.infrastructure.cache.redis_manager import get_redis_manager
 from AICrews.services.realtime_ws_manager import get_realtime_ws_manager
+from AICrews.services.live_indicator_service import get_live_indicator_service
+from AICrews.services.strategy_alert_service import get_strategy_alert_engine
 from AICrews.infrastructure.data_fetcher import (
     get_yfinance_fetcher,
     get_akshare_fetcher,
@@ -47,9 +54,15 @@ from AICrews.config.settings import get_settings
 logger = get_logger(__name__)
 
 
+# 调度分桶：同一桶内的 ticker 共用一次批量拉取
+BUCKET_YFINANCE = "yfinance"
+BUCKET_CRYPTO = "crypto"
+BUCKET_AKSHARE = "akshare"
+
+
 @dataclass
 class SyncTask:
-    """同步任务信息
+    """同步任务信息（批量调度器中的单个 ticker 状态）
 
     默认值从 SyncConfig 配置获取，支持通过环境变量覆盖。
     """
@@ -58,7 +71,7 @@ class SyncTask:
     asset_type: str
     subscriber_count: int = 0
     last_sync_at: Optional[datetime] = None
-    task_handle: Optional[asyncio.Task] = None
+    next_sync_at: float = 0.0  # time.monotonic() 时间点，0 表示立即同步
     error_count: int = 0
     is_running: bool = False
 
@@ -74,6 +87,8 @@ class UnifiedSyncService:
 
     def __init__(self):
         self.sync_tasks: Dict[str, SyncTask] = {}
+        # 仅因告警策略而同步的标的（无用户订阅）
+        self._alert_only_tickers: set = set()
         self.yfinance_fetcher = get_yfinance_fetcher()
         self.akshare_fetcher = get_akshare_fetcher()
         self.redis = get_redis_manager()
@@ -81,6 +96,8 @@ class UnifiedSyncService:
         self.executor = ThreadPoolExecutor(max_workers=5)
         self.is_running = False
         self._shutdown_event = asyncio.Event()
+        self._scheduler_wakeup = asyncio.Event()
+        self._scheduler_task: Optional[asyncio.Task] = None
 
     async def start(self) -> None:
         """启动同步服务"""
@@ -99,7 +116,8 @@ class UnifiedSyncService:
         # 启动 Redis Pub/Sub 监听
         await self.ws_manager.start_redis_subscriber(self.redis)
 
-        # 启动主循环
+        # 启动批量调度循环与主循环
+        self._scheduler_task = asyncio.create_task(self._scheduler_loop())
         asyncio.create_task(self._main_loop())
 
         logger.info("Unified sync service started successfully")
@@ -117,14 +135,14 @@ class UnifiedSyncService:
         # 停止 Redis Pub/Sub
         await self.ws_manager.stop_redis_subscriber()
 
-        # 停止所有同步任务
-        for task_info in self.sync_tasks.values():
-            if task_info.task_handle and not task_info.task_handle.done():
-                task_info.task_handle.cancel()
-                try:
-                    await task_info.task_handle
-                except asyncio.CancelledError:
-                    pass
+        # 停止批量调度循环
+        if self._scheduler_task and not self._scheduler_task.done():
+            self._scheduler_task.cancel()
+            try:
+                await self._scheduler_task
+            except asyncio.CancelledError:
+                pass
+        self._scheduler_task = None
 
         self.executor.shutdown(wait=True)
         logger.info("Unified sync service stopped")
@@ -191,6 +209,9 @@ class UnifiedSyncService:
                     await self._start_sync_task(ticker, asset.asset_type)
                     logger.info(f"Started new sync task for {ticker}")
 
+                # 用户订阅接管原本仅为告警而同步的任务，告警取消关注时不再停止它
+                self._alert_only_tickers.discard(ticker)
+
                 await session.commit()
 
                 # 同步更新 Redis 订阅计数
@@ -216,8 +237,11 @@ class UnifiedSyncService:
                 monitoring.subscriber_count -= 1
 
                 if monitoring.subscriber_count <= 0:
-                    # 没有订阅者了，停止任务并删除监控记录
-                    await self._stop_sync_task(ticker)
+                    # 没有订阅者了，停止任务并删除监控记录（仍被告警策略关注的标的继续同步）
+                    if ticker in get_strategy_alert_engine().watched_tickers:
+                        self._alert_only_tickers.add(ticker)
+                    else:
+                        await self._stop_sync_task(ticker)
                     await session.delete(monitoring)
                     logger.info(f"Stopped sync task for {ticker} - no subscribers")
                 else:
@@ -308,6 +332,9 @@ class UnifiedSyncService:
                 # 检查订阅者变化并同步活跃监控列表
                 await self._sync_active_monitoring()
 
+                # 同步告警策略关注的标的
+                await self._sync_alert_watchlist()
+
                 # 清理错误过多的任务
                 await self._cleanup_failed_tasks()
 
@@ -360,219 +387,260 @@ class UnifiedSyncService:
         if not asset_type:
             asset_type = self._guess_asset_type(ticker)
 
-        # SyncTask 会从 SyncConfig 获取默认值
+        # SyncTask 会从 SyncConfig 获取默认值；next_sync_at=0 表示下个 tick 立即同步
         task_info = SyncTask(
             ticker=ticker,
             asset_type=asset_type,
             subscriber_count=0,  # 从数据库同步
         )
 
-        # 创建异步任务
-        task_handle = asyncio.create_task(self._sync_asset_loop(task_info))
-        task_info.task_handle = task_handle
-
         self.sync_tasks[ticker] = task_info
+        # 唤醒调度器，新 ticker 与同一时刻注册的其他 ticker 合并为一批
+        self._scheduler_wakeup.set()
         logger.info(f"Started sync task for {ticker} ({asset_type})")
 
-    async def _stop_sync_task(self, ticker: str) -> None:
-        """停止特定资产的同步任务"""
+    async def _stop_sync_task(self, ticker: str, clear_cache: bool = True) -> None:
+        """停止特定资产的同步任务
+
+        Args:
+            ticker: 资产代码
+            clear_cache: 是否同时删除 Redis 中缓存的价格
+        """
         if ticker not in self.sync_tasks:
             logger.warning(f"No sync task found for {ticker}")
             return
 
-        task_info = self.sync_tasks[ticker]
-        if task_info.task_handle and not task_info.task_handle.done():
-            task_info.task_handle.cancel()
-            try:
-                await task_info.task_handle
-            except asyncio.CancelledError:
-                pass
-
         del self.sync_tasks[ticker]
+        get_live_indicator_service().forget(ticker)
 
         # 清理 Redis 缓存
-        await self.redis.delete_price(ticker)
+        if clear_cache:
+            await self.redis.delete_price(ticker)
 
         logger.info(f"Stopped sync task for {ticker}")
 
-    async def _sync_asset_loop(self, task_info: SyncTask) -> None:
-        """单个资产的同步循环"""
-        ticker = task_info.ticker
+    async def _scheduler_loop(self) -> None:
+        """批量调度循环
 
-        # 立即执行一次同步
-        await self._sync_single_asset(ticker, task_info.asset_type)
+        每个 tick 收集所有到期的 ticker，按数据源分桶批量拉取，
+        替代原来每个 ticker 一个协程的模型。
+        """
+        tick = get_settings().sync.scheduler_tick
 
         while self.is_running:
             try:
-                task_info.is_running = True
-
-                # 获取最新数据
-                success = await self._sync_single_asset(ticker, task_info.asset_type)
-
-                if success:
-                    task_info.error_count = 0
-                    # Gradually recover interval back to base (fast recovery without oscillation)
-                    if (
-                        task_info.sync_interval_seconds
-                        > task_info.base_interval_seconds
-                    ):
-                        task_info.sync_interval_seconds = max(
-                            task_info.base_interval_seconds,
-                            int(task_info.sync_interval_seconds * 0.75),
-                        )
-                else:
-                    task_info.error_count += 1
-                    # Exponential backoff under persistent failures (e.g., provider limits/timeouts)
-                    task_info.sync_interval_seconds = min(
-                        task_info.max_interval_seconds,
-                        max(
-                            task_info.base_interval_seconds,
-                            task_info.sync_interval_seconds * 2,
-                        ),
-                    )
-                    logger.warning(
-                        f"Failed to sync {ticker} (error count: {task_info.error_count})"
-                    )
+                self._scheduler_wakeup.clear()
 
-                task_info.is_running = False
+                due_tasks = self._collect_due_tasks()
+                if due_tasks:
+                    await self._sync_batch(due_tasks)
 
-                # 等待下次同步
-                await asyncio.sleep(task_info.sync_interval_seconds)
+                try:
+                    await asyncio.wait_for(self._scheduler_wakeup.wait(), timeout=tick)
+                except asyncio.TimeoutError:
+                    pass
 
             except asyncio.CancelledError:
-                logger.info(f"Sync task for {ticker} was cancelled")
+                logger.info("Sync scheduler was cancelled")
                 break
             except Exception as e:
-                task_info.error_count += 1
-                logger.error(f"Error in sync loop for {ticker}: {e}")
-                await asyncio.sleep(30)  # 出错时等待30秒再重试
-
-        task_info.is_running = False
-
-    async def _sync_single_asset(self, ticker: str, asset_type: str) -> bool:
-        """同步单个资产数据"""
-        try:
-            # 调用 MCP 获取数据
-            if asset_type in ["US", "CRYPTO"]:
-                data = await self._fetch_quote(ticker, asset_type)
-            else:
-                data = await self._fetch_quote(ticker, asset_type)
-
-            if not data:
-                return False
-
-            # 更新 Redis 缓存
-            await self.redis.set_price(ticker, data)
+                logger.error(f"Error in sync scheduler loop: {e}")
+                await asyncio.sleep(tick)
+
+    def _collect_due_tasks(self) -> List[SyncTask]:
+        """收集已到期的同步任务"""
+        now = time.monotonic()
+        return [
+            task_info
+            for task_info in self.sync_tasks.values()
+            if not task_info.is_running and task_info.next_sync_at <= now
+        ]
+
+    def _bucket_for(self, ticker: str) -> str:
+        """根据市场选择批量拉取的分桶"""
+        market = detect_market(ticker)
+        if market in [MarketType.CN, MarketType.HK]:
+            return BUCKET_AKSHARE
+        if market == MarketType.CRYPTO:
+            return BUCKET_CRYPTO
+        return BUCKET_YFINANCE
 
-            # 异步更新数据库
-            asyncio.create_task(self._update_db(ticker, data))
+    async def _sync_batch(self, tasks: List[SyncTask]) -> Dict[str, Dict[str, Any]]:
+        """批量同步一组任务：分桶拉取 → Redis pipeline → DB 批量 upsert → 一次广播
 
-            # WebSocket 推送
-            await self.ws_manager.broadcast_price_update(ticker, data)
+        Returns:
+            成功获取的 {ticker: quote}
+        """
+        buckets: Dict[str, List[str]] = {}
+        for task_info in tasks:
+            task_info.is_running = True
+            buckets.setdefault(self._bucket_for(task_info.ticker), []).append(
+                task_info.ticker
+            )
 
-            logger.debug(f"Synced {ticker}: price={data.get('price')}")
-            return True
+        quotes: Dict[str, Dict[str, Any]] = {}
+        skipped: set = set()
+        try:
+            results = await asyncio.gather(
+                *(
+                    self._fetch_quotes_batch(bucket, tickers)
+                    for bucket, tickers in buckets.items()
+                ),
+                return_exceptions=True,
+            )
+            for (bucket, tickers), result in zip(buckets.items(), results):
+                if isinstance(result, Exception):
+                    logger.error(
+                        f"Batch fetch failed for {bucket} bucket ({len(tickers)} tickers): {result}"
+                    )
+                    continue
+                bucket_quotes, bucket_skipped = result
+                quotes.update(bucket_quotes)
+                skipped.update(bucket_skipped)
 
+            if quotes:
+                await self._publish_quotes(quotes)
         except Exception as e:
-            logger.error(f"Error syncing {ticker}: {e}")
-            return False
+            logger.error(f"Error syncing batch of {len(tasks)} tickers: {e}")
+            quotes = {}
+        finally:
+            for task_info in tasks:
+                task_info.is_running = False
+                self._reschedule(
+                    task_info,
+                    task_info.ticker in quotes,
+                    skipped=task_info.ticker in skipped,
+                )
 
-    async def _fetch_price_data(self, ticker: str) -> Optional[Dict[str, Any]]:
-        """使用 SDK Fetcher 获取价格数据
+        logger.debug(f"Synced batch: {len(quotes)}/{len(tasks)} tickers")
+        return quotes
 
-        v2.0 优化：添加备用数据源机制。
-        当主数据源失败时，自动尝试备用数据源。
+    def _reschedule(
+        self, task_info: SyncTask, success: bool, skipped: bool = False
+    ) -> None:
+        """根据同步结果调整间隔并安排下次同步
 
-        v2.1 修复：当主数据源返回 None 时也尝试备用数据源。
+        skipped 表示本轮因 YFinance 限流未请求该标的：不计入错误，待冷却结束后再试。
+        """
+        if skipped and not success:
+            task_info.next_sync_at = time.monotonic() + max(
+                task_info.sync_interval_seconds, get_yfinance_cooldown_remaining()
+            )
+            return
 
-        v2.2 增强：当所有数据源都失败时，使用 Redis 缓存的旧数据作为降级方案。
+        if success:
+            task_info.error_count = 0
+            task_info.last_sync_at = datetime.now()
+            # Gradually recover interval back to base (fast recovery without oscillation)
+            if task_info.sync_interval_seconds > task_info.base_interval_seconds:
+                task_info.sync_interval_seconds = max(
+                    task_info.base_interval_seconds,
+                    int(task_info.sync_interval_seconds * 0.75),
+                )
+        else:
+            task_info.error_count += 1
+            # Exponential backoff under persistent failures (e.g., provider limits/timeouts)
+            task_info.sync_interval_seconds = min(
+                task_info.max_interval_seconds,
+                max(
+                    task_info.base_interval_seconds,
+                    task_info.sync_interval_seconds * 2,
+                ),
+            )
+            logger.warning(
+                f"Failed to sync {task_info.ticker} (error count: {task_info.error_count})"
+            )
 
-        v2.3 优化：在 YFinance 限流时直接跳过请求，使用缓存数据。
+        task_info.next_sync_at = time.monotonic() + task_info.sync_interval_seconds
 
-        路由逻辑：
-        - US/CRYPTO/其他: 主 YFinance → 备用 AkShare → Redis 缓存
-        - CN/HK: 主 AkShare → 备用 YFinance → Redis 缓存
-        """
-        market = detect_market(ticker)
+    async def _fetch_quotes_batch(
+        self, bucket: str, tickers: List[str]
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """批量获取同一分桶内的报价
 
-        # 定义主/备数据源
-        if market in [MarketType.CN, MarketType.HK]:
-            primary_fetcher = self.akshare_fetcher
-            backup_fetcher = self.yfinance_fetcher
-            primary_name = "akshare"
-            backup_name = "yfinance"
-            primary_is_yfinance = False
-        else:
-            primary_fetcher = self.yfinance_fetcher
-            backup_fetcher = self.akshare_fetcher
-            primary_name = "yfinance"
-            backup_name = "akshare"
-            primary_is_yfinance = True
+        路由逻辑（不含 Redis 缓存降级，YFinance 限流期间跳过其请求）：
+        - yfinance 桶: yf.download 批量
+        - crypto 桶: 补全 -USD 后缀，yf.download 批量
+        - akshare 桶: 行情快照 → yfinance 批量备用
 
-        price = None
+        Returns:
+            ({ticker: quote}, 因限流被跳过、未实际请求的 tickers)
+        """
+        raw: Dict[str, Dict[str, Any]] = {}
+        skipped: List[str] = []
 
-        # 检查 YFinance 是否处于限流状态
         yf_rate_limited = is_yfinance_rate_limited()
         if yf_rate_limited:
-            cooldown_remaining = get_yfinance_cooldown_remaining()
             logger.debug(
-                f"YFinance rate limited for {ticker}, cooldown remaining: {cooldown_remaining:.1f}s"
+                f"YFinance rate limited, cooldown remaining: "
+                f"{get_yfinance_cooldown_remaining():.1f}s"
             )
 
-        # 尝试主数据源（如果是 YFinance 且被限流，则跳过）
-        if not (primary_is_yfinance and yf_rate_limited):
-            try:
-                if market == MarketType.CRYPTO:
-                    price = await self.yfinance_fetcher.fetch_crypto_price(ticker)
-                else:
-                    price = await primary_fetcher.fetch_price(ticker)
+        if bucket == BUCKET_AKSHARE:
+            primary = await self.akshare_fetcher.fetch_prices_batch(tickers)
+            raw.update({t: {**p, "_source": "akshare"} for t, p in primary.items() if p})
+
+            missing = [t for t in tickers if t not in raw]
+            if missing and yf_rate_limited:
+                skipped = missing
+            elif missing:
+                backup = await self.yfinance_fetcher.fetch_prices_batch(missing)
+                raw.update({t: {**p, "_source": "yfinance"} for t, p in backup.items() if p})
+        elif yf_rate_limited:
+            skipped = list(tickers)
+        else:
+            if bucket == BUCKET_CRYPTO:
+                symbols = {(t if "-USD" in t else f"{t}-USD"): t for t in tickers}
+            else:
+                symbols = {t: t for t in tickers}
+            primary = await self.yfinance_fetcher.fetch_prices_batch(list(symbols))
+            raw.update(
+                {symbols[sym]: {**p, "_source": "yfinance"} for sym, p in primary.items() if p}
+            )
 
-                if price:
-                    price["_source"] = primary_name
-                    return price
-                else:
-                    logger.debug(f"Primary source ({primary_name}) returned no data for {ticker}")
-            except Exception as e:
-                logger.warning(f"Primary source ({primary_name}) failed for {ticker}: {e}")
+        # 所有数据源都失败或被跳过的标的不回退到 Redis 旧数据：
+        # 旧值仍留在缓存中供读取，但不再重复发布/落库/推进实时指标；
+        # 失败的标的按失败退避，被跳过的标的不计错误，冷却结束后重试
+        missing = len(tickers) - len(raw)
+        if missing:
+            logger.debug(
+                f"No fresh quotes for {missing}/{len(tickers)} tickers in {bucket} bucket "
+                f"({len(skipped)} skipped while rate limited)"
+            )
 
-        # 主数据源失败或被跳过，尝试备用数据源（如果是 YFinance 且被限流，则跳过）
-        backup_is_yfinance = not primary_is_yfinance
-        if not (backup_is_yfinance and yf_rate_limited):
-            try:
-                logger.info(f"Trying backup source ({backup_name}) for {ticker}")
-                price = await backup_fetcher.fetch_price(ticker)
-                if price:
-                    price["_source"] = backup_name
-                    return price
-            except Exception as e:
-                logger.debug(f"Backup source ({backup_name}) also failed for {ticker}: {e}")
+        quotes = {
+            ticker: self._normalize_quote_data(data, ticker)
+            for ticker, data in raw.items()
+        }
+        return quotes, skipped
 
-        # 所有数据源都失败或被跳过，尝试使用 Redis 缓存的旧数据
-        try:
-            cached = await self.redis.get_price(ticker)
-            if cached:
-                logger.warning(
-                    f"All data sources unavailable for {ticker}, using cached data "
-                    f"(last_updated: {cached.get('last_updated', 'unknown')})"
-                )
-                cached["_source"] = "cache_fallback"
-                cached["_stale"] = True
-                return cached
-        except Exception as e:
-            logger.debug(f"Redis cache fallback also failed for {ticker}: {e}")
+    async def _publish_quotes(self, quotes: Dict[str, Dict[str, Any]]) -> None:
+        """写入 Redis、异步批量更新数据库并广播"""
+        # Redis pipeline 批量写入
+        await self.redis.set_prices_batch(quotes)
 
-        return None
+        # 异步批量更新数据库
+        asyncio.create_task(self._bulk_upsert_quotes(dict(quotes)))
 
-    async def _fetch_quote(
-        self, ticker: str, asset_type: str
-    ) -> Optional[Dict[str, Any]]:
-        """获取报价数据 - 使用 SDK Fetcher"""
-        price_data = await self._fetch_price_data(ticker)
+        # WebSocket 推送（每批次一次）
+        await self.ws_manager.broadcast_price_updates(quotes)
 
-        if price_data:
-            return self._normalize_quote_data(price_data, ticker)
+        # 增量指标更新（O(1)/标的，不阻塞下一批次）
+        asyncio.create_task(self._update_live_indicators(dict(quotes)))
+
+    async def _update_live_indicators(self, quotes: Dict[str, Dict[str, Any]]) -> None:
+        try:
+            snapshots = await get_live_indicator_service().on_quotes(quotes)
+        except Exception as e:
+            logger.error(f"Error updating live indicators for {len(quotes)} quotes: {e}")
+            return
+
+        # 只对本批次发生变化的标的重新评估告警策略
+        try:
+            await get_strategy_alert_engine().on_snapshots(snapshots)
+        except Exception as e:
+            logger.error(f"Error evaluating strategy alerts for {len(snapshots)} tickers: {e}")
 
-        return None
     def _normalize_quote_data(
         self, data: Dict[str, Any], ticker: str
     ) -> Dict[str, Any]:
@@ -590,45 +658,80 @@ class UnifiedSyncService:
             "previous_close": data.get("previousClose")
             or data.get("regularMarketPreviousClose"),
             "market_cap": data.get("marketCap"),
+            "trade_date": data.get("trade_date"),
             "timestamp": datetime.now().isoformat(),
         }
 
-    async def _update_db(self, ticker: str, data: Dict[str, Any]) -> None:
-        """异步更新数据库"""
+    async def _bulk_upsert_quotes(self, quotes: Dict[str, Dict[str, Any]]) -> None:
+        """批量 upsert RealtimeQuote（单条 INSERT ... ON CONFLICT 语句）"""
+        if not quotes:
+            return
+
+        current_time = datetime.now()
+        rows = [
+            {
+                "ticker": ticker,
+                "price": data.get("price"),
+                "change_percent": data.get("change_percent"),
+                "change_value": data.get("change_value"),
+                "volume": data.get("volume"),
+                "last_updated": current_time,
+                "fetch_error": None,
+                "data_source": "mcp",
+            }
+            for ticker, data in quotes.items()
+        ]
+
         try:
             async with get_db_session() as session:
-                result = await session.execute(
-                    select(RealtimeQuote).where(RealtimeQuote.ticker == ticker)
+                # realtime_quotes.ticker 外键引用 assets：未登记的标的会让整条语句失败，先过滤
+                known = set(
+                    (
+                        await session.execute(
+                            select(Asset.ticker).where(Asset.ticker.in_(list(quotes)))
+                        )
+                    ).scalars()
                 )
-                existing = result.scalar_one_or_none()
-
-                current_time = datetime.now()
-
-                if existing:
-                    # 更新
-                    existing.price = data.get("price")
-                    existing.change_percent = data.get("change_percent")
-                    existing.change_value = data.get("change_value")
-                    existing.volume = data.get("volume")
-                    existing.last_updated = current_time
-                    existing.fetch_error = None
-                else:
-                    # 创建
-                    new_quote = RealtimeQuote(
-                        ticker=ticker,
-                        price=data.get("price"),
-                        change_percent=data.get("change_percent"),
-                        change_value=data.get("change_value"),
-                        volume=data.get("volume"),
-                        last_updated=current_time,
-                        data_source="mcp",
-                    )
-                    session.add(new_quote)
+                skipped = len(rows)
+                rows = [row for row in rows if row["ticker"] in known]
+                skipped -= len(rows)
+                if skipped:
+                    logger.debug(f"Skipped {skipped} quotes for tickers not in assets")
+                if not rows:
+                    return
 
-                await session.commit()
+                try:
+                    await session.execute(self._quote_upsert_stmt(rows))
+                    await session.commit()
+                except IntegrityError:
+                    # 过滤后仍有资产被并发删除：逐行 upsert，隔离失败行
+                    await session.rollback()
+                    for row in rows:
+                        try:
+                            await session.execute(self._quote_upsert_stmt([row]))
+                            await session.commit()
+                        except IntegrityError:
+                            await session.rollback()
+                            logger.debug(f"Skipped quote upsert for {row['ticker']}")
 
         except Exception as e:
-            logger.error(f"Error updating database for {ticker}: {e}")
+            logger.error(f"Error bulk updating database for {len(rows)} quotes: {e}")
+
+    @staticmethod
+    def _quote_upsert_stmt(rows: List[Dict[str, Any]]) -> Any:
+        """INSERT ... ON CONFLICT (ticker) DO UPDATE 语句"""
+        stmt = pg_insert(RealtimeQuote).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=["ticker"],
+            set_={
+                "price": stmt.excluded.price,
+                "change_percent": stmt.excluded.change_percent,
+                "change_value": stmt.excluded.change_value,
+                "volume": stmt.excluded.volume,
+                "last_updated": stmt.excluded.last_updated,
+                "fetch_error": None,
+            },
+        )
 
     async def _fetch_asset_info(
         self, ticker: str, asset_type: str
@@ -675,6 +778,34 @@ class UnifiedSyncService:
         # 当前实现主要依赖 register_subscription 和 unregister_subscription 来维护
         pass
 
+    async def _sync_alert_watchlist(self) -> None:
+        """确保告警策略关注的标的都在同步，并停止不再被关注的告警专用任务"""
+        engine = get_strategy_alert_engine()
+        await engine.refresh_index()
+
+        watched = engine.watched_tickers
+        for ticker in watched - set(self.sync_tasks):
+            await self._start_sync_task(ticker, None)
+            self._alert_only_tickers.add(ticker)
+
+        unwatched = [t for t in self._alert_only_tickers - watched if t in self.sync_tasks]
+        if unwatched:
+            # 仍有用户订阅的标的由订阅维护，不随告警取消而停止
+            async with get_db_session() as session:
+                subscribed = set(
+                    (
+                        await session.execute(
+                            select(ActiveMonitoring.ticker).where(
+                                ActiveMonitoring.ticker.in_(unwatched)
+                            )
+                        )
+                    ).scalars()
+                )
+            for ticker in unwatched:
+                if ticker not in subscribed:
+                    await self._stop_sync_task(ticker)
+        self._alert_only_tickers &= watched
+
     async def _cleanup_failed_tasks(self) -> None:
         """清理失败过多的任务"""
         failed_tickers = []
@@ -684,7 +815,8 @@ class UnifiedSyncService:
 
         for ticker in failed_tickers:
             logger.warning(f"Stopping sync task for {ticker} due to excessive errors")
-            await self._stop_sync_task(ticker)
+            # 保留最后一次成功的价格供读取，由其 TTL 自然过期
+            await self._stop_sync_task(ticker, clear_cache=False)
 
 
 # 全局单例
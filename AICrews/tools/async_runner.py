@@ -0,0 +1,188 @@
+"""
+Async Runner - 同步工具调用的共享事件循环
+
+CrewAI 的 @tool 函数是同步的，而底层数据客户端是异步的。此前每次调用都
+新建 ThreadPoolExecutor 并 asyncio.run() 一个新事件循环，导致每次调用都要
+创建线程、重建 httpx/aiohttp 会话和信号量，连接池与按事件循环绑定的缓存无法复用。
+
+这里维护一个进程级后台线程，线程内运行一个常驻事件循环；同步包装器通过
+run_coroutine_threadsafe 把协程提交到该循环并阻塞等待结果：
+- 连接池、信号量等事件循环绑定资源在多次工具调用间复用
+- 每次调用记录延迟指标 (tool_call_duration_seconds{tool_name,status})
+- 超时后取消协程，避免后台循环堆积僵尸任务
+
+使用方式:
+    from AICrews.tools.async_runner import run_sync
+
+    @tool("get_stock_price")
+    def get_stock_price(ticker: str) -> str:
+        async def _get_price():
+            ...
+        return run_sync(_get_price(), name="get_stock_price")
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from typing import Any, Coroutine, Dict, Optional, TypeVar
+
+from AICrews.observability.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncRunner:
+    """在后台线程中运行常驻事件循环，供同步代码提交协程"""
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout if timeout is not None else float(
+            os.getenv("FAIC_TOOL_CALL_TIMEOUT_SECONDS", "300")
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "errors": 0, "timeouts": 0}
+
+    # =========================================================================
+    # 生命周期
+    # =========================================================================
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """后台事件循环（首次访问时启动线程）"""
+        if self._loop is None or self._loop.is_closed() or not self._thread.is_alive():
+            with self._lock:
+                if self._loop is None or self._loop.is_closed() or not self._thread.is_alive():
+                    self._start()
+        return self._loop
+
+    def _start(self) -> None:
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def _run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        thread = threading.Thread(target=_run, name="faic-async-runner", daemon=True)
+        thread.start()
+        ready.wait()
+        self._loop, self._thread = loop, thread
+        logger.info("Async runner event loop started")
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """停止后台事件循环（用于进程退出或测试）"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread = None, None
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout)
+        if not loop.is_running():
+            loop.close()
+
+    # =========================================================================
+    # 调用
+    # =========================================================================
+
+    def in_runner_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def run(
+        self,
+        coro: Coroutine[Any, Any, T],
+        name: str = "anonymous",
+        timeout: Optional[float] = None,
+    ) -> T:
+        """同步执行协程并返回结果
+
+        Args:
+            coro: 要执行的协程
+            name: 工具名称，用作指标标签（应为低基数的函数名）
+            timeout: 超时秒数，默认使用 FAIC_TOOL_CALL_TIMEOUT_SECONDS
+
+        Raises:
+            RuntimeError: 在后台事件循环线程内调用（会死锁）
+            TimeoutError: 超时（协程已被取消）
+        """
+        if self.in_runner_thread():
+            coro.close()
+            raise RuntimeError(
+                f"run_sync('{name}') called from the async runner loop; await the coroutine instead"
+            )
+
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        status = "ok"
+        start = time.perf_counter()
+        self._adjust_in_flight(1)
+        try:
+            return future.result(timeout if timeout is not None else self.timeout)
+        except concurrent.futures.TimeoutError:
+            status = "timeout"
+            future.cancel()
+            self._stats["timeouts"] += 1
+            raise TimeoutError(f"Tool call '{name}' timed out")
+        except BaseException:
+            status = "error"
+            self._stats["errors"] += 1
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            self._stats["calls"] += 1
+            self._adjust_in_flight(-1)
+            self._observe(name, status, duration)
+
+    @staticmethod
+    def _adjust_in_flight(delta: int) -> None:
+        try:
+            from AICrews.infrastructure.metrics import get_tool_call_metrics
+
+            get_tool_call_metrics().tool_calls_in_flight.inc(delta)
+        except Exception:
+            pass
+
+    @staticmethod
+    def _observe(name: str, status: str, duration: float) -> None:
+        try:
+            from AICrews.infrastructure.metrics import get_tool_call_metrics
+
+            get_tool_call_metrics().observe_call(name, status, duration)
+        except Exception as e:
+            logger.debug(f"Tool call metrics unavailable: {e}")
+        if duration > 10:
+            logger.info(f"Slow tool call {name}: {duration:.2f}s ({status})")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "running": self._loop is not None and self._loop.is_running(),
+        }
+
+
+_async_runner: Optional[AsyncRunner] = None
+_async_runner_lock = threading.Lock()
+
+
+def get_async_runner() -> AsyncRunner:
+    global _async_runner
+    if _async_runner is None:
+        with _async_runner_lock:
+            if _async_runner is None:
+                _async_runner = AsyncRunner()
+    return _async_runner
+
+
+def run_sync(
+    coro: Coroutine[Any, Any, T],
+    name: str = "anonymous",
+    timeout: Optional[float] = None,
+) -> T:
+    """在共享事件循环上同步执行协程（同步工具包装器的统一入口）"""
+    return get_async_runner().run(coro, name=name, timeout=timeout)
@@ -2,12 +2,14 @@
 Expression Engine - Level 2 策略解析器 (安全沙箱)
 
 安全解析用户的字符串公式，转换为 Agent 可调用的工具。
-使用 simpleeval 实现安全的表达式求值，严禁使用 eval()。
+基于白名单 AST 求值器实现安全的表达式求值，严禁使用 eval()。
 
 支持的语法：
 - 比较运算: >, <, >=, <=, ==, !=
 - 逻辑运算: AND, OR, NOT
-- 函数调用: MA(period), EMA(period), RSI(period), MACD(), VOL, CLOSE, OPEN, HIGH, LOW
+- 函数调用: MA(period), EMA(period), RSI(period), ATR(period), VOL_MA(period)
+- 无参数指标: MACD*, BB_*, K/D/J（可写作 K 或 K()；固定 KDJ(9,3)、MACD(12,26,9)，不接受参数）
+- 价格变量: VOL, CLOSE, OPEN, HIGH, LOW
 - 数学运算: +, -, *, /, %
 
 示例公式：
@@ -16,33 +18,45 @@ Expression Engine - Level 2 策略解析器 (安全沙箱)
 - "MACD_HIST > 0 AND RSI(14) < 70"
 
 安全保证：
-- 使用 simpleeval 而非 eval()
+- 严禁 eval()：表达式解析为 AST 后只允许白名单节点（比较/逻辑/四则/IF）
 - 白名单函数和变量
 - 禁止 import、exec、open 等危险操作
 - 超时保护防止无限循环
+
+编译缓存 (ExpressionEngine.compile)：
+- 公式规范化后编译为不可变的 CompiledFormula：已校验的 AST、
+  所需指标列表 (name, period) 以及对上下文求值的闭包
+- 编译结果按规范化公式文本存入进程级 LRU，重复调用只需计算指标并求值
+
+批量模式 (evaluate_batch / evaluate_for_tickers)：
+- 公式只编译一次
+- 指标在多标的宽表面板上一次计算
+- 布尔表达式按列（逐标的）向量化求值
 """
 
+import ast
+import asyncio
+import os
 import re
 from AICrews.observability.logging import get_logger
 from typing import Dict, Any, List, Optional, Tuple, Callable
+from dataclasses import dataclass, field
 from datetime import datetime
 from functools import lru_cache
 
 import pandas as pd
 import numpy as np
 
-try:
-    from simpleeval import simple_eval, EvalWithCompoundTypes, DEFAULT_FUNCTIONS, DEFAULT_OPERATORS
-    HAS_SIMPLEEVAL = True
-except ImportError:
-    HAS_SIMPLEEVAL = False
-    simple_eval = None
-
 from crewai.tools import tool
+from AICrews.tools.async_runner import run_sync
 
 logger = get_logger(__name__)
 
 
+# 编译缓存容量（按规范化公式文本）
+FORMULA_CACHE_SIZE = int(os.getenv("FAIC_FORMULA_CACHE_SIZE", "1024"))
+
+
 class ExpressionParseError(Exception):
     """公式解析错误"""
     pass
@@ -53,6 +67,135 @@ class ExpressionSecurityError(Exception):
     pass
 
 
+@dataclass(frozen=True)
+class IndicatorRequest:
+    """公式引用的带周期指标，如 MA(20) -> IndicatorRequest("MA", 20)"""
+    name: str
+    period: int
+
+
+@dataclass(frozen=True)
+class CompiledFormula:
+    """编译后的公式（不可变，可跨线程/跨请求共享）
+
+    Attributes:
+        formula: 规范化后的公式文本
+        expression: 改写后的表达式（指标替换为 context['KEY']）
+        tree: 已通过白名单校验的 AST
+        indicators: 带周期指标请求
+        needs_macd / needs_bollinger / needs_kdj: 无参数指标组
+        context_keys: 求值所需的上下文键
+        evaluate: evaluate(context) -> 结果；上下文值可以是标量或按标的/按 K 线的向量
+    """
+    formula: str
+    expression: str
+    tree: ast.Expression = field(compare=False, repr=False)
+    indicators: Tuple[IndicatorRequest, ...]
+    needs_macd: bool
+    needs_bollinger: bool
+    needs_kdj: bool
+    context_keys: Tuple[str, ...]
+    evaluate: Callable[[Dict[str, Any]], Any] = field(compare=False, repr=False)
+
+
+def normalize_formula(formula: str) -> str:
+    """规范化公式文本（大写、合并空白），作为编译缓存键"""
+    normalized = " ".join(formula.split()).upper()
+    return re.sub(r"\(\s+", "(", re.sub(r"\s+\)", ")", normalized))
+
+
+# 白名单 AST 节点 → numpy 运算（标量与向量通用）
+_COMPARATORS = {
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+_BINOPS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+    ast.Mod: np.mod,
+}
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Compare, ast.IfExp, ast.Constant, ast.Name, ast.Subscript, ast.Load,
+    *_COMPARATORS, *_BINOPS,
+)
+
+
+def _check_tree(tree: ast.Expression, context_keys: Tuple[str, ...]) -> None:
+    """编译期校验：只允许白名单节点与已知上下文键"""
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ExpressionSecurityError(f"Unsupported expression element: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, bool, str)):
+            raise ExpressionSecurityError(f"Unsupported constant: {node.value!r}")
+        if isinstance(node, ast.Name) and node.id not in ("context", "TRUE", "FALSE"):
+            raise ExpressionSecurityError(f"Unsafe name in expression: {node.id}")
+        if isinstance(node, ast.Subscript) and not (
+            isinstance(node.value, ast.Name)
+            and node.value.id == "context"
+            and isinstance(node.slice, ast.Constant)
+            and node.slice.value in context_keys
+        ):
+            raise ExpressionSecurityError("Unsupported subscript in expression")
+
+
+def _eval_node(node: ast.AST, context: Dict[str, Any]):
+    """对已校验的 AST 求值
+
+    AND/OR/NOT 映射为 numpy 逻辑运算，IF(...) 映射为 np.where，
+    因此同一个表达式既可对标量求值，也可一次对所有标的/所有 K 线求值。
+    """
+    if isinstance(node, ast.Expression):
+        return _eval_node(node.body, context)
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        return node.id == "TRUE"
+    if isinstance(node, ast.Subscript):
+        return context[node.slice.value]
+    if isinstance(node, ast.BoolOp):
+        values = [_eval_node(v, context) for v in node.values]
+        reducer = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return reducer.reduce(np.broadcast_arrays(*values))
+    if isinstance(node, ast.UnaryOp):
+        operand = _eval_node(node.operand, context)
+        if isinstance(node.op, ast.Not):
+            return np.logical_not(operand)
+        if isinstance(node.op, ast.USub):
+            return np.negative(operand)
+        return operand
+    if isinstance(node, ast.BinOp):
+        return _BINOPS[type(node.op)](_eval_node(node.left, context), _eval_node(node.right, context))
+    if isinstance(node, ast.Compare):
+        left = _eval_node(node.left, context)
+        result = True
+        for op, comparator in zip(node.ops, node.comparators):
+            right = _eval_node(comparator, context)
+            result = np.logical_and(result, _COMPARATORS[type(op)](left, right))
+            left = right
+        return result
+    if isinstance(node, ast.IfExp):
+        return np.where(
+            _eval_node(node.test, context),
+            _eval_node(node.body, context),
+            _eval_node(node.orelse, context),
+        )
+    raise ExpressionSecurityError(f"Unsupported expression element: {type(node).__name__}")
+
+
+def _make_evaluator(tree: ast.Expression) -> Callable[[Dict[str, Any]], Any]:
+    def evaluate(context: Dict[str, Any]):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _eval_node(tree, context)
+    return evaluate
+
+
 class ExpressionEngine:
     """Level 2 策略表达式引擎
     
@@ -92,10 +235,10 @@ class ExpressionEngine:
     # 支持的价格变量
     PRICE_VARIABLES = ['CLOSE', 'OPEN', 'HIGH', 'LOW', 'VOL', 'VOLUME']
     
+    # 带周期的指标函数（其余函数名为无参数指标组或 IF）
+    PERIOD_FUNCTIONS = ('MA', 'SMA', 'EMA', 'RSI', 'ATR', 'VOL_MA')
+    
     def __init__(self):
-        if not HAS_SIMPLEEVAL:
-            logger.warning("simpleeval not installed. Expression engine will be limited.")
-        
         self._quant_engine = None
     
     @property
@@ -146,6 +289,11 @@ class ExpressionEngine:
                 if not any(func.startswith(sf) for sf in self.SUPPORTED_FUNCTIONS):
                     return False, f"Unsupported function: {func}"
 
+        # 无参数指标组（MACD、BB_*、K/D/J）使用固定参数，不接受 K(9) 这类调用
+        for func, args in re.findall(r'(?<![A-Z0-9_])([A-Z_]+)\s*\(([^()]*)\)', formula.upper()):
+            if args.strip() and func in self.SUPPORTED_FUNCTIONS and func not in self.PERIOD_FUNCTIONS:
+                return False, f"{func} takes no arguments; use {func} or {func}()"
+
         # Validate identifiers (prevent accepting arbitrary words like SOMEVAR).
         allowed_identifiers = {
             *self.PRICE_VARIABLES,
@@ -195,6 +343,86 @@ class ExpressionEngine:
         
         return True, None
     
+    def compile(self, formula: str) -> CompiledFormula:
+        """编译公式（带进程级 LRU 缓存）
+        
+        Raises:
+            ExpressionParseError: 公式无效
+        """
+        if not formula or not formula.strip():
+            raise ExpressionParseError("Formula cannot be empty")
+        return _compile_normalized(normalize_formula(formula))
+    
+    def _compile_uncached(self, normalized: str) -> CompiledFormula:
+        """校验、提取指标计划并生成 AST 与求值闭包"""
+        is_valid, error = self.validate_formula(normalized)
+        if not is_valid:
+            raise ExpressionParseError(error)
+        
+        # 匹配 MA(20), RSI(14) 等
+        func_pattern = r'([A-Z_]+)\s*\(\s*(\d+)?\s*\)'
+        indicators = []
+        for func_name, period_str in re.findall(func_pattern, normalized):
+            if func_name not in self.PERIOD_FUNCTIONS:
+                continue
+            request = IndicatorRequest(func_name, int(period_str) if period_str else 14)  # 默认周期14
+            if request not in indicators:
+                indicators.append(request)
+        
+        needs_macd = 'MACD' in normalized
+        needs_bollinger = 'BB_' in normalized
+        # K/D/J 可写作裸标识符或 K()；按完整标识符匹配，避免命中 MACD 等
+        needs_kdj = re.search(r'(?<![A-Z0-9_])[KDJ](?![A-Z0-9_])', normalized) is not None
+        
+        context_keys = ['CLOSE', 'OPEN', 'HIGH', 'LOW', 'VOL', 'VOLUME', 'CURRENTPRICE']
+        for request in indicators:
+            key = f'{request.name}({request.period})'
+            context_keys.append(key)
+            if request.name in ('MA', 'SMA'):
+                context_keys.append(f'MA_{request.period}')
+            elif request.name in ('EMA', 'RSI'):
+                context_keys.append(f'{request.name}_{request.period}')
+        if needs_macd:
+            context_keys.extend(['MACD', 'MACD_LINE', 'MACD_SIGNAL', 'MACD_HIST'])
+        if needs_bollinger:
+            context_keys.extend(['BB_UPPER', 'BB_MIDDLE', 'BB_LOWER'])
+        if needs_kdj:
+            context_keys.extend(['K', 'D', 'J'])
+        context_keys = tuple(dict.fromkeys(context_keys))
+        
+        expression = self._prepare_expression(normalized, context_keys)
+        try:
+            tree = ast.parse(expression.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ExpressionParseError(f"Invalid syntax: {e.msg}")
+        try:
+            _check_tree(tree, context_keys)
+        except ExpressionSecurityError as e:
+            raise ExpressionParseError(str(e))
+        
+        return CompiledFormula(
+            formula=normalized,
+            expression=expression,
+            tree=tree,
+            indicators=tuple(indicators),
+            needs_macd=needs_macd,
+            needs_bollinger=needs_bollinger,
+            needs_kdj=needs_kdj,
+            context_keys=context_keys,
+            evaluate=_make_evaluator(tree),
+        )
+    
+    @staticmethod
+    def compile_cache_info() -> Dict[str, int]:
+        """编译缓存命中统计"""
+        info = _compile_normalized.cache_info()
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "max_size": info.maxsize,
+        }
+    
     def parse_formula(self, formula: str, df: pd.DataFrame) -> Dict[str, Any]:
         """解析公式，提取所需的指标和变量
         
@@ -209,76 +437,125 @@ class ExpressionEngine:
         df_copy = df.copy()
         df_copy.columns = df_copy.columns.str.lower()
         
+        def calc(indicator: str, *args):
+            return getattr(self.quant_engine, f"calculate_{indicator}")(df_copy, *args)
+        
+        return self._build_context(self.compile(formula), df_copy, calc)
+    
+    def parse_formula_panel(
+        self, formula: str, panel: Dict[str, pd.DataFrame]
+    ) -> Dict[str, pd.Series]:
+        """在多标的宽表面板上解析公式
+        
+        与 parse_formula 计算相同的指标，但每个指标只在面板上计算一次，
+        上下文中的值为以 ticker 为索引的 Series（各标的最新值）。
+        
+        Args:
+            formula: 公式字符串
+            panel: QuantEngine.build_panel() 的返回值
+        """
+        def calc(indicator: str, *args):
+            return self.quant_engine.calculate_panel(indicator, panel, *args)
+        
+        return self._build_context(self.compile(formula), panel, calc)
+    
+    @staticmethod
+    def _last_value(values, default):
+        """取最新值，NaN 用默认值替代（兼容单票 Series 与面板 DataFrame）"""
+        last = values.iloc[-1]
+        if isinstance(last, pd.Series):
+            return last.fillna(default)
+        return last if not pd.isna(last) else default
+    
+    @staticmethod
+    def _full_series(values, default):
+        """保留完整序列（回测模式），预热期 NaN 保持为 NaN，由调用方屏蔽"""
+        return values
+    
+    @staticmethod
+    def _scalar_value(value, default):
+        """标量模式（增量指标快照）：未完成预热的指标用默认值"""
+        return default if value is None else value
+    
+    def _build_context(
+        self, plan: CompiledFormula, source, calc: Callable, mode: str = "last"
+    ) -> Dict[str, Any]:
+        """按编译计划构建求值上下文
+        
+        Args:
+            plan: 编译后的公式
+            source: 单票 DataFrame、宽表面板 dict（列名已小写），或标量模式下的当前 K 线 dict
+            calc: calc(indicator, *args) -> 指标结果
+            mode: "last" 取最新值；"series" 保留逐 K 线序列（回测）；"scalar" 直接使用标量
+        """
+        last = {
+            "last": self._last_value,
+            "series": self._full_series,
+            "scalar": self._scalar_value,
+        }[mode]
         context = {}
         
-        # 添加基础价格变量（使用最新值）
-        context['CLOSE'] = df_copy['close'].iloc[-1]
-        context['OPEN'] = df_copy['open'].iloc[-1]
-        context['HIGH'] = df_copy['high'].iloc[-1]
-        context['LOW'] = df_copy['low'].iloc[-1]
-        context['VOL'] = df_copy['volume'].iloc[-1] if 'volume' in df_copy.columns else 0
+        # 添加基础价格变量（使用最新值；回测模式下为完整序列）
+        def price(column: str):
+            return source[column] if mode != "last" else source[column].iloc[-1]
+        
+        context['CLOSE'] = price('close')
+        context['OPEN'] = price('open')
+        context['HIGH'] = price('high')
+        context['LOW'] = price('low')
+        context['VOL'] = price('volume') if 'volume' in source else 0
         context['VOLUME'] = context['VOL']
         context['CURRENTPRICE'] = context['CLOSE']
         
-        # 解析函数调用并计算指标
-        # 匹配 MA(20), RSI(14) 等
-        func_pattern = r'([A-Z_]+)\s*\(\s*(\d+)?\s*\)'
-        matches = re.findall(func_pattern, formula.upper())
-        
-        for func_name, period_str in matches:
-            period = int(period_str) if period_str else 14  # 默认周期14
+        for request in plan.indicators:
+            func_name, period = request.name, request.period
             
             if func_name in ['MA', 'SMA']:
-                series = self.quant_engine.calculate_sma(df_copy, period)
-                context[f'{func_name}({period})'] = series.iloc[-1] if not pd.isna(series.iloc[-1]) else 0
+                context[f'{func_name}({period})'] = last(calc('sma', period), 0)
                 context[f'MA_{period}'] = context[f'{func_name}({period})']
                 
             elif func_name == 'EMA':
-                series = self.quant_engine.calculate_ema(df_copy, period)
-                context[f'EMA({period})'] = series.iloc[-1] if not pd.isna(series.iloc[-1]) else 0
+                context[f'EMA({period})'] = last(calc('ema', period), 0)
                 context[f'EMA_{period}'] = context[f'EMA({period})']
                 
             elif func_name == 'RSI':
-                series = self.quant_engine.calculate_rsi(df_copy, period)
-                context[f'RSI({period})'] = series.iloc[-1] if not pd.isna(series.iloc[-1]) else 50
+                context[f'RSI({period})'] = last(calc('rsi', period), 50)
                 context[f'RSI_{period}'] = context[f'RSI({period})']
                 
             elif func_name == 'ATR':
-                series = self.quant_engine.calculate_atr(df_copy, period)
-                context[f'ATR({period})'] = series.iloc[-1] if not pd.isna(series.iloc[-1]) else 0
+                context[f'ATR({period})'] = last(calc('atr', period), 0)
                 
             elif func_name == 'VOL_MA':
-                series = self.quant_engine.calculate_volume_ma(df_copy, period)
-                context[f'VOL_MA({period})'] = series.iloc[-1] if not pd.isna(series.iloc[-1]) else 0
+                context[f'VOL_MA({period})'] = last(calc('volume_ma', period), 0)
         
         # 处理 MACD 相关
-        if 'MACD' in formula.upper():
-            macd = self.quant_engine.calculate_macd(df_copy)
-            context['MACD'] = macd['macd'].iloc[-1] if not pd.isna(macd['macd'].iloc[-1]) else 0
+        if plan.needs_macd:
+            macd = calc('macd')
+            context['MACD'] = last(macd['macd'], 0)
             context['MACD_LINE'] = context['MACD']
-            context['MACD_SIGNAL'] = macd['signal'].iloc[-1] if not pd.isna(macd['signal'].iloc[-1]) else 0
-            context['MACD_HIST'] = macd['histogram'].iloc[-1] if not pd.isna(macd['histogram'].iloc[-1]) else 0
+            context['MACD_SIGNAL'] = last(macd['signal'], 0)
+            context['MACD_HIST'] = last(macd['histogram'], 0)
         
         # 处理 Bollinger Bands
-        if 'BB_' in formula.upper():
-            bb = self.quant_engine.calculate_bollinger_bands(df_copy)
-            context['BB_UPPER'] = bb['upper'].iloc[-1] if not pd.isna(bb['upper'].iloc[-1]) else 0
-            context['BB_MIDDLE'] = bb['middle'].iloc[-1] if not pd.isna(bb['middle'].iloc[-1]) else 0
-            context['BB_LOWER'] = bb['lower'].iloc[-1] if not pd.isna(bb['lower'].iloc[-1]) else 0
+        if plan.needs_bollinger:
+            bb = calc('bollinger_bands')
+            context['BB_UPPER'] = last(bb['upper'], 0)
+            context['BB_MIDDLE'] = last(bb['middle'], 0)
+            context['BB_LOWER'] = last(bb['lower'], 0)
         
         # 处理 KDJ
-        if any(x in formula.upper() for x in ['K(', 'D(', 'J(']):
-            kdj = self.quant_engine.calculate_kdj(df_copy)
-            context['K'] = kdj['K'].iloc[-1] if not pd.isna(kdj['K'].iloc[-1]) else 50
-            context['D'] = kdj['D'].iloc[-1] if not pd.isna(kdj['D'].iloc[-1]) else 50
-            context['J'] = kdj['J'].iloc[-1] if not pd.isna(kdj['J'].iloc[-1]) else 50
+        if plan.needs_kdj:
+            kdj = calc('kdj')
+            context['K'] = last(kdj['K'], 50)
+            context['D'] = last(kdj['D'], 50)
+            context['J'] = last(kdj['J'], 50)
         
         return context
     
-    def _prepare_expression(self, formula: str, context: Dict[str, Any]) -> str:
+    def _prepare_expression(self, formula: str, context) -> str:
         """将公式转换为可执行的表达式
         
-        将 MA(20) 转换为 context 中的键名
+        将 MA(20) 转换为 context 中的键名（context 可以是字典或键序列）
         将 AND/OR 转换为 Python 的 and/or
         """
         expr = formula.upper()
@@ -341,11 +618,23 @@ class ExpressionEngine:
 
         expr = _rewrite_if_calls(expr)
 
-        # 替换函数调用为上下文变量
-        for key in sorted(context.keys(), key=len, reverse=True):
-            # 转义括号
-            pattern = re.escape(key)
-            expr = re.sub(pattern, f"context['{key}']", expr, flags=re.IGNORECASE)
+        # 替换函数调用为上下文变量（单次扫描，长键优先，已替换的文本不会被再次匹配）
+        # 无参数指标允许写成 MACD() / K() 形式；只匹配完整标识符，避免 D 命中 MACD 或 and
+        keys = sorted(context, key=len, reverse=True)
+        if keys:
+            alternatives = [
+                re.escape(key) if key.endswith(")") else rf"{re.escape(key)}(?:\s*\(\s*\))?(?![A-Z0-9_])"
+                for key in keys
+            ]
+            pattern = r"(?<![A-Za-z0-9_'])(?:" + "|".join(alternatives) + ")"
+            
+            def _to_context(match: re.Match) -> str:
+                key = match.group(0)
+                if key not in context:
+                    key = key.split("(")[0].strip()
+                return f"context['{key}']"
+            
+            expr = re.sub(pattern, _to_context, expr)
         
         return expr
     
@@ -359,39 +648,24 @@ class ExpressionEngine:
         Returns:
             (result, details) - 布尔结果和计算详情
         """
-        # 验证公式
-        is_valid, error = self.validate_formula(formula)
-        if not is_valid:
-            raise ExpressionParseError(error)
+        # 编译（校验 + 解析，命中缓存时无额外开销）
+        compiled = self.compile(formula)
+        
+        # 按编译计划计算指标
+        df_copy = df.copy()
+        df_copy.columns = df_copy.columns.str.lower()
         
-        # 解析并计算指标
-        context = self.parse_formula(formula, df)
+        def calc(indicator: str, *args):
+            return getattr(self.quant_engine, f"calculate_{indicator}")(df_copy, *args)
         
-        # 准备表达式
-        expr = self._prepare_expression(formula, context)
+        context = self._build_context(compiled, df_copy, calc)
         
         try:
-            if HAS_SIMPLEEVAL:
-                # 使用 simpleeval 安全求值
-                evaluator = EvalWithCompoundTypes()
-                evaluator.names = {"context": context}
-                evaluator.functions = {}  # 禁用函数调用
-                result = evaluator.eval(expr)
-            else:
-                # Fallback: 使用限制性的本地环境
-                # 警告：这种方式安全性较低，仅作为备选
-                local_vars = {"context": context}
-                # 使用 compile 检查语法
-                code = compile(expr, '<strategy>', 'eval')
-                # 检查不安全的字节码
-                for name in code.co_names:
-                    if name not in ['context', 'and', 'or', 'not', 'True', 'False']:
-                        raise ExpressionSecurityError(f"Unsafe name in expression: {name}")
-                result = eval(code, {"__builtins__": {}}, local_vars)
+            result = bool(compiled.evaluate(context))
             
-            return bool(result), {
+            return result, {
                 "formula": formula,
-                "result": bool(result),
+                "result": result,
                 "context": {k: round(v, 4) if isinstance(v, float) else v for k, v in context.items()},
                 "evaluated_at": datetime.now().isoformat()
             }
@@ -425,7 +699,7 @@ class ExpressionEngine:
                     "error": "Insufficient historical data"
                 }
             
-            result, details = self.evaluate(formula, df)
+            result, details = await asyncio.to_thread(self.evaluate, formula, df)
             
             return {
                 "ticker": ticker,
@@ -441,6 +715,304 @@ class ExpressionEngine:
                 "result": False,
                 "error": str(e)
             }
+    
+    # =========================================================================
+    # 增量指标求值（实时告警）
+    # =========================================================================
+    
+    # QuantEngine 指标 -> streaming_indicators 规格（参数与 QuantEngine 默认值一致）
+    _STREAMING_SPECS = {
+        "sma": "sma:{0}",
+        "ema": "ema:{0}",
+        "rsi": "rsi:{0}",
+        "atr": "atr:{0}",
+        "volume_ma": "sma:{0}:volume",
+        "macd": "macd:12:26:9",
+        "bollinger_bands": "bollinger:20:2.0",
+        "kdj": "kdj:9:3",
+    }
+    
+    @staticmethod
+    def _missing(indicator: str):
+        """未完成预热的指标：复合指标返回各分量为 None 的映射"""
+        return _MissingIndicator() if indicator in ("macd", "bollinger_bands", "kdj") else None
+    
+    def streaming_specs(self, formula) -> Tuple[str, ...]:
+        """公式所需的增量指标规格（见 AICrews.tools.streaming_indicators）"""
+        compiled = formula if isinstance(formula, CompiledFormula) else self.compile(formula)
+        specs = []
+        
+        def record(indicator: str, *args):
+            specs.append(self._STREAMING_SPECS[indicator].format(*args))
+            return self._missing(indicator)
+        
+        bar = {"open": 0.0, "high": 0.0, "low": 0.0, "close": 0.0, "volume": 0.0}
+        self._build_context(compiled, bar, record, mode="scalar")
+        return tuple(dict.fromkeys(specs))
+    
+    def evaluate_live(self, formula, snapshot: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """基于增量指标快照求值（O(公式大小)，不访问历史数据）
+        
+        Args:
+            formula: 公式字符串或 CompiledFormula
+            snapshot: IndicatorSet.snapshot()，需包含 streaming_specs() 返回的规格
+            
+        Returns:
+            (result, context)
+        """
+        compiled = formula if isinstance(formula, CompiledFormula) else self.compile(formula)
+        
+        def calc(indicator: str, *args):
+            value = snapshot.get(self._STREAMING_SPECS[indicator].format(*args))
+            return self._missing(indicator) if value is None else value
+        
+        context = self._build_context(compiled, snapshot, calc, mode="scalar")
+        return bool(compiled.evaluate(context)), context
+    
+    # =========================================================================
+    # 历史回测（逐 K 线求值）
+    # =========================================================================
+    
+    def evaluate_series(self, formula: str, df: pd.DataFrame) -> pd.Series:
+        """对每根 K 线向量化求值公式
+        
+        与 evaluate 使用同一编译结果和 QuantEngine 指标，但不取最新值，
+        而是在完整指标序列上求值。指标预热期（任一所需指标为 NaN）的 K 线
+        视为无信号。
+        
+        Args:
+            formula: 公式字符串
+            df: 历史数据 DataFrame（含 date 列时以其为索引）
+            
+        Returns:
+            逐 K 线的布尔 Series
+        """
+        compiled = self.compile(formula)
+        
+        df_copy = df.copy()
+        df_copy.columns = df_copy.columns.str.lower()
+        if 'date' in df_copy.columns:
+            df_copy = df_copy.set_index(pd.to_datetime(df_copy['date']))
+        
+        def calc(indicator: str, *args):
+            return getattr(self.quant_engine, f"calculate_{indicator}")(df_copy, *args)
+        
+        context = self._build_context(compiled, df_copy, calc, mode="series")
+        
+        try:
+            raw = compiled.evaluate(context)
+        except Exception as e:
+            logger.error(f"Series expression evaluation error: {e}")
+            raise ExpressionParseError(f"Failed to evaluate expression: {str(e)}")
+        
+        signals = pd.Series(
+            np.broadcast_to(np.asarray(raw, dtype=bool), (len(df_copy),)),
+            index=df_copy.index,
+        )
+        
+        # 屏蔽指标预热期
+        warmed_up = pd.Series(True, index=df_copy.index)
+        for value in context.values():
+            if isinstance(value, pd.Series):
+                warmed_up &= value.notna()
+        return signals & warmed_up
+    
+    def backtest(
+        self, formula: str, df: pd.DataFrame, horizons: Tuple[int, ...] = (1, 5, 10, 20)
+    ) -> Dict[str, Any]:
+        """历史回测：信号日期、各持有期前瞻收益/胜率、回撤统计
+        
+        - 前瞻收益：信号日收盘买入，持有 h 根 K 线后收盘价的收益率
+        - 胜率：前瞻收益 > 0 的信号占比
+        - 最大不利偏移：持有期内最低价相对买入价的最差跌幅
+        - 策略净值：信号当日收盘持有至下一根 K 线，按逐日收益复利，统计最大回撤
+        
+        Args:
+            formula: 公式字符串
+            df: 历史数据 DataFrame
+            horizons: 前瞻持有期（K 线数）
+        """
+        signals = self.evaluate_series(formula, df)
+        
+        prices = df.copy()
+        prices.columns = prices.columns.str.lower()
+        prices.index = signals.index
+        close = prices['close'].astype(float)
+        low = prices['low'].astype(float) if 'low' in prices else close
+        
+        signal_bars = signals[signals]
+        # 信号由无到有的 K 线视为入场
+        entries = signals & ~signals.shift(1, fill_value=False)
+        
+        horizon_stats = []
+        for h in sorted({int(h) for h in horizons if int(h) > 0}):
+            forward = close.shift(-h) / close - 1
+            # 未来 h 根 K 线内的最低价（不含当日）
+            future_low = low[::-1].rolling(h, min_periods=h).min()[::-1].shift(-1)
+            adverse = future_low / close - 1
+            
+            signal_forward = forward[signals].dropna()
+            baseline = forward.dropna()
+            horizon_stats.append({
+                "horizon": h,
+                "samples": int(len(signal_forward)),
+                "hit_rate": round(float((signal_forward > 0).mean()), 4) if len(signal_forward) else None,
+                "avg_return": round(float(signal_forward.mean()), 6) if len(signal_forward) else None,
+                "median_return": round(float(signal_forward.median()), 6) if len(signal_forward) else None,
+                "max_adverse_excursion": round(float(adverse[signals].min()), 6) if adverse[signals].notna().any() else None,
+                "baseline_avg_return": round(float(baseline.mean()), 6) if len(baseline) else None,
+            })
+        
+        # 信号持仓的净值曲线（信号日收盘入场，次日收益计入）
+        daily_returns = close.pct_change().fillna(0)
+        strategy_returns = daily_returns.where(signals.shift(1, fill_value=False), 0.0)
+        equity = (1 + strategy_returns).cumprod()
+        drawdown = equity / equity.cummax() - 1
+        
+        def fmt_date(value) -> str:
+            return value.isoformat() if hasattr(value, "isoformat") else str(value)
+        
+        return {
+            "formula": formula,
+            "bars": int(len(signals)),
+            "start": fmt_date(signals.index[0]) if len(signals) else None,
+            "end": fmt_date(signals.index[-1]) if len(signals) else None,
+            "signal_count": int(len(signal_bars)),
+            "entry_count": int(entries.sum()),
+            "signal_dates": [fmt_date(d) for d in signal_bars.index],
+            "horizons": horizon_stats,
+            "exposure": round(float(signals.mean()), 4) if len(signals) else 0.0,
+            "total_return": round(float(equity.iloc[-1] - 1), 6) if len(equity) else 0.0,
+            "max_drawdown": round(float(drawdown.min()), 6) if len(drawdown) else 0.0,
+            "evaluated_at": datetime.now().isoformat(),
+        }
+    
+    # =========================================================================
+    # 批量（多标的）求值
+    # =========================================================================
+    
+    def evaluate_batch(
+        self, formula: str, frames: Dict[str, pd.DataFrame]
+    ) -> Dict[str, Dict[str, Any]]:
+        """对多个标的批量求值同一公式
+        
+        公式只编译一次，指标在宽表面板上一次计算，表达式按列求值。
+        返回结构与 evaluate_for_ticker 一致。
+        
+        Args:
+            formula: 公式字符串
+            frames: {ticker: 历史数据 DataFrame}
+            
+        Returns:
+            {ticker: 评估结果}
+        """
+        compiled = self.compile(formula)
+        
+        if not frames:
+            return {}
+        
+        panel = self.quant_engine.build_panel(frames)
+        
+        def calc(indicator: str, *args):
+            return self.quant_engine.calculate_panel(indicator, panel, *args)
+        
+        context = self._build_context(compiled, panel, calc)
+        
+        try:
+            raw = compiled.evaluate(context)
+        except Exception as e:
+            logger.error(f"Batch expression evaluation error: {e}")
+            raise ExpressionParseError(f"Failed to evaluate expression: {str(e)}")
+        
+        tickers = list(frames.keys())
+        signals = np.broadcast_to(np.asarray(raw, dtype=bool), (len(tickers),))
+        evaluated_at = datetime.now().isoformat()
+        
+        results = {}
+        for idx, ticker in enumerate(tickers):
+            ticker_context = {}
+            for key, value in context.items():
+                v = value[ticker] if isinstance(value, pd.Series) else value
+                if isinstance(v, np.generic):
+                    v = v.item()
+                ticker_context[key] = round(v, 4) if isinstance(v, float) else v
+            result = bool(signals[idx])
+            results[ticker] = {
+                "ticker": ticker,
+                "formula": formula,
+                "result": result,
+                "details": {
+                    "formula": formula,
+                    "result": result,
+                    "context": ticker_context,
+                    "evaluated_at": evaluated_at,
+                },
+            }
+        return results
+    
+    async def evaluate_for_tickers(
+        self, tickers: List[str], formula: str, max_concurrency: int = 16
+    ) -> Dict[str, Dict[str, Any]]:
+        """为多个股票批量评估策略公式
+        
+        并发获取历史数据，然后通过 evaluate_batch 一次性求值。
+        
+        Args:
+            tickers: 股票代码列表
+            formula: 策略公式
+            max_concurrency: 历史数据并发获取上限
+            
+        Returns:
+            {ticker: 评估结果}，结构与 evaluate_for_ticker 一致
+        """
+        def error_result(ticker: str, error: str) -> Dict[str, Any]:
+            return {"ticker": ticker, "formula": formula, "result": False, "error": error}
+        
+        try:
+            self.compile(formula)
+        except ExpressionParseError as e:
+            return {ticker: error_result(ticker, str(e)) for ticker in tickers}
+        
+        from AICrews.tools.market_data_tools import MarketDataClient
+        client = MarketDataClient()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def fetch(ticker: str):
+            async with semaphore:
+                try:
+                    return ticker, await client.get_historical_data(ticker, period="6mo")
+                except Exception as e:
+                    logger.warning(f"Failed to fetch history for {ticker}: {e}")
+                    return ticker, None
+        
+        frames: Dict[str, pd.DataFrame] = {}
+        results: Dict[str, Dict[str, Any]] = {}
+        for ticker, df in await asyncio.gather(*(fetch(t) for t in tickers)):
+            if df is None or len(df) < 50:
+                results[ticker] = error_result(ticker, "Insufficient historical data")
+            else:
+                frames[ticker] = df
+        
+        try:
+            results.update(await asyncio.to_thread(self.evaluate_batch, formula, frames))
+        except Exception as e:
+            for ticker in frames:
+                results[ticker] = error_result(ticker, str(e))
+        
+        return {ticker: results[ticker] for ticker in tickers}
+
+
+class _MissingIndicator(dict):
+    """未完成预热的复合指标：任意分量均为 None（标量模式下取默认值）"""
+    
+    def __missing__(self, key):
+        return None
+
+
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def _compile_normalized(normalized: str) -> CompiledFormula:
+    """进程级编译缓存（所有 ExpressionEngine 实例共享）"""
+    return ExpressionEngine()._compile_uncached(normalized)
 
 
 # =========================================================================
@@ -476,24 +1048,10 @@ def evaluate_strategy(ticker: str, formula: str) -> str:
         策略评估结果，包含信号和指标详情
     """
     try:
-        import asyncio
-        
         async def _evaluate():
             return await _expression_engine.evaluate_for_ticker(ticker, formula)
         
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        if loop.is_running():
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, _evaluate())
-                result = future.result()
-        else:
-            result = loop.run_until_complete(_evaluate())
+        result = run_sync(_evaluate(), name="evaluate_strategy")
         
         if result.get("error"):
             return f"Strategy evaluation failed for {ticker}: {result['error']}"
@@ -3,6 +3,7 @@ Market Data Tools - 市场数据工具
 
 提供统一的市场数据获取接口，供 CrewAI Agent 使用。
 数据源：yfinance (美股、港股、加密货币)
+历史数据经由 OHLCVStore 读穿缓存（内存 + market_prices 表）
 
 使用方式:
     client = MarketDataClient()
@@ -14,14 +15,13 @@ Market Data Tools - 市场数据工具
     quote = await client.get_realtime_quote("AAPL")
 """
 
+import asyncio
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
-import asyncio
-import concurrent.futures
-
 import pandas as pd
 
 from crewai.tools import tool
+from AICrews.tools.async_runner import run_sync
 from AICrews.observability.logging import get_logger
 
 logger = get_logger(__name__)
@@ -41,6 +41,9 @@ class MarketDataClient:
     ) -> Optional[pd.DataFrame]:
         """获取历史价格数据
 
+        通过 OHLCVStore 读穿缓存获取：内存 → market_prices 表 → 仅补缺口的
+        yfinance 拉取，provider 调用在工作线程中执行，不阻塞事件循环。
+
         Args:
             ticker: 股票代码
             period: 时间周期 (1mo, 3mo, 6mo, 1y, 2y)
@@ -50,9 +53,9 @@ class MarketDataClient:
             包含 OHLCV 数据的 DataFrame
         """
         try:
-            # 使用 yfinance 获取数据
-            logger.info(f"Fetching historical data for {ticker} via yfinance")
-            df = await self._fetch_with_yfinance(ticker, period)
+            from AICrews.infrastructure.data_fetcher.ohlcv_store import get_ohlcv_store
+
+            df = await get_ohlcv_store().get_history(ticker, period=period, interval=interval)
             if df is not None and len(df) > 0:
                 return df
 
@@ -64,28 +67,6 @@ class MarketDataClient:
             logger.error(f"Error fetching historical data for {ticker}: {e}")
             return self._generate_mock_data(ticker, period)
 
-    async def _fetch_with_yfinance(
-        self, ticker: str, period: str
-    ) -> Optional[pd.DataFrame]:
-        """使用 yfinance 作为备选数据源"""
-        try:
-            import yfinance as yf
-
-            stock = yf.Ticker(ticker)
-            df = stock.history(period=period)
-
-            if df is not None and len(df) > 0:
-                df = df.reset_index()
-                df.columns = df.columns.str.lower()
-                return df
-
-        except ImportError:
-            logger.warning("yfinance not installed")
-        except Exception as e:
-            logger.warning(f"yfinance fetch error for {ticker}: {e}")
-
-        return self._generate_mock_data(ticker, period)
-
     def _generate_mock_data(self, ticker: str, period: str) -> pd.DataFrame:
         """生成模拟数据（用于测试和演示）"""
         import random
@@ -135,18 +116,21 @@ class MarketDataClient:
             logger.info(f"Fetching realtime quote for {ticker} via yfinance")
             import yfinance as yf
 
-            stock = yf.Ticker(ticker)
-            info = stock.fast_info
-            return {
-                "ticker": ticker,
-                "price": info.last_price,
-                "change": None,  # fast_info doesn't have change
-                "change_percent": None,
-                "volume": info.last_volume,
-                "high": info.day_high,
-                "low": info.day_low,
-                "source": "yfinance",
-            }
+            def fetch_quote() -> Dict[str, Any]:
+                # fast_info 属性按需发起网络请求，整体放到工作线程中读取
+                info = yf.Ticker(ticker).fast_info
+                return {
+                    "ticker": ticker,
+                    "price": info.last_price,
+                    "change": None,  # fast_info doesn't have change
+                    "change_percent": None,
+                    "volume": info.last_volume,
+                    "high": info.day_high,
+                    "low": info.day_low,
+                    "source": "yfinance",
+                }
+
+            return await asyncio.to_thread(fetch_quote)
         except Exception as e:
             logger.warning(f"yfinance quote failed for {ticker}: {e}")
             return None
@@ -165,7 +149,7 @@ class MarketDataClient:
 
             logger.info(f"Fetching fundamentals for {ticker} via yfinance")
             stock = yf.Ticker(ticker)
-            info = stock.info
+            info = await asyncio.to_thread(lambda: stock.info)
             return {
                 "ticker": ticker,
                 "name": info.get("longName"),
@@ -198,7 +182,7 @@ class MarketDataClient:
 
             logger.info(f"Fetching news for {ticker} via yfinance")
             stock = yf.Ticker(ticker)
-            news = stock.news
+            news = await asyncio.to_thread(lambda: stock.news)
 
             if news:
                 result = []
@@ -271,18 +255,7 @@ def get_stock_price(ticker: str) -> str:
         return f"Unable to get quote for {normalized}"
 
     try:
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        if loop.is_running():
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, _get_price())
-                return future.result()
-        else:
-            return loop.run_until_complete(_get_price())
+        return run_sync(_get_price(), name="get_stock_price")
     except Exception as e:
         return f"Error getting price for {normalized}: {str(e)}"
 
@@ -319,18 +292,7 @@ def get_stock_fundamentals(ticker: str) -> str:
         return f"Unable to get fundamentals for {ticker}"
 
     try:
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        if loop.is_running():
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, _get_fundamentals())
-                return future.result()
-        else:
-            return loop.run_until_complete(_get_fundamentals())
+        return run_sync(_get_fundamentals(), name="get_stock_fundamentals")
     except Exception as e:
         return f"Error getting fundamentals for {ticker}: {str(e)}"
 
@@ -358,17 +320,6 @@ def get_stock_news(ticker: str, limit: int = 5) -> str:
         return f"No recent news found for {ticker}"
 
     try:
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        if loop.is_running():
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, _get_news())
-                return future.result()
-        else:
-            return loop.run_until_complete(_get_news())
+        return run_sync(_get_news(), name="get_stock_news")
     except Exception as e:
         return f"Error getting news for {ticker}: {str(e)}"
@@ -10,6 +10,12 @@ Quant Engine - 原生量化计算引擎
 - 波动类: Bollinger Bands, ATR
 - 成交量: OBV, VWAP, Volume MA
 
+指标缓存：
+- 带 ticker/resolution 标记 (df.attrs，由 OHLCVStore 设置) 的 DataFrame 上的计算结果
+  按 (ticker, resolution, 首/末 K 线时间, K 线数, 最新收盘价, 索引类型与首/末索引, 指标, 参数) 缓存
+- 有界 LRU，进程内共享；MACD/布林带等复合指标复用缓存的 EMA/SMA 中间结果
+- 缓存结果为共享对象，调用方不得原地修改
+
 使用方式:
     engine = QuantEngine()
     
@@ -21,11 +27,13 @@ Quant Engine - 原生量化计算引擎
 """
 
 from AICrews.observability.logging import get_logger
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, Callable, List, Optional, Union
 from datetime import datetime, timedelta
 from functools import lru_cache
+from collections import OrderedDict
 import asyncio
-import concurrent.futures
+import os
+import threading
 
 import pandas as pd
 import numpy as np
@@ -38,20 +46,156 @@ except ImportError:
     ta = None
 
 from crewai.tools import tool
+from AICrews.tools.async_runner import run_sync
 from AICrews.tools.market_data_tools import MarketDataClient
 
 logger = get_logger(__name__)
 
 
+# =========================================================================
+# 平滑算法
+# =========================================================================
+
+def _wilder_smooth(values: Union[pd.Series, pd.DataFrame], period: int):
+    """Wilder 平滑 (RMA)：前 period 个有效值的算术平均作种子，之后按
+    ewm(alpha=1/period, adjust=False) 递推，与 streaming_indicators 的增量结果一致
+    """
+    if isinstance(values, pd.DataFrame):
+        return values.apply(_wilder_smooth, args=(period,))
+    valid = np.flatnonzero(values.notna().to_numpy())
+    if len(valid) < period:
+        return pd.Series(np.nan, index=values.index)
+    start = valid[0]
+    seed = start + period - 1
+    seeded = values.astype(float)
+    seeded.iloc[:seed] = np.nan
+    seeded.iloc[seed] = values.iloc[start:seed + 1].mean()
+    return seeded.ewm(alpha=1 / period, adjust=False).mean()
+
+
+# =========================================================================
+# 指标缓存
+# =========================================================================
+
+class IndicatorCache:
+    """进程内指标计算结果 LRU 缓存（线程安全）"""
+    
+    METRICS_NAME = "quant_indicators"
+    
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv("FAIC_INDICATOR_CACHE_SIZE", "2048"))
+        self._entries: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+    
+    @staticmethod
+    def make_key(df, indicator: str, params: tuple) -> Optional[tuple]:
+        """构造缓存键；数据未标记 ticker 时返回 None（不缓存）"""
+        attrs = getattr(df, "attrs", None)
+        if not attrs or not attrs.get("ticker") or len(df) == 0:
+            return None
+        try:
+            if "date" in df.columns:
+                first_bar, last_bar = df["date"].iloc[0], df["date"].iloc[-1]
+            else:
+                first_bar, last_bar = df.index[0], df.index[-1]
+            last_close = float(df["close"].iloc[-1])
+            # 结果 Series 沿用输入的索引：按日期索引与 RangeIndex 的同一数据不能共用缓存
+            index_key = (type(df.index).__name__, df.index[0], df.index[-1])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return (
+            attrs["ticker"],
+            attrs.get("resolution", "1d"),
+            first_bar,
+            last_bar,
+            len(df),
+            last_close,
+            index_key,
+            indicator,
+            params,
+        )
+    
+    def get_or_compute(self, key: Optional[tuple], compute: Callable[[], Any]) -> Any:
+        if key is None:
+            return compute()
+        
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                self._record("hit")
+                return self._entries[key]
+            self._stats["misses"] += 1
+        self._record("miss")
+        
+        # 计算放在锁外；同一键的并发计算结果相同，后写入者覆盖即可
+        value = compute()
+        evicted = 0
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            self._stats["evictions"] += evicted
+        if evicted:
+            self._record("eviction", evicted)
+        return value
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "max_entries": self.max_entries}
+    
+    def _record(self, result: str, count: int = 1) -> None:
+        try:
+            from AICrews.infrastructure.metrics import get_cache_metrics
+            
+            metrics = get_cache_metrics()
+            if result == "hit":
+                metrics.record_hit(self.METRICS_NAME)
+            elif result == "miss":
+                metrics.record_miss(self.METRICS_NAME)
+            else:
+                metrics.record_eviction(self.METRICS_NAME, count)
+        except Exception as e:
+            logger.debug(f"Indicator cache metrics unavailable: {e}")
+
+
+_indicator_cache: Optional[IndicatorCache] = None
+_indicator_cache_lock = threading.Lock()
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """获取进程级指标缓存单例"""
+    global _indicator_cache
+    if _indicator_cache is None:
+        with _indicator_cache_lock:
+            if _indicator_cache is None:
+                _indicator_cache = IndicatorCache()
+    return _indicator_cache
+
+
 class QuantEngine:
     """原生量化计算引擎
     
     封装 pandas-ta 的技术指标计算，提供简单易用的接口
     """
     
-    def __init__(self):
+    def __init__(self, cache: Optional[IndicatorCache] = None):
         if not HAS_PANDAS_TA:
             logger.warning("pandas-ta not installed. Some features will be limited.")
+        self._cache = cache or get_indicator_cache()
+    
+    def _cached(self, df, indicator: str, params: tuple, compute: Callable[[], Any]) -> Any:
+        """经指标缓存计算（未标记 ticker 的数据和宽表面板直接计算）"""
+        return self._cache.get_or_compute(
+            IndicatorCache.make_key(df, indicator, params), compute
+        )
     
     # =========================================================================
     # 核心指标计算方法
@@ -59,117 +203,215 @@ class QuantEngine:
     
     def calculate_sma(self, df: pd.DataFrame, period: int = 20, column: str = "close") -> pd.Series:
         """计算简单移动平均线"""
-        if HAS_PANDAS_TA:
-            return ta.sma(df[column], length=period)
-        return df[column].rolling(window=period).mean()
+        def compute():
+            if HAS_PANDAS_TA:
+                return ta.sma(df[column], length=period)
+            return df[column].rolling(window=period).mean()
+        return self._cached(df, "sma", (period, column), compute)
     
     def calculate_ema(self, df: pd.DataFrame, period: int = 20, column: str = "close") -> pd.Series:
         """计算指数移动平均线"""
-        if HAS_PANDAS_TA:
-            return ta.ema(df[column], length=period)
-        return df[column].ewm(span=period, adjust=False).mean()
+        def compute():
+            if HAS_PANDAS_TA:
+                return ta.ema(df[column], length=period)
+            return df[column].ewm(span=period, adjust=False).mean()
+        return self._cached(df, "ema", (period, column), compute)
     
     def calculate_rsi(self, df: pd.DataFrame, period: int = 14, column: str = "close") -> pd.Series:
         """计算相对强弱指数"""
-        if HAS_PANDAS_TA:
-            return ta.rsi(df[column], length=period)
-        
-        # 手动计算 RSI
-        delta = df[column].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
+        def compute():
+            if HAS_PANDAS_TA:
+                return ta.rsi(df[column], length=period)
+            
+            # 手动计算 RSI（Wilder 平滑）
+            delta = df[column].diff()
+            gain = _wilder_smooth(delta.clip(lower=0).where(delta.notna()), period)
+            loss = _wilder_smooth((-delta).clip(lower=0).where(delta.notna()), period)
+            rs = gain / loss
+            return (100 - (100 / (1 + rs))).mask(loss == 0, 100.0)
+        return self._cached(df, "rsi", (period, column), compute)
     
     def calculate_macd(self, df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9, 
                        column: str = "close") -> Dict[str, pd.Series]:
         """计算 MACD 指标"""
-        if HAS_PANDAS_TA:
-            macd_df = ta.macd(df[column], fast=fast, slow=slow, signal=signal)
-            if macd_df is not None:
-                return {
-                    "macd": macd_df.iloc[:, 0],
-                    "signal": macd_df.iloc[:, 1],
-                    "histogram": macd_df.iloc[:, 2]
-                }
-        
-        # 手动计算
-        ema_fast = df[column].ewm(span=fast, adjust=False).mean()
-        ema_slow = df[column].ewm(span=slow, adjust=False).mean()
-        macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-        histogram = macd_line - signal_line
-        
-        return {
-            "macd": macd_line,
-            "signal": signal_line,
-            "histogram": histogram
-        }
+        def compute():
+            if HAS_PANDAS_TA:
+                macd_df = ta.macd(df[column], fast=fast, slow=slow, signal=signal)
+                if macd_df is not None:
+                    return {
+                        "macd": macd_df.iloc[:, 0],
+                        "signal": macd_df.iloc[:, 1],
+                        "histogram": macd_df.iloc[:, 2]
+                    }
+                # pandas-ta 数据不足时回退到手动公式，不与 ta.ema 的缓存结果混用
+                ema_fast = df[column].ewm(span=fast, adjust=False).mean()
+                ema_slow = df[column].ewm(span=slow, adjust=False).mean()
+            else:
+                # 手动计算：快慢 EMA 与 calculate_ema 公式相同，复用缓存的中间结果
+                ema_fast = self.calculate_ema(df, fast, column)
+                ema_slow = self.calculate_ema(df, slow, column)
+            macd_line = ema_fast - ema_slow
+            signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+            histogram = macd_line - signal_line
+            
+            return {
+                "macd": macd_line,
+                "signal": signal_line,
+                "histogram": histogram
+            }
+        return self._cached(df, "macd", (fast, slow, signal, column), compute)
     
     def calculate_bollinger_bands(self, df: pd.DataFrame, period: int = 20, std_dev: float = 2.0,
                                    column: str = "close") -> Dict[str, pd.Series]:
         """计算布林带"""
-        if HAS_PANDAS_TA:
-            bb = ta.bbands(df[column], length=period, std=std_dev)
-            if bb is not None:
-                return {
-                    "upper": bb.iloc[:, 0],
-                    "middle": bb.iloc[:, 1],
-                    "lower": bb.iloc[:, 2]
-                }
-        
-        # 手动计算
-        middle = df[column].rolling(window=period).mean()
-        std = df[column].rolling(window=period).std()
-        upper = middle + (std * std_dev)
-        lower = middle - (std * std_dev)
-        
-        return {"upper": upper, "middle": middle, "lower": lower}
+        def compute():
+            if HAS_PANDAS_TA:
+                bb = ta.bbands(df[column], length=period, std=std_dev)
+                if bb is not None:
+                    return {
+                        "upper": bb.iloc[:, 0],
+                        "middle": bb.iloc[:, 1],
+                        "lower": bb.iloc[:, 2]
+                    }
+                middle = df[column].rolling(window=period).mean()
+            else:
+                # 手动计算：中轨即 SMA，复用缓存的中间结果
+                middle = self.calculate_sma(df, period, column)
+            std = df[column].rolling(window=period).std()
+            upper = middle + (std * std_dev)
+            lower = middle - (std * std_dev)
+            
+            return {"upper": upper, "middle": middle, "lower": lower}
+        return self._cached(df, "bollinger_bands", (period, float(std_dev), column), compute)
     
     def calculate_atr(self, df: pd.DataFrame, period: int = 14) -> pd.Series:
         """计算平均真实波幅"""
-        if HAS_PANDAS_TA:
-            return ta.atr(df["high"], df["low"], df["close"], length=period)
-        
-        # 手动计算
-        high_low = df["high"] - df["low"]
-        high_close = (df["high"] - df["close"].shift()).abs()
-        low_close = (df["low"] - df["close"].shift()).abs()
-        tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        return tr.rolling(window=period).mean()
+        def compute():
+            if HAS_PANDAS_TA:
+                return ta.atr(df["high"], df["low"], df["close"], length=period)
+            
+            # 手动计算（fmax 忽略 NaN，与逐行取最大值一致，且支持宽表面板）
+            high_low = df["high"] - df["low"]
+            high_close = (df["high"] - df["close"].shift()).abs()
+            low_close = (df["low"] - df["close"].shift()).abs()
+            tr = np.fmax(np.fmax(high_low, high_close), low_close)
+            return _wilder_smooth(tr, period)
+        return self._cached(df, "atr", (period,), compute)
     
     def calculate_kdj(self, df: pd.DataFrame, k_period: int = 9, d_period: int = 3) -> Dict[str, pd.Series]:
         """计算 KDJ 指标"""
-        if HAS_PANDAS_TA:
-            stoch = ta.stoch(df["high"], df["low"], df["close"], k=k_period, d=d_period)
-            if stoch is not None:
-                k = stoch.iloc[:, 0]
-                d = stoch.iloc[:, 1]
-                j = 3 * k - 2 * d
-                return {"K": k, "D": d, "J": j}
-        
-        # 手动计算
-        low_min = df["low"].rolling(window=k_period).min()
-        high_max = df["high"].rolling(window=k_period).max()
-        rsv = (df["close"] - low_min) / (high_max - low_min) * 100
-        k = rsv.ewm(span=d_period, adjust=False).mean()
-        d = k.ewm(span=d_period, adjust=False).mean()
-        j = 3 * k - 2 * d
-        
-        return {"K": k, "D": d, "J": j}
+        def compute():
+            if HAS_PANDAS_TA:
+                stoch = ta.stoch(df["high"], df["low"], df["close"], k=k_period, d=d_period)
+                if stoch is not None:
+                    k = stoch.iloc[:, 0]
+                    d = stoch.iloc[:, 1]
+                    j = 3 * k - 2 * d
+                    return {"K": k, "D": d, "J": j}
+            
+            # 手动计算
+            low_min = df["low"].rolling(window=k_period).min()
+            high_max = df["high"].rolling(window=k_period).max()
+            rsv = (df["close"] - low_min) / (high_max - low_min) * 100
+            k = rsv.ewm(span=d_period, adjust=False).mean()
+            d = k.ewm(span=d_period, adjust=False).mean()
+            j = 3 * k - 2 * d
+            
+            return {"K": k, "D": d, "J": j}
+        return self._cached(df, "kdj", (k_period, d_period), compute)
     
     def calculate_obv(self, df: pd.DataFrame) -> pd.Series:
         """计算能量潮指标"""
-        if HAS_PANDAS_TA:
-            return ta.obv(df["close"], df["volume"])
-        
-        # 手动计算
-        obv = (np.sign(df["close"].diff()) * df["volume"]).fillna(0).cumsum()
-        return obv
+        def compute():
+            if HAS_PANDAS_TA:
+                return ta.obv(df["close"], df["volume"])
+            
+            # 手动计算
+            return (np.sign(df["close"].diff()) * df["volume"]).fillna(0).cumsum()
+        return self._cached(df, "obv", (), compute)
     
     def calculate_volume_ma(self, df: pd.DataFrame, period: int = 20) -> pd.Series:
         """计算成交量移动平均"""
-        return df["volume"].rolling(window=period).mean()
+        return self._cached(
+            df, "volume_ma", (period,), lambda: df["volume"].rolling(window=period).mean()
+        )
+    
+    # =========================================================================
+    # 多标的面板计算
+    # =========================================================================
+    
+    @staticmethod
+    def build_panel(frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """将多个标的的 OHLCV 数据组装为宽表面板
+        
+        每个字段一张宽表 (index=bar 序号, columns=ticker)。各标的按最后一根 K 线
+        右对齐，历史较短的标的在头部补 NaN —— 滚动/指数类指标遇到头部 NaN 的
+        结果与单票计算一致，且不受不同市场交易日历差异的影响。
+        
+        Args:
+            frames: {ticker: DataFrame}，列名大小写不限
+            
+        Returns:
+            {"open"|"high"|"low"|"close"|"volume": 宽表 DataFrame}
+        """
+        if not frames:
+            return {}
+        
+        normalized = {}
+        for ticker, df in frames.items():
+            df = df.copy()
+            df.columns = df.columns.str.lower()
+            normalized[ticker] = df
+        
+        length = max(len(df) for df in normalized.values())
+        panel = {}
+        for field in ["open", "high", "low", "close", "volume"]:
+            columns = {}
+            for ticker, df in normalized.items():
+                values = np.full(length, np.nan)
+                if field in df.columns:
+                    values[length - len(df):] = df[field].to_numpy(dtype=float)
+                columns[ticker] = values
+            panel[field] = pd.DataFrame(columns, index=pd.RangeIndex(length))
+        return panel
+    
+    def calculate_panel(
+        self, indicator: str, panel: Dict[str, pd.DataFrame], *args, **params
+    ) -> Union[pd.DataFrame, Dict[str, pd.DataFrame]]:
+        """在宽表面板上计算指标（一次计算全部标的）
+        
+        手动实现的指标均为逐列的 pandas 运算，直接作用于整张宽表；
+        安装 pandas-ta 时其函数只接受 Series，逐列调用以保证与单票结果一致。
+        
+        Args:
+            indicator: 指标名，对应 calculate_<indicator> 方法 (sma, ema, rsi, macd, ...)
+            panel: build_panel() 的返回值
+            
+        Returns:
+            宽表 DataFrame；多输出指标 (macd/bollinger_bands/kdj) 返回 {name: 宽表}
+        """
+        method = getattr(self, f"calculate_{indicator}")
+        if not HAS_PANDAS_TA:
+            return method(panel, *args, **params)
+        
+        per_ticker = {}
+        for ticker in panel["close"].columns:
+            frame = pd.DataFrame({field: panel[field][ticker] for field in panel})
+            # 去掉右对齐时补的头部 NaN，保证与单票计算完全一致
+            start = frame["close"].first_valid_index()
+            if start is None:
+                continue
+            per_ticker[ticker] = method(frame.loc[start:], *args, **params)
+        index = panel["close"].index
+        first = next(iter(per_ticker.values()), None)
+        if isinstance(first, dict):
+            return {
+                name: pd.DataFrame(
+                    {ticker: result[name] for ticker, result in per_ticker.items()}, index=index
+                )
+                for name in first
+            }
+        return pd.DataFrame(per_ticker, index=index)
     
     # =========================================================================
     # 高级分析方法
@@ -411,8 +653,13 @@ def get_technical_summary(ticker: str) -> str:
             if df is None or len(df) < 30:
                 return f"Unable to get sufficient historical data for {ticker}"
             
-            signals = _quant_engine.get_indicator_signals(df)
-            trend = _quant_engine.get_trend_assessment(df)
+            # 指标计算在工作线程中执行，不阻塞共享的工具事件循环
+            signals, trend = await asyncio.to_thread(
+                lambda: (
+                    _quant_engine.get_indicator_signals(df),
+                    _quant_engine.get_trend_assessment(df),
+                )
+            )
             
             summary = f'''
 ## {ticker} Technical Analysis Summary
@@ -435,18 +682,7 @@ Based on technical indicators, the stock shows a **{trend['trend']}** bias.
 '''.strip()
             return summary
         
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        if loop.is_running():
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, _get_summary())
-                return future.result()
-        else:
-            return loop.run_until_complete(_get_summary())
+        return run_sync(_get_summary(), name="get_technical_summary")
             
     except Exception as e:
         logger.error(f"Error getting technical summary for {ticker}: {e}")
@@ -474,6 +710,9 @@ def calculate_indicator(ticker: str, indicator: str, period: int = 14) -> str:
             if df is None or len(df) < period:
                 return f"Insufficient data for {ticker}"
             
+            return await asyncio.to_thread(_compute, df)
+        
+        def _compute(df) -> str:
             df.columns = df.columns.str.lower()
             indicator_lower = indicator.lower()
             
@@ -508,18 +747,7 @@ def calculate_indicator(ticker: str, indicator: str, period: int = 14) -> str:
             else:
                 return f"Unknown indicator: {indicator}. Supported: rsi, macd, sma, ema, bollinger, atr, kdj"
         
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        if loop.is_running():
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, _calculate())
-                return future.result()
-        else:
-            return loop.run_until_complete(_calculate())
+        return run_sync(_calculate(), name="calculate_indicator")
             
     except Exception as e:
         logger.error(f"Error calculating {indicator} for {ticker}: {e}")
@@ -545,7 +773,7 @@ def check_trend(ticker: str) -> str:
             if df is None or len(df) < 50:
                 return f"Insufficient data for trend analysis of {ticker}"
             
-            trend = _quant_engine.get_trend_assessment(df)
+            trend = await asyncio.to_thread(_quant_engine.get_trend_assessment, df)
             
             return f'''
 Trend Analysis for {ticker}:
@@ -557,18 +785,7 @@ Trend Analysis for {ticker}:
 - MACD Histogram: {trend['indicators']['macd_histogram']}
 '''.strip()
         
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        if loop.is_running():
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, _check())
-                return future.result()
-        else:
-            return loop.run_until_complete(_check())
+        return run_sync(_check(), name="check_trend")
             
     except Exception as e:
         logger.error(f"Error checking trend for {ticker}: {e}")
@@ -596,7 +813,9 @@ def support_resistance(ticker: str, method: str = "pivot", num_levels: int = 3)
             if df is None or len(df) < 20:
                 return f"Insufficient data for support/resistance analysis of {ticker}"
             
-            result = _quant_engine.calculate_support_resistance(df, method, num_levels)
+            result = await asyncio.to_thread(
+                _quant_engine.calculate_support_resistance, df, method, num_levels
+            )
             
             if "error" in result:
                 return f"Error: {result['error']}"
@@ -622,18 +841,7 @@ def support_resistance(ticker: str, method: str = "pivot", num_levels: int = 3)
             
             return output.strip()
         
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        if loop.is_running():
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, _calculate())
-                return future.result()
-        else:
-            return loop.run_until_complete(_calculate())
+        return run_sync(_calculate(), name="support_resistance")
             
     except Exception as e:
         logger.error(f"Error calculating support/resistance for {ticker}: {e}")
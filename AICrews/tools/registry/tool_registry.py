@@ -563,7 +563,26 @@ Returns:
         if not tool_ids:
             return []
 
-        tools = []
+        resolved = self.resolve_tool_ids(tool_ids, user_id=user_id)
+        tools = [resolved[tid] for tid in tool_ids if resolved.get(tid) is not None]
+
+        logger.info(
+            f"[4-Tier Loadout] Loaded {len(tools)} tools from {len(tool_ids)} IDs"
+        )
+        return tools
+
+    def resolve_tool_ids(
+        self, tool_ids: List[str], user_id: Optional[int] = None
+    ) -> Dict[str, Optional[Callable]]:
+        """批量解析工具 ID，返回 {tool_id: 工具或 None}
+
+        与 get_tools_by_namespaced_ids 的解析规则相同，但保留 ID 与结果的对应关系，
+        供预检一次性判断多个 Agent 的工具可用性；策略工具用一次 IN 查询加载。
+        """
+        resolved: Dict[str, Optional[Callable]] = {}
+        if not tool_ids:
+            return resolved
+
         all_available = self.get_user_tools(user_id)
 
         # 创建工具名称到工具对象的映射
@@ -576,29 +595,23 @@ Returns:
             # 同时也存储不带前缀的名称（向后兼容）
             tool_map[tool_name] = t
 
+        strategies = self._load_strategies(
+            [tid for tid in tool_ids if tid.startswith("strategy:")], user_id
+        )
+
         # 根据 ID 获取工具
-        for tool_id in tool_ids:
+        for tool_id in dict.fromkeys(tool_ids):
+            tool = None
             if ":" in tool_id:
                 # 命名空间格式: "tier:key"
                 if tool_id.startswith("strategy:"):
                     # 特殊处理：动态加载策略工具
                     strategy_id_str = tool_id.split(":", 1)[1]
                     try:
-                        strategy_id = int(strategy_id_str)
-                        strategy = (
-                            self.db.query(UserStrategy)
-                            .filter(
-                                UserStrategy.id == strategy_id,
-                                UserStrategy.user_id == user_id,
-                                UserStrategy.is_active == True,
-                            )
-                            .first()
-                        )
-
+                        strategy = strategies.get(int(strategy_id_str))
                         if strategy:
                             tool = self._create_strategy_tool(strategy)
                             if tool:
-                                tools.append(tool)
                                 logger.info(f"Created strategy tool: {tool_id}")
                             else:
                                 logger.warning(
@@ -610,40 +623,54 @@ Returns:
                         logger.warning(f"Invalid strategy ID format: {tool_id}")
 
                 elif tool_id in tool_map:
-                    tools.append(tool_map[tool_id])
+                    tool = tool_map[tool_id]
                 else:
                     logger.warning(f"Tool not found: {tool_id}")
             else:
                 # 直接工具名称 - 支持 MCP 工具命名空间格式
-                found = False
-
                 # 1. Check if it's in the tool_map (existing tools)
                 if tool_id in tool_map:
-                    tools.append(tool_map[tool_id])
-                    found = True
+                    tool = tool_map[tool_id]
 
                 # 2. Check if it's a namespaced MCP tool (mcp_server_tool)
                 elif tool_id.startswith("mcp_"):
                     tool = self._get_tool_by_namespaced_name(tool_id, user_id)
                     if tool:
-                        tools.append(tool)
-                        found = True
                         logger.info(f"Loaded MCP tool by namespaced name: {tool_id}")
 
                 # 3. Fallback to legacy name lookup (backward compatibility)
-                if not found:
+                if not tool:
                     tool = self._get_tool_by_legacy_name(tool_id, user_id)
-                    if tool:
-                        tools.append(tool)
-                        found = True
 
-                if not found:
+                if not tool:
                     logger.warning(f"Tool not found: {tool_id}")
 
-        logger.info(
-            f"[4-Tier Loadout] Loaded {len(tools)} tools from {len(tool_ids)} IDs"
+            resolved[tool_id] = tool or None
+
+        return resolved
+
+    def _load_strategies(
+        self, tool_ids: List[str], user_id: Optional[int]
+    ) -> Dict[int, UserStrategy]:
+        """按 strategy:<id> 批量加载当前用户的有效策略"""
+        strategy_ids = set()
+        for tool_id in tool_ids:
+            try:
+                strategy_ids.add(int(tool_id.split(":", 1)[1]))
+            except ValueError:
+                continue
+        if not strategy_ids:
+            return {}
+        rows = (
+            self.db.query(UserStrategy)
+            .filter(
+                UserStrategy.id.in_(sorted(strategy_ids)),
+                UserStrategy.user_id == user_id,
+                UserStrategy.is_active == True,
+            )
+            .all()
         )
-        return tools
+        return {row.id: row for row in rows}
 
     def _get_tool_key(self, tool: Any) -> str:
         """获取工具的命名空间键
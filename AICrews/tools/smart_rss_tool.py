@@ -165,8 +165,8 @@ class SmartRSSTool:
         self.BEARISH_KEYWORDS.update(sentiment_data.get("bearish", []))
 
         # Per-loop semaphore management (avoids "bound to different event loop" errors)
-        # When tools use ThreadPoolExecutor + asyncio.run, each call creates a new loop
-        # A single Semaphore bound to one loop will fail in other loops
+        # Tool wrappers run on the shared async runner loop, but fetch_news may also be
+        # awaited directly from the API server loop; each loop needs its own Semaphore
         self._semaphores: Dict[int, asyncio.Semaphore] = {}
         self._semaphore_lock = threading.Lock()
 
@@ -183,8 +183,8 @@ class SmartRSSTool:
     def _get_semaphore(self) -> asyncio.Semaphore:
         """Get or create a semaphore for the current event loop.
 
-        This avoids "bound to different event loop" errors when tools
-        use ThreadPoolExecutor + asyncio.run to create new loops.
+        This avoids "bound to different event loop" errors when the tool
+        is used from both the async runner loop and the API server loop.
         """
         loop_id = id(asyncio.get_running_loop())
 
@@ -356,7 +356,7 @@ class SmartRSSTool:
                     content = response.text
 
                 # Parse RSS feed
-                feed = feedparser.parse(content)
+                feed = await asyncio.to_thread(feedparser.parse, content)
                 if feed.bozo and not feed.entries:
                     logger.warning(f"RSS parse error for {url}: {feed.bozo_exception}")
                     return []
@@ -729,39 +729,23 @@ class SmartRSSCrewTool:
             Returns:
                 Formatted news summary ready for analysis
             """
-            import asyncio
-            
+            from AICrews.tools.async_runner import run_sync
+
             ticker_list = [t.strip() for t in tickers.split(",") if t.strip()] or None
             keyword_list = [k.strip() for k in keywords.split(",") if k.strip()] or None
             category_list = [c.strip() for c in categories.split(",") if c.strip()]
             
-            # Run async fetch
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # If already in async context, create new task
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(
-                        asyncio.run,
-                        self.tool.fetch_news(
-                            tickers=ticker_list,
-                            keywords=keyword_list,
-                            categories=category_list,
-                            max_age_hours=max_age_hours,
-                            limit=limit,
-                        )
-                    )
-                    news_items = future.result()
-            else:
-                news_items = loop.run_until_complete(
-                    self.tool.fetch_news(
-                        tickers=ticker_list,
-                        keywords=keyword_list,
-                        categories=category_list,
-                        max_age_hours=max_age_hours,
-                        limit=limit,
-                    )
-                )
+            # Run async fetch on the shared tool loop
+            news_items = run_sync(
+                self.tool.fetch_news(
+                    tickers=ticker_list,
+                    keywords=keyword_list,
+                    categories=category_list,
+                    max_age_hours=max_age_hours,
+                    limit=limit,
+                ),
+                name="fetch_market_news",
+            )
             
             # Format output for LLM consumption
             return self._format_news_for_llm(news_items)
@@ -0,0 +1,633 @@
+"""
+Streaming Indicators - 增量（流式）技术指标
+
+QuantEngine 的在线版本：每个指标维护"已完成 K 线"的提交状态和当前 K 线的
+临时值，实时行情到达时只根据提交状态重算当前 K 线，O(1) 更新，无需重新加载
+历史或跑 pandas 滚动窗口。
+
+K 线语义：
+- 同一 bar 时间戳的多次 update 视为当前 K 线的修正（日线内的实时跳动）
+- 时间戳前进时先提交上一根 K 线，再开始新 K 线
+- 早于当前 K 线的更新被忽略
+
+支持的指标（参数默认值与 QuantEngine 一致），以规格字符串标识：
+- sma:<period>[:<field>]: 简单移动平均（滚动和；field=volume 即 VOL_MA）
+- ema:<period>: 指数移动平均 (adjust=False)
+- rsi:<period>: Wilder 平滑（与 pandas-ta 一致）
+- macd:<fast>:<slow>:<signal>: 快/慢 EMA 差值 + 信号线 EMA
+- bollinger:<period>:<std>: 滚动和 / 平方和（样本标准差）
+- atr:<period>: Wilder 平滑的真实波幅（与 pandas-ta 一致）
+- kdj:<k>:<d>: 滚动高低点 RSV 的 EMA 平滑
+- obv: 能量潮
+
+状态可通过 to_dict()/from_dict() 序列化为 JSON，用于 Redis 持久化。
+
+使用方式:
+    indicators = IndicatorSet.from_history(df, specs=["sma:20", "rsi:14"])
+    indicators.update_quote(price=101.2, bar_ts="2024-06-03", volume=1_200_000)
+    snapshot = indicators.snapshot()
+"""
+
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple, Type
+
+import pandas as pd
+
+
+class Bar(NamedTuple):
+    """一根（可能尚未完成的）K 线"""
+    ts: str
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float = 0.0
+
+
+class StreamingIndicator:
+    """增量指标基类
+
+    子类实现：
+    - _step(bar): 基于提交状态计算当前 K 线的临时结果（不得修改提交状态）
+    - _commit(pending): 将临时结果写入提交状态
+    - _value(pending): 对外暴露的指标值
+    - _state() / _load_state(): 提交状态的序列化
+    """
+
+    kind = "base"
+
+    def __init__(self):
+        self._bar_ts: Optional[str] = None
+        self._pending: Any = None
+
+    def update(self, bar: Bar) -> Any:
+        """推入一根 K 线（或当前 K 线的最新值），返回指标值"""
+        if self._bar_ts is not None:
+            if bar.ts < self._bar_ts:
+                return self.value
+            if bar.ts > self._bar_ts and self._pending is not None:
+                self._commit(self._pending)
+        self._bar_ts = bar.ts
+        self._pending = self._step(bar)
+        return self.value
+
+    @property
+    def value(self) -> Any:
+        if self._pending is None:
+            return None
+        return self._value(self._pending)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "params": self._params(),
+            "bar_ts": self._bar_ts,
+            "pending": self._pending,
+            "state": self._state(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StreamingIndicator":
+        indicator = cls(**data.get("params", {}))
+        indicator._load_state(data.get("state") or {})
+        indicator._bar_ts = data.get("bar_ts")
+        pending = data.get("pending")
+        indicator._pending = tuple(pending) if isinstance(pending, list) else pending
+        return indicator
+
+    # ---- 子类实现 ----
+
+    def _params(self) -> Dict[str, Any]:
+        return {}
+
+    def _step(self, bar: Bar) -> Any:
+        raise NotImplementedError
+
+    def _commit(self, pending: Any) -> None:
+        raise NotImplementedError
+
+    def _value(self, pending: Any) -> Any:
+        return pending
+
+    def _state(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def _load_state(self, state: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class StreamingSMA(StreamingIndicator):
+    """简单移动平均：窗口内的滚动和"""
+
+    kind = "sma"
+
+    def __init__(self, period: int = 20, field: str = "close"):
+        super().__init__()
+        self.period = period
+        self.field = field
+        # 提交状态只保留最近 period - 1 个值，当前 K 线补足窗口
+        self.window: deque = deque(maxlen=max(period - 1, 1))
+        self.total = 0.0
+
+    def _params(self) -> Dict[str, Any]:
+        return {"period": self.period, "field": self.field}
+
+    def _step(self, bar: Bar):
+        """pending = (value, sma)"""
+        value = float(getattr(bar, self.field) or 0.0)
+        if self.period <= 1:
+            return (value, value)
+        if len(self.window) + 1 < self.period:
+            return (value, None)
+        return (value, (self.total + value) / self.period)
+
+    def _commit(self, pending) -> None:
+        if self.period <= 1:
+            return
+        value = pending[0]
+        if len(self.window) == self.window.maxlen:
+            self.total -= self.window[0]
+        self.window.append(value)
+        self.total += value
+
+    def _value(self, pending) -> Optional[float]:
+        return pending[1]
+
+    def _state(self) -> Dict[str, Any]:
+        return {"window": list(self.window)}
+
+    def _load_state(self, state: Dict[str, Any]) -> None:
+        self.window = deque(state.get("window") or [], maxlen=max(self.period - 1, 1))
+        self.total = float(sum(self.window))
+
+
+class StreamingEMA(StreamingIndicator):
+    """指数移动平均：ema = alpha * close + (1 - alpha) * ema_prev"""
+
+    kind = "ema"
+
+    def __init__(self, period: int = 20):
+        super().__init__()
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.prev: Optional[float] = None
+
+    def step_value(self, value: float) -> float:
+        """对任意输入序列（如 MACD 线）计算当前值，供复合指标复用"""
+        if self.prev is None:
+            return value
+        return self.alpha * value + (1 - self.alpha) * self.prev
+
+    def _params(self) -> Dict[str, Any]:
+        return {"period": self.period}
+
+    def _step(self, bar: Bar) -> float:
+        return self.step_value(bar.close)
+
+    def _commit(self, pending: float) -> None:
+        self.prev = pending
+
+    def _state(self) -> Dict[str, Any]:
+        return {"prev": self.prev}
+
+    def _load_state(self, state: Dict[str, Any]) -> None:
+        self.prev = state.get("prev")
+
+
+class _WilderAverage:
+    """Wilder 平滑 (RMA)：前 period 个样本取算术平均作为种子，之后递推"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.total = 0.0
+        self.avg: Optional[float] = None
+
+    def peek(self, value: float) -> Optional[float]:
+        if self.avg is not None:
+            return (self.avg * (self.period - 1) + value) / self.period
+        if self.count + 1 >= self.period:
+            return (self.total + value) / self.period
+        return None
+
+    def commit(self, value: float) -> None:
+        self.avg = self.peek(value)
+        if self.avg is None:
+            self.count += 1
+            self.total += value
+
+    def state(self) -> Dict[str, Any]:
+        return {"count": self.count, "total": self.total, "avg": self.avg}
+
+    def load(self, state: Dict[str, Any]) -> None:
+        self.count = state.get("count", 0)
+        self.total = state.get("total", 0.0)
+        self.avg = state.get("avg")
+
+
+class StreamingRSI(StreamingIndicator):
+    """相对强弱指数（Wilder 平滑）"""
+
+    kind = "rsi"
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.gain = _WilderAverage(period)
+        self.loss = _WilderAverage(period)
+
+    def _params(self) -> Dict[str, Any]:
+        return {"period": self.period}
+
+    def _step(self, bar: Bar):
+        """pending = (close, gain, loss, rsi)"""
+        if self.prev_close is None:
+            return (bar.close, None, None, None)
+        change = bar.close - self.prev_close
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        avg_gain, avg_loss = self.gain.peek(gain), self.loss.peek(loss)
+        rsi = None
+        if avg_gain is not None and avg_loss is not None:
+            rsi = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+        return (bar.close, gain, loss, rsi)
+
+    def _commit(self, pending) -> None:
+        close, gain, loss, _ = pending
+        if gain is not None:
+            self.gain.commit(gain)
+            self.loss.commit(loss)
+        self.prev_close = close
+
+    def _value(self, pending) -> Optional[float]:
+        return pending[3]
+
+    def _state(self) -> Dict[str, Any]:
+        return {"prev_close": self.prev_close, "gain": self.gain.state(), "loss": self.loss.state()}
+
+    def _load_state(self, state: Dict[str, Any]) -> None:
+        self.prev_close = state.get("prev_close")
+        self.gain.load(state.get("gain") or {})
+        self.loss.load(state.get("loss") or {})
+
+
+class StreamingMACD(StreamingIndicator):
+    """MACD：快/慢 EMA 差值，信号线为 MACD 线的 EMA"""
+
+    kind = "macd"
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        super().__init__()
+        self.fast, self.slow, self.signal = fast, slow, signal
+        self.fast_ema = StreamingEMA(fast)
+        self.slow_ema = StreamingEMA(slow)
+        self.signal_ema = StreamingEMA(signal)
+
+    def _params(self) -> Dict[str, Any]:
+        return {"fast": self.fast, "slow": self.slow, "signal": self.signal}
+
+    def _step(self, bar: Bar):
+        """pending = (fast_ema, slow_ema, macd, signal)"""
+        fast = self.fast_ema.step_value(bar.close)
+        slow = self.slow_ema.step_value(bar.close)
+        macd = fast - slow
+        return (fast, slow, macd, self.signal_ema.step_value(macd))
+
+    def _commit(self, pending) -> None:
+        fast, slow, _, signal = pending
+        self.fast_ema.prev, self.slow_ema.prev, self.signal_ema.prev = fast, slow, signal
+
+    def _value(self, pending) -> Dict[str, float]:
+        _, _, macd, signal = pending
+        return {"macd": macd, "signal": signal, "histogram": macd - signal}
+
+    def _state(self) -> Dict[str, Any]:
+        return {"fast": self.fast_ema.prev, "slow": self.slow_ema.prev, "signal": self.signal_ema.prev}
+
+    def _load_state(self, state: Dict[str, Any]) -> None:
+        self.fast_ema.prev = state.get("fast")
+        self.slow_ema.prev = state.get("slow")
+        self.signal_ema.prev = state.get("signal")
+
+
+class StreamingBollinger(StreamingIndicator):
+    """布林带：窗口内收盘价的滚动和 / 平方和（样本标准差，与 pandas rolling.std 一致）"""
+
+    kind = "bollinger"
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        super().__init__()
+        self.period = period
+        self.std_dev = std_dev
+        # 提交状态只保留最近 period - 1 根收盘价，当前 K 线补足窗口
+        self.window: deque = deque(maxlen=max(period - 1, 1))
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def _params(self) -> Dict[str, Any]:
+        return {"period": self.period, "std_dev": self.std_dev}
+
+    def _step(self, bar: Bar):
+        """pending = (close, upper, middle, lower)"""
+        n = len(self.window) + 1
+        if n < self.period:
+            return (bar.close, None, None, None)
+        total = self.total + bar.close
+        total_sq = self.total_sq + bar.close * bar.close
+        middle = total / n
+        variance = max((total_sq - total * total / n) / (n - 1), 0.0) if n > 1 else 0.0
+        width = math.sqrt(variance) * self.std_dev
+        return (bar.close, middle + width, middle, middle - width)
+
+    def _commit(self, pending) -> None:
+        close = pending[0]
+        if self.period > 1 and len(self.window) == self.window.maxlen:
+            dropped = self.window[0]
+            self.total -= dropped
+            self.total_sq -= dropped * dropped
+        if self.period > 1:
+            self.window.append(close)
+            self.total += close
+            self.total_sq += close * close
+
+    def _value(self, pending) -> Optional[Dict[str, float]]:
+        _, upper, middle, lower = pending
+        if middle is None:
+            return None
+        return {"upper": upper, "middle": middle, "lower": lower}
+
+    def _state(self) -> Dict[str, Any]:
+        return {"window": list(self.window)}
+
+    def _load_state(self, state: Dict[str, Any]) -> None:
+        self.window = deque(state.get("window") or [], maxlen=max(self.period - 1, 1))
+        # 重新求和，避免持久化的累计浮点误差
+        self.total = float(sum(self.window))
+        self.total_sq = float(sum(v * v for v in self.window))
+
+
+class StreamingATR(StreamingIndicator):
+    """平均真实波幅（Wilder 平滑）"""
+
+    kind = "atr"
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.tr = _WilderAverage(period)
+
+    def _params(self) -> Dict[str, Any]:
+        return {"period": self.period}
+
+    def _step(self, bar: Bar):
+        """pending = (close, tr, atr)"""
+        if self.prev_close is None:
+            tr = bar.high - bar.low
+        else:
+            tr = max(bar.high - bar.low, abs(bar.high - self.prev_close), abs(bar.low - self.prev_close))
+        return (bar.close, tr, self.tr.peek(tr))
+
+    def _commit(self, pending) -> None:
+        close, tr, _ = pending
+        self.tr.commit(tr)
+        self.prev_close = close
+
+    def _value(self, pending) -> Optional[float]:
+        return pending[2]
+
+    def _state(self) -> Dict[str, Any]:
+        return {"prev_close": self.prev_close, "tr": self.tr.state()}
+
+    def _load_state(self, state: Dict[str, Any]) -> None:
+        self.prev_close = state.get("prev_close")
+        self.tr.load(state.get("tr") or {})
+
+
+class StreamingKDJ(StreamingIndicator):
+    """KDJ：RSV = (close - 最低价) / (最高价 - 最低价)，K/D 为 EMA 平滑，J = 3K - 2D"""
+
+    kind = "kdj"
+
+    def __init__(self, k_period: int = 9, d_period: int = 3):
+        super().__init__()
+        self.k_period, self.d_period = k_period, d_period
+        # 提交状态保留最近 k_period - 1 根 K 线的高低点（窗口很小，取极值为常数开销）
+        self.highs: deque = deque(maxlen=max(k_period - 1, 1))
+        self.lows: deque = deque(maxlen=max(k_period - 1, 1))
+        self.k_ema = StreamingEMA(d_period)
+        self.d_ema = StreamingEMA(d_period)
+
+    def _params(self) -> Dict[str, Any]:
+        return {"k_period": self.k_period, "d_period": self.d_period}
+
+    def _step(self, bar: Bar):
+        """pending = (high, low, k, d)"""
+        k, d = self.k_ema.prev, self.d_ema.prev
+        if len(self.highs) + 1 >= self.k_period:
+            high = max(max(self.highs, default=bar.high), bar.high)
+            low = min(min(self.lows, default=bar.low), bar.low)
+            if high > low:
+                rsv = (bar.close - low) / (high - low) * 100
+                k = self.k_ema.step_value(rsv)
+                d = self.d_ema.step_value(k)
+        return (bar.high, bar.low, k, d)
+
+    def _commit(self, pending) -> None:
+        high, low, k, d = pending
+        if self.k_period > 1:
+            self.highs.append(high)
+            self.lows.append(low)
+        self.k_ema.prev, self.d_ema.prev = k, d
+
+    def _value(self, pending) -> Optional[Dict[str, float]]:
+        _, _, k, d = pending
+        if k is None or d is None:
+            return None
+        return {"K": k, "D": d, "J": 3 * k - 2 * d}
+
+    def _state(self) -> Dict[str, Any]:
+        return {
+            "highs": list(self.highs),
+            "lows": list(self.lows),
+            "k": self.k_ema.prev,
+            "d": self.d_ema.prev,
+        }
+
+    def _load_state(self, state: Dict[str, Any]) -> None:
+        self.highs = deque(state.get("highs") or [], maxlen=max(self.k_period - 1, 1))
+        self.lows = deque(state.get("lows") or [], maxlen=max(self.k_period - 1, 1))
+        self.k_ema.prev = state.get("k")
+        self.d_ema.prev = state.get("d")
+
+
+class StreamingOBV(StreamingIndicator):
+    """能量潮：按收盘价涨跌方向累加成交量"""
+
+    kind = "obv"
+
+    def __init__(self):
+        super().__init__()
+        self.prev_close: Optional[float] = None
+        self.obv = 0.0
+
+    def _step(self, bar: Bar):
+        """pending = (close, obv)"""
+        if self.prev_close is None:
+            return (bar.close, self.obv)
+        direction = (bar.close > self.prev_close) - (bar.close < self.prev_close)
+        return (bar.close, self.obv + direction * (bar.volume or 0.0))
+
+    def _commit(self, pending) -> None:
+        self.prev_close, self.obv = pending
+
+    def _value(self, pending) -> float:
+        return pending[1]
+
+    def _state(self) -> Dict[str, Any]:
+        return {"prev_close": self.prev_close, "obv": self.obv}
+
+    def _load_state(self, state: Dict[str, Any]) -> None:
+        self.prev_close = state.get("prev_close")
+        self.obv = state.get("obv", 0.0)
+
+
+_INDICATOR_TYPES: Dict[str, Type[StreamingIndicator]] = {
+    cls.kind: cls
+    for cls in (
+        StreamingSMA, StreamingEMA, StreamingRSI, StreamingMACD,
+        StreamingBollinger, StreamingATR, StreamingKDJ, StreamingOBV,
+    )
+}
+
+# 默认维护的指标（与 QuantEngine 默认参数一致）
+DEFAULT_SPECS: Tuple[str, ...] = (
+    "ema:12",
+    "ema:26",
+    "rsi:14",
+    "macd:12:26:9",
+    "bollinger:20:2.0",
+    "atr:14",
+    "obv",
+)
+
+
+def indicator_from_spec(spec: str) -> StreamingIndicator:
+    """按规格字符串创建指标，如 "sma:20:volume"、"macd:12:26:9"
+
+    Raises:
+        ValueError: 未知指标或参数无效
+    """
+    kind, *args = spec.split(":")
+    try:
+        if kind == "sma":
+            return StreamingSMA(int(args[0]), *(args[1:2] or ["close"]))
+        if kind in ("ema", "rsi", "atr"):
+            return _INDICATOR_TYPES[kind](int(args[0]))
+        if kind == "macd":
+            return StreamingMACD(*(int(a) for a in args))
+        if kind == "bollinger":
+            return StreamingBollinger(int(args[0]), float(args[1]))
+        if kind == "kdj":
+            return StreamingKDJ(*(int(a) for a in args))
+        if kind == "obv" and not args:
+            return StreamingOBV()
+    except (IndexError, TypeError, ValueError):
+        pass
+    raise ValueError(f"Invalid streaming indicator spec: {spec}")
+
+
+class IndicatorSet:
+    """单个标的的一组增量指标（按规格字符串索引），同时维护当前 K 线的 OHLCV"""
+
+    def __init__(self, specs: Optional[Iterable[str]] = None):
+        self.indicators: Dict[str, StreamingIndicator] = {
+            spec: indicator_from_spec(spec) for spec in dict.fromkeys(specs or DEFAULT_SPECS)
+        }
+        self.bar: Optional[Bar] = None
+
+    def has_specs(self, specs: Iterable[str]) -> bool:
+        return all(spec in self.indicators for spec in specs)
+
+    @classmethod
+    def from_history(
+        cls, df: pd.DataFrame, specs: Optional[Iterable[str]] = None
+    ) -> "IndicatorSet":
+        """用历史 K 线回放初始化状态（一次性 O(n)，之后逐笔 O(1)）"""
+        indicator_set = cls(specs)
+        frame = df.copy()
+        frame.columns = frame.columns.str.lower()
+        dates = pd.to_datetime(frame["date"]) if "date" in frame.columns else pd.to_datetime(frame.index)
+        for ts, row in zip(dates, frame.itertuples(index=False)):
+            close = float(row.close)
+            indicator_set.update_bar(Bar(
+                ts=ts.date().isoformat(),
+                open=float(getattr(row, "open", close)),
+                high=float(getattr(row, "high", close)),
+                low=float(getattr(row, "low", close)),
+                close=close,
+                volume=float(getattr(row, "volume", 0.0) or 0.0),
+            ))
+        return indicator_set
+
+    def update_bar(self, bar: Bar) -> None:
+        self.bar = bar
+        for indicator in self.indicators.values():
+            indicator.update(bar)
+
+    def update_quote(
+        self,
+        price: float,
+        bar_ts: str,
+        volume: Optional[float] = None,
+        high: Optional[float] = None,
+        low: Optional[float] = None,
+    ) -> None:
+        """推入一笔实时行情（合并到当前日线 K 线）
+
+        bar_ts 为行情所属交易日（交易所时区的 ISO 日期），由调用方根据成交时间确定；
+        volume 为当日累计成交量（与行情源一致），缺失时沿用当前 K 线的值。
+        """
+        current = self.bar
+        if current is not None and current.ts > bar_ts:
+            return
+        if current is None or current.ts < bar_ts:
+            bar = Bar(bar_ts, price, high or price, low or price, price, volume or 0.0)
+        else:
+            bar = Bar(
+                bar_ts,
+                current.open,
+                max(current.high, high or price, price),
+                min(current.low, low or price, price),
+                price,
+                volume if volume is not None else current.volume,
+            )
+        self.update_bar(bar)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前 K 线 OHLCV 与各指标值（键为规格字符串，未完成预热的指标为 None）"""
+        result: Dict[str, Any] = {
+            spec: indicator.value for spec, indicator in self.indicators.items()
+        }
+        if self.bar is not None:
+            result.update(self.bar._asdict())
+            result["bar_ts"] = result.pop("ts")
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bar": list(self.bar) if self.bar is not None else None,
+            "indicators": {spec: indicator.to_dict() for spec, indicator in self.indicators.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IndicatorSet":
+        indicator_set = cls(specs=())
+        indicator_set.indicators = {
+            spec: _INDICATOR_TYPES[payload["kind"]].from_dict(payload)
+            for spec, payload in (data.get("indicators") or {}).items()
+        }
+        if data.get("bar"):
+            indicator_set.bar = Bar(*data["bar"])
+        return indicator_set
@@ -11,12 +11,12 @@ from fastapi import APIRouter, HTTPException, Query, Depends
 from sqlalchemy.orm import Session
 
 from AICrews.infrastructure.jobs.job_manager import JobStatus
+from AICrews.infrastructure.jobs.scheduler import JobAdmissionError
 from backend.app.security import get_current_user_optional, get_db
 from AICrews.database.models import User
-from AICrews.services.analysis_service import AnalysisService
+from AICrews.services.analysis_service import ANALYSIS_TASK, AnalysisService
 from AICrews.services.entitlements.policy_engine import EntitlementPolicyEngine
 from AICrews.schemas.entitlements import PolicyAction
-from AICrews.application.crew.run_context import RunContext, run_context_scope
 from AICrews.schemas.analysis import (
     AnalysisRequest,
     ChatRequest,
@@ -28,6 +28,7 @@ from AICrews.schemas.analysis import (
     JobListResponse,
 )
 from AICrews.schemas.common import ErrorResponse
+from backend.app.api.v1.utils.jobs_http import admission_http_error
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +44,7 @@ def get_analysis_service() -> AnalysisService:
 @router.post(
     "/analysis/start",
     response_model=JobResponse,
-    responses={400: {"model": ErrorResponse}},
+    responses={400: {"model": ErrorResponse}, 429: {"model": ErrorResponse}},
     summary="启动分析任务",
     description="提交股票分析任务，返回任务ID用于后续查询",
 )
@@ -83,33 +84,23 @@ async def start_analysis(
                 },
             )
 
-        run_ctx = RunContext(
-            entitlements_decision=decision,
-            effective_scope=decision.effective_scope.value,
-            byok_allowed=decision.limits.byok_allowed,
-            runtime_limits=decision.limits,
-        )
-
         analysis_date = request.date or datetime.now().strftime("%Y-%m-%d")
 
-        def run_crew(job_id: str = None):
-            with run_context_scope(run_ctx):
-                result_dict = service.run_analysis(
-                    ticker=request.ticker,
-                    date=analysis_date,
-                    crew_name=request.crew_name,
-                    analysts=request.selected_analysts,
-                    debate_rounds=request.debate_rounds or 1,
-                    user_id=user_id,
-                    run_id=job_id,
-                )
-                return str(result_dict.get("result", ""))
-
-        job_id = service.job_manager.submit(
-            run_crew,
+        job_id = service.job_manager.submit_task(
+            ANALYSIS_TASK,
+            {
+                "ticker": request.ticker,
+                "date": analysis_date,
+                "crew_name": request.crew_name,
+                "analysts": request.selected_analysts,
+                "debate_rounds": request.debate_rounds or 1,
+                "user_id": user_id,
+                "decision": decision.model_dump(mode="json"),
+            },
             ticker=request.ticker,
             crew_name=request.crew_name,
             user_id=user_id,
+            tier=decision.effective_tier.value,
         )
         
         return JobResponse(
@@ -120,6 +111,8 @@ async def start_analysis(
         
     except HTTPException:
         raise
+    except JobAdmissionError as e:
+        raise admission_http_error(e)
     except Exception as e:
         logger.error(f"Failed to start analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -176,6 +169,7 @@ async def get_analysis_status(
 async def list_analysis_jobs(
     status: Optional[str] = Query(None, description="过滤状态"),
     limit: int = Query(50, ge=1, le=100, description="返回数量"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor）"),
     current_user: Optional[User] = Depends(get_current_user_optional),
     service: AnalysisService = Depends(get_analysis_service),
 ):
@@ -190,8 +184,17 @@ async def list_analysis_jobs(
                 detail=f"Invalid status: {status}. Valid: {[s.value for s in JobStatus]}"
             )
     
+    if cursor is not None:
+        try:
+            float(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
     user_id = current_user.id if current_user else None
-    jobs = service.list_jobs(status=status_filter, limit=limit, user_id=user_id)
+    page = service.list_jobs_page(
+        status=status_filter, limit=limit, user_id=user_id, cursor=cursor
+    )
+    jobs = page.jobs
     
     job_responses = [
         JobStatusResponse(
@@ -210,7 +213,9 @@ async def list_analysis_jobs(
         for job in jobs
     ]
     
-    return JobListResponse(jobs=job_responses, total=len(job_responses))
+    return JobListResponse(
+        jobs=job_responses, total=len(job_responses), next_cursor=page.next_cursor
+    )
 
 
 @router.delete(
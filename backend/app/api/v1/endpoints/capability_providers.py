@@ -12,6 +12,7 @@ from datetime import datetime
 import logging
 
 from backend.app.security import get_db, get_current_user
+from AICrews.application.crew.preflight import invalidate_preflight_cache
 from AICrews.database.models.provider import CapabilityProvider, ProviderCapabilityMapping
 from AICrews.capabilities.taxonomy import ALL_CAPABILITIES
 from AICrews.schemas.provider import (
@@ -354,6 +355,8 @@ async def disable_provider(
 
     provider.enabled = False
     db.commit()
+    # 依赖该提供方的 Skill 可能变为不可用，所有用户的预检缓存失效
+    await invalidate_preflight_cache()
 
     return {
         "provider_id": provider_id,
@@ -381,6 +384,7 @@ async def delete_provider(
     provider_key = provider.provider_key
     db.delete(provider)
     db.commit()
+    await invalidate_preflight_cache()
 
     return {
         "provider_key": provider_key,
@@ -23,6 +23,13 @@ GET /api/chart?ticker=AAPL&resolution=5m
 
 import logging
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as ChartJSONResponse
+except ImportError:  # pragma: no cover - optional dependency
+    ChartJSONResponse = JSONResponse
 
 from AICrews.schemas.chart import ChartDataRequest, ChartDataResponse, SparklineResponse
 from AICrews.services.chart_service import ChartDataService
@@ -41,12 +48,22 @@ async def get_chart_data(
 ):
     """
     获取图表数据
+
+    直接序列化缓存的列式序列（不逐根构造 OHLCVData）；layout=columnar 时返回数组格式。
     """
     try:
-        result = await service.get_chart_data(request)
+        result = await service.get_chart_series(request)
         if not result:
             raise HTTPException(status_code=404, detail=f"No data found for {request.ticker}")
-        return result
+        series, cached = result
+        return ChartJSONResponse(
+            series.to_response_dict(
+                request.ticker,
+                request.resolution,
+                cached=cached,
+                columnar=request.layout == "columnar",
+            )
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -49,6 +49,7 @@ from AICrews.schemas.entitlements import PolicyAction
 from backend.app.security import (get_current_user, get_current_user_optional,
                                   get_db)
 from backend.app.api.v1.utils.entitlements_http import require_entitlement
+from backend.app.api.v1.utils.jobs_http import admission_http_error
 
 logger = logging.getLogger(__name__)
 
@@ -99,6 +100,17 @@ def get_crew_assembler():
     return _get_crew_assembler()
 
 
+async def invalidate_compiled_crews(*tags: str) -> None:
+    """定义变更后失效所有 worker 上相关的编译产物缓存（crew:<id> / user:<id>）"""
+    try:
+        from AICrews.infrastructure.cache.layered_cache_manager import \
+            get_layered_cache
+
+        await get_layered_cache().invalidate_tags(*tags)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate compiled crew cache {tags}: {e}")
+
+
 def get_preflight_result_class():
     """Lazy import of PreflightResult class"""
     from AICrews.application.crew.preflight import PreflightResult
@@ -254,6 +266,7 @@ async def update_agent_definition(
     agent.updated_at = datetime.now()
     db.commit()
     db.refresh(agent)
+    await invalidate_compiled_crews(f"user:{current_user.id}")
 
     return AgentDefinitionResponse.model_validate(agent)
 
@@ -288,6 +301,7 @@ async def delete_agent_definition(
     agent.is_active = False
     agent.updated_at = datetime.now()
     db.commit()
+    await invalidate_compiled_crews(f"user:{current_user.id}")
 
     return {"message": f"Agent {agent_id} deleted"}
 
@@ -414,6 +428,7 @@ async def update_task_definition(
     task.updated_at = datetime.now()
     db.commit()
     db.refresh(task)
+    await invalidate_compiled_crews(f"user:{current_user.id}")
 
     return TaskDefinitionResponse.model_validate(task)
 
@@ -447,6 +462,7 @@ async def delete_task_definition(
 
     db.delete(task)
     db.commit()
+    await invalidate_compiled_crews(f"user:{current_user.id}")
 
     return {"message": f"Task {task_id} deleted"}
 
@@ -646,6 +662,7 @@ async def update_crew_definition(
     crew.updated_at = datetime.now()
     db.commit()
     db.refresh(crew)
+    await invalidate_compiled_crews(f"crew:{crew_id}")
 
     return CrewDefinitionResponse.model_validate(crew)
 
@@ -680,6 +697,7 @@ async def delete_crew_definition(
     crew.is_active = False
     crew.updated_at = datetime.now()
     db.commit()
+    await invalidate_compiled_crews(f"crew:{crew_id}")
 
     return {"message": f"Crew {crew_id} deleted"}
 
@@ -709,7 +727,8 @@ async def run_crew_definition(
     - Custom crews require RUN_CUSTOM_CREW action (Pro tier)
     """
     from AICrews.application.crew import get_crew_assembler
-    from AICrews.infrastructure.jobs import get_job_manager
+    from AICrews.application.crew.crew_run_job import CREW_RUN_TASK
+    from AICrews.infrastructure.jobs import JobAdmissionError, get_job_manager
 
     crew = db.get(CrewDefinition, crew_id)
 
@@ -736,12 +755,7 @@ async def run_crew_definition(
 
     # Build RunContext (same pattern as analysis.py)
     from AICrews.application.crew.run_context import RunContext, run_context_scope
-    run_ctx = RunContext(
-        entitlements_decision=decision,
-        effective_scope=decision.effective_scope.value,
-        byok_allowed=decision.limits.byok_allowed,
-        runtime_limits=decision.limits,
-    )
+    run_ctx = RunContext.from_decision(decision)
 
     variables = body.variables or {}
 
@@ -796,207 +810,20 @@ async def run_crew_definition(
             logger.error(f"Preflight check error: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail="Preflight check failed")
 
-    # Capture values to avoid closure issues with thread execution
-    _crew_id = crew_id
-    _variables = dict(variables)
-    _user_id = current_user.id
-    _crew_name = crew.name
-    _run_ctx = run_ctx  # Capture RunContext for thread execution
-
-    def execute_crew(job_id: str = None, **kwargs):
-        import time
-        import traceback
-        from AICrews.application.crew import get_crew_assembler
-        from AICrews.application.crew.run_context import run_context_scope
-        from AICrews.observability.logging import LogContext
-        from AICrews.schemas.llm_policy import LLMKeyProvisioningError
-        from AICrews.schemas.stats import AgentActivityEvent
-        from AICrews.services.tracking_service import TrackingService
-        from AICrews.utils.redaction import truncate_text
-
-        logger.info(
-            f"==================== [Job {job_id}] EXECUTION START ===================="
-        )
-
-        assembler = get_crew_assembler()
-        tracker = TrackingService()
-
-        # Set LogContext for the entire execution so EventBus listeners can access job_id
-        # This enables CrewAI tool events and litellm LLM events to be associated with this job
-        log_context = LogContext(
-            job_id=job_id,
-            user_id=str(_user_id) if _user_id else None,
-            ticker=_variables.get("ticker"),
-        )
-        log_context.__enter__()
-
-        def _safe_activity(
-            activity_type: str,
-            message: str,
-            details: dict | None = None,
-        ) -> None:
-            try:
-                tracker.add_activity(
-                    job_id,
-                    AgentActivityEvent(
-                        agent_name="System",
-                        activity_type=activity_type,
-                        message=message,
-                        details=details,
-                    ),
-                )
-            except Exception:
-                logger.debug(
-                    "[Job %s] Failed to record activity: %s",
-                    job_id,
-                    activity_type,
-                    exc_info=True,
-                )
-
-        _safe_activity("phase", "Execution started")
-
-        # Retry configuration for LLM key provisioning
-        MAX_PROVISIONING_RETRIES = 6
-        MAX_TOTAL_WAIT_SECONDS = 30
-
-        try:
-            # Execute within RunContext scope for entitlements + LLM routing
-            with run_context_scope(_run_ctx):
-                # Retry loop for LLM key provisioning
-                crew_obj = None
-                pf = None
-                total_wait = 0
-                last_provisioning_error = None
-
-                for attempt in range(MAX_PROVISIONING_RETRIES):
-                    try:
-                        _safe_activity(
-                            "phase",
-                            f"Assembling crew (attempt {attempt + 1}/{MAX_PROVISIONING_RETRIES})",
-                            {"crew_id": _crew_id, "crew_name": _crew_name},
-                        )
-
-                        crew_obj, pf = assembler.assemble(
-                            crew_id=_crew_id, variables=_variables, job_id=job_id, user_id=_user_id
-                        )
-                        break  # Success, exit retry loop
-                    except LLMKeyProvisioningError as e:
-                        last_provisioning_error = e
-                        retry_after = e.retry_after or 5
-
-                        # Check if we've exceeded max wait time
-                        if total_wait + retry_after > MAX_TOTAL_WAIT_SECONDS:
-                            logger.warning(
-                                f"[Job {job_id}] LLM provisioning timeout after {total_wait}s "
-                                f"(max {MAX_TOTAL_WAIT_SECONDS}s). Giving up."
-                            )
-                            raise
-
-                        logger.info(
-                            f"[Job {job_id}] LLM key provisioning in progress, "
-                            f"waiting {retry_after}s (attempt {attempt + 1}/{MAX_PROVISIONING_RETRIES})"
-                        )
-                        _safe_activity(
-                            "phase",
-                            f"LLM key provisioning in progress; sleeping {retry_after}s",
-                            {
-                                "attempt": attempt + 1,
-                                "max_attempts": MAX_PROVISIONING_RETRIES,
-                                "retry_after_seconds": retry_after,
-                                "total_wait_seconds": total_wait,
-                            },
-                        )
-                        time.sleep(retry_after)
-                        total_wait += retry_after
-
-                # If we exhausted retries without success
-                if crew_obj is None:
-                    if last_provisioning_error:
-                        raise last_provisioning_error
-                    raise RuntimeError("Assembly failed: no crew object returned")
-
-                if not pf.success:
-                    logger.error(f"[Job {job_id}] Assembly failed: {pf.errors}")
-                    _safe_activity(
-                        "error",
-                        f"Assembly failed: {truncate_text(str(pf.errors), limit=500)}",
-                    )
-                    raise RuntimeError(f"Assembly failed: {pf.errors}")
-
-                logger.info(
-                    f"[Job {job_id}] Crew assembled with {len(crew_obj.agents)} agents, {len(crew_obj.tasks)} tasks. Starting kickoff..."
-                )
-                _safe_activity(
-                    "phase",
-                    "Kickoff starting",
-                    {
-                        "agents": len(getattr(crew_obj, "agents", []) or []),
-                        "tasks": len(getattr(crew_obj, "tasks", []) or []),
-                    },
-                )
-                result = crew_obj.kickoff()
-                result_str = str(result)
-                logger.info(f"[Job {job_id}] Crew kickoff completed successfully")
-                _safe_activity("phase", "Kickoff completed")
-
-            # Milestone B3 & B2 & C1: Enhanced archiving with traces, token usage, and versioning
-            try:
-                from AICrews.services.crew_run_archive_service import archive_crew_run_result
-
-                _safe_activity("phase", "Archiving started")
-
-                archive_crew_run_result(
-                    job_id=job_id,
-                    crew_id=_crew_id,
-                    crew_name=_crew_name,
-                    user_id=_user_id,
-                    variables=_variables,
-                    result=result,
-                    result_str=result_str,
-                )
-                _safe_activity("phase", "Archiving completed")
-            except Exception as archive_err:
-                logger.error(
-                    f"[Job {job_id}] Failed to archive enhanced result: {archive_err}\n{traceback.format_exc()}"
-                )
-                _safe_activity(
-                    "warning",
-                    f"Archiving failed: {truncate_text(str(archive_err), limit=500)}",
-                )
-
-            logger.info(
-                f"==================== [Job {job_id}] EXECUTION FINISHED ===================="
-            )
-            # Clean up LogContext before returning
-            log_context.__exit__(None, None, None)
-            return result_str
-
-        except Exception as e:
-            error_stack = traceback.format_exc()
-            logger.error(f"[Job {job_id}] CRITICAL FAILURE: {e}\n{error_stack}")
-            _safe_activity(
-                "error",
-                f"CRITICAL FAILURE: {truncate_text(str(e), limit=500)}",
-                {"stack_preview": truncate_text(error_stack, limit=2000)},
-            )
-            # 更新 JobManager 中的状态 (如果可能)
-            try:
-                from AICrews.infrastructure.jobs import get_job_manager
-                jm = get_job_manager()
-                # 这种手动更新通常由 JobManager.submit 包装层处理，但这里显式打印确保万无一失
-            except:
-                pass
-            # Clean up LogContext before re-raising
-            log_context.__exit__(type(e), e, e.__traceback__)
-            raise
-
     try:
         job_manager = get_job_manager()
-        job_id = job_manager.submit(
-            execute_crew,
-            crew_id=crew_id,
+        job_id = job_manager.submit_task(
+            CREW_RUN_TASK,
+            {
+                "crew_id": crew_id,
+                "crew_name": crew.name,
+                "user_id": current_user.id,
+                "variables": dict(variables),
+                "decision": decision.model_dump(mode="json"),
+            },
             crew_name=crew.name,
             user_id=current_user.id,
+            tier=decision.effective_tier.value,
         )
 
         logger.info(
@@ -1009,6 +836,8 @@ async def run_crew_definition(
             status="pending",
         )
 
+    except JobAdmissionError as e:
+        raise admission_http_error(e)
     except Exception as e:
         logger.error(f"Failed to submit crew {crew_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to submit crew execution")
@@ -1167,12 +996,7 @@ async def preflight_crew(
 
     from AICrews.application.crew.run_context import RunContext, run_context_scope
 
-    run_ctx = RunContext(
-        entitlements_decision=decision,
-        effective_scope=decision.effective_scope.value,
-        byok_allowed=decision.limits.byok_allowed,
-        runtime_limits=decision.limits,
-    )
+    run_ctx = RunContext.from_decision(decision)
 
     try:
         assembler = get_crew_assembler()
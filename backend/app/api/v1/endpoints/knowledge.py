@@ -18,6 +18,7 @@ from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile, File
 from sqlalchemy.orm import Session
 
 from backend.app.security import get_current_user, get_current_user_optional, get_db
+from AICrews.application.crew.preflight import invalidate_preflight_cache
 from AICrews.database.models import User
 
 # Import schemas
@@ -97,7 +98,9 @@ async def unsubscribe_knowledge(
 ) -> Dict[str, str]:
     """取消订阅知识源"""
     try:
-        return service.unsubscribe_knowledge(source_key, current_user)
+        result = service.unsubscribe_knowledge(source_key, current_user)
+        await invalidate_preflight_cache(current_user.id)
+        return result
     except ValueError as e:
         if str(e) == "Knowledge source not found":
             raise HTTPException(status_code=404, detail=str(e))
@@ -174,7 +177,9 @@ async def delete_user_knowledge(
 ) -> Dict[str, str]:
     """删除用户自定义知识源"""
     try:
-        return service.delete_user_knowledge(source_id, current_user)
+        result = service.delete_user_knowledge(source_id, current_user)
+        await invalidate_preflight_cache(current_user.id)
+        return result
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -199,7 +204,9 @@ async def set_crew_knowledge_binding(
     service: KnowledgeService = Depends(get_knowledge_service),
 ) -> Dict[str, Any]:
     """设置 Crew 的知识绑定配置"""
-    return service.set_crew_knowledge_binding(crew_name, request, current_user)
+    result = service.set_crew_knowledge_binding(crew_name, request, current_user)
+    await invalidate_preflight_cache(current_user.id)
+    return result
 
 @router.delete("/bindings/{crew_name}", summary="删除 Crew 知识绑定")
 async def delete_crew_knowledge_binding(
@@ -236,7 +243,9 @@ async def bind_agent_knowledge(
     service: KnowledgeService = Depends(get_knowledge_service),
 ) -> AgentKnowledgeBindingResponse:
     """为指定 Agent 绑定知识源（显式绑定）"""
-    return service.bind_agent_knowledge(request, crew_name, current_user)
+    result = service.bind_agent_knowledge(request, crew_name, current_user)
+    await invalidate_preflight_cache(current_user.id)
+    return result
 
 @router.get("/agents/{crew_name}/{agent_name}/binding", summary="获取 Agent 知识绑定")
 async def get_agent_knowledge_binding(
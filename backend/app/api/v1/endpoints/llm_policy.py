@@ -22,6 +22,7 @@ from sqlalchemy.orm import Session
 
 from backend.app.security import get_current_user, get_db
 from backend.app.api.v1.utils.entitlements_http import require_entitlement
+from AICrews.application.crew.preflight import invalidate_preflight_cache
 from AICrews.database.models.user import User
 from AICrews.database.models.llm_policy import (
     LLMSystemProfile,
@@ -100,6 +101,19 @@ _config_store_instance: Optional[Any] = None
 _config_store_lock = __import__('threading').Lock()
 
 
+async def _invalidate_pooled_llms(llm_config_id: int) -> None:
+    """凭证/端点变更后让所有 worker 丢弃基于旧配置创建的 LLM 实例"""
+    try:
+        from AICrews.infrastructure.cache.invalidation_bus import get_invalidation_bus
+        from AICrews.llm.runtime.runtime import LLM_POOL_NAMESPACE, llm_pool_tags
+
+        await get_invalidation_bus().publish(
+            LLM_POOL_NAMESPACE, tags=llm_pool_tags(llm_config_id=llm_config_id)
+        )
+    except Exception as e:
+        logger.warning(f"Failed to invalidate pooled LLMs for config {llm_config_id}: {e}")
+
+
 def _get_config_store():
     """Lazy-initialize ConfigStore to avoid import-time I/O."""
     global _config_store_instance
@@ -604,6 +618,8 @@ async def save_llm_config(
 
     db.commit()
     db.refresh(config)
+    await _invalidate_pooled_llms(config.id)
+    await invalidate_preflight_cache(current_user.id)
 
     logger.info(
         f"Saved LLM config: user_id={current_user.id}, provider={request.provider_key}, "
@@ -647,6 +663,8 @@ async def delete_llm_config(
 
     db.delete(config)
     db.commit()
+    await _invalidate_pooled_llms(config_id)
+    await invalidate_preflight_cache(current_user.id)
     logger.info(f"Deleted LLM config: user_id={current_user.id}, config_id={config_id}")
 
 
@@ -1473,6 +1491,15 @@ async def reload_system_llm_config() -> SystemConfigReloadResponse:
     store = get_system_llm_config_store()
     result = store.reload()
 
+    # Broadcast so the other workers reload too (this worker already has)
+    try:
+        from AICrews.infrastructure.cache.invalidation_bus import get_invalidation_bus
+        from AICrews.llm.system_config import SYSTEM_LLM_CONFIG_NAMESPACE
+
+        await get_invalidation_bus().publish(SYSTEM_LLM_CONFIG_NAMESPACE, clear=True, local=False)
+    except Exception as e:
+        logger.warning(f"Failed to broadcast system LLM config reload: {e}")
+
     # Get all configs with masked keys for response
     configs = store.get_all_configs()
 
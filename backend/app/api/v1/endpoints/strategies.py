@@ -14,7 +14,8 @@ from backend.app.security import get_db, get_current_user
 from AICrews.database.models import User
 from AICrews.schemas.strategy import (
     StrategyCreate, StrategyUpdate, StrategyResponse,
-    StrategyValidation, StrategyEvaluation, EvaluationResult
+    StrategyValidation, StrategyEvaluation, EvaluationResult,
+    StrategyBacktestRequest, BacktestResult
 )
 from AICrews.services.strategy_service import StrategyService
 
@@ -142,6 +143,29 @@ async def batch_evaluate_strategy(
     except PermissionError:
         raise HTTPException(status_code=403, detail="Access denied")
 
+@router.post("/backtest", response_model=BacktestResult)
+async def backtest_strategy(
+    request: StrategyBacktestRequest,
+    current_user: User = Depends(get_current_user),
+    service: StrategyService = Depends(get_strategy_service)
+):
+    """历史回测策略（逐 K 线求值）"""
+    try:
+        return await service.backtest_strategy(
+            user_id=current_user.id,
+            ticker=request.ticker,
+            strategy_id=request.strategy_id,
+            formula=request.formula,
+            period=request.period,
+            horizons=request.horizons
+        )
+    except ValueError as e:
+        if "not found" in str(e):
+            raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+    except PermissionError:
+        raise HTTPException(status_code=403, detail="Access denied")
+
 # ============================================
 # Strategy Market (Public Strategies)
 # ============================================
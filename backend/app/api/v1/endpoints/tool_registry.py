@@ -23,6 +23,7 @@ from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.orm import Session
 
 from backend.app.security import get_db, get_current_user, get_current_user_optional
+from AICrews.application.crew.preflight import invalidate_preflight_cache
 from AICrews.database.models import (
     User, MCPServer, MCPTool, UserMCPSubscription, UserStrategy, BuiltinTool,
     UserToolPreference
@@ -307,6 +308,7 @@ async def toggle_tool(
                 # 直接更新策略的 is_active
                 strategy.is_active = request.enabled
                 db.commit()
+                await invalidate_preflight_cache(current_user.id)
                 return ToggleToolResponse(
                     tool_key=tool_key,
                     user_enabled=request.enabled,
@@ -338,6 +340,7 @@ async def toggle_tool(
         db.add(pref)
     
     db.commit()
+    await invalidate_preflight_cache(current_user.id)
     
     return ToggleToolResponse(
         tool_key=tool_key,
@@ -425,6 +428,7 @@ async def subscribe_mcp_server(
         db.add(sub)
     
     db.commit()
+    await invalidate_preflight_cache(current_user.id)
     
     return {
         "server_key": server_key,
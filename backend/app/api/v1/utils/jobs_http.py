@@ -0,0 +1,19 @@
+from fastapi import HTTPException
+
+from AICrews.infrastructure.jobs.scheduler import JobAdmissionError
+
+
+def admission_http_error(exc: JobAdmissionError) -> HTTPException:
+    """
+    Map a rejected job submission to a 429 with a Retry-After hint.
+
+    Admission runs before the job record is created, so clients can simply retry.
+    """
+    return HTTPException(
+        status_code=429,
+        detail={
+            "reason": exc.reason,
+            "message": str(exc),
+        },
+        headers={"Retry-After": str(exc.retry_after)},
+    )
@@ -10,6 +10,7 @@ from typing import Awaitable, Callable, List
 from fastapi import FastAPI
 
 from AICrews.database.db_manager import get_db_session
+from AICrews.infrastructure.cache.invalidation_bus import get_invalidation_bus
 from AICrews.infrastructure.cache.redis_manager import close_redis, init_redis
 from AICrews.infrastructure.jobs.job_manager import get_job_manager
 from AICrews.llm.unified_manager import get_unified_llm_manager
@@ -398,9 +399,16 @@ async def lifespan(app: FastAPI):
         await init_redis(host=redis_host, port=redis_port, db=redis_db)
         logger.info("Redis cache initialized: %s:%s", redis_host, redis_port)
 
+        # Cross-worker cache invalidation (compiled crews, knowledge sources, LLM pool)
+        invalidation_bus = get_invalidation_bus()
+        await invalidation_bus.start()
+        register_cleanup(invalidation_bus.stop)
+
         # Initialize TrackingService with WebSocket manager for real-time event broadcast
         tracker = TrackingService()
         tracker.set_dependencies(storage=None, ws_manager=ws_manager)
+        await tracker.event_dispatcher.start()
+        register_cleanup(tracker.event_dispatcher.stop)
         logger.info("TrackingService initialized with WebSocket manager")
 
         # Register CrewAI EventBus listeners and litellm callbacks for event tracking
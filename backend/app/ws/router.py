@@ -6,6 +6,7 @@ from typing import List, Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from AICrews.services.realtime_ws_manager import get_realtime_ws_manager
+from backend.app.security import decode_access_token
 from backend.app.ws.run_log_manager import manager as run_log_ws_manager
 
 logger = logging.getLogger(__name__)
@@ -15,7 +16,10 @@ router = APIRouter()
 
 async def _handle_run_log_ws(websocket: WebSocket, run_id: str) -> None:
     last_event_id = websocket.query_params.get("last_event_id")
-    await run_log_ws_manager.connect(websocket, run_id, last_event_id=last_event_id)
+    batch = websocket.query_params.get("batch", "").lower() in ("1", "true")
+    await run_log_ws_manager.connect(
+        websocket, run_id, last_event_id=last_event_id, batch=batch
+    )
     try:
         while True:
             await websocket.receive_text()
@@ -45,12 +49,28 @@ def _parse_tickers_param(value: Optional[str]) -> Optional[List[str]]:
     return tickers or None
 
 
+def _parse_user_id(token: Optional[str]) -> Optional[int]:
+    """解析可选的 token 参数，用于绑定用户定向推送（如策略告警）"""
+    if not token:
+        return None
+    payload = decode_access_token(token)
+    if not payload or payload.get("sub") is None:
+        return None
+    try:
+        return int(payload["sub"])
+    except (TypeError, ValueError):
+        return None
+
+
 async def _handle_price_ws(websocket: WebSocket) -> None:
     ws_manager = get_realtime_ws_manager()
     tickers = _parse_tickers_param(websocket.query_params.get("tickers"))
 
     try:
         await ws_manager.connect_price(websocket, tickers=tickers)
+        user_id = _parse_user_id(websocket.query_params.get("token"))
+        if user_id is not None:
+            ws_manager.bind_user(websocket, user_id)
         while True:
             data = await websocket.receive_text()
             if data == "ping":
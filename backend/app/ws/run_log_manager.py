@@ -1,8 +1,8 @@
 import json
 import logging
 import os
-from collections import OrderedDict
-from typing import Any, Dict, List
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Set
 
 from fastapi import WebSocket
 
@@ -17,6 +17,11 @@ class ConnectionManager:
     Memory Management:
     - LRU eviction (max runs in memory, configurable via FAIC_WS_RUN_LOG_MAX_RUNS)
     - Per-run event limits (configurable via FAIC_WS_RUN_LOG_MAX_EVENTS_PER_RUN)
+
+    Framing:
+    - Default clients receive one RunEvent JSON object per frame.
+    - Clients connecting with ?batch=1 receive batched frames:
+      {"type": "run_events", "run_id": ..., "events": [RunEvent, ...]}
     """
     def __init__(self, max_history: int = None, max_runs: int = None):
         # run_id -> list of websockets
@@ -26,20 +31,26 @@ class ConnectionManager:
         self.max_history = max_history or int(os.getenv("FAIC_WS_RUN_LOG_MAX_EVENTS_PER_RUN", "1000"))
         self.max_runs = max_runs or int(os.getenv("FAIC_WS_RUN_LOG_MAX_RUNS", "100"))
 
-        # run_id -> list of recent messages (ring-buffer)
+        # run_id -> recent messages (ring-buffer)
         # OrderedDict for LRU tracking (insertion order = access order via move_to_end)
-        self.history: OrderedDict[str, List[Dict[str, Any]]] = OrderedDict()
+        self.history: OrderedDict[str, Deque[Dict[str, Any]]] = OrderedDict()
+        # websockets that opted into batched frames
+        self.batch_clients: Set[WebSocket] = set()
 
         logger.info(
             f"ConnectionManager initialized: max_runs={self.max_runs}, "
             f"max_events_per_run={self.max_history}"
         )
 
-    async def connect(self, websocket: WebSocket, run_id: str, last_event_id: str = None):
+    async def connect(
+        self, websocket: WebSocket, run_id: str, last_event_id: str = None, batch: bool = False
+    ):
         await websocket.accept()
         if run_id not in self.active_connections:
             self.active_connections[run_id] = []
         self.active_connections[run_id].append(websocket)
+        if batch:
+            self.batch_clients.add(websocket)
         logger.info(f"WebSocket connected for run_id: {run_id}")
 
         # Mark run as recently accessed (LRU)
@@ -58,10 +69,11 @@ class ConnectionManager:
 
             # If not found (or was the last one), we might have missed some if it was purged
             # For now, if not found, we send nothing or could send all
-            for msg in missed_messages:
-                await websocket.send_text(json.dumps(msg))
+            if missed_messages:
+                await self._send_events(websocket, run_id, missed_messages)
 
     def disconnect(self, websocket: WebSocket, run_id: str):
+        self.batch_clients.discard(websocket)
         if run_id in self.active_connections:
             if websocket in self.active_connections[run_id]:
                 self.active_connections[run_id].remove(websocket)
@@ -109,38 +121,61 @@ class ConnectionManager:
         await websocket.send_text(message)
 
     async def broadcast_to_run(self, run_id: str, message: Dict[str, Any]) -> None:
-        """Broadcast a message to all clients interested in a specific run_id.
+        """Broadcast a message to all clients interested in a specific run_id."""
+        await self.broadcast_batch(run_id, [message])
+
+    async def broadcast_batch(self, run_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Broadcast several messages for one run, in order.
 
         Enforces run limit via LRU eviction before adding new run.
         """
+        if not messages:
+            return
+
         # Enforce run limit before adding new run
         if run_id not in self.history:
             self._enforce_run_limit()
-
-        # Mark run as recently accessed (LRU)
-        if run_id in self.history:
+            # Per-run event limit: the ring-buffer drops the oldest event once full
+            self.history[run_id] = deque(maxlen=self.max_history)
+        else:
+            # Mark run as recently accessed (LRU)
             self.history.move_to_end(run_id)
 
         # Store in history first
-        if run_id not in self.history:
-            self.history[run_id] = []
-
-        self.history[run_id].append(message)
-
-        # Enforce per-run event limit (FIFO eviction)
-        if len(self.history[run_id]) > self.max_history:
-            evicted = self.history[run_id].pop(0)
-            logger.debug(
-                f"[ConnectionManager] Run {run_id} history full ({self.max_history}), evicted oldest event"
-            )
-
-        if run_id in self.active_connections:
-            msg_json = json.dumps(message)
-            for connection in self.active_connections[run_id]:
-                try:
-                    await connection.send_text(msg_json)
-                except Exception as e:
-                    logger.error(f"Error sending websocket message: {e}")
-                    # Disconnect will happen when the connection is closed
+        self.history[run_id].extend(messages)
+
+        connections = self.active_connections.get(run_id)
+        if not connections:
+            return
+
+        batch_json = None
+        single_json = None
+        for connection in list(connections):
+            try:
+                if connection in self.batch_clients:
+                    if batch_json is None:
+                        batch_json = self._batch_frame(run_id, messages)
+                    await connection.send_text(batch_json)
+                else:
+                    if single_json is None:
+                        single_json = [json.dumps(message) for message in messages]
+                    for text in single_json:
+                        await connection.send_text(text)
+            except Exception as e:
+                logger.error(f"Error sending websocket message: {e}")
+                # Disconnect will happen when the connection is closed
+
+    @staticmethod
+    def _batch_frame(run_id: str, messages: List[Dict[str, Any]]) -> str:
+        return json.dumps({"type": "run_events", "run_id": run_id, "events": messages})
+
+    async def _send_events(
+        self, websocket: WebSocket, run_id: str, messages: List[Dict[str, Any]]
+    ) -> None:
+        if websocket in self.batch_clients:
+            await websocket.send_text(self._batch_frame(run_id, messages))
+            return
+        for msg in messages:
+            await websocket.send_text(json.dumps(msg))
 
 manager = ConnectionManager()
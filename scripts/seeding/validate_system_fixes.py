@@ -218,6 +218,27 @@ def validate_expression_validation():
 
         print("  ✅ Expression validation (natural language): PASS")
 
+        # Test 5: Bare K/D/J must evaluate whenever validation accepts them
+        import numpy as np
+        import pandas as pd
+
+        closes = np.linspace(100, 120, 60)
+        df = pd.DataFrame({
+            "open": closes,
+            "high": closes + 1,
+            "low": closes - 1,
+            "close": closes,
+            "volume": np.full(60, 1_000_000.0),
+        })
+        for formula in ("K > 50", "D < 80", "J > D", "K() > D"):
+            is_valid, error = engine.validate_formula(formula)
+            if not is_valid:
+                print(f"  ❌ Expression validation: FAIL - should accept {formula}: {error}")
+                return False
+            engine.evaluate(formula, df)
+
+        print("  ✅ Expression validation (bare KDJ round-trip): PASS")
+
         return True
 
     except Exception as e: